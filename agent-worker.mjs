@@ -0,0 +1,39 @@
+// Agent job worker: runs the long-running agents /api/agents/run queues
+// (lib/agent-jobs.js), outside the web server.
+//
+//   yarn worker                (MONGO_URL and DB_NAME from .env, as Next reads it)
+//   MONGO_URL=mongodb://... DB_NAME=... node agent-worker.mjs
+//
+// Each process runs up to AGENT_WORKERS (default 4) jobs at a time; start
+// more processes to run more. Without one running, jobs stay queued. On
+// SIGTERM or SIGINT it stops claiming jobs and exits once the jobs it is
+// running have finished.
+
+import nextEnv from '@next/env';
+import { MongoClient } from 'mongodb';
+import { getAgentWorkers } from './lib/agent-jobs.js';
+import { runAgent } from './lib/agents.js';
+
+nextEnv.loadEnvConfig(process.cwd());
+
+if (!process.env.MONGO_URL || !process.env.DB_NAME) {
+  console.error('MONGO_URL and DB_NAME are required');
+  process.exit(2);
+}
+
+const client = new MongoClient(process.env.MONGO_URL);
+await client.connect();
+const workers = getAgentWorkers(client.db(process.env.DB_NAME), runAgent);
+console.log(`Agent worker started: ${workers.size} workers`);
+
+let stopping = false;
+const stop = async signal => {
+  if (stopping) return;
+  stopping = true;
+  console.log(`${signal}: finishing running agent jobs`);
+  await workers.stop();
+  await client.close();
+  process.exit(0);
+};
+process.on('SIGTERM', () => stop('SIGTERM'));
+process.on('SIGINT', () => stop('SIGINT'));
@@ -1,6 +1,7 @@
 'use client'
 
 import { useState } from 'react'
+import { waitForJob } from '@/lib/stream-client'
 import { Card, CardContent, CardDescription, CardFooter, CardHeader, CardTitle } from '@/components/ui/card'
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
@@ -327,7 +328,17 @@ export default function AgentsPage() {
       }
       
       const data = await response.json()
-      setResult(data.result)
+      if (response.status === 202) {
+        // Long-running agents are queued; follow the job until it finishes
+        setResult('Queued...')
+        const job = await waitForJob(data.status_url, update => {
+          if (update.status === 'running') setResult('Working on it...')
+        })
+        if (job.status === 'failed') throw new Error(job.error || 'Agent failed')
+        setResult(job.result)
+      } else {
+        setResult(data.result)
+      }
     } catch (error) {
       setResult(`Error: ${error.message}`)
     } finally {
@@ -5,6 +5,28 @@ import * as cheerio from 'cheerio'
 import { getClient } from '@/lib/apollo-client'
 import { GET_AI_TOOLS, SEARCH_AI_TOOLS, isAITool } from '@/lib/producthunt'
 import TargetedAiToolsScraper from '@/lib/scrapers/targeted-aitools-scraper'
+import AiToolsScraper from '@/lib/scrapers/aitools-scraper'
+import { ScrapeProfileStore } from '@/lib/scrapers/scrape-profiles'
+import { classifyTool, reclassifyCatalog } from '@/lib/category-classifier'
+import { getToolSuggester } from '@/lib/suggest-index'
+import { searchTools } from '@/lib/tool-search'
+import { getTrendingTools, refreshTrendScores } from '@/lib/trending'
+import { sanitizeHTML } from '@/lib/html-sanitizer'
+import { promptCacheStats } from '@/lib/ai-providers'
+import { streamWebsiteGeneration } from '@/lib/website-stream'
+import { hedgedCompletion, collectHedgedCompletion, providerLatency } from '@/lib/provider-hedging'
+import { WorkflowOutputParser } from '@/lib/workflow-output'
+import { assembleSite, regenerateSection } from '@/lib/site-sections'
+import { getWorkflowTemplateIndex, workflowOwner, workflowSystemPrompt } from '@/lib/workflow-templates'
+import { convertWorkflow, WORKFLOW_PLATFORMS } from '@/lib/workflow-graph'
+import { saveWebsite, loadWebsite, replaceWebsiteSection, migrateWebsite, saveWorkflow, loadWorkflow, migrateGeneratedCollection, storageReport, WEBSITE_LIST_PROJECTION, WORKFLOW_LIST_PROJECTION } from '@/lib/generated-store'
+import { startSyncJob, getSyncJob } from '@/lib/sync-jobs'
+import { AgentError, enqueueAgentJob, getAgentJob, agentJobEvents } from '@/lib/agent-jobs'
+import { LONG_RUNNING_AGENTS, runAgent } from '@/lib/agents'
+import { getBlobBytes } from '@/lib/blob-store'
+import { writeTools, rebuildEntities, ensureToolIndexes } from '@/lib/tool-sink'
+import { syncProductHuntTopic, backfillProductHunt, DEFAULT_PH_TOPICS, BACKFILL_TOPICS } from '@/lib/producthunt-sync'
+import { fetchFromSources, normalizeToolName } from '@/lib/source-fanout'
 
 // Cricbuzz live scores using external API
 async function scrapeCricbuzzLiveMatches() {
@@ -1441,6 +1463,17 @@ async function connectToMongo() {
   return db
 }
 
+// Entity-resolution internals are never sent to clients
+const TOOL_LIST_PROJECTION = { minhash: 0, minhash_bands: 0, name_key: 0 }
+
+// Timers, document.write, eval and Function in inline scripts of generated
+// websites are refused, whole or one regenerated section at a time
+const usesUnsafeScript = code => /\b(?:setTimeout|setInterval|document\.write|document\.writeln|eval|(?:new\s+)?Function)\s*\(/.test(code)
+const unsafeScriptError = {
+  error: 'Unable to generate safe code. Please try a different prompt.',
+  suggestion: 'Try describing your website without requesting specific JavaScript functions.'
+}
+
 // Helper function to handle CORS
 function handleCORS(response) {
   response.headers.set('Access-Control-Allow-Origin', '*')
@@ -1670,14 +1703,17 @@ async function fetchProductHuntTools() {
     // Transform Product Hunt data to match our schema
     const transformedTools = data.data?.posts?.edges?.map(edge => {
       const post = edge.node
+      const topics = post.topics?.edges?.map(topicEdge => topicEdge.node.name) || []
+      const { category, confidence } = classifyTool({ ...post, topics }, { fallback: 'Other' })
       return {
         id: post.id,
         name: post.name || 'Unknown Tool',
         tagline: post.tagline || '',
         description: post.description || post.tagline || '',
         url: post.url || '',
-        category: mapProductHuntTopicsToCategory(post.topics?.edges || []),
-        topics: post.topics?.edges?.map(topicEdge => topicEdge.node.name) || [],
+        category,
+        category_confidence: confidence,
+        topics,
         votes: post.votesCount || 0,
         rating: 0, // Product Hunt doesn't provide ratings
         featured_at: post.featuredAt || post.createdAt || new Date().toISOString(),
@@ -1700,182 +1736,6 @@ async function fetchProductHuntTools() {
   }
 }
 
-// Helper function to fetch aitools.fyi data
-async function fetchAitoolsFyiTools() {
-  try {
-    console.log('Scraping aitools.fyi...')
-    
-    const response = await fetch('https://aitools.fyi/', {
-      headers: {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-      }
-    })
-    
-    if (!response.ok) {
-      console.error('Failed to fetch aitools.fyi:', response.status)
-      return []
-    }
-    
-    const html = await response.text()
-    const $ = cheerio.load(html)
-    const tools = []
-    
-    // Scrape AI tools from aitools.fyi
-    $('.tool-card, .card, .item, [data-tool]').each((index, element) => {
-      if (tools.length >= 30) return false // Limit to 30 tools
-      
-      try {
-        const $elem = $(element)
-        const name = $elem.find('.tool-name, .title, h3, h2').first().text().trim()
-        const tagline = $elem.find('.tool-tagline, .description, .subtitle').first().text().trim()
-        const description = $elem.find('.tool-description, .desc, p').first().text().trim()
-        const url = $elem.find('a').first().attr('href')
-        const category = $elem.find('.category, .tag').first().text().trim()
-        
-        if (name && name.length > 2) {
-          tools.push({
-            id: uuidv4(),
-            name: name,
-            tagline: tagline || '',
-            description: description || tagline || '',
-            url: url ? (url.startsWith('http') ? url : `https://aitools.fyi${url}`) : '',
-            category: category || mapAitoolsTextToCategory(name + ' ' + tagline),
-            topics: [category || 'AI Tools'].filter(Boolean),
-            votes: 0,
-            rating: 0,
-            featured_at: new Date().toISOString(),
-            created_at: new Date().toISOString(),
-            source: 'aitools.fyi',
-            maker: 'aitools.fyi',
-            website: url ? extractWebsiteFromUrl(url) : 'aitools.fyi',
-            launch_date: new Date().toISOString(),
-            is_featured: false,
-            badge: 'AI Tool',
-            thumbnail: generateThumbnailUrl(name)
-          })
-        }
-      } catch (err) {
-        console.error('Error parsing aitools.fyi element:', err)
-      }
-    })
-    
-    // If no tools found with specific selectors, try general approach
-    if (tools.length === 0) {
-      $('h1, h2, h3, h4, .title').each((index, element) => {
-        if (tools.length >= 20) return false
-        
-        try {
-          const $elem = $(element)
-          const name = $elem.text().trim()
-          const parent = $elem.parent()
-          const description = parent.find('p, .description').first().text().trim()
-          
-          if (name && name.length > 2 && name.length < 100) {
-            tools.push({
-              id: uuidv4(),
-              name: name,
-              tagline: description.substring(0, 100) || '',
-              description: description || '',
-              url: 'https://aitools.fyi/',
-              category: mapAitoolsTextToCategory(name + ' ' + description),
-              topics: ['AI Tools'],
-              votes: 0,
-              rating: 0,
-              featured_at: new Date().toISOString(),
-              created_at: new Date().toISOString(),
-              source: 'aitools.fyi',
-              maker: 'aitools.fyi',
-              website: 'aitools.fyi',
-              launch_date: new Date().toISOString(),
-              is_featured: false,
-              badge: 'AI Tool',
-              thumbnail: generateThumbnailUrl(name)
-            })
-          }
-        } catch (err) {
-          console.error('Error parsing aitools.fyi general element:', err)
-        }
-      })
-    }
-    
-    console.log(`✅ Scraped ${tools.length} tools from aitools.fyi`)
-    return tools
-    
-  } catch (error) {
-    console.error('Error scraping aitools.fyi:', error)
-    return []
-  }
-}
-
-// Helper function to map Product Hunt topics to categories
-function mapProductHuntTopicsToCategory(topics) {
-  const topicMap = {
-    'artificial-intelligence': 'AI & Machine Learning',
-    'design-tools': 'Design',
-    'marketing': 'Marketing',
-    'developer-tools': 'Development',
-    'sales': 'Sales',
-    'saas': 'SaaS',
-    'productivity': 'Productivity',
-    'social-media': 'Social Media',
-    'no-code': 'No-Code',
-    'fintech': 'Finance',
-    'health-fitness': 'Health & Fitness',
-    'education': 'Education',
-    'analytics': 'Analytics',
-    'customer-communication': 'Communication',
-    'email': 'Email',
-    'crypto': 'Cryptocurrency',
-    'games': 'Gaming',
-    'travel': 'Travel',
-    'music': 'Music',
-    'video': 'Video'
-  }
-  
-  for (const topic of topics) {
-    const topicName = topic.node?.name?.toLowerCase()
-    if (topicName && topicMap[topicName]) {
-      return topicMap[topicName]
-    }
-  }
-  
-  return 'Other'
-}
-
-// Helper function to map aitools.fyi text to categories
-function mapAitoolsTextToCategory(text) {
-  const lowerText = text.toLowerCase()
-  
-  if (lowerText.includes('ai') || lowerText.includes('artificial intelligence') || lowerText.includes('machine learning')) {
-    return 'AI & Machine Learning'
-  } else if (lowerText.includes('design') || lowerText.includes('graphic') || lowerText.includes('ui') || lowerText.includes('ux')) {
-    return 'Design'
-  } else if (lowerText.includes('marketing') || lowerText.includes('seo') || lowerText.includes('ads')) {
-    return 'Marketing'
-  } else if (lowerText.includes('developer') || lowerText.includes('code') || lowerText.includes('api')) {
-    return 'Development'
-  } else if (lowerText.includes('sales') || lowerText.includes('crm')) {
-    return 'Sales'
-  } else if (lowerText.includes('productivity') || lowerText.includes('task') || lowerText.includes('workflow')) {
-    return 'Productivity'
-  } else if (lowerText.includes('social') || lowerText.includes('media')) {
-    return 'Social Media'
-  } else if (lowerText.includes('no-code') || lowerText.includes('nocode')) {
-    return 'No-Code'
-  } else if (lowerText.includes('video') || lowerText.includes('youtube')) {
-    return 'Video'
-  } else if (lowerText.includes('image') || lowerText.includes('photo')) {
-    return 'Image'
-  } else if (lowerText.includes('text') || lowerText.includes('writing')) {
-    return 'Writing'
-  } else if (lowerText.includes('audio') || lowerText.includes('music')) {
-    return 'Audio'
-  } else {
-    return 'AI & Machine Learning'
-  }
-}
-
 // Helper function to extract website from URL
 function extractWebsiteFromUrl(url) {
   try {
@@ -1893,24 +1753,10 @@ function generateThumbnailUrl(name) {
   return `https://via.placeholder.com/400x300/4F46E5/FFFFFF?text=${encodedName}`
 }
 
-// Helper function to remove duplicate tools
-function removeDuplicateTools(tools) {
-  const seen = new Set()
-  const uniqueTools = []
-  
-  for (const tool of tools) {
-    const key = tool.name.toLowerCase().trim()
-    if (!seen.has(key)) {
-      seen.add(key)
-      uniqueTools.push(tool)
-    }
-  }
-  
-  return uniqueTools
-}
-
 // Helper function to transform Product Hunt data to our format
 function transformPHToolToDBFormat(phTool) {
+  const topics = phTool.topics?.edges?.map(edge => edge.node.name) || []
+  const { category, confidence } = classifyTool({ ...phTool, topics }, { fallback: 'General' })
   return {
     id: uuidv4(),
     ph_id: phTool.id,
@@ -1921,17 +1767,52 @@ function transformPHToolToDBFormat(phTool) {
     url: phTool.url,
     website: phTool.website,
     makers: [], // Simplified - no makers data in reduced query
-    topics: [], // Simplified - no topics data in reduced query
-    category: 'General',
+    topics,
+    category,
+    category_confidence: confidence,
     pricing: 'Unknown',
     rating: Math.random() * 2 + 3,
-    featured_at: new Date(phTool.createdAt),
+    featured_at: new Date(phTool.featuredAt || phTool.createdAt),
     source: 'Product Hunt',
     created_at: new Date(),
     updated_at: new Date()
   }
 }
 
+// Source adapters for /ai-tools/sync-all; add a source by adding an entry
+function syncAllSourceAdapters() {
+  return [
+    {
+      name: 'producthunt',
+      fetchTools: async () => {
+        const apolloClient = getClient();
+        const { data } = await apolloClient.query({
+          query: GET_AI_TOOLS,
+          variables: { first: 10 }
+        });
+        return data.posts.edges.map(edge => edge.node).filter(isAITool).map(transformPHToolToDBFormat);
+      }
+    },
+    {
+      name: 'aitools-fyi',
+      fetchTools: () => new AiToolsScraper().scrapeWithFallback()
+    }
+  ]
+}
+
+function syncJobResponse(sourceName, started, resumed, job) {
+  return {
+    message: started
+      ? `${resumed ? 'Resumed' : 'Started'} ${sourceName} sync`
+      : `${sourceName} sync already in progress`,
+    in_progress: !started,
+    resumed: !!resumed,
+    job_id: job.id,
+    status_url: `/api/ai-tools/sync-jobs/${job.id}`,
+    job
+  }
+}
+
 // Route handler function
 async function handleRoute(request, { params }) {
   const { path = [] } = params
@@ -1965,52 +1846,20 @@ async function handleRoute(request, { params }) {
           const source = url.searchParams.get('source') || '';
           const sort = url.searchParams.get('sort') || 'featured_at';
           
-          const skip = (page - 1) * limit;
-          
-          // Build query for database
-          const query = {};
-          if (search) {
-            query.$or = [
-              { name: { $regex: search, $options: 'i' } },
-              { description: { $regex: search, $options: 'i' } },
-              { tagline: { $regex: search, $options: 'i' } }
-            ];
-          }
-          if (category) query.category = category;
-          if (source) query.source = source;
-          
-          // Build sort
-          const sortObj = {};
-          if (sort === 'featured_at') sortObj.featured_at = -1;
-          else if (sort === 'votes') sortObj.votes = -1;
-          else if (sort === 'name') sortObj.name = 1;
-          else if (sort === 'rating') sortObj.rating = -1;
-          else sortObj.featured_at = -1;
-          
-          // Fetch from database
-          const dbTools = await db.collection('ai_tools').find(query)
-            .sort(sortObj)
-            .skip(skip)
-            .limit(limit)
-            .toArray();
-          
-          // Fetch fresh data from Product Hunt and aitools.fyi
-          const productHuntTools = await fetchProductHuntTools();
-          const aitoolsTools = await fetchAitoolsFyiTools();
-          
-          // Combine tools - Product Hunt first (newest), then aitools.fyi, then database
-          const allTools = [...productHuntTools, ...aitoolsTools, ...dbTools];
-          
-          // Remove duplicates by tool name
-          const uniqueTools = removeDuplicateTools(allTools);
-          
-          // Sort by date (newest first)
-          uniqueTools.sort((a, b) => new Date(b.featured_at) - new Date(a.featured_at));
-          
-          // Apply pagination to combined results
-          const paginatedTools = uniqueTools.slice(skip, skip + limit);
+          // facets=1 adds category and source counts for the same filters
+          const withFacets = ['1', 'true'].includes(url.searchParams.get('facets'));
+          
+          const { tools: paginatedTools, totalCount, facets } = await searchTools(db, {
+            search,
+            category,
+            source,
+            sort,
+            page,
+            limit,
+            facets: withFacets,
+            projection: TOOL_LIST_PROJECTION
+          });
           
-          const totalCount = uniqueTools.length;
           const totalPages = Math.ceil(totalCount / limit);
           
           return handleCORS(NextResponse.json({
@@ -2021,7 +1870,8 @@ async function handleRoute(request, { params }) {
               totalCount: totalCount,
               hasNextPage: page < totalPages,
               hasPrevPage: page > 1
-            }
+            },
+            ...(facets && { facets })
           }));
           
         } catch (error) {
@@ -2033,111 +1883,130 @@ async function handleRoute(request, { params }) {
         }
       }
 
-      // Sync Product Hunt tools endpoint - POST /api/ai-tools/sync-producthunt
-      if (toolsRoute === '/sync-producthunt' && method === 'POST') {
+      // Typeahead - GET /api/ai-tools/suggest?q=
+      if (toolsRoute === '/suggest' && method === 'GET') {
         try {
-          const productHuntTools = await fetchProductHuntTools();
+          const url = new URL(request.url);
+          const q = url.searchParams.get('q') || '';
+          const limit = Math.min(Math.max(parseInt(url.searchParams.get('limit')) || 8, 1), 20);
           
-          // Store in database with Product Hunt source
-          for (const tool of productHuntTools) {
-            await db.collection('ai_tools').updateOne(
-              { name: tool.name },
-              { 
-                $set: {
-                  ...tool,
-                  source: 'producthunt',
-                  synced_at: new Date()
-                }
-              },
-              { upsert: true }
-            );
-          }
+          // Built from MongoDB on first use, then kept current in memory
+          const suggester = getToolSuggester(db);
+          await suggester.ready();
           
-          return handleCORS(NextResponse.json({
-            success: true,
-            message: `Synced ${productHuntTools.length} tools from Product Hunt`,
-            count: productHuntTools.length
-          }));
+          const started = performance.now();
+          const suggestions = suggester.suggest(q, limit);
+          const tookMs = performance.now() - started;
+          
+          return handleCORS(NextResponse.json(
+            { query: q, ...suggestions, took_ms: Math.round(tookMs * 1000) / 1000 },
+            { headers: { 'Cache-Control': 'public, max-age=30' } }
+          ));
           
         } catch (error) {
-          console.error('Error syncing Product Hunt tools:', error);
+          console.error('Error fetching suggestions:', error);
           return handleCORS(NextResponse.json(
-            { error: 'Failed to sync Product Hunt tools' },
+            { error: 'Failed to fetch suggestions' },
             { status: 500 }
           ));
         }
       }
 
-      // Sync aitools.fyi endpoint - POST /api/ai-tools/sync-aitools
-      if (toolsRoute === '/sync-aitools' && method === 'POST') {
+      // Sync Product Hunt tools endpoint - POST /api/ai-tools/sync-producthunt
+      if (toolsRoute === '/sync-producthunt' && method === 'POST') {
         try {
-          const aitoolsTools = await fetchAitoolsFyiTools();
+          const productHuntTools = await fetchProductHuntTools();
           
-          // Store in database with aitools.fyi source
-          for (const tool of aitoolsTools) {
-            await db.collection('ai_tools').updateOne(
-              { name: tool.name },
-              { 
-                $set: {
-                  ...tool,
-                  source: 'aitools.fyi',
-                  synced_at: new Date()
-                }
-              },
-              { upsert: true }
-            );
-          }
+          // Store in database with Product Hunt source
+          await writeTools(db, productHuntTools.map(({ id, ...tool }) => ({
+            ...tool,
+            id: uuidv4(),
+            ph_id: id,
+            source: 'producthunt',
+            synced_at: new Date()
+          })));
           
           return handleCORS(NextResponse.json({
             success: true,
-            message: `Synced ${aitoolsTools.length} tools from aitools.fyi`,
-            count: aitoolsTools.length
+            message: `Synced ${productHuntTools.length} tools from Product Hunt`,
+            count: productHuntTools.length
           }));
           
         } catch (error) {
-          console.error('Error syncing aitools.fyi tools:', error);
+          console.error('Error syncing Product Hunt tools:', error);
           return handleCORS(NextResponse.json(
-            { error: 'Failed to sync aitools.fyi tools' },
+            { error: 'Failed to sync Product Hunt tools' },
             { status: 500 }
           ));
         }
       }
 
-    // AI Tools sync endpoint - POST /api/ai-tools/sync (Product Hunt)
+    // AI Tools sync endpoint - POST /api/ai-tools/sync (Product Hunt, incremental)
     if (route === '/ai-tools/sync' && method === 'POST') {
       try {
-        const apolloClient = getClient();
-        const { data } = await apolloClient.query({
-          query: GET_AI_TOOLS,
-          variables: { first: 10 } // Reduced from 50 to 10 to lower complexity
+        const { started, resumed, job } = await startSyncJob(db, 'producthunt', {
+          pages: DEFAULT_PH_TOPICS,
+          // Pages forward from the newest post until the topic's high-water mark
+          processPage: async (topic) => {
+            const result = await syncProductHuntTopic(db, topic, {
+              transform: transformPHToolToDBFormat,
+              filter: isAITool
+            });
+            return { found: result.found, inserted: result.inserted, updated: result.updated };
+          }
         });
         
-        const tools = data.posts.edges.map(edge => edge.node);
-        const aiTools = tools.filter(isAITool);
+        return handleCORS(NextResponse.json(syncJobResponse('Product Hunt', started, resumed, job), { status: 202 }));
         
-        let syncedCount = 0;
-        
-        for (const tool of aiTools) {
-          // Check if tool already exists
-          const existingTool = await db.collection('ai_tools').findOne({ ph_id: tool.id });
-          
-          if (!existingTool) {
-            const transformedTool = transformPHToolToDBFormat(tool);
-            await db.collection('ai_tools').insertOne(transformedTool);
-            syncedCount++;
-          }
+      } catch (error) {
+        console.error('Error syncing AI tools:', error);
+        return handleCORS(NextResponse.json(
+          { error: 'Failed to sync AI tools from Product Hunt' },
+          { status: 500 }
+        ));
+      }
+    }
+
+    // Product Hunt history backfill - POST /api/ai-tools/sync/backfill
+    if (route === '/ai-tools/sync/backfill' && method === 'POST') {
+      try {
+        const body = await request.json().catch(() => ({}));
+        const concurrency = Math.min(Math.max(parseInt(body.concurrency) || 2, 1), 4);
+        const pagesPerTopic = Math.min(Math.max(parseInt(body.pagesPerTopic) || 25, 1), 200);
+        const topics = body.topics === undefined ? BACKFILL_TOPICS : [].concat(body.topics);
+
+        if (topics.length === 0 || topics.some(topic => !BACKFILL_TOPICS.includes(topic))) {
+          return handleCORS(NextResponse.json(
+            { error: `Topics must be one of: ${BACKFILL_TOPICS.join(', ')}` },
+            { status: 400 }
+          ));
         }
+
+        const { started, resumed, job } = await startSyncJob(db, 'producthunt-backfill', {
+          pages: ['backfill'],
+          // Each run walks up to pagesPerTopic further back from the saved cursors
+          processPage: async () => {
+            const results = await backfillProductHunt(db, {
+              topics: [...new Set(topics)],
+              transform: transformPHToolToDBFormat,
+              filter: isAITool,
+              pagesPerTopic,
+              concurrency
+            });
+            return results.reduce((totals, result) => ({
+              found: totals.found + result.found,
+              inserted: totals.inserted + result.inserted,
+              updated: totals.updated + result.updated
+            }), { found: 0, inserted: 0, updated: 0 });
+          }
+        });
         
-        return handleCORS(NextResponse.json({
-          message: `Successfully synced ${syncedCount} new AI tools from Product Hunt`,
-          synced: syncedCount,
-          total_found: aiTools.length
-        }));
+        return handleCORS(NextResponse.json(syncJobResponse('Product Hunt backfill', started, resumed, job), { status: 202 }));
         
       } catch (error) {
-        console.error('Error syncing AI tools:', error);
+        console.error('Error starting Product Hunt backfill:', error);
         return handleCORS(NextResponse.json(
-          { error: 'Failed to sync AI tools from Product Hunt' },
+          { error: 'Failed to start Product Hunt backfill' },
           { status: 500 }
         ));
       }
@@ -2146,41 +2015,29 @@ async function handleRoute(request, { params }) {
     // AI Tools sync endpoint - POST /api/ai-tools/sync-aitools (Targeted AITools.fyi)
     if (route === '/ai-tools/sync-aitools' && method === 'POST') {
       try {
-        const scraper = new TargetedAiToolsScraper();
-        const scrapedTools = await scraper.scrapeAllTargetPages();
-        
-        let syncedCount = 0;
-        
-        for (const tool of scrapedTools) {
-          // Check if tool already exists by name and source
-          const existingTool = await db.collection('ai_tools').findOne({ 
-            name: tool.name, 
-            source: tool.source 
-          });
-          
-          if (!existingTool) {
-            await db.collection('ai_tools').insertOne(tool);
-            syncedCount++;
-          } else {
-            // Update existing tool with new information
-            await db.collection('ai_tools').updateOne(
-              { _id: existingTool._id },
-              { 
-                $set: { 
-                  ...tool,
-                  updated_at: new Date()
-                }
-              }
-            );
+        const scraper = new TargetedAiToolsScraper({ profiles: new ScrapeProfileStore(db) });
+        // Same normalized-name de-dupe scrapeAllTargetPages applies, kept per run
+        const seenNames = new Set();
+        
+        const { started, resumed, job } = await startSyncJob(db, 'aitools-fyi', {
+          pages: scraper.targetPaths,
+          pageDelayMs: scraper.pageDelayMs,
+          processPage: async (path) => {
+            // A page that cannot be fetched fails (and is retried on the next
+            // sync) instead of writing a placeholder tool
+            const pageTools = await scraper.scrapePage(`${scraper.baseUrl}${path}`, 25);
+            const tools = pageTools.filter(tool => {
+              const normalizedName = normalizeToolName(tool.name);
+              if (normalizedName.length <= 2 || seenNames.has(normalizedName)) return false;
+              seenNames.add(normalizedName);
+              return true;
+            });
+            const { inserted, updated } = await writeTools(db, tools);
+            return { found: tools.length, inserted, updated };
           }
-        }
+        });
         
-        return handleCORS(NextResponse.json({
-          message: `Successfully synced ${syncedCount} new AI tools from targeted pages`,
-          synced: syncedCount,
-          total_found: scrapedTools.length,
-          pages_scraped: 20
-        }));
+        return handleCORS(NextResponse.json(syncJobResponse('AITools.fyi', started, resumed, job), { status: 202 }));
         
       } catch (error) {
         console.error('Error syncing targeted AI tools:', error);
@@ -2191,58 +2048,104 @@ async function handleRoute(request, { params }) {
       }
     }
 
+    // Bulk reclassify - POST /api/ai-tools/reclassify
+    if (route === '/ai-tools/reclassify' && method === 'POST') {
+      try {
+        const body = await request.json().catch(() => ({}));
+        // Tools scoring under minConfidence keep their current category
+        const minConfidence = Math.min(Math.max(parseFloat(body.minConfidence) || 0, 0), 1);
+        
+        const { started, resumed, job } = await startSyncJob(db, 'ai-tools-categories', {
+          pages: ['reclassify'],
+          processPage: async () => {
+            const { scanned, changed } = await reclassifyCatalog(db, { minConfidence });
+            return { found: scanned, inserted: 0, updated: changed };
+          }
+        });
+        
+        return handleCORS(NextResponse.json(syncJobResponse('Category reclassification', started, resumed, job), { status: 202 }));
+        
+      } catch (error) {
+        console.error('Error starting category reclassification:', error);
+        return handleCORS(NextResponse.json(
+          { error: 'Failed to start category reclassification' },
+          { status: 500 }
+        ));
+      }
+    }
+
+    // Learned scraper profiles - GET /api/ai-tools/scrape-profiles
+    if (route === '/ai-tools/scrape-profiles' && method === 'GET') {
+      const profiles = await db.collection('scrape_profiles')
+        .find({})
+        .sort({ updated_at: -1 })
+        .toArray();
+      return handleCORS(NextResponse.json({ profiles }));
+    }
+
+    // Entity rebuild - POST /api/ai-tools/entities/rebuild
+    if (route === '/ai-tools/entities/rebuild' && method === 'POST') {
+      try {
+        // Folds legacy duplicates into canonical entities; progress via the sync job
+        const { started, resumed, job } = await startSyncJob(db, 'ai-tools-entities', {
+          pages: ['rebuild'],
+          processPage: async () => {
+            const { scanned, entities, merged } = await rebuildEntities(db);
+            return { found: scanned, inserted: 0, updated: entities, merged };
+          }
+        });
+        
+        return handleCORS(NextResponse.json(syncJobResponse('Entity rebuild', started, resumed, job), { status: 202 }));
+        
+      } catch (error) {
+        console.error('Error starting entity rebuild:', error);
+        return handleCORS(NextResponse.json(
+          { error: 'Failed to start entity rebuild' },
+          { status: 500 }
+        ));
+      }
+    }
+
+    // Sync job progress - GET /api/ai-tools/sync-jobs/:id
+    if (route.startsWith('/ai-tools/sync-jobs/') && method === 'GET') {
+      const job = await getSyncJob(db, route.split('/').pop());
+      
+      if (!job) {
+        return handleCORS(NextResponse.json(
+          { error: 'Sync job not found' },
+          { status: 404 }
+        ));
+      }
+      
+      return handleCORS(NextResponse.json(job));
+    }
+
     // AI Tools sync all endpoint - POST /api/ai-tools/sync-all
     if (route === '/ai-tools/sync-all' && method === 'POST') {
       try {
-        let totalSynced = 0;
         
-        // Sync from Product Hunt
-        try {
-          const apolloClient = getClient();
-          const { data } = await apolloClient.query({
-            query: GET_AI_TOOLS,
-            variables: { first: 10 }
-          });
-          
-          const tools = data.posts.edges.map(edge => edge.node);
-          const aiTools = tools.filter(isAITool);
-          
-          for (const tool of aiTools) {
-            const existingTool = await db.collection('ai_tools').findOne({ ph_id: tool.id });
-            
-            if (!existingTool) {
-              const transformedTool = transformPHToolToDBFormat(tool);
-              await db.collection('ai_tools').insertOne(transformedTool);
-              totalSynced++;
-            }
-          }
-        } catch (phError) {
-          console.error('Product Hunt sync error:', phError);
-        }
+        // All sources run concurrently; the sink folds listings of the same
+        // product into one entity, earlier adapters creating it
+        const { sources, wallMs } = await fetchFromSources(syncAllSourceAdapters());
+        const tools = sources.flatMap(source => source.tools);
         
-        // Sync from AITools.fyi
-        try {
-          const scraper = new AiToolsScraper();
-          const scrapedTools = await scraper.scrapeWithFallback();
-          
-          for (const tool of scrapedTools) {
-            const existingTool = await db.collection('ai_tools').findOne({ 
-              name: tool.name, 
-              source: tool.source 
-            });
-            
-            if (!existingTool) {
-              await db.collection('ai_tools').insertOne(tool);
-              totalSynced++;
-            }
-          }
-        } catch (scrapeError) {
-          console.error('AITools.fyi sync error:', scrapeError);
-        }
+        const writeStart = performance.now();
+        const { inserted, updated, merged, batches } = await writeTools(db, tools);
+        const writeMs = Math.round(performance.now() - writeStart);
         
         return handleCORS(NextResponse.json({
-          message: `Successfully synced ${totalSynced} new AI tools from all sources`,
-          synced: totalSynced
+          message: `Successfully synced ${inserted} new AI tools from all sources`,
+          synced: inserted,
+          updated,
+          total_found: tools.length,
+          merged_in_batch: merged,
+          sources: sources.map(({ tools, ...source }) => ({ ...source, found: tools.length })),
+          timing: {
+            fetch_wall_ms: wallMs,
+            fetch_sum_ms: sources.reduce((sum, source) => sum + source.duration_ms, 0),
+            write_ms: writeMs,
+            write_batches: batches
+          }
         }));
         
       } catch (error) {
@@ -2256,21 +2159,40 @@ async function handleRoute(request, { params }) {
 
     // AI Tools trending endpoint - GET /api/ai-tools/trending
     if (route === '/ai-tools/trending' && method === 'GET') {
-      const limit = parseInt(new URL(request.url).searchParams.get('limit') || '10');
+      const limit = Math.min(100, Math.max(1, parseInt(new URL(request.url).searchParams.get('limit')) || 10))
       
-      const trendingTools = await db.collection('ai_tools')
-        .find({})
-        .sort({ votes: -1, featured_at: -1 })
-        .limit(limit)
-        .toArray();
-      
-      const cleanedTools = trendingTools.map(({ _id, ...rest }) => rest);
+      // Top tools by decayed trend_score, served from an in-memory top-N list
+      // read through the { trend_score: -1 } index
+      await ensureToolIndexes(db)
+      const trendingTools = await getTrendingTools(db, limit, { ...TOOL_LIST_PROJECTION, _id: 0 });
       
       return handleCORS(NextResponse.json({
-        tools: cleanedTools
+        tools: trendingTools
       }));
     }
 
+    // Trend score pass - POST /api/ai-tools/trending/refresh
+    if (route === '/ai-tools/trending/refresh' && method === 'POST') {
+      try {
+        const { started, resumed, job } = await startSyncJob(db, 'ai-tools-trending', {
+          pages: ['trend-scores'],
+          processPage: async () => {
+            const { scored, decayed } = await refreshTrendScores(db);
+            return { found: scored + decayed, inserted: 0, updated: scored + decayed };
+          }
+        });
+        
+        return handleCORS(NextResponse.json(syncJobResponse('Trend score refresh', started, resumed, job), { status: 202 }));
+        
+      } catch (error) {
+        console.error('Error starting trend score refresh:', error);
+        return handleCORS(NextResponse.json(
+          { error: 'Failed to start trend score refresh' },
+          { status: 500 }
+        ));
+      }
+    }
+
     // AI Tools categories endpoint - GET /api/ai-tools/categories
     if (route === '/ai-tools/categories' && method === 'GET') {
       const categories = await db.collection('ai_tools')
@@ -2323,6 +2245,15 @@ async function handleRoute(request, { params }) {
           ))
         }
         
+        // Optional backup providers, raced against the primary when it is slow or fails
+        const hedge = [].concat(body.hedge || [])
+        if (hedge.some(backup => !backup?.apiKey || !validProviders.includes(backup.provider))) {
+          return handleCORS(NextResponse.json(
+            { error: 'Each hedge entry needs an API key and a provider (openai, claude or gemini)' },
+            { status: 400 }
+          ))
+        }
+        
         const systemPrompt = `You are an expert frontend developer and modern web designer. Generate a complete, professional, production-ready website using HTML, Bootstrap CSS, and modern design patterns.
 
 REQUIREMENTS:
@@ -2377,96 +2308,60 @@ IMPORTANT OUTPUT FORMAT:
 
 Generate a complete, professional website that looks like it was built by a top-tier web agency with modern design trends.`
         
-        let generatedCode = ''
-        
-        // Generate code based on provider
-        if (provider === 'openai') {
-          const response = await fetch('https://api.openai.com/v1/chat/completions', {
-            method: 'POST',
-            headers: {
-              'Authorization': `Bearer ${apiKey}`,
-              'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-              model: 'gpt-4',
-              messages: [
-                { role: 'system', content: systemPrompt },
-                { role: 'user', content: prompt }
-              ],
-              max_tokens: 4000,
-              temperature: 0.7,
-            }),
-          })
-          
-          if (!response.ok) {
-            const error = await response.json()
-            throw new Error(error.error?.message || 'OpenAI API error')
-          }
-          
-          const data = await response.json()
-          generatedCode = data.choices[0].message.content
-          
-        } else if (provider === 'claude') {
-          const response = await fetch('https://api.anthropic.com/v1/messages', {
-            method: 'POST',
-            headers: {
-              'x-api-key': apiKey,
-              'Content-Type': 'application/json',
-              'anthropic-version': '2023-06-01',
-            },
-            body: JSON.stringify({
-              model: 'claude-3-5-sonnet-20241022',
-              max_tokens: 4000,
-              system: systemPrompt,
-              messages: [
-                { role: 'user', content: prompt }
-              ],
-            }),
+        // Streaming mode: sanitized HTML is forwarded as NDJSON events while
+        // the model writes it, with token counts in progress events
+        if (body.stream) {
+          const stream = streamWebsiteGeneration({
+            provider,
+            apiKey,
+            hedge,
+            systemPrompt,
+            prompt,
+            validate: code => (usesUnsafeScript(code) ? unsafeScriptError : null),
+            save: async (code, stats) => {
+              const websiteRecord = {
+                id: uuidv4(),
+                prompt: prompt,
+                provider: stats.hedge?.winner || provider,
+                input_tokens: stats.input_tokens,
+                cached_input_tokens: stats.cached_input_tokens,
+                output_tokens: stats.output_tokens,
+                created_at: new Date(),
+                updated_at: new Date()
+              }
+              await saveWebsite(db, websiteRecord, code)
+              return {
+                provider: websiteRecord.provider,
+                code_length: code.length,
+                input_tokens: stats.input_tokens,
+                cached_input_tokens: stats.cached_input_tokens,
+                output_tokens: stats.output_tokens,
+                generated_at: new Date().toISOString(),
+                website_id: websiteRecord.id,
+                ...(stats.hedge && { hedge: stats.hedge })
+              }
+            }
           })
-          
-          if (!response.ok) {
-            const error = await response.json()
-            throw new Error(error.error?.message || 'Claude API error')
-          }
-          
-          const data = await response.json()
-          generatedCode = data.content[0].text
-          
-        } else if (provider === 'gemini') {
-          const response = await fetch(`https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-pro:generateContent?key=${apiKey}`, {
-            method: 'POST',
+          return handleCORS(new Response(stream, {
             headers: {
-              'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-              contents: [
-                {
-                  parts: [
-                    { text: `${systemPrompt}\n\nUser request: ${prompt}` }
-                  ]
-                }
-              ],
-              generationConfig: {
-                temperature: 0.7,
-                maxOutputTokens: 4000,
-              },
-            }),
-          })
-          
-          if (!response.ok) {
-            const error = await response.json()
-            throw new Error(error.error?.message || 'Gemini API error')
-          }
-          
-          const data = await response.json()
-          generatedCode = data.candidates[0].content.parts[0].text
+              'Content-Type': 'application/x-ndjson; charset=utf-8',
+              'Cache-Control': 'no-cache, no-transform',
+              'X-Accel-Buffering': 'no'
+            }
+          }))
         }
         
+        // Streamed and collected, so token counts (cached ones included) are
+        // reported; backup providers in `hedge` are raced against the primary
+        const completion = await collectHedgedCompletion([{ provider, apiKey }, ...hedge], systemPrompt, prompt)
+        const generatedCode = completion.text
+        const hedgeReport = hedge.length > 0 ? completion.hedge : null
+        
         // Clean the generated code to extract just the HTML content
         let cleanCode = generatedCode.trim()
         
-        // Remove any explanatory text before HTML
-        const htmlStart = cleanCode.search(/<[^>]+>/);
+        // Remove any explanatory text before HTML (up to the first '<' opening a tag)
+        const htmlStart = cleanCode.search(/<[a-zA-Z!\/]/);
         if (htmlStart > 0) {
           cleanCode = cleanCode.substring(htmlStart);
         }
@@ -2478,8 +2373,6 @@ Generate a complete, professional website that looks like it was built by a top-
         // Remove any remaining explanatory text patterns
         cleanCode = cleanCode.replace(/^.*?(?=<)/s, '');
         
-        generatedCode = cleanCode
-        
         // Ensure the component ends with export default
         if (!cleanCode.includes('export default')) {
           // Try to find the main component name
@@ -2495,68 +2388,46 @@ Generate a complete, professional website that looks like it was built by a top-
           }
         }
         
-        // Security validation - allow React.js patterns but block truly dangerous content
-        const dangerousPatterns = [
-          // Block external script sources (but allow inline React code)
-          /<script[^>]*src=["'][^"']*(?!.*tailwind|.*react|.*babel)[^"']*["']/gi,
-          // Block external iframes (but allow data: urls)
-          /<iframe[^>]*src=["'][^"']*(?!data:)[^"']*["']/gi,
-          // Block javascript: urls
-          /javascript:\s*[^"'\s]/gi,
-          // Block dangerous functions (but allow React event handlers)
-          /\b(?:eval|Function|setTimeout|setInterval)\s*\(/gi,
-          // Block document.write and similar
-          /\b(?:document\.write|document\.writeln)\s*\(/gi
-        ]
+        // Security pass in one linear scan: event handlers, javascript: URLs,
+        // scripts from unknown hosts and non-https frames are removed and
+        // unclosed tags are closed. Inline scripts are kept for interactivity.
+        const sanitized = sanitizeHTML(cleanCode, { allowInlineScripts: true })
+        if (!sanitized.safe) {
+          console.log('Removed potentially unsafe content from generated code:', sanitized.report.removed)
+        }
+        cleanCode = sanitized.html
         
-        // Check for dangerous patterns
-        const foundDangerousPattern = dangerousPatterns.find(pattern => pattern.test(generatedCode))
-        if (foundDangerousPattern) {
-          console.log('Potentially unsafe content detected, cleaning code...')
-          // Instead of rejecting, try to clean the code
-          let cleanedCode = generatedCode
-          
-          // Remove dangerous script tags but preserve React code
-          cleanedCode = cleanedCode.replace(/<script[^>]*src=["'][^"']*(?!.*tailwind|.*react|.*babel)[^"']*["'][^>]*>.*?<\/script>/gi, '')
-          
-          // Remove javascript: urls
-          cleanedCode = cleanedCode.replace(/javascript:\s*[^"'\s]+/gi, '#')
-          
-          // Remove dangerous function calls
-          cleanedCode = cleanedCode.replace(/\b(?:eval|Function)\s*\(/gi, 'console.log(')
-          
-          // If still dangerous after cleaning, return error
-          if (dangerousPatterns.some(pattern => pattern.test(cleanedCode))) {
-            return handleCORS(NextResponse.json({ 
-              error: 'Unable to generate safe code. Please try a different prompt.',
-              suggestion: 'Try describing your website without requesting specific JavaScript functions.'
-            }, { status: 400 }))
-          }
-          
-          generatedCode = cleanedCode
+        if (usesUnsafeScript(cleanCode)) {
+          return handleCORS(NextResponse.json(unsafeScriptError, { status: 400 }))
         }
         
         // Save generated website to database
         const websiteRecord = {
           id: uuidv4(),
           prompt: prompt,
-          provider: provider,
-          generated_code: cleanCode,
-          code_length: cleanCode.length,
+          provider: hedgeReport?.winner || provider,
+          input_tokens: completion.usage.input_tokens ?? null,
+          cached_input_tokens: completion.usage.cached_input_tokens ?? null,
+          output_tokens: completion.usage.output_tokens ?? null,
           created_at: new Date(),
           updated_at: new Date()
         }
         
-        await db.collection('generated_websites').insertOne(websiteRecord)
+        // Stored as sections in the blob store, so edits can regenerate one at a time
+        await saveWebsite(db, websiteRecord, cleanCode)
         
         return handleCORS(NextResponse.json({
           success: true,
           code: cleanCode,
           metadata: {
-            provider: provider,
+            provider: websiteRecord.provider,
             code_length: cleanCode.length,
+            input_tokens: websiteRecord.input_tokens,
+            cached_input_tokens: websiteRecord.cached_input_tokens,
+            output_tokens: websiteRecord.output_tokens,
             generated_at: new Date().toISOString(),
-            website_id: websiteRecord.id
+            website_id: websiteRecord.id,
+            ...(hedgeReport && { hedge: hedgeReport })
           }
         }))
         
@@ -2569,6 +2440,147 @@ Generate a complete, professional website that looks like it was built by a top-
       }
     }
 
+    // Generated websites, newest first - GET /api/website-builder/websites
+    if (route === '/website-builder/websites' && method === 'GET') {
+      try {
+        const url = new URL(request.url)
+        const page = Math.max(1, parseInt(url.searchParams.get('page')) || 1)
+        const limit = Math.min(100, Math.max(1, parseInt(url.searchParams.get('limit')) || 20))
+        
+        // The projection keeps page HTML (inline or in blobs) out of the scan
+        const websites = await db.collection('generated_websites')
+          .find({}, { projection: WEBSITE_LIST_PROJECTION })
+          .sort({ created_at: -1 })
+          .skip((page - 1) * limit)
+          .limit(limit)
+          .toArray()
+        
+        return handleCORS(NextResponse.json({ success: true, websites, page, limit }))
+        
+      } catch (error) {
+        console.error('Error listing websites:', error)
+        return handleCORS(NextResponse.json(
+          { error: 'Failed to list websites' },
+          { status: 500 }
+        ))
+      }
+    }
+
+    // Generated website with its sections - GET /api/website-builder/websites/:id
+    const websiteRoute = route.match(/^\/website-builder\/websites\/([^/]+)$/)
+    if (websiteRoute && method === 'GET') {
+      try {
+        const websiteId = websiteRoute[1]
+        const website = await db.collection('generated_websites').findOne({ id: websiteId })
+        
+        if (!website) {
+          return handleCORS(NextResponse.json(
+            { error: 'Website not found' },
+            { status: 404 }
+          ))
+        }
+        
+        const { site, code } = await loadWebsite(db, website)
+        
+        return handleCORS(NextResponse.json({
+          success: true,
+          website: {
+            id: website.id,
+            prompt: website.prompt,
+            provider: website.provider,
+            code,
+            shell: site.shell,
+            sections: site.sections,
+            updated_at: website.updated_at
+          }
+        }))
+        
+      } catch (error) {
+        console.error('Error getting website:', error)
+        return handleCORS(NextResponse.json(
+          { error: 'Failed to get website' },
+          { status: 500 }
+        ))
+      }
+    }
+
+    // Regenerate one section - POST /api/website-builder/websites/:id/sections/:sectionId/regenerate
+    const sectionRoute = route.match(/^\/website-builder\/websites\/([^/]+)\/sections\/([^/]+)\/regenerate$/)
+    if (sectionRoute && method === 'POST') {
+      try {
+        const [, websiteId, sectionId] = sectionRoute
+        const { provider, apiKey, instruction } = await request.json()
+        
+        if (!provider || !apiKey || !instruction) {
+          return handleCORS(NextResponse.json(
+            { error: 'Provider, API key, and instruction are required' },
+            { status: 400 }
+          ))
+        }
+        
+        let website = await db.collection('generated_websites').findOne({ id: websiteId })
+        if (!website) {
+          return handleCORS(NextResponse.json(
+            { error: 'Website not found' },
+            { status: 404 }
+          ))
+        }
+        
+        website = await migrateWebsite(db, website)
+        if (!website.sections.some(section => section.id === sectionId)) {
+          return handleCORS(NextResponse.json(
+            { error: `Section not found: ${sectionId}`, sections: website.sections.map(section => section.id) },
+            { status: 404 }
+          ))
+        }
+        
+        // Only this section goes to the model; the rest is reused from storage
+        const stored = await loadWebsite(db, website)
+        const { site, section } = await regenerateSection({
+          provider,
+          apiKey,
+          site: stored.site,
+          sectionId,
+          instruction
+        })
+        
+        if (usesUnsafeScript(section.html)) {
+          return handleCORS(NextResponse.json({
+            ...unsafeScriptError,
+            suggestion: 'Try describing the change without requesting specific JavaScript functions.'
+          }, { status: 400 }))
+        }
+        
+        if (!await replaceWebsiteSection(db, website, section)) {
+          return handleCORS(NextResponse.json(
+            { error: 'The website changed while this section was regenerating. Please try again.' },
+            { status: 409 }
+          ))
+        }
+        const code = assembleSite(site)
+        
+        return handleCORS(NextResponse.json({
+          success: true,
+          code,
+          section,
+          metadata: {
+            provider: provider,
+            website_id: websiteId,
+            section_id: sectionId,
+            section_length: section.html.length,
+            code_length: code.length
+          }
+        }))
+        
+      } catch (error) {
+        console.error('Error regenerating section:', error)
+        return handleCORS(NextResponse.json(
+          { error: error.message || 'Failed to regenerate section' },
+          { status: 500 }
+        ))
+      }
+    }
+
     // Chatbot creation endpoint - POST /api/chatbot/create
     if (route === '/chatbot/create' && method === 'POST') {
       try {
@@ -2791,1007 +2803,26 @@ Generate a complete, professional website that looks like it was built by a top-
         const body = await request.json()
         const { agentId, inputs } = body
         
-        let result = ''
-        
-        switch (agentId) {
-          case 'business-plan-generator':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for business plan generation.'
-            } else if (!inputs.businessIdea || !inputs.industry || !inputs.targetMarket) {
-              result = 'Please provide business idea, industry, and target market.'
-            } else {
-              try {
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-4",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are a professional business consultant. Create a comprehensive business plan with executive summary, market analysis, financial projections, marketing strategy, and implementation timeline. Be specific and actionable.`
-                      },
-                      {
-                        role: "user",
-                        content: `Create a business plan for: ${inputs.businessIdea}. Industry: ${inputs.industry}. Target Market: ${inputs.targetMarket}. Budget: ${inputs.budget || 'Not specified'}.`
-                      }
-                    ],
-                    max_tokens: 2000
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error generating business plan: ${error.message}`
-              }
-            }
-            break
-            
-          case 'competitor-analysis':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for competitor analysis.'
-            } else if (!inputs.company || !inputs.competitors) {
-              result = 'Please provide your company name and list of competitors.'
-            } else {
-              try {
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-4",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are a strategic business analyst. Perform a detailed ${inputs.analysisType} for the given company and competitors. Include strengths, weaknesses, opportunities, threats, and strategic recommendations.`
-                      },
-                      {
-                        role: "user",
-                        content: `Analyze ${inputs.company} against these competitors: ${inputs.competitors}. Focus on: ${inputs.analysisType}.`
-                      }
-                    ],
-                    max_tokens: 1500
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error performing competitor analysis: ${error.message}`
-              }
-            }
-            break
-            
-          case 'meeting-summarizer':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for meeting summarization.'
-            } else if (!inputs.transcript) {
-              result = 'Please provide the meeting transcript.'
-            } else {
-              try {
-                let systemPrompt = `You are a professional meeting assistant. `;
-                
-                switch (inputs.outputFormat) {
-                  case 'Executive Summary':
-                    systemPrompt += 'Create a high-level executive summary focusing on key decisions and strategic points.';
-                    break;
-                  case 'Action Items':
-                    systemPrompt += 'Extract and organize all action items with responsible parties and deadlines.';
-                    break;
-                  case 'Key Decisions':
-                    systemPrompt += 'Focus on decisions made and their implications.';
-                    break;
-                  default:
-                    systemPrompt += 'Create a comprehensive summary including key points, decisions, and action items.';
-                }
-                
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-4",
-                    messages: [
-                      {
-                        role: "system",
-                        content: systemPrompt
-                      },
-                      {
-                        role: "user",
-                        content: `Summarize this ${inputs.meetingType} meeting transcript: "${inputs.transcript}"`
-                      }
-                    ],
-                    max_tokens: 1200
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error summarizing meeting: ${error.message}`
-              }
-            }
-            break
-            
-          case 'sales-email-sequences':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for sales email generation.'
-            } else if (!inputs.product || !inputs.targetAudience) {
-              result = 'Please provide product/service and target audience information.'
-            } else {
-              try {
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-4",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are a sales copywriting expert. Create a ${inputs.emailCount} ${inputs.sequenceType} email sequence. Include subject lines, personalization tips, and timing recommendations for each email.`
-                      },
-                      {
-                        role: "user",
-                        content: `Create ${inputs.emailCount} for ${inputs.sequenceType} selling "${inputs.product}" to "${inputs.targetAudience}".`
-                      }
-                    ],
-                    max_tokens: 2000
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error generating sales email sequence: ${error.message}`
-              }
-            }
-            break
-            
-          case 'market-research-ai':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for market research.'
-            } else if (!inputs.market) {
-              result = 'Please specify the market or industry to research.'
-            } else {
-              try {
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-4",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are a market research analyst. Conduct ${inputs.researchType} for the specified market with focus on ${inputs.geography} over ${inputs.timeframe}. Include market size, trends, opportunities, and challenges.`
-                      },
-                      {
-                        role: "user",
-                        content: `Research the ${inputs.market} market. Focus: ${inputs.researchType}. Geography: ${inputs.geography}. Timeframe: ${inputs.timeframe}.`
-                      }
-                    ],
-                    max_tokens: 1800
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error conducting market research: ${error.message}`
-              }
-            }
-            break
-            
-          case 'user-persona-generator':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for persona generation.'
-            } else if (!inputs.product) {
-              result = 'Please describe your product or service.'
-            } else {
-              try {
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-4",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are a UX researcher. Create ${inputs.personaCount} detailed user personas for a ${inputs.industry} product. Include ${inputs.includeData} for each persona with demographics, behaviors, pain points, goals, and motivations.`
-                      },
-                      {
-                        role: "user",
-                        content: `Create user personas for: ${inputs.product}. Industry: ${inputs.industry}. Number: ${inputs.personaCount}. Include: ${inputs.includeData}.`
-                      }
-                    ],
-                    max_tokens: 1600
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error generating user personas: ${error.message}`
-              }
-            }
-            break
-            
-          case 'financial-projections':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for financial projections.'
-            } else if (!inputs.businessType) {
-              result = 'Please specify your business type.'
-            } else {
-              try {
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-4",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are a financial analyst. Create ${inputs.projectionPeriod} financial projections for a ${inputs.businessType} business with current revenue of ${inputs.revenue}. Include ${inputs.includeScenarios} scenarios with P&L, cash flow, and key metrics.`
-                      },
-                      {
-                        role: "user",
-                        content: `Generate financial projections for ${inputs.businessType} business. Current revenue: ${inputs.revenue}. Period: ${inputs.projectionPeriod}. Scenarios: ${inputs.includeScenarios}.`
-                      }
-                    ],
-                    max_tokens: 1800
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error generating financial projections: ${error.message}`
-              }
-            }
-            break
-            
-          case 'code-reviewer':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for code review.'
-            } else if (!inputs.code) {
-              result = 'Please provide the code to review.'
-            } else {
-              try {
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-4",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are a senior software engineer conducting a code review. Focus on ${inputs.reviewFocus} for ${inputs.language} code. Show ${inputs.severity} issues with specific line references and improvement suggestions.`
-                      },
-                      {
-                        role: "user",
-                        content: `Review this ${inputs.language} code focusing on ${inputs.reviewFocus}: ${inputs.code}`
-                      }
-                    ],
-                    max_tokens: 1500
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error reviewing code: ${error.message}`
-              }
-            }
-            break
-            
-          case 'seo-content-optimizer':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for SEO optimization.'
-            } else if (!inputs.content || !inputs.targetKeyword) {
-              result = 'Please provide content and target keyword.'
-            } else {
-              try {
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-4",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are an SEO expert. Perform ${inputs.optimizationLevel} optimization for a ${inputs.contentType} targeting "${inputs.targetKeyword}". Provide specific recommendations for improvements, keyword density, meta descriptions, and structure.`
-                      },
-                      {
-                        role: "user",
-                        content: `Optimize this ${inputs.contentType} content for "${inputs.targetKeyword}": ${inputs.content}`
-                      }
-                    ],
-                    max_tokens: 1500
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error optimizing content: ${error.message}`
-              }
-            }
-            break
-            
-          case 'automated-testing-generator':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for test generation.'
-            } else if (!inputs.feature) {
-              result = 'Please describe the feature to test.'
-            } else {
-              try {
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-4",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are a QA engineer. Generate ${inputs.complexity} ${inputs.testType} for ${inputs.framework}. Include test cases, setup, assertions, and edge cases.`
-                      },
-                      {
-                        role: "user",
-                        content: `Generate ${inputs.testType} using ${inputs.framework} for: ${inputs.feature}. Complexity: ${inputs.complexity}.`
-                      }
-                    ],
-                    max_tokens: 1500
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error generating tests: ${error.message}`
-              }
-            }
-            break
-            
-          case 'intro-email':
-            if (!inputs.person1 || !inputs.person2 || !inputs.purpose) {
-              result = 'Please provide both person names and introduction purpose.'
-            } else {
-              result = `Subject: Introduction - ${inputs.person1} and ${inputs.person2}
-
-Dear ${inputs.person2},
-
-I hope this email finds you well. I wanted to introduce you to ${inputs.person1}, who I believe would be a valuable connection for you.
-
-${inputs.purpose}
-
-${inputs.context || 'I think you both would benefit from connecting and potentially collaborating.'}
-
-I'll let you both take it from here. ${inputs.person1}, please feel free to reach out to ${inputs.person2} directly.
-
-Best regards,
-[Your Name]
-
----
-Introduction email generated between ${inputs.person1} and ${inputs.person2}`
-            }
-            break
-            
-          case 'follow-up-writer':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key.'
-            } else if (!inputs.previousEmail || !inputs.recipient) {
-              result = 'Please provide the previous email/conversation and recipient name.'
-            } else {
-              try {
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-3.5-turbo",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are a professional email writer. Create a polite, professional follow-up email for the purpose: ${inputs.purpose || 'general follow-up'}`
-                      },
-                      {
-                        role: "user", 
-                        content: `Write a follow-up email to ${inputs.recipient}. Previous conversation: "${inputs.previousEmail}". Purpose: ${inputs.purpose || 'Check Status'}`
-                      }
-                    ],
-                    max_tokens: 300
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error generating follow-up email: ${error.message}`
-              }
-            }
-            break
-            
-          case 'stock-finder':
-            if (!inputs.apiKey) {
-              result = `Most Traded Stocks - ${inputs.market || 'US'} Market
-
-⚠️ This agent requires a RapidAPI key for Yahoo Finance API.
-
-To get real-time stock data:
-1. Go to rapidapi.com
-2. Subscribe to Yahoo Finance API
-3. Add your API key above
-
-Demo Data (${inputs.timeframe || 'Today'}):
-📈 AAPL - Apple Inc. - Volume: 45.2M
-📈 TSLA - Tesla Inc. - Volume: 38.7M  
-📈 NVDA - NVIDIA Corp - Volume: 42.1M
-📈 MSFT - Microsoft Corp - Volume: 28.9M
-📈 AMZN - Amazon.com Inc - Volume: 35.6M
-
-Note: This is demo data. Use your RapidAPI key for real-time information.`
-            } else {
-              result = `Most Traded Stocks - ${inputs.market || 'US'} Market (${inputs.timeframe || 'Today'})
-
-🔄 Fetching real-time data with your API key...
-
-Note: Real Yahoo Finance API integration would be implemented here with your provided API key.
-
-Demo structure:
-📈 Stock Symbol - Company Name - Volume: XXX
-📊 Price: $XXX.XX | Change: +X.XX%
-🕒 Last Updated: [Timestamp]`
-            }
-            break
-            
-          case 'crypto-pulse':
-            const cryptoData = {
-              'Top 10': [
-                '₿ Bitcoin (BTC): $43,250 (+2.4%)',
-                'Ξ Ethereum (ETH): $2,650 (+1.8%)',
-                '🟢 BNB: $315 (+0.9%)',
-                '💰 XRP: $0.63 (+4.2%)',
-                '🔵 Cardano (ADA): $0.48 (+1.5%)'
-              ],
-              'All Markets': [
-                '📈 Biggest Gainers: SOL (+8.2%), MATIC (+6.1%)',
-                '📉 Biggest Losers: DOGE (-3.4%), SHIB (-2.8%)',
-                '💹 Highest Volume: BTC, ETH, USDT'
-              ]
-            }
-            
-            const selectedData = cryptoData[inputs.focus] || cryptoData['Top 10']
-            result = `Crypto Market Pulse - ${inputs.focus || 'Top 10'} (${inputs.timeframe || '24h'})
-
-${selectedData.join('\n')}
-
-📊 Market Overview:
-• Total Market Cap: $1.68T
-• 24h Volume: $68.5B
-• Bitcoin Dominance: 52.3%
-• Fear & Greed Index: 65 (Greed)
-
-⏰ Data as of: ${new Date().toLocaleString()}
-📡 Source: CoinGecko API (Demo Data)
-
-Note: This is demo data. Real implementation would use CoinGecko or CoinMarketCap APIs.`
-            break
-            
-          case 'ai-detector':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for AI detection analysis.'
-            } else if (!inputs.text) {
-              result = 'Please provide text to analyze.'
-            } else {
-              try {
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-3.5-turbo",
-                    messages: [
-                      {
-                        role: "system",
-                        content: "You are an AI detection expert. Analyze the given text and determine if it was likely written by AI or human. Look for patterns like repetitive phrasing, overly formal language, lack of personal touch, or generic content. Provide a confidence percentage."
-                      },
-                      {
-                        role: "user",
-                        content: `Please analyze this text and determine if it was written by AI or human: "${inputs.text}"`
-                      }
-                    ],
-                    max_tokens: 200
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error analyzing text: ${error.message}`
-              }
-            }
-            break
-            
-          case 'seo-writer':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for SEO blog writing.'
-            } else if (!inputs.topic) {
-              result = 'Please provide a blog topic.'
-            } else {
-              try {
-                const keywords = inputs.keywords || inputs.topic
-                const length = inputs.length || 'Medium (1000 words)'
-                const tone = inputs.tone || 'Professional'
-                
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-3.5-turbo",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are an expert SEO content writer. Write a ${length} blog post about "${inputs.topic}" in a ${tone} tone. Include these keywords naturally: ${keywords}. Structure with H1, H2, H3 headers, include meta description, and optimize for search engines.`
-                      },
-                      {
-                        role: "user",
-                        content: `Write an SEO-optimized blog post about: ${inputs.topic}. Target keywords: ${keywords}. Length: ${length}. Tone: ${tone}`
-                      }
-                    ],
-                    max_tokens: 1500
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error generating SEO blog post: ${error.message}`
-              }
-            }
-            break
-            
-          case 'pdf-explainer':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for PDF analysis.'
-            } else if (!inputs.pdfText) {
-              result = 'Please provide the PDF content (copy and paste text from your PDF).'
-            } else {
-              try {
-                const task = inputs.task || 'Summary'
-                let systemPrompt = ''
-                
-                switch (task) {
-                  case 'Summary':
-                    systemPrompt = 'Provide a clear, concise summary of the document content.'
-                    break
-                  case 'Key Points':
-                    systemPrompt = 'Extract and list the key points from the document in bullet format.'
-                    break
-                  case 'Q&A':
-                    systemPrompt = 'Create relevant questions and answers based on the document content.'
-                    break
-                  case 'Explanation':
-                    systemPrompt = 'Explain the document content in simple, easy-to-understand terms.'
-                    break
-                  case 'Action Items':
-                    systemPrompt = 'Identify and list any action items, tasks, or next steps mentioned in the document.'
-                    break
-                }
-                
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-3.5-turbo",
-                    messages: [
-                      {
-                        role: "system",
-                        content: systemPrompt
-                      },
-                      {
-                        role: "user",
-                        content: `Please analyze this document: "${inputs.pdfText}"`
-                      }
-                    ],
-                    max_tokens: 800
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error analyzing PDF: ${error.message}`
-              }
-            }
-            break
-            
-          case 'fine-print-checker':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key for contract analysis.'
-            } else if (!inputs.document) {
-              result = 'Please provide the contract or policy text to analyze.'
-            } else {
-              try {
-                const focus = inputs.focus || 'All Issues'
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-3.5-turbo",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are a legal contract analyzer. Review the document and identify potential issues, focusing on: ${focus}. Highlight concerning clauses, hidden fees, unusual terms, and potential risks. Provide clear explanations in plain English.`
-                      },
-                      {
-                        role: "user",
-                        content: `Please analyze this contract/policy for potential issues (focus: ${focus}): "${inputs.document}"`
-                      }
-                    ],
-                    max_tokens: 800
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = data.choices[0].message.content
-              } catch (error) {
-                result = `Error analyzing contract: ${error.message}`
-              }
-            }
-            break
-            
-          case 'clara-coach':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key so Clara can help you.'
-            } else if (!inputs.situation) {
-              result = 'Please tell Clara about your current situation so she can provide personalized guidance.'
-            } else {
-              try {
-                const mood = inputs.mood || 'Neutral'
-                const goal = inputs.goal || 'General guidance'
-                
-                const response = await fetch('https://api.openai.com/v1/chat/completions', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "gpt-3.5-turbo",
-                    messages: [
-                      {
-                        role: "system",
-                        content: `You are Clara, a warm, empathetic personal growth coach. You provide thoughtful, encouraging advice while being realistic and practical. The person is feeling ${mood} and needs help with ${goal}. Be supportive, ask insightful questions, and provide actionable advice. Keep responses conversational and caring.`
-                      },
-                      {
-                        role: "user",
-                        content: `Hi Clara! I'm feeling ${mood} right now. Here's my situation: ${inputs.situation}. I need help with ${goal}. Can you guide me?`
-                      }
-                    ],
-                    max_tokens: 400
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = `💝 Clara says:\n\n${data.choices[0].message.content}\n\n---\n❤️ Remember: You've got this! Clara is here whenever you need support.`
-              } catch (error) {
-                result = `Clara is having trouble connecting right now: ${error.message}\n\nBut Clara wants you to know: Whatever you're going through, you're stronger than you think! 💪✨`
-              }
-            }
-            break
-            
-          case 'text-summarizer':
-            if (!inputs.text || inputs.text.length < 50) {
-              result = 'Please provide a longer text to summarize (at least 50 characters).'
-            } else {
-              const sentences = inputs.text.split(/[.!?]+/).filter(s => s.trim().length > 10)
-              const sentenceCount = Math.min(3, Math.max(1, Math.floor(sentences.length / 3)))
-              const topSentences = sentences.slice(0, sentenceCount)
-              result = `Summary:\n\n${topSentences.join('. ')}.`
-            }
-            break
-            
-          case 'content-writer':
-            if (!inputs.topic) {
-              result = 'Please provide a topic to write about.'
-            } else {
-              result = `# ${inputs.topic}
-
-## Introduction
-This piece explores the fascinating topic of ${inputs.topic}. In today's rapidly evolving landscape, understanding ${inputs.topic} has become increasingly important.
-
-## Key Points
-- ${inputs.topic} offers numerous benefits and opportunities
-- Understanding the fundamentals is crucial for success
-- Implementation requires careful planning and consideration
-- Results can be measured through various metrics
-
-## Practical Applications
-The real-world applications of ${inputs.topic} are vast and varied. From personal development to business strategy, these principles can be applied in numerous scenarios.
-
-## Conclusion
-In conclusion, ${inputs.topic} represents an important area of focus that deserves our attention and understanding.
-
----
-Generated with ${inputs.tone || 'professional'} tone in ${inputs.length || 'medium'} format.`
-            }
-            break
-            
-          case 'code-generator':
-            if (!inputs.language || !inputs.description) {
-              result = 'Please provide both programming language and description.'
-            } else {
-              const funcName = inputs.description.toLowerCase().replace(/\s+/g, '_')
-              if (inputs.language === 'Python') {
-                result = `def ${funcName}():
-    """
-    ${inputs.description}
-    """
-    # TODO: Implement the logic for ${inputs.description}
-    pass
-    
-# Example usage:
-# result = ${funcName}()
-# print(result)`
-              } else if (inputs.language === 'JavaScript') {
-                result = `function ${funcName.replace(/_/g, '')}() {
-    /**
-     * ${inputs.description}
-     */
-    // TODO: Implement the logic for ${inputs.description}
-    return null;
-}
-
-// Example usage:
-// const result = ${funcName.replace(/_/g, '')}();
-// console.log(result);`
-              } else {
-                result = `// ${inputs.language} code for: ${inputs.description}
-// TODO: Implement the logic for ${inputs.description}`
-              }
-            }
-            break
-            
-          case 'email-writer':
-            if (!inputs.purpose || !inputs.recipient) {
-              result = 'Please provide both purpose and recipient information.'
-            } else {
-              result = `Subject: ${inputs.purpose} - ${inputs.context || 'Follow-up'}
-
-Dear ${inputs.recipient},
-
-I hope this email finds you well. I am writing regarding ${inputs.context || 'the matter we discussed'}.
-
-${inputs.purpose === 'Business' ? 'I would appreciate the opportunity to discuss this matter further at your convenience.' : 
-  inputs.purpose === 'Follow-up' ? 'As discussed, I wanted to follow up on our recent conversation.' :
-  'I would be grateful if you could help me with this matter.'}
-
-Please let me know if you need any additional information or would like to schedule a time to discuss this further.
-
-Thank you for your time and consideration.
-
-Best regards,
-[Your Name]
-
----
-Email generated for ${inputs.purpose} purpose to ${inputs.recipient}`
-            }
-            break
-            
-          case 'social-media':
-            if (!inputs.platform || !inputs.topic) {
-              result = 'Please provide both platform and topic.'
-            } else {
-              const hashtag = inputs.topic.replace(/\s+/g, '')
-              if (inputs.platform === 'Twitter') {
-                result = `🚀 Exploring ${inputs.topic} and its impact on innovation! The possibilities are endless when we embrace new technologies and ideas. #${hashtag} #Innovation
-
----
-Generated for ${inputs.platform} in ${inputs.style || 'professional'} style`
-              } else {
-                result = `The evolution of ${inputs.topic} continues to reshape our industry in fascinating ways.
-
-Key insights:
-• Innovation drives transformation
-• Collaboration amplifies results
-• Continuous learning is essential
-
-What's your experience with ${inputs.topic}?
-
-#${hashtag} #Innovation #Leadership
-
----
-Generated for ${inputs.platform} in ${inputs.style || 'professional'} style`
-              }
-            }
-            break
-            
-          case 'translator':
-            if (!inputs.text || !inputs.fromLang || !inputs.toLang) {
-              result = 'Please provide text, source language, and target language.'
-            } else {
-              result = `Original text (${inputs.fromLang}): ${inputs.text}
-
-Translated to ${inputs.toLang}: [Demo translation - integrate with Google Translate API for actual translations]
-
----
-Translation: ${inputs.fromLang} → ${inputs.toLang}
-Note: This is a demo. For production use, integrate with translation APIs.`
-            }
-            break
-            
-          case 'data-analyzer':
-            if (!inputs.data || !inputs.question) {
-              result = 'Please provide both data and your analysis question.'
-            } else {
-              const lines = inputs.data.split('\n').filter(line => line.trim())
-              const headers = lines[0]?.split(',') || []
-              const rows = lines.slice(1)
-              result = `Data Analysis Results:
-
-Dataset Overview:
-• Total rows: ${rows.length}
-• Columns: ${headers.length} (${headers.join(', ')})
-• Question: ${inputs.question}
-
-Quick Insights:
-• The dataset contains ${rows.length} records
-• Key columns identified: ${headers.slice(0, 3).join(', ')}
-• Data appears to be in CSV format
-
-Recommended Next Steps:
-1. Clean and validate the data
-2. Perform statistical analysis
-3. Create visualizations
-4. Identify patterns and trends
-
----
-Analysis for: ${inputs.question}`
-            }
-            break
-            
-          case 'image-generator':
-            if (!inputs.apiKey) {
-              result = 'Please provide your OpenAI API key to generate images.'
-            } else if (!inputs.prompt) {
-              result = 'Please provide a description for the image you want to generate.'
-            } else {
-              try {
-                const response = await fetch('https://api.openai.com/v1/images/generations', {
-                  method: 'POST',
-                  headers: {
-                    'Authorization': `Bearer ${inputs.apiKey}`,
-                    'Content-Type': 'application/json'
-                  },
-                  body: JSON.stringify({
-                    model: "dall-e-3",
-                    prompt: inputs.prompt,
-                    n: 1,
-                    size: "1024x1024"
-                  })
-                })
-                
-                if (!response.ok) {
-                  throw new Error(`OpenAI API error: ${response.status}`)
-                }
-                
-                const data = await response.json()
-                result = `Image generated successfully!\n\nImage URL: ${data.data[0].url}\n\nPrompt used: ${inputs.prompt}`
-              } catch (error) {
-                result = `Error generating image: ${error.message}`
-              }
-            }
-            break
-            
-          default:
-            result = 'Unknown agent type. Please select a valid agent.'
+        // Long-running agents go to the job queue instead of holding this request open
+        if (LONG_RUNNING_AGENTS.has(agentId) && inputs?.apiKey) {
+          // Run by the agent worker process (agent-worker.mjs)
+          const job = await enqueueAgentJob(db, { agentId, inputs })
+          return handleCORS(NextResponse.json({
+            success: true,
+            queued: true,
+            job_id: job.id,
+            status_url: job.status_url,
+            events_url: job.events_url,
+            job
+          }, { status: 202 }))
         }
         
+        // In the request an agent's failure is still answered as its result
+        const result = await runAgent(db, agentId, inputs).catch(error => {
+          if (error instanceof AgentError) return error.message
+          throw error
+        })
+        
         return handleCORS(NextResponse.json({
           success: true,
           result: result
@@ -3806,6 +2837,51 @@ Analysis for: ${inputs.question}`
       }
     }
 
+    // Agent job status and result - GET /api/agents/jobs/:id
+    // Server-sent status events until it finishes - GET /api/agents/jobs/:id/events
+    if (route.startsWith('/agents/jobs/') && method === 'GET') {
+      const [id, events] = route.replace('/agents/jobs/', '').split('/')
+      
+      if (events === 'events') {
+        return handleCORS(new Response(agentJobEvents(db, id), {
+          headers: {
+            'Content-Type': 'text/event-stream; charset=utf-8',
+            'Cache-Control': 'no-cache, no-transform',
+            'X-Accel-Buffering': 'no'
+          }
+        }))
+      }
+      
+      const job = await getAgentJob(db, id)
+      if (!job) {
+        return handleCORS(NextResponse.json(
+          { error: 'Agent job not found' },
+          { status: 404 }
+        ))
+      }
+      return handleCORS(NextResponse.json(job))
+    }
+
+    // Images made by the image agent - GET /api/agents/images/:hash
+    if (route.startsWith('/agents/images/') && method === 'GET') {
+      const hash = route.split('/').pop()
+      // Only blobs stored as images; website and workflow payloads are not served here
+      const bytes = /^[0-9a-f]{64}$/.test(hash) ? await getBlobBytes(db, hash, { kind: 'image' }) : null
+      if (!bytes) {
+        return handleCORS(NextResponse.json(
+          { error: 'Image not found' },
+          { status: 404 }
+        ))
+      }
+      const contentType = bytes[0] === 0xff && bytes[1] === 0xd8 ? 'image/jpeg'
+        : bytes.subarray(8, 12).toString('latin1') === 'WEBP' ? 'image/webp'
+        : 'image/png'
+      // Content-addressed, so it never changes
+      return handleCORS(new Response(bytes, {
+        headers: { 'Content-Type': contentType, 'Cache-Control': 'public, max-age=31536000, immutable' }
+      }))
+    }
+
     // Status endpoints - POST /api/status
     if (route === '/status' && method === 'POST') {
       const body = await request.json()
@@ -3840,6 +2916,42 @@ Analysis for: ${inputs.question}`
       return handleCORS(NextResponse.json(cleanedStatusChecks))
     }
 
+    // Process metrics for soak tests - GET /api/metrics
+    if (route === '/metrics' && method === 'GET') {
+      const memory = process.memoryUsage()
+      const collections = {}
+
+      for (const name of ['chatbots', 'chat_interactions']) {
+        try {
+          const [stats] = await db.collection(name)
+            .aggregate([{ $collStats: { storageStats: {} } }])
+            .toArray()
+          collections[name] = {
+            count: stats?.storageStats?.count ?? 0,
+            size_bytes: stats?.storageStats?.size ?? 0,
+            index_size_bytes: stats?.storageStats?.totalIndexSize ?? 0
+          }
+        } catch (error) {
+          // $collStats is unavailable on some shared tiers
+          collections[name] = { count: await db.collection(name).estimatedDocumentCount() }
+        }
+      }
+
+      return handleCORS(NextResponse.json({
+        pid: process.pid,
+        uptime_seconds: process.uptime(),
+        memory: {
+          rss: memory.rss,
+          heap_total: memory.heapTotal,
+          heap_used: memory.heapUsed,
+          external: memory.external,
+          array_buffers: memory.arrayBuffers
+        },
+        collections,
+        timestamp: new Date().toISOString()
+      }))
+    }
+
     // Cricket API endpoints
     if (route.startsWith('/cricket/')) {
       const cricketRoute = route.replace('/cricket/', '')
@@ -3954,7 +3066,13 @@ Analysis for: ${inputs.question}`
     if (route === '/workflow-builder/generate' && method === 'POST') {
       try {
         const body = await request.json()
-        const { name, description, provider, apiKey, automationDescription, platform, templateId } = body
+        const { name, description, provider, apiKey, automationDescription, templateId } = body
+        // With `platforms` the workflow is generated once, for `platform` (or the
+        // first one listed), and converted to the others locally
+        const platforms = Array.isArray(body.platforms) && body.platforms.length > 0
+          ? [...new Set(body.platforms)]
+          : [body.platform].filter(Boolean)
+        const platform = body.platform && platforms.includes(body.platform) ? body.platform : platforms[0]
         
         if (!name || !apiKey || !automationDescription || !provider || !platform) {
           return handleCORS(NextResponse.json(
@@ -3972,159 +3090,142 @@ Analysis for: ${inputs.question}`
           ))
         }
         
+        // Optional backup providers, raced against the primary when it is slow or fails
+        const hedge = [].concat(body.hedge || [])
+        if (hedge.some(backup => !backup?.apiKey || !validProviders.includes(backup.provider))) {
+          return handleCORS(NextResponse.json(
+            { error: 'Each hedge entry needs an API key and a provider (openai, claude or gemini)' },
+            { status: 400 }
+          ))
+        }
+        
         // Validate platform
-        const validPlatforms = ['n8n', 'make']
-        if (!validPlatforms.includes(platform)) {
+        if (!platforms.every(requested => WORKFLOW_PLATFORMS.includes(requested))) {
           return handleCORS(NextResponse.json(
             { error: 'Invalid platform. Must be one of: n8n, make' },
             { status: 400 }
           ))
         }
         
-        const systemPrompt = `You are an expert automation workflow designer for ${platform === 'n8n' ? 'n8n' : 'Make.com'}. Generate a complete, production-ready workflow JSON that can be directly imported into ${platform === 'n8n' ? 'n8n' : 'Make.com'}.
-
-CRITICAL REQUIREMENTS:
-1. Generate VALID ${platform === 'n8n' ? 'n8n' : 'Make.com'} workflow JSON format
-2. Include all necessary nodes, connections, and configurations
-3. Use realistic node IDs and proper connections
-4. Include error handling and proper data flow
-5. Add helpful comments and descriptions
-6. Make it production-ready with proper settings
-
-${platform === 'n8n' ? `
-N8N WORKFLOW STRUCTURE:
-- Use proper n8n node types (HTTP Request, Email, Database, etc.)
-- Include connections array with proper node linking
-- Use realistic node IDs (UUIDs)
-- Include proper node settings and parameters
-- Add credentials placeholders where needed
-- Include proper error handling nodes
-` : `
-MAKE.COM WORKFLOW STRUCTURE:
-- Use proper Make.com module structure
-- Include scenarios with modules and routes
-- Use realistic module IDs
-- Include proper module settings and mapping
-- Add webhooks, apps, and connections
-- Include error handling and filters
-`}
-
-WORKFLOW GENERATION RULES:
-- Create a logical flow based on the automation description
-- Include appropriate triggers (webhooks, schedules, etc.)
-- Add data transformation nodes where needed
-- Include proper error handling
-- Add notifications and logging
-- Make it scalable and maintainable
-
-IMPORTANT: Return ONLY the JSON workflow, no explanations or markdown formatting.`
-        
-        let generatedWorkflow = ''
-        let visualPreview = ''
-        
-        // Generate workflow based on provider
-        if (provider === 'openai') {
-          const response = await fetch('https://api.openai.com/v1/chat/completions', {
-            method: 'POST',
-            headers: {
-              'Authorization': `Bearer ${apiKey}`,
-              'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-              model: 'gpt-4',
-              messages: [
-                { role: 'system', content: systemPrompt },
-                { role: 'user', content: `Create a ${platform} workflow for: ${automationDescription}${description ? `\n\nAdditional context: ${description}` : ''}` }
-              ],
-              max_tokens: 3000,
-              temperature: 0.3,
-            }),
-          })
-          
-          if (!response.ok) {
-            const error = await response.json()
-            throw new Error(error.error?.message || 'OpenAI API error')
+        // Adds the other requested platforms to a response: each is converted from
+        // the generated workflow and saved as its own record (source 'converted')
+        const withConversions = async (result, primaryRecord) => {
+          if (platforms.length < 2) return result
+          const workflows = {
+            [platform]: { workflow: result.workflow, visualPreview: result.visualPreview, nodeCount: result.nodeCount, workflow_id: primaryRecord.id, warnings: [] }
           }
-          
-          const data = await response.json()
-          generatedWorkflow = data.choices[0].message.content
-          
-        } else if (provider === 'claude') {
-          const response = await fetch('https://api.anthropic.com/v1/messages', {
-            method: 'POST',
-            headers: {
-              'x-api-key': apiKey,
-              'Content-Type': 'application/json',
-              'anthropic-version': '2023-06-01',
-            },
-            body: JSON.stringify({
-              model: 'claude-3-5-sonnet-20241022',
-              max_tokens: 3000,
-              system: systemPrompt,
-              messages: [
-                { role: 'user', content: `Create a ${platform} workflow for: ${automationDescription}${description ? `\n\nAdditional context: ${description}` : ''}` }
-              ],
-            }),
-          })
-          
-          if (!response.ok) {
-            const error = await response.json()
-            throw new Error(error.error?.message || 'Claude API error')
+          let conversionMs = 0
+          for (const target of platforms.filter(requested => requested !== platform)) {
+            const convertStart = performance.now()
+            const { workflow, warnings } = convertWorkflow(result.workflow, platform, target)
+            conversionMs += performance.now() - convertStart
+            const preview = generateVisualPreview(workflow, target)
+            const convertedRecord = {
+              id: uuidv4(),
+              name: name,
+              description: description || '',
+              platform: target,
+              provider: primaryRecord.provider,
+              source: 'converted',
+              converted_from: primaryRecord.id,
+              automation_description: automationDescription,
+              template_id: templateId || null,
+              node_count: countNodes(workflow, target),
+              created_at: new Date(),
+              updated_at: new Date()
+            }
+            await saveWorkflow(db, convertedRecord, { workflow, preview })
+            workflows[target] = { workflow, visualPreview: preview, nodeCount: convertedRecord.node_count, workflow_id: convertedRecord.id, warnings }
           }
-          
-          const data = await response.json()
-          generatedWorkflow = data.content[0].text
-          
-        } else if (provider === 'gemini') {
-          const response = await fetch(`https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-pro:generateContent?key=${apiKey}`, {
-            method: 'POST',
-            headers: {
-              'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-              contents: [
-                {
-                  parts: [
-                    { text: `${systemPrompt}\n\nCreate a ${platform} workflow for: ${automationDescription}${description ? `\n\nAdditional context: ${description}` : ''}` }
-                  ]
-                }
-              ],
-              generationConfig: {
-                temperature: 0.3,
-                maxOutputTokens: 3000,
-              },
-            }),
-          })
-          
-          if (!response.ok) {
-            const error = await response.json()
-            throw new Error(error.error?.message || 'Gemini API error')
+          return {
+            ...result,
+            workflows,
+            metadata: { ...result.metadata, converted_from: platform, conversion_ms: Math.round(conversionMs * 100) / 100 }
           }
-          
-          const data = await response.json()
-          generatedWorkflow = data.candidates[0].content.parts[0].text
         }
         
-        // Clean the generated workflow
-        let cleanWorkflow = generatedWorkflow.trim()
+        // Template tier: stock automations are answered from the local index
+        // (curated templates and this key's earlier LLM workflows) without a provider call
+        const templateIndex = getWorkflowTemplateIndex(db)
+        const owner = workflowOwner(apiKey)
+        if (body.useTemplates !== false) {
+          const matchStart = performance.now()
+          await templateIndex.ready()
+          const match = templateIndex.search(automationDescription, platform, { owner })
+          if (match) {
+            const { workflow, template } = await templateIndex.instantiate(match, name)
+            const preview = generateVisualPreview(workflow, platform)
+            const templateRecord = {
+              id: uuidv4(),
+              name: name,
+              description: description || '',
+              platform: platform,
+              provider: provider,
+              source: 'template',
+              template: template,
+              automation_description: automationDescription,
+              template_id: templateId || null,
+              node_count: countNodes(workflow, platform),
+              created_at: new Date(),
+              updated_at: new Date()
+            }
+            await saveWorkflow(db, templateRecord, { workflow, preview })
+            
+            return handleCORS(NextResponse.json(await withConversions({
+              success: true,
+              workflow: workflow,
+              visualPreview: preview,
+              nodeCount: templateRecord.node_count,
+              metadata: {
+                platform: platform,
+                provider: provider,
+                served_from: 'template',
+                template: template,
+                match_ms: Math.round((performance.now() - matchStart) * 10) / 10,
+                generated_at: new Date().toISOString(),
+                workflow_id: templateRecord.id
+              }
+            }, templateRecord)))
+          }
+        }
         
-        // Remove markdown code blocks
-        cleanWorkflow = cleanWorkflow.replace(/^```(?:json|JSON)?\n?/gm, '')
-        cleanWorkflow = cleanWorkflow.replace(/\n?```$/gm, '')
+        // Static per platform, so providers can cache it as a prompt prefix;
+        // everything specific to this request goes in the user message
+        const systemPrompt = workflowSystemPrompt(platform)
         
-        // Remove any explanatory text before JSON
-        const jsonStart = cleanWorkflow.indexOf('{')
-        if (jsonStart > 0) {
-          cleanWorkflow = cleanWorkflow.substring(jsonStart)
-        }
+        let visualPreview = ''
         
-        // Try to parse and validate JSON
-        let workflowJson
+        // The reply is parsed while it streams: fences and prose around the JSON
+        // are skipped, nodes that do not fit the platform are dropped as they
+        // complete, and a reply cut off at the token limit is closed off and kept
+        const outputParser = new WorkflowOutputParser(platform)
+        const userPrompt = `Create a ${platform} workflow for: ${automationDescription}${description ? `\n\nAdditional context: ${description}` : ''}`
+        let hedgeReport = null
+        const usage = {}
         try {
-          workflowJson = JSON.parse(cleanWorkflow)
-        } catch (parseError) {
-          // If JSON parsing fails, create a basic template
+          for await (const event of hedgedCompletion([{ provider, apiKey }, ...hedge], systemPrompt, userPrompt, { maxTokens: 3000, temperature: 0.3 })) {
+            if (event.hedge) hedgeReport = event.hedge
+            // Once the JSON is complete, what follows is commentary: it is not
+            // parsed, and the stream is stopped at the next usage report (OpenAI
+            // sends its only one at the end, Claude its output count)
+            const finished = outputParser.done
+            if (event.usage) Object.assign(usage, event.usage)
+            if (finished && event.usage) break
+            if (event.text && !finished) outputParser.write(event.text)
+          }
+        } catch (streamError) {
+          // A reply that broke off mid-stream is repaired like a truncated one
+          if (!outputParser.started) throw streamError
+          console.error('Workflow stream interrupted:', streamError.message)
+        }
+        
+        const parsed = outputParser.end()
+        let workflowJson = parsed.workflow
+        let workflowSource = parsed.complete ? 'llm' : 'repaired'
+        if (!workflowJson) {
+          // Nothing usable came back; fall back to a basic template
           workflowJson = createBasicWorkflowTemplate(platform, name, automationDescription)
+          workflowSource = 'fallback'
         }
         
         // Generate visual preview
@@ -4136,29 +3237,42 @@ IMPORTANT: Return ONLY the JSON workflow, no explanations or markdown formatting
           name: name,
           description: description || '',
           platform: platform,
-          provider: provider,
+          provider: hedgeReport?.winner || provider,
+          source: workflowSource,
+          owner: owner,
           automation_description: automationDescription,
           template_id: templateId || null,
-          workflow_json: workflowJson,
-          visual_preview: visualPreview,
+          node_count: countNodes(workflowJson, platform),
+          input_tokens: usage.input_tokens ?? null,
+          cached_input_tokens: usage.cached_input_tokens ?? null,
+          output_tokens: usage.output_tokens ?? null,
           created_at: new Date(),
           updated_at: new Date()
         }
         
-        await db.collection('generated_workflows').insertOne(workflowRecord);
+        // The workflow JSON and preview go to the blob store; identical ones are stored once
+        await saveWorkflow(db, workflowRecord, { workflow: workflowJson, preview: visualPreview });
+        // Later requests for the same automation can be served from it
+        if (workflowSource === 'llm') templateIndex.add(workflowRecord);
         
-        return handleCORS(NextResponse.json({
+        return handleCORS(NextResponse.json(await withConversions({
           success: true,
           workflow: workflowJson,
           visualPreview: visualPreview,
-          nodeCount: countNodes(workflowJson, platform),
+          nodeCount: workflowRecord.node_count,
           metadata: {
             platform: platform,
-            provider: provider,
+            provider: workflowRecord.provider,
+            served_from: 'llm',
+            repairs: parsed.repairs,
+            input_tokens: workflowRecord.input_tokens,
+            cached_input_tokens: workflowRecord.cached_input_tokens,
+            output_tokens: workflowRecord.output_tokens,
             generated_at: new Date().toISOString(),
-            workflow_id: workflowRecord.id
+            workflow_id: workflowRecord.id,
+            ...(hedge.length > 0 && hedgeReport && { hedge: hedgeReport })
           }
-        }));
+        }, workflowRecord)));
         
       } catch (error) {
         console.error('Error generating workflow:', error);
@@ -4169,6 +3283,108 @@ IMPORTANT: Return ONLY the JSON workflow, no explanations or markdown formatting
       }
     }
 
+    // Generated workflows, newest first - GET /api/workflow-builder/workflows
+    if (route === '/workflow-builder/workflows' && method === 'GET') {
+      try {
+        const url = new URL(request.url)
+        const page = Math.max(1, parseInt(url.searchParams.get('page')) || 1)
+        const limit = Math.min(100, Math.max(1, parseInt(url.searchParams.get('limit')) || 20))
+        const platform = url.searchParams.get('platform')
+        
+        const workflows = await db.collection('generated_workflows')
+          .find(platform ? { platform } : {}, { projection: WORKFLOW_LIST_PROJECTION })
+          .sort({ created_at: -1 })
+          .skip((page - 1) * limit)
+          .limit(limit)
+          .toArray()
+        
+        return handleCORS(NextResponse.json({ success: true, workflows, page, limit }))
+        
+      } catch (error) {
+        console.error('Error listing workflows:', error)
+        return handleCORS(NextResponse.json(
+          { error: 'Failed to list workflows' },
+          { status: 500 }
+        ))
+      }
+    }
+
+    // One generated workflow - GET /api/workflow-builder/workflows/:id
+    const workflowRoute = route.match(/^\/workflow-builder\/workflows\/([^/]+)$/)
+    if (workflowRoute && method === 'GET') {
+      try {
+        const record = await db.collection('generated_workflows').findOne(
+          { id: workflowRoute[1] },
+          { projection: { _id: 0, owner: 0 } }
+        )
+        
+        if (!record) {
+          return handleCORS(NextResponse.json(
+            { error: 'Workflow not found' },
+            { status: 404 }
+          ))
+        }
+        
+        const { workflow, preview } = await loadWorkflow(db, record)
+        const { workflow_json, visual_preview, workflow_blob, preview_blob, storage, ...metadata } = record
+        
+        return handleCORS(NextResponse.json({
+          success: true,
+          workflow,
+          visualPreview: preview,
+          metadata
+        }))
+        
+      } catch (error) {
+        console.error('Error getting workflow:', error)
+        return handleCORS(NextResponse.json(
+          { error: 'Failed to get workflow' },
+          { status: 500 }
+        ))
+      }
+    }
+
+    // Move inline website/workflow payloads into the blob store - POST /api/generated-storage/migrate
+    if (route === '/generated-storage/migrate' && method === 'POST') {
+      try {
+        const { started, resumed, job } = await startSyncJob(db, 'generated-storage', {
+          pages: ['generated_websites', 'generated_workflows'],
+          processPage: async (collection) => {
+            const { found, migrated, inline_bytes } = await migrateGeneratedCollection(db, collection)
+            console.log(`Moved ${migrated}/${found} ${collection} records (${inline_bytes} inline bytes) to the blob store`)
+            return { found, inserted: 0, updated: migrated }
+          }
+        })
+        
+        return handleCORS(NextResponse.json(syncJobResponse('Generated storage migration', started, resumed, job), { status: 202 }))
+        
+      } catch (error) {
+        console.error('Error starting storage migration:', error)
+        return handleCORS(NextResponse.json(
+          { error: 'Failed to start storage migration' },
+          { status: 500 }
+        ))
+      }
+    }
+
+    // Space used and saved by the blob store - GET /api/generated-storage/report
+    if (route === '/generated-storage/report' && method === 'GET') {
+      try {
+        return handleCORS(NextResponse.json({ success: true, ...(await storageReport(db)) }))
+      } catch (error) {
+        console.error('Error building storage report:', error)
+        return handleCORS(NextResponse.json(
+          { error: 'Failed to build storage report' },
+          { status: 500 }
+        ))
+      }
+    }
+
+    // First-token latency, hedging and prompt-cache totals per provider (this process) - GET /api/provider-latency
+    if (route === '/provider-latency' && method === 'GET') {
+      return handleCORS(NextResponse.json({ success: true, ...providerLatency.stats(), prompt_cache: promptCacheStats() }))
+    }
+
     // Route not found
     return handleCORS(NextResponse.json(
       { error: `Route ${route} not found` }, 
@@ -4184,12 +3400,22 @@ IMPORTANT: Return ONLY the JSON workflow, no explanations or markdown formatting
   }
 }
 
+// Wrap a handler so every response reports its server-side duration
+function withServerTiming(handler) {
+  return async (request, context) => {
+    const start = performance.now()
+    const response = await handler(request, context)
+    response.headers.set('Server-Timing', `app;dur=${(performance.now() - start).toFixed(1)}`)
+    return response
+  }
+}
+
 // Export all HTTP methods
-export const GET = handleRoute;
-export const POST = handleRoute;
-export const PUT = handleRoute;
-export const DELETE = handleRoute;
-export const PATCH = handleRoute;
+export const GET = withServerTiming(handleRoute);
+export const POST = withServerTiming(handleRoute);
+export const PUT = withServerTiming(handleRoute);
+export const DELETE = withServerTiming(handleRoute);
+export const PATCH = withServerTiming(handleRoute);
 
 // OPTIONS handler for CORS
 export async function OPTIONS() {
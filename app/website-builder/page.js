@@ -19,6 +19,10 @@ import {
   Globe,
   Layout
 } from 'lucide-react'
+import { readEventStream } from '@/lib/stream-client'
+
+// Streamed HTML re-renders the preview at most this often
+const PREVIEW_INTERVAL_MS = 500
 
 export default function WebsiteBuilder() {
   const [apiProvider, setApiProvider] = useState('openai')
@@ -29,7 +33,14 @@ export default function WebsiteBuilder() {
   const [error, setError] = useState('')
   const [previewMode, setPreviewMode] = useState('desktop')
   const [showCodeView, setShowCodeView] = useState(false)
+  const [progress, setProgress] = useState(null)
+  const [websiteId, setWebsiteId] = useState(null)
+  const [sections, setSections] = useState([])
+  const [editSection, setEditSection] = useState('')
+  const [editInstruction, setEditInstruction] = useState('')
+  const [regenerating, setRegenerating] = useState(false)
   const iframeRef = useRef(null)
+  const previewTimer = useRef(null)
 
   const generateWebsite = async () => {
     if (!apiKey || !prompt) {
@@ -40,7 +51,13 @@ export default function WebsiteBuilder() {
     console.log('🚀 Starting generation with:', { provider: apiProvider, promptLength: prompt.length })
     setLoading(true)
     setError('')
+    setGeneratedCode('')
+    setProgress(null)
+    setWebsiteId(null)
+    setSections([])
     
+    let code = ''
+    let failed = null
     try {
       const response = await fetch('/api/website-builder/generate', {
         method: 'POST',
@@ -50,7 +67,8 @@ export default function WebsiteBuilder() {
         body: JSON.stringify({
           provider: apiProvider,
           apiKey: apiKey,
-          prompt: prompt
+          prompt: prompt,
+          stream: true
         })
       })
       
@@ -67,21 +85,33 @@ export default function WebsiteBuilder() {
         }
       }
       
-      const data = await response.json()
-      console.log('📦 API Response data:', { success: data.success, codeLength: data.code?.length })
+      // Sanitized HTML arrives in pieces; the preview follows along
+      await readEventStream(response, event => {
+        if (event.type === 'html') {
+          code += event.html
+          setGeneratedCode(code)
+          schedulePreview(() => code)
+        } else if (event.type === 'progress') {
+          setProgress(event)
+        } else if (event.type === 'error') {
+          failed = event.error
+        } else if (event.type === 'done') {
+          console.log('📦 Generation finished:', event.metadata)
+          loadSections(event.metadata.website_id)
+        }
+      })
       
-      if (data.success && data.code) {
-        console.log('✅ Setting generated code, length:', data.code.length)
-        setGeneratedCode(data.code)
-        
-        // Use setTimeout to ensure state updates properly
-        setTimeout(() => {
-          console.log('🔄 Updating preview after state update')
-          updatePreview(data.code)
-        }, 200)
+      clearTimeout(previewTimer.current)
+      previewTimer.current = null
+      if (failed) {
+        // A refused page is not kept around for download
+        setGeneratedCode('')
+        setError(failed)
+      } else if (code) {
+        console.log('✅ Generated code, length:', code.length)
+        setTimeout(() => updatePreview(code), 200)
       } else {
-        console.error('❌ Invalid response data:', data)
-        setError(data.error || 'Failed to generate website - invalid response')
+        setError('Failed to generate website - empty response')
       }
       
     } catch (err) {
@@ -93,7 +123,56 @@ export default function WebsiteBuilder() {
     }
   }
 
-  const updatePreview = (code) => {
+  // Section list of a saved site, for single-section edits
+  const loadSections = async (id) => {
+    try {
+      const response = await fetch(`/api/website-builder/websites/${id}`)
+      if (!response.ok) return
+      const data = await response.json()
+      setWebsiteId(id)
+      setSections(data.website.sections.filter(section => !['style', 'script'].includes(section.kind)))
+    } catch (err) {
+      console.error('Failed to load sections:', err)
+    }
+  }
+
+  const regenerateSection = async () => {
+    if (!websiteId || !editSection || !editInstruction) return
+    setRegenerating(true)
+    setError('')
+    try {
+      const response = await fetch(`/api/website-builder/websites/${websiteId}/sections/${editSection}/regenerate`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ provider: apiProvider, apiKey, instruction: editInstruction })
+      })
+      const data = await response.json()
+      if (!response.ok || !data.success) {
+        throw new Error(data.error || 'Failed to regenerate section')
+      }
+      setGeneratedCode(data.code)
+      setSections(sections.map(section => (section.id === data.section.id ? data.section : section)))
+      setEditInstruction('')
+      updatePreview(data.code)
+    } catch (err) {
+      console.error('💥 Section regeneration error:', err)
+      setError(err.message)
+    } finally {
+      setRegenerating(false)
+    }
+  }
+
+  // Throttled preview refresh while HTML is streaming in. Scripts stay off
+  // until the server has checked the whole page and sent 'done'.
+  const schedulePreview = (latestCode) => {
+    if (previewTimer.current) return
+    previewTimer.current = setTimeout(() => {
+      previewTimer.current = null
+      updatePreview(latestCode(), { scripts: false })
+    }, PREVIEW_INTERVAL_MS)
+  }
+
+  const updatePreview = (code, { scripts = true } = {}) => {
     console.log('Updating preview with HTML code:', code.substring(0, 100))
     
     if (!iframeRef.current) {
@@ -107,6 +186,7 @@ export default function WebsiteBuilder() {
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Generated Website</title>
+    ${scripts ? '' : `<meta http-equiv="Content-Security-Policy" content="script-src 'none'">`}
     <!-- Bootstrap CSS -->
     <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css" rel="stylesheet">
     <!-- Font Awesome -->
@@ -179,7 +259,7 @@ export default function WebsiteBuilder() {
 </head>
 <body>
     ${code}
-    
+    ${scripts ? `
     <!-- Bootstrap JS -->
     <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js"></script>
     
@@ -232,7 +312,7 @@ export default function WebsiteBuilder() {
         });
         
         console.log('✅ Modern website loaded successfully!');
-    </script>
+    </script>` : ''}
 </body>
 </html>`
     
@@ -573,6 +653,11 @@ export default function WebsiteBuilder() {
                     <>
                       <Loader2 className="w-4 h-4 mr-2 animate-spin" />
                       Generating...
+                      {progress?.output_tokens > 0 && (
+                        <span className="ml-2 text-xs opacity-80">
+                          {progress.estimated ? '~' : ''}{progress.output_tokens.toLocaleString()} tokens
+                        </span>
+                      )}
                     </>
                   ) : (
                     <>
@@ -612,6 +697,40 @@ export default function WebsiteBuilder() {
                 )}
               </div>
 
+              {/* Section Editing */}
+              {websiteId && sections.length > 0 && !loading && (
+                <div className="mt-4 space-y-2">
+                  <label className="text-sm font-medium text-gray-300 block">Edit one section</label>
+                  <select
+                    value={editSection}
+                    onChange={(e) => setEditSection(e.target.value)}
+                    className="w-full p-2 rounded-lg bg-slate-700 border border-slate-600 text-white text-sm"
+                  >
+                    <option value="">Choose a section...</option>
+                    {sections.map((section) => (
+                      <option key={section.id} value={section.id}>
+                        {section.id}{section.summary ? ` - ${section.summary.slice(0, 40)}` : ''}
+                      </option>
+                    ))}
+                  </select>
+                  <Input
+                    value={editInstruction}
+                    onChange={(e) => setEditInstruction(e.target.value)}
+                    placeholder="e.g. Add a third pricing tier"
+                    className="bg-slate-700 border-slate-600 text-white placeholder-gray-400"
+                  />
+                  <Button
+                    onClick={regenerateSection}
+                    disabled={regenerating || !editSection || !editInstruction || !apiKey}
+                    variant="outline"
+                    className="w-full border-purple-500/30 text-purple-300 hover:bg-purple-500/20"
+                  >
+                    {regenerating ? <Loader2 className="w-4 h-4 mr-2 animate-spin" /> : <Sparkles className="w-4 h-4 mr-2" />}
+                    {regenerating ? 'Regenerating section...' : 'Regenerate Section'}
+                  </Button>
+                </div>
+              )}
+
               {/* Error Display */}
               {error && (
                 <div className="mt-4 p-4 bg-red-900/50 border border-red-700 rounded-lg">
@@ -636,7 +755,7 @@ export default function WebsiteBuilder() {
             </div>
 
             <div className="h-full flex items-center justify-center bg-white">
-              {loading ? (
+              {loading && !generatedCode ? (
                 <div className="text-center">
                   <div className="w-16 h-16 border-4 border-purple-200 border-t-purple-500 rounded-full animate-spin mx-auto mb-4"></div>
                   <p className="text-purple-600 font-medium text-lg">Generating your beautiful website...</p>
@@ -2,10 +2,14 @@
 
 import requests
 import json
+import os
 import time
 import sys
+from collections import Counter
 from datetime import datetime
 
+from result_sink import ResultSink
+
 # Configuration
 BASE_URL = "https://f2884661-c20b-483f-ad47-0b43883bbdde.preview.emergentagent.com/api"
 HEADERS = {
@@ -18,6 +22,7 @@ class BackendTester:
         self.passed_tests = 0
         self.failed_tests = 0
         self.test_results = []
+        self.sink = ResultSink("backend_test", base_url=BASE_URL)
         
     def log_test(self, test_name, passed, message=""):
         status = "✅ PASSED" if passed else "❌ FAILED"
@@ -30,6 +35,7 @@ class BackendTester:
             'passed': passed,
             'message': message
         })
+        self.sink.record(test_name, passed, message)
         
         if passed:
             self.passed_tests += 1
@@ -310,29 +316,91 @@ class BackendTester:
                 
         except Exception as e:
             self.log_test("Clara Coach (No API Key)", False, f"Exception: {str(e)}")
+        
+        # Test 11: Long-running agent queued as a job (needs the agent worker: yarn worker)
+        print("\n--- Testing Queued Agent Job ---")
+        try:
+            payload = {
+                "agentId": "business-plan-generator",
+                "inputs": {
+                    "apiKey": "fake-api-key-for-testing",
+                    "businessIdea": "Meal-prep subscription for night-shift workers",
+                    "industry": "Food",
+                    "targetMarket": "Hospital staff"
+                }
+            }
+            
+            start = time.time()
+            response = requests.post(f"{BASE_URL}/agents/run", json=payload, headers=HEADERS, timeout=30)
+            accepted_ms = (time.time() - start) * 1000
+            
+            if response.status_code == 202:
+                data = response.json()
+                job = self.wait_for_agent_job(data['job_id'])
+                # OpenAI rejects the fake key, so the job must fail rather than complete with the error text
+                if job and job.get('status') == 'failed' and 'OpenAI API error' in (job.get('error') or '') and not job.get('result') and 'inputs' not in job:
+                    self.log_test("Queued Agent Job", True, f"Accepted in {accepted_ms:.0f} ms, failed after {job.get('attempts')} attempts: {job.get('error', '')[:60]}")
+                else:
+                    self.log_test("Queued Agent Job", False, f"Job did not finish cleanly: {job}")
+            else:
+                self.log_test("Queued Agent Job", False, f"HTTP {response.status_code}: {response.text}")
+            
+            response = requests.get(f"{BASE_URL}/agents/jobs/no-such-job", headers=HEADERS, timeout=30)
+            self.log_test("Unknown Agent Job", response.status_code == 404, f"HTTP {response.status_code}")
+                
+        except Exception as e:
+            self.log_test("Queued Agent Job", False, f"Exception: {str(e)}")
+    
+    def wait_for_agent_job(self, job_id, timeout=120, interval=1):
+        """Poll GET /agents/jobs/:id until the job finishes; None on timeout"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            response = requests.get(f"{BASE_URL}/agents/jobs/{job_id}", headers=HEADERS, timeout=30)
+            if response.status_code == 200:
+                job = response.json()
+                if job.get('status') in ('completed', 'failed'):
+                    return job
+            time.sleep(interval)
+        return None
     
+    def wait_for_sync_job(self, job_id, timeout=600, interval=3):
+        """Poll GET /ai-tools/sync-jobs/:id until the job finishes; None on timeout"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            response = requests.get(f"{BASE_URL}/ai-tools/sync-jobs/{job_id}", headers=HEADERS, timeout=30)
+            if response.status_code == 200:
+                job = response.json()
+                print(f"   ⏳ {job.get('status')}: {job.get('pages_done')}/{job.get('pages_total')} pages, "
+                      f"{job.get('tools_found')} tools found")
+                if job.get('status') in ('completed', 'partial', 'failed'):
+                    return job
+            time.sleep(interval)
+        return None
+
     def test_enhanced_scraping(self):
         """Test enhanced scraping functionality"""
         print("\n" + "="*80)
         print("TESTING ENHANCED SCRAPING FUNCTIONALITY")
         print("="*80)
         
-        # Test 1: Enhanced AITools.fyi scraper
+        # Test 1: Enhanced AITools.fyi scraper (background job, polled to completion)
         print("\n--- Testing Enhanced AITools.fyi Scraper ---")
         try:
-            response = requests.post(f"{BASE_URL}/ai-tools/sync-aitools", headers=HEADERS, timeout=120)
+            response = requests.post(f"{BASE_URL}/ai-tools/sync-aitools", headers=HEADERS, timeout=30)
             
-            if response.status_code == 200:
+            if response.status_code == 202:
                 data = response.json()
-                if 'synced' in data and 'total_found' in data and 'categories_scraped' in data:
-                    synced = data['synced']
-                    total_found = data['total_found']
-                    categories = data['categories_scraped']
-                    
-                    if total_found > 0 and categories > 50:  # Should scrape 60+ categories
-                        self.log_test("Enhanced AITools.fyi Scraper", True, f"Scraped {total_found} tools from {categories} categories")
+                job_id = data.get('job_id')
+                if job_id:
+                    job = self.wait_for_sync_job(job_id)
+                    if job is None:
+                        self.log_test("Enhanced AITools.fyi Scraper", False, f"Sync job {job_id} did not finish in time")
+                    elif job.get('status') == 'completed' and job.get('tools_found', 0) > 0:
+                        self.log_test("Enhanced AITools.fyi Scraper", True,
+                                      f"Scraped {job['tools_found']} tools from {job['pages_done']}/{job['pages_total']} pages "
+                                      f"({job['inserted']} new, {job['throughput']['pages_per_minute']} pages/min)")
                     else:
-                        self.log_test("Enhanced AITools.fyi Scraper", False, f"Insufficient scraping: {total_found} tools, {categories} categories")
+                        self.log_test("Enhanced AITools.fyi Scraper", False, f"Sync job ended badly: {job}")
                 else:
                     self.log_test("Enhanced AITools.fyi Scraper", False, f"Invalid response format: {data}")
             else:
@@ -681,6 +749,65 @@ class BackendTester:
         except Exception as e:
             self.log_test("Malformed JSON", True, f"Exception correctly caught: {str(e)}")
     
+    def test_website_stream(self):
+        """Test streamed website generation (stream: true) event order and token counts"""
+        print("\n" + "="*80)
+        print("TESTING STREAMED WEBSITE GENERATION")
+        print("="*80)
+        
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            print("Skipped: set OPENAI_API_KEY to run the streamed generation test")
+            return
+        
+        try:
+            payload = {
+                "provider": "openai",
+                "apiKey": api_key,
+                "prompt": "A one-page site for a small bakery with a menu and a contact form",
+                "stream": True
+            }
+            response = requests.post(f"{BASE_URL}/website-builder/generate", json=payload, stream=True, timeout=300)
+            
+            if response.status_code != 200:
+                self.log_test("Website Stream: Response", False, f"HTTP {response.status_code}")
+                return
+            content_type = response.headers.get('Content-Type', '')
+            self.log_test("Website Stream: NDJSON", content_type.startswith('application/x-ndjson'), content_type)
+            
+            events = [json.loads(line) for line in response.iter_lines() if line]
+            types = [event.get('type') for event in events]
+            
+            # start first, then html/progress, then exactly one final done or error
+            final = types[-1] if types else None
+            order_ok = (
+                len(types) >= 3
+                and types[0] == 'start'
+                and final in ('done', 'error')
+                and all(t in ('html', 'progress') for t in types[1:-1])
+            )
+            self.log_test("Website Stream: Event Order", order_ok, f"{Counter(types)}")
+            
+            progress = [event for event in events if event.get('type') == 'progress']
+            counts_ok = bool(progress) and all(
+                all(key in event for key in ('input_tokens', 'cached_input_tokens', 'output_tokens', 'estimated', 'chars'))
+                for event in progress
+            ) and isinstance(progress[-1].get('output_tokens'), int) and progress[-1]['output_tokens'] > 0
+            self.log_test("Website Stream: Token Counts", counts_ok,
+                          f"{len(progress)} progress events, last: {progress[-1] if progress else None}")
+            
+            if final == 'done':
+                code = ''.join(event['html'] for event in events if event.get('type') == 'html')
+                metadata = events[-1].get('metadata', {})
+                self.log_test("Website Stream: Saved", bool(metadata.get('website_id')) and metadata.get('code_length') == len(code),
+                              f"website_id={metadata.get('website_id')}, {len(code)} chars")
+            else:
+                # A refusal still has to come after everything that was sent
+                self.log_test("Website Stream: Refusal", bool(events[-1].get('error')), events[-1].get('error', ''))
+        
+        except Exception as e:
+            self.log_test("Website Stream", False, f"Exception: {str(e)}")
+    
     def test_cricket_functionality(self):
         """Test all cricket API endpoints"""
         print("\n" + "="*80)
@@ -928,6 +1055,7 @@ class BackendTester:
         self.test_enhanced_scraping()
         self.test_workflow_builder()
         self.test_input_validation()
+        self.test_website_stream()
         self.test_cricket_functionality()
         
         # Print final summary
@@ -944,6 +1072,7 @@ class BackendTester:
         else:
             print(f"\n⚠️  {self.failed_tests} tests failed. Review the issues above.")
         
+        self.sink.close()
         return self.failed_tests == 0
 
 if __name__ == "__main__":
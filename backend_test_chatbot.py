@@ -4,12 +4,15 @@ Comprehensive Backend Testing for NEW Chatbot Builder Platform
 Testing the newly implemented chatbot functionality that was not covered in previous tests.
 """
 
+import argparse
 import requests
 import json
 import time
 import uuid
 from datetime import datetime
 
+from result_sink import ResultSink
+
 # Configuration
 BASE_URL = "https://f2884661-c20b-483f-ad47-0b43883bbdde.preview.emergentagent.com"
 API_BASE = f"{BASE_URL}/api"
@@ -18,6 +21,7 @@ class ChatbotBuilderTester:
     def __init__(self):
         self.test_results = []
         self.created_chatbot_id = None
+        self.sink = ResultSink("backend_test_chatbot", base_url=API_BASE)
         
     def log_test(self, test_name, success, details="", error=""):
         """Log test results"""
@@ -29,6 +33,7 @@ class ChatbotBuilderTester:
             "timestamp": datetime.now().isoformat()
         }
         self.test_results.append(result)
+        self.sink.record(test_name, success, details or error)
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{status} - {test_name}")
         if details:
@@ -319,23 +324,32 @@ class ChatbotBuilderTester:
             self.log_test("Chatbot Info - Non-existent ID", False, "", str(e))
 
     def test_targeted_scraping(self):
-        """Test POST /api/ai-tools/sync-aitools (Enhanced/Targeted Scraping)"""
+        """Test POST /api/ai-tools/sync-aitools (Enhanced/Targeted Scraping, background job)"""
         try:
             print("Testing enhanced targeted scraping (this may take 30-60 seconds)...")
-            response = requests.post(f"{API_BASE}/ai-tools/sync-aitools", json={}, timeout=90)
+            response = requests.post(f"{API_BASE}/ai-tools/sync-aitools", json={}, timeout=30)
             
-            if response.status_code == 200:
-                data = response.json()
-                if 'synced' in data and 'total_found' in data:
-                    self.log_test(
-                        "Enhanced Targeted Scraping",
-                        True,
-                        f"Scraping completed: {data['synced']} new tools synced, {data['total_found']} total found from {data.get('pages_scraped', 'unknown')} pages"
-                    )
-                else:
-                    self.log_test("Enhanced Targeted Scraping", False, "", "Response missing expected fields")
-            else:
+            if response.status_code != 202 or not response.json().get('job_id'):
                 self.log_test("Enhanced Targeted Scraping", False, "", f"HTTP {response.status_code}: {response.text}")
+                return
+            
+            job_id = response.json()['job_id']
+            deadline = time.time() + 300
+            job = {}
+            while time.time() < deadline:
+                job = requests.get(f"{API_BASE}/ai-tools/sync-jobs/{job_id}", timeout=30).json()
+                if job.get('status') in ('completed', 'partial', 'failed'):
+                    break
+                time.sleep(3)
+            
+            if job.get('status') == 'completed':
+                self.log_test(
+                    "Enhanced Targeted Scraping",
+                    True,
+                    f"Scraping completed: {job['inserted']} new tools synced, {job['tools_found']} total found from {job['pages_done']} pages"
+                )
+            else:
+                self.log_test("Enhanced Targeted Scraping", False, "", f"Sync job {job_id} ended as {job.get('status')}: {job.get('error')}")
                 
         except Exception as e:
             self.log_test("Enhanced Targeted Scraping", False, "", str(e))
@@ -439,8 +453,27 @@ class ChatbotBuilderTester:
             for test in failed_tests:
                 print(f"  ❌ {test['test']}: {test['error']}")
         
+        self.sink.close()
         return self.test_results
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chatbot Builder backend tests")
+    parser.add_argument("--soak", action="store_true", help="run the long-running soak mode instead of the functional tests")
+    parser.add_argument("--duration", type=int, default=3600, help="soak duration in seconds")
+    parser.add_argument("--sessions", type=int, default=2000, help="concurrent simulated chat sessions")
+    parser.add_argument("--bots", type=int, default=20, help="chatbots to spread sessions across")
+    parser.add_argument("--workers", type=int, default=32, help="HTTP worker threads")
+    parser.add_argument("--think-time", type=float, default=8.0, help="median seconds between a session's messages")
+    parser.add_argument("--sample-interval", type=int, default=30, help="seconds between metrics samples")
+    parser.add_argument("--drift-threshold", type=float, default=0.2, help="fitted growth that counts as drift (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.soak:
+        from chatbot_soak import ChatbotSoak
+        soak = ChatbotSoak(API_BASE, duration=args.duration, sessions=args.sessions, bots=args.bots,
+                           workers=args.workers, think_time=args.think_time,
+                           sample_interval=args.sample_interval, drift_threshold=args.drift_threshold)
+        raise SystemExit(soak.run())
+
     tester = ChatbotBuilderTester()
     results = tester.run_all_tests()
\ No newline at end of file
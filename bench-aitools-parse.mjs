@@ -0,0 +1,134 @@
+// Micro-benchmark: cheerio vs streaming extraction on saved aitools.fyi pages.
+//
+//   node --expose-gc bench-aitools-parse.mjs [--iterations 200] [--concurrency 8]
+//
+// For each fixture in tests/fixtures/aitools it reports parse time per page
+// for both scraper paths, checks they extract the same tools, and measures
+// heap held while `concurrency` pages are mid-parse at once (cheerio keeps a
+// DOM per page; the streaming path keeps only its open cards).
+
+import fs from 'fs';
+import path from 'path';
+import { fileURLToPath } from 'url';
+import { TargetedAiToolsScraper } from './lib/scrapers/targeted-aitools-scraper.js';
+import { EnhancedAiToolsScraper } from './lib/scrapers/enhanced-aitools-scraper.js';
+
+const FIXTURES = path.join(path.dirname(fileURLToPath(import.meta.url)), 'tests', 'fixtures', 'aitools');
+const CHUNK_SIZE = 16 * 1024;
+
+function option(name, fallback) {
+  const index = process.argv.indexOf(`--${name}`);
+  return index >= 0 ? parseInt(process.argv[index + 1]) : fallback;
+}
+
+const iterations = option('iterations', 200);
+const concurrency = option('concurrency', 8);
+
+function* chunksOf(html) {
+  const bytes = Buffer.from(html);
+  for (let i = 0; i < bytes.length; i += CHUNK_SIZE) {
+    yield bytes.subarray(i, i + CHUNK_SIZE);
+  }
+}
+
+function percentile(sorted, p) {
+  return sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+}
+
+async function timeParser(parse, html) {
+  // Warm up the JIT before timing
+  for (let i = 0; i < Math.min(20, iterations); i++) await parse(html);
+  const samples = [];
+  for (let i = 0; i < iterations; i++) {
+    const start = process.hrtime.bigint();
+    await parse(html);
+    samples.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  samples.sort((a, b) => a - b);
+  return { p50: percentile(samples, 0.5), p95: percentile(samples, 0.95) };
+}
+
+function heapUsed() {
+  global.gc?.();
+  return process.memoryUsage().heapUsed;
+}
+
+// Heap retained with `concurrency` pages in flight, sampled just before the
+// last chunk of each page arrives
+async function heapInFlight(kind, scraper, html) {
+  const baseline = heapUsed();
+  let held;
+  if (kind === 'cheerio') {
+    const { load } = await import('cheerio');
+    const documents = Array.from({ length: concurrency }, () => load(html));
+    held = heapUsed() - baseline;
+    documents.length = 0;
+  } else {
+    const pending = [];
+    let release;
+    const gate = new Promise(resolve => { release = resolve; });
+    let waiting = 0;
+    const arrived = new Promise(resolve => {
+      for (let i = 0; i < concurrency; i++) {
+        pending.push(scraper.extractFromStream((async function* () {
+          const chunks = [...chunksOf(html)];
+          for (let c = 0; c < chunks.length - 1; c++) yield chunks[c];
+          if (++waiting === concurrency) resolve();
+          await gate;
+          yield chunks[chunks.length - 1];
+        })(), Infinity));
+      }
+    });
+    await arrived;
+    held = heapUsed() - baseline;
+    release();
+    await Promise.all(pending);
+  }
+  return held;
+}
+
+function names(candidates) {
+  return candidates.map(candidate => candidate.name.replace(/\s+/g, ' ').trim());
+}
+
+const scrapers = {
+  targeted: new TargetedAiToolsScraper(),
+  enhanced: new EnhancedAiToolsScraper()
+};
+
+if (!global.gc) {
+  console.log('(run with node --expose-gc for stable heap numbers)');
+}
+console.log(`iterations=${iterations} concurrency=${concurrency}\n`);
+console.log('fixture                    scraper   tools  cheerio p50/p95 ms  stream p50/p95 ms  speedup  heap cheerio  heap stream  parity');
+
+let mismatches = 0;
+for (const file of fs.readdirSync(FIXTURES).filter(name => name.endsWith('.html')).sort()) {
+  const html = fs.readFileSync(path.join(FIXTURES, file), 'utf8');
+
+  for (const [label, scraper] of Object.entries(scrapers)) {
+    const cheerioResult = scraper.extractWithCheerio(html, Infinity);
+    const streamResult = await scraper.extractFromStream(chunksOf(html), Infinity);
+    const same = JSON.stringify(names(cheerioResult.candidates)) === JSON.stringify(names(streamResult.candidates));
+    if (!same) mismatches++;
+
+    const cheerioTime = await timeParser(page => scraper.extractWithCheerio(page, Infinity), html);
+    const streamTime = await timeParser(page => scraper.extractFromStream(chunksOf(page), Infinity), html);
+    const cheerioHeap = await heapInFlight('cheerio', scraper, html);
+    const streamHeap = await heapInFlight('stream', scraper, html);
+
+    console.log([
+      file.padEnd(26),
+      label.padEnd(9),
+      String(streamResult.candidates.length).padStart(5),
+      `${cheerioTime.p50.toFixed(2)}/${cheerioTime.p95.toFixed(2)}`.padStart(19),
+      `${streamTime.p50.toFixed(2)}/${streamTime.p95.toFixed(2)}`.padStart(18),
+      `${(cheerioTime.p50 / streamTime.p50).toFixed(1)}x`.padStart(8),
+      `${(cheerioHeap / 1024).toFixed(0)} KB`.padStart(13),
+      `${(streamHeap / 1024).toFixed(0)} KB`.padStart(12),
+      same ? '  ok' : `  MISMATCH (${cheerioResult.selector} vs ${streamResult.selector})`
+    ].join(' '));
+  }
+}
+
+process.exit(mismatches > 0 ? 1 : 0);
@@ -0,0 +1,89 @@
+// Benchmark: prompt-prefix caching of the workflow builder's system prompt.
+//
+//   node bench-prompt-cache.mjs
+//   node bench-prompt-cache.mjs --provider claude --api-key sk-ant-... [--calls 5] [--platform n8n]
+//
+// Offline it reports the size of each platform's system prompt against the
+// 1,024-token minimum below which OpenAI and Claude Sonnet do not cache.
+//
+// With an API key it sends the same system prompt with a different request
+// each time (as /workflow-builder/generate does), output capped at a few
+// tokens, and reports time to first token and cached input tokens per call.
+// The first call writes the cache; the later ones should read most of the
+// prompt from it and answer sooner. Input cost uses the providers' published
+// ratios: Anthropic bills cache reads at 0.1x and cache writes at 1.25x,
+// OpenAI cached tokens at 0.5x.
+
+import { streamCompletion } from './lib/ai-providers.js';
+import { workflowSystemPrompt } from './lib/workflow-templates.js';
+import { WORKFLOW_PLATFORMS } from './lib/workflow-graph.js';
+
+function option(name, fallback) {
+  const index = process.argv.indexOf(`--${name}`);
+  return index >= 0 ? process.argv[index + 1] : fallback;
+}
+
+const provider = option('provider', null);
+const apiKey = option('api-key', process.env.API_KEY);
+const calls = parseInt(option('calls', '5'));
+const platform = option('platform', 'n8n');
+
+const MIN_CACHED_PREFIX_TOKENS = 1024;
+// Rough, for the offline report; JSON-heavy text runs nearer 3 characters a token
+const CHARS_PER_TOKEN = 4;
+const CACHE_READ_COST = { claude: 0.1, openai: 0.5, gemini: 0.25 };
+const CACHE_WRITE_COST = { claude: 1.25, openai: 1, gemini: 1 };
+
+const requests = [
+  'When someone submits a contact form, send them a welcome email and add them to HubSpot',
+  'Every morning, fetch yesterday\'s orders from our API and append them to a Google Sheet',
+  'Post new blog posts from our RSS feed to Twitter and LinkedIn',
+  'When a lead scores above 80, notify the sales channel in Slack',
+  'Every hour, check our status page and text the on-call engineer if it is down',
+  'When a calendar booking comes in, send a confirmation email and an SMS reminder',
+  'Summarize support tickets with OpenAI and store the summary in Postgres',
+  'Parse uploaded CSV files and email a report of the rows'
+];
+
+console.log('system prompt       chars  ~tokens  cacheable');
+for (const name of WORKFLOW_PLATFORMS) {
+  const text = workflowSystemPrompt(name);
+  const tokens = Math.round(text.length / CHARS_PER_TOKEN);
+  console.log(`workflow/${name.padEnd(10)} ${String(text.length).padStart(5)} ${String(tokens).padStart(8)}  ${tokens >= MIN_CACHED_PREFIX_TOKENS ? 'yes' : 'no (too short)'}`);
+}
+
+if (provider) {
+  if (!apiKey) {
+    console.error('\n--api-key (or API_KEY) is required with --provider');
+    process.exit(2);
+  }
+  const systemPrompt = workflowSystemPrompt(platform);
+  console.log(`\n${provider}, ${platform} system prompt, ${calls} calls`);
+  console.log('call  first token ms  input  cached  written  input cost');
+  const rows = [];
+  for (let i = 0; i < calls; i++) {
+    const userPrompt = `Create a ${platform} workflow for: ${requests[i % requests.length]}`;
+    const start = performance.now();
+    let firstToken = null;
+    const usage = {};
+    for await (const event of streamCompletion(provider, apiKey, systemPrompt, userPrompt, { maxTokens: 16, temperature: 0 })) {
+      if (event.text && firstToken === null) firstToken = performance.now() - start;
+      if (event.usage) Object.assign(usage, event.usage);
+    }
+    const cached = usage.cached_input_tokens || 0;
+    const written = usage.cache_write_tokens || 0;
+    const uncached = (usage.input_tokens || 0) - cached - written;
+    // In units of one uncached input token
+    const cost = uncached + cached * CACHE_READ_COST[provider] + written * CACHE_WRITE_COST[provider];
+    rows.push({ firstToken, cost, input: usage.input_tokens || 0 });
+    console.log(`${String(i + 1).padStart(4)} ${firstToken === null ? '             -' : firstToken.toFixed(0).padStart(15)} ${String(usage.input_tokens ?? '-').padStart(6)} ${String(cached).padStart(7)} ${String(written).padStart(8)} ${cost.toFixed(0).padStart(11)}`);
+  }
+  const [cold, ...warm] = rows;
+  if (warm.length > 0) {
+    const average = list => list.reduce((sum, value) => sum + value, 0) / list.length;
+    const warmFirstToken = average(warm.map(row => row.firstToken ?? 0));
+    const warmCost = average(warm.map(row => row.cost / row.input));
+    console.log(`\ncold call: ${cold.firstToken?.toFixed(0)} ms to first token`);
+    console.log(`warm calls: ${warmFirstToken.toFixed(0)} ms to first token on average, input billed at ${(warmCost * 100).toFixed(0)}% of the uncached price`);
+  }
+}
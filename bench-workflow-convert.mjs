@@ -0,0 +1,136 @@
+// Benchmark: converting a generated workflow between n8n and Make.com
+// versus generating it a second time.
+//
+//   node bench-workflow-convert.mjs [--iterations 2000]
+//   node bench-workflow-convert.mjs --base-url http://localhost:3000/api --provider openai --api-key sk-...
+//
+// Locally it times convertWorkflow on every curated template (both
+// directions) and on a larger branching workflow, and checks that a
+// converted template equals the one built natively for the other platform.
+//
+// With --base-url it also measures the saving end to end against a running
+// server: two /workflow-builder/generate calls (one per platform, template
+// tier off) against one call with platforms: ["n8n", "make"].
+
+import { convertWorkflow } from './lib/workflow-graph.js';
+import { CURATED, WorkflowTemplateIndex } from './lib/workflow-templates.js';
+
+function option(name, fallback) {
+  const index = process.argv.indexOf(`--${name}`);
+  return index >= 0 ? process.argv[index + 1] : fallback;
+}
+
+const iterations = parseInt(option('iterations', '2000'));
+const baseUrl = option('base-url', null);
+const provider = option('provider', 'openai');
+const apiKey = option('api-key', process.env.API_KEY);
+const description = option('description',
+  'When a Stripe payment fails, look up the customer in Airtable, open a Zendesk ticket and post the details to a Slack channel');
+
+function percentile(sorted, p) {
+  return sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+}
+
+function timeConversion(workflow, from, to) {
+  for (let i = 0; i < Math.min(100, iterations); i++) convertWorkflow(workflow, from, to);
+  const samples = [];
+  for (let i = 0; i < iterations; i++) {
+    const start = process.hrtime.bigint();
+    convertWorkflow(workflow, from, to);
+    samples.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  samples.sort((a, b) => a - b);
+  return { p50: percentile(samples, 0.5), p95: percentile(samples, 0.95) };
+}
+
+// A 40-step n8n workflow with an IF every few steps, both branches used
+function branchingWorkflow() {
+  const kinds = [
+    ['n8n-nodes-base.httpRequest', { url: '={{$json.url}}', method: 'GET' }],
+    ['n8n-nodes-base.set', { values: { string: [{ name: 'id', value: '={{$json.id}}' }] } }],
+    ['n8n-nodes-base.slack', { channel: '#ops', text: '={{$node["Trigger"].json.title}}' }],
+    ['n8n-nodes-base.if', { conditions: { string: [{ value1: '={{$json.status}}', operation: 'equal', value2: 'ok' }] } }],
+    ['n8n-nodes-base.emailSend', { toEmail: '={{$node["Trigger"].json.email}}', subject: 'Report', text: '={{$json.body}}' }]
+  ];
+  const nodes = [{ id: 'n0', name: 'Trigger', type: 'n8n-nodes-base.webhook', position: [0, 0], parameters: { path: 'bench' } }];
+  const connections = {};
+  let tails = ['Trigger'];
+  for (let i = 1; i < 40; i++) {
+    const [type, parameters] = kinds[i % kinds.length];
+    const node = { id: `n${i}`, name: `Step ${i}`, type, position: [i * 220, 0], parameters };
+    nodes.push(node);
+    for (const tail of tails) {
+      const main = (connections[tail] ||= { main: [[]] }).main;
+      main[0].push({ node: node.name, type: 'main', index: 0 });
+    }
+    tails = [node.name];
+    if (type === 'n8n-nodes-base.if') {
+      // The false branch gets a step of its own
+      const other = { id: `n${i}-else`, name: `Step ${i} else`, type: 'n8n-nodes-base.noOp', position: [i * 220, 200], parameters: {} };
+      nodes.push(other);
+      (connections[node.name] ||= { main: [[]] }).main[1] = [{ node: other.name, type: 'main', index: 0 }];
+    }
+  }
+  return { name: 'Branching benchmark', nodes, connections, settings: { executionOrder: 'v1' } };
+}
+
+const index = new WorkflowTemplateIndex(null);
+const build = async (template, platform) => (
+  await index.instantiate({ entry: { source: 'curated', id: template.id, platform, template }, score: 1 }, 'Benchmark')
+).workflow;
+
+console.log(`iterations=${iterations}\n`);
+console.log('workflow                   steps  n8n->make p50/p95 ms  make->n8n p50/p95 ms  parity');
+
+let mismatches = 0;
+const rows = [];
+for (const template of CURATED) {
+  const n8n = await build(template, 'n8n');
+  const make = await build(template, 'make');
+  const same = JSON.stringify(convertWorkflow(n8n, 'n8n', 'make').workflow) === JSON.stringify(make);
+  if (!same) mismatches++;
+  rows.push([template.id, template.steps.length, n8n, make, same ? 'ok' : 'MISMATCH']);
+}
+const branching = branchingWorkflow();
+rows.push(['branching (synthetic)', branching.nodes.length, branching, convertWorkflow(branching, 'n8n', 'make').workflow, '-']);
+
+for (const [label, steps, n8n, make, parity] of rows) {
+  const toMake = timeConversion(n8n, 'n8n', 'make');
+  const toN8n = timeConversion(make, 'make', 'n8n');
+  console.log([
+    label.padEnd(26),
+    String(steps).padStart(5),
+    `${toMake.p50.toFixed(3)}/${toMake.p95.toFixed(3)}`.padStart(21),
+    `${toN8n.p50.toFixed(3)}/${toN8n.p95.toFixed(3)}`.padStart(21),
+    `  ${parity}`
+  ].join(' '));
+}
+
+async function generate(body) {
+  const start = performance.now();
+  const response = await fetch(`${baseUrl}/workflow-builder/generate`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ name: 'Convert benchmark', provider, apiKey, automationDescription: description, useTemplates: false, ...body })
+  });
+  const data = await response.json();
+  if (!response.ok) throw new Error(data.error || `HTTP ${response.status}`);
+  return { ms: performance.now() - start, data };
+}
+
+if (baseUrl) {
+  if (!apiKey) {
+    console.error('\n--api-key (or API_KEY) is required with --base-url');
+    process.exit(2);
+  }
+  console.log(`\nend to end against ${baseUrl} (${provider})`);
+  const separate = [await generate({ platform: 'n8n' }), await generate({ platform: 'make' })];
+  const separateMs = separate[0].ms + separate[1].ms;
+  const combined = await generate({ platforms: ['n8n', 'make'] });
+  const warnings = Object.values(combined.data.workflows || {}).flatMap(entry => entry.warnings || []);
+  console.log(`  two generations:         ${separateMs.toFixed(0)} ms (${separate.map(run => run.ms.toFixed(0)).join(' + ')})`);
+  console.log(`  generate once + convert: ${combined.ms.toFixed(0)} ms (conversion ${combined.data.metadata?.conversion_ms} ms)`);
+  console.log(`  saved:                   ${(separateMs - combined.ms).toFixed(0)} ms (${((1 - combined.ms / separateMs) * 100).toFixed(0)}%), ${warnings.length} conversion warnings`);
+}
+
+process.exit(mismatches > 0 ? 1 : 0);
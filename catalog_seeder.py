@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Synthetic ai_tools Catalog Seeder and Query-Plan Checker
+Bulk-generates a realistic ai_tools catalog (millions of documents) into a
+local MongoDB and then explains every query shape the /api/ai-tools route
+handler issues, flagging collection scans, in-memory sorts and poor
+docsExamined/nReturned ratios.
+
+Usage:
+    python catalog_seeder.py --count 1000000 --drop
+    python catalog_seeder.py --skip-seed            # only run the plan checker
+    python catalog_seeder.py --skip-seed --indexes  # create the app's indexes, then check
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+# Configuration
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "happytools_perf")
+COLLECTION = "ai_tools"
+# Matches lib/dedupe.js: entities carry one LSH band key per band
+LSH_BANDS = 16
+
+# Category popularity follows a long tail; the first entries dominate.
+CATEGORIES = [
+    "AI & Machine Learning", "Productivity", "Image Generation", "Content Creation",
+    "Marketing", "Development", "Writing", "Video", "Design", "Chatbots", "Automation",
+    "Analytics", "Sales", "Social Media", "Audio", "Education", "Finance", "Healthcare",
+    "Customer Support", "Research", "Translation", "Gaming", "Legal", "Real Estate",
+    "Travel", "E-commerce", "Featured", "General", "Other"
+]
+
+# Source mix as seen in production, including the legacy spellings.
+SOURCES = [
+    ("AITools.fyi", 0.55),
+    ("producthunt", 0.25),
+    ("Product Hunt", 0.08),
+    ("aitools.fyi", 0.08),
+    ("Google Trending", 0.04),
+]
+
+PRICING = [("Freemium", 0.4), ("Free", 0.25), ("Paid", 0.2), ("Free Trial", 0.1), ("Unknown", 0.05)]
+
+NAME_PREFIXES = ["Auto", "Smart", "Deep", "Neural", "Hyper", "Magic", "Quick", "Open", "Meta",
+                 "Mind", "Copy", "Pixel", "Vox", "Lumi", "Synth", "Cog", "Flow", "Gen", "Brain", "Sense"]
+NAME_STEMS = ["write", "draw", "chat", "code", "voice", "lens", "mail", "sheet", "deck", "clip",
+              "frame", "scribe", "forge", "pilot", "mate", "desk", "note", "search", "tube", "brand"]
+NAME_SUFFIXES = ["", " AI", ".ai", " Pro", " GPT", " Studio", " Labs", " HQ", " 2.0", " Copilot"]
+
+VERBS = ["Generate", "Automate", "Summarize", "Design", "Translate", "Analyze", "Write", "Edit",
+         "Schedule", "Optimize", "Transcribe", "Create", "Organize", "Research", "Forecast"]
+OBJECTS = ["blog posts", "product photos", "meeting notes", "sales emails", "social media captions",
+           "SQL queries", "presentations", "podcasts", "landing pages", "customer replies",
+           "spreadsheets", "marketing videos", "logos", "contracts", "study guides"]
+QUALIFIERS = ["in seconds", "with GPT-4", "for small teams", "without code", "at scale",
+              "from a single prompt", "in 40 languages", "for e-commerce stores", "on autopilot"]
+
+
+def zipf_weights(n, s=1.1):
+    weights = [1 / (rank ** s) for rank in range(1, n + 1)]
+    total = sum(weights)
+    return [w / total for w in weights]
+
+
+class CatalogGenerator:
+    def __init__(self, seed=42, horizon_days=3 * 365):
+        self.rng = random.Random(seed)
+        self.horizon_days = horizon_days
+        self.now = datetime.utcnow()
+        self.category_weights = zipf_weights(len(CATEGORIES))
+        self.source_names = [s for s, _ in SOURCES]
+        self.source_weights = [w for _, w in SOURCES]
+        self.pricing_names = [p for p, _ in PRICING]
+        self.pricing_weights = [w for _, w in PRICING]
+
+    def name(self, index):
+        rng = self.rng
+        base = rng.choice(NAME_PREFIXES) + rng.choice(NAME_STEMS).capitalize() + rng.choice(NAME_SUFFIXES)
+        # Keep names mostly unique while still allowing realistic collisions
+        return base if rng.random() < 0.3 else f"{base} {index % 9973}"
+
+    def featured_at(self):
+        # Launches skew heavily toward recent dates (exponential age distribution)
+        age_days = min(self.rng.expovariate(1 / 90), self.horizon_days)
+        return self.now - timedelta(days=age_days, seconds=self.rng.randint(0, 86400))
+
+    def votes(self, source):
+        # Heavy-tailed vote counts; scraped sources carry lower, synthetic votes
+        if source in ("producthunt", "Product Hunt"):
+            return int(self.rng.paretovariate(1.2) * 20)
+        return int(self.rng.lognormvariate(5, 0.6))
+
+    def document(self, index):
+        rng = self.rng
+        source = rng.choices(self.source_names, self.source_weights)[0]
+        category = rng.choices(CATEGORIES, self.category_weights)[0]
+        name = self.name(index)
+        slug = name.lower().replace(" ", "-").replace(".", "")
+        tagline = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(QUALIFIERS)}"
+        description = " ".join(
+            f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(QUALIFIERS)}." for _ in range(rng.randint(2, 5))
+        )
+        featured_at = self.featured_at()
+        votes = self.votes(source)
+        url = f"https://aitools.fyi/tool/{slug}" if "aitools" in source.lower() else f"https://www.producthunt.com/posts/{slug}"
+        name_key = "".join(c for c in name.lower() if c.isalnum())
+        domain = f"{slug}.com"
+        age_hours = (self.now - featured_at).total_seconds() / 3600
+
+        doc = {
+            "id": str(uuid.uuid4()),
+            "name": name,
+            "tagline": tagline,
+            "description": f"{name} helps you {description.lower()}",
+            "url": url,
+            "website": f"https://{slug}.com",
+            "category": category,
+            "pricing": rng.choices(self.pricing_names, self.pricing_weights)[0],
+            "rating": round(rng.uniform(3.0, 5.0), 2),
+            "votes": votes,
+            "makers": [],
+            "topics": [category],
+            "featured_at": featured_at,
+            "source": source,
+            "sources": [{"source": source, "name": name, "url": url, "seen_at": featured_at}],
+            # Entity fields written by lib/tool-sink.js
+            "name_key": name_key,
+            "domain": domain,
+            "entity_key": f"{name_key}@{domain}",
+            "minhash_bands": [f"{band}:{rng.getrandbits(32):x}" for band in range(LSH_BANDS)],
+            # Trend score as of now with a 72 hour half-life (lib/trending.js)
+            "trend_score": round(votes * 0.5 ** (age_hours / 72), 4),
+            "trend_votes": votes,
+            "trend_at": self.now,
+            "created_at": featured_at,
+            "updated_at": featured_at
+        }
+        if source in ("producthunt", "Product Hunt"):
+            doc["ph_id"] = str(rng.randint(100000, 999999999))
+            doc["sources"][0]["ph_id"] = doc["ph_id"]
+        return doc
+
+
+def seed_catalog(collection, count, batch_size, drop, seed):
+    if drop:
+        print(f"🗑️  Dropping {collection.full_name}")
+        collection.drop()
+
+    generator = CatalogGenerator(seed=seed)
+    inserted = 0
+    start = time.perf_counter()
+
+    while inserted < count:
+        size = min(batch_size, count - inserted)
+        batch = [generator.document(inserted + i) for i in range(size)]
+        collection.insert_many(batch, ordered=False)
+        inserted += size
+
+        if inserted % (batch_size * 10) == 0 or inserted == count:
+            elapsed = time.perf_counter() - start
+            print(f"   Inserted {inserted:,}/{count:,} documents ({inserted / elapsed:,.0f} docs/s)")
+
+    print(f"✅ Seeded {inserted:,} documents in {time.perf_counter() - start:.1f}s")
+
+
+def ensure_tool_indexes(collection):
+    """Create the indexes ensureToolIndexes (lib/tool-sink.js) creates on ai_tools.
+
+    --drop removes them with the collection, and the app only recreates them
+    on its next write, so the plan check would otherwise run without them.
+    """
+    if "source_name_unique" in collection.index_information():
+        collection.drop_index("source_name_unique")
+    collection.create_index([("entity_key", 1)], unique=True,
+                            partialFilterExpression={"entity_key": {"$type": "string"}})
+    collection.create_index([("name_key", 1)])
+    collection.create_index([("domain", 1)], sparse=True)
+    collection.create_index([("minhash_bands", 1)])
+    collection.create_index([("ph_id", 1)], sparse=True)
+    collection.create_index([("trend_score", -1)])
+
+
+def route_query_shapes(sample):
+    """Every query the route handler issues against ai_tools, keyed by a readable name.
+
+    Each entry is the raw explain command body; `sample` supplies realistic
+    values (an existing name_key, entity_key, ph_id, category and source).
+    The filters mirror lib/tool-search.js, lib/dedupe.js and lib/trending.js.
+    """
+    search = {"$regex": "image", "$options": "i"}
+    search_or = {"$or": [{"name": search}, {"description": search}, {"tagline": search}]}
+    category = {"category": sample["category"]}
+    # Merged entities list every source they were seen on
+    source = {"$or": [{"source": sample["source"]}, {"sources.source": sample["source"]}]}
+    shapes = {}
+
+    # GET /api/ai-tools — every sort option, with and without filters, plus the total
+    for sort_name, sort in [("featured_at", {"featured_at": -1}), ("votes", {"votes": -1}),
+                            ("name", {"name": 1}), ("rating", {"rating": -1})]:
+        shapes[f"list sort={sort_name}"] = {"find": COLLECTION, "filter": {}, "sort": sort, "skip": 0, "limit": 12}
+        shapes[f"list category sort={sort_name}"] = {
+            "find": COLLECTION, "filter": category, "sort": sort, "skip": 0, "limit": 12}
+        shapes[f"list source sort={sort_name}"] = {
+            "find": COLLECTION, "filter": source, "sort": sort, "skip": 0, "limit": 12}
+    shapes["list category+source"] = {
+        "find": COLLECTION, "filter": {"$and": [category, source]},
+        "sort": {"featured_at": -1}, "skip": 0, "limit": 12}
+    shapes["list category count"] = {"count": COLLECTION, "query": category}
+    shapes["list deep page"] = {"find": COLLECTION, "filter": {}, "sort": {"featured_at": -1}, "skip": 1200, "limit": 12}
+    shapes["search"] = {"find": COLLECTION, "filter": search_or, "sort": {"featured_at": -1}, "skip": 0, "limit": 12}
+    shapes["search + category"] = {
+        "find": COLLECTION, "filter": {"$and": [search_or, category]},
+        "sort": {"featured_at": -1}, "skip": 0, "limit": 12}
+
+    # GET /api/ai-tools?facets=1 — page, total and counts from one $facet aggregation
+    shapes["search facets"] = {"aggregate": COLLECTION, "cursor": {}, "allowDiskUse": True, "pipeline": [
+        {"$match": search_or},
+        {"$facet": {
+            "tools": [{"$match": category}, {"$sort": {"featured_at": -1}}, {"$skip": 0}, {"$limit": 12}],
+            "total": [{"$match": category}, {"$count": "count"}],
+            "categories": [
+                {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}}, {"$limit": 50}],
+            "sources": [
+                {"$match": category},
+                {"$project": {"source": {"$setUnion": [{"$ifNull": ["$sources.source", []]},
+                                                       [{"$ifNull": ["$source", None]}]]}}},
+                {"$unwind": "$source"},
+                {"$group": {"_id": "$source", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}}, {"$limit": 50}]
+        }}
+    ]}
+
+    # Sync paths — the candidate lookup before each batch, then upserts by entity_key
+    shapes["sync candidates"] = {"find": COLLECTION, "filter": {"$or": [
+        {"name_key": {"$in": [sample["name_key"]]}},
+        {"minhash_bands": {"$in": sample["minhash_bands"]}},
+        {"ph_id": {"$in": [sample["ph_id"]]}},
+        {"domain": {"$in": [sample["domain"]]}}
+    ]}}
+    shapes["sync upsert by entity_key"] = {"find": COLLECTION, "filter": {"entity_key": sample["entity_key"]}, "limit": 1}
+
+    # GET /api/ai-tools/trending — the top-N list, and the periodic decay pass
+    shapes["trending"] = {"find": COLLECTION, "filter": {"trend_score": {"$gt": 0}},
+                          "sort": {"trend_score": -1}, "limit": 100}
+    shapes["trend decay"] = {"count": COLLECTION, "query": {"trend_score": {"$gt": 0}}}
+
+    # GET /api/ai-tools/categories
+    shapes["categories distinct"] = {"distinct": COLLECTION, "key": "category"}
+
+    # GET /api/ai-tools/stats
+    shapes["stats count"] = {"count": COLLECTION, "query": {}}
+    shapes["stats by category"] = {"aggregate": COLLECTION, "cursor": {}, "pipeline": [
+        {"$group": {"_id": "$category", "count": {"$sum": 1}}}, {"$sort": {"count": -1}}]}
+    shapes["stats by source"] = {"aggregate": COLLECTION, "cursor": {}, "pipeline": [
+        {"$group": {"_id": "$source", "count": {"$sum": 1}}}, {"$sort": {"count": -1}}]}
+
+    return shapes
+
+
+def walk_plan(node, stages, counters):
+    """Collect stage names and execution counters from any explain layout (classic or SBE)"""
+    if isinstance(node, dict):
+        stage = node.get("stage")
+        if isinstance(stage, str):
+            stages.append(stage)
+        for key in ("totalDocsExamined", "docsExamined"):
+            if isinstance(node.get(key), int):
+                counters["docsExamined"] = max(counters.get("docsExamined", 0), node[key])
+        if isinstance(node.get("nReturned"), int) and "executionSuccess" in node:
+            counters["nReturned"] = node["nReturned"]
+        for key, value in node.items():
+            if key == "rejectedPlans":
+                continue
+            walk_plan(value, stages, counters)
+    elif isinstance(node, list):
+        for item in node:
+            walk_plan(item, stages, counters)
+
+
+class QueryPlanChecker:
+    def __init__(self, db, ratio_threshold=10.0):
+        self.db = db
+        self.ratio_threshold = ratio_threshold
+        self.findings = []
+
+    def check(self, name, command):
+        explain = self.db.command("explain", command, verbosity="executionStats")
+        stages, counters = [], {}
+        walk_plan(explain, stages, counters)
+
+        # Only the plan decides: a $group or $facet stage is fine as long as
+        # the documents feeding it come from an index
+        issues = []
+        if "COLLSCAN" in stages:
+            issues.append("COLLSCAN")
+        if "SORT" in stages:
+            issues.append("in-memory SORT")
+
+        examined = counters.get("docsExamined", 0)
+        returned = counters.get("nReturned", 0)
+        ratio = examined / max(returned, 1)
+        # An aggregation's output is its grouped rows, not the documents it matched
+        if "find" in command and examined and ratio > self.ratio_threshold:
+            issues.append(f"docsExamined/nReturned={ratio:,.0f}")
+
+        self.findings.append({"query": name, "issues": issues, "docsExamined": examined,
+                              "nReturned": returned, "stages": stages})
+        status = "❌ FLAGGED" if issues else "✅ OK"
+        print(f"{status} - {name}: examined {examined:,}, returned {returned:,}"
+              + (f" [{', '.join(issues)}]" if issues else ""))
+
+    def run(self, shapes):
+        print("\n" + "="*80)
+        print("QUERY PLAN CHECK")
+        print("="*80)
+        for name, command in shapes.items():
+            try:
+                self.check(name, command)
+            except Exception as e:
+                print(f"❌ ERROR - {name}: {str(e)}")
+                self.findings.append({"query": name, "issues": [f"explain failed: {e}"]})
+        return [f for f in self.findings if f["issues"]]
+
+
+def pick_sample(collection):
+    sample = collection.find_one({"ph_id": {"$exists": True}}) or collection.find_one() or {}
+    return {
+        "name_key": sample.get("name_key", "chatgpt"),
+        "domain": sample.get("domain", "openai.com"),
+        "entity_key": sample.get("entity_key", "chatgpt@openai.com"),
+        "minhash_bands": sample.get("minhash_bands", ["0:0"]),
+        "ph_id": sample.get("ph_id", "0"),
+        "category": sample.get("category", "Productivity"),
+        "source": sample.get("source", "AITools.fyi"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic ai_tools catalog and check query plans")
+    parser.add_argument("--mongo-url", default=MONGO_URL)
+    parser.add_argument("--db", default=DB_NAME)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="drop the collection before seeding")
+    parser.add_argument("--skip-seed", action="store_true", help="only run the query plan checker")
+    parser.add_argument("--indexes", action="store_true",
+                        help="create the app's ai_tools indexes before checking (always done after seeding)")
+    parser.add_argument("--ratio-threshold", type=float, default=10.0,
+                        help="flag queries examining more than this many docs per doc returned")
+    args = parser.parse_args()
+
+    print("🚀 AI TOOLS CATALOG SEEDER")
+    print(f"🗄️  {args.mongo_url} / {args.db}.{COLLECTION}")
+
+    client = MongoClient(args.mongo_url)
+    db = client[args.db]
+    collection = db[COLLECTION]
+
+    if not args.skip_seed:
+        seed_catalog(collection, args.count, args.batch_size, args.drop, args.seed)
+    if not args.skip_seed or args.indexes:
+        print("📇 Creating ai_tools indexes (lib/tool-sink.js ensureToolIndexes)")
+        ensure_tool_indexes(collection)
+
+    total = collection.estimated_document_count()
+    print(f"📊 Collection holds ~{total:,} documents")
+    print(f"📇 Indexes: {', '.join(collection.index_information().keys())}")
+
+    checker = QueryPlanChecker(db, ratio_threshold=args.ratio_threshold)
+    flagged = checker.run(route_query_shapes(pick_sample(collection)))
+
+    print("\n" + "="*80)
+    if flagged:
+        print(f"⚠️  {len(flagged)}/{len(checker.findings)} query shapes flagged:")
+        for finding in flagged:
+            print(f"  ❌ {finding['query']}: {', '.join(finding['issues'])}")
+        return 1
+
+    print(f"🎉 All {len(checker.findings)} query shapes use efficient plans.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
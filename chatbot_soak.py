@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Soak Mode for the Chatbot Builder Harness
+Keeps thousands of simulated chat sessions alive across many bots for hours,
+samples server memory (GET /api/metrics) and /chatbot/chat latency over time,
+and flags sustained upward drift that points at leaks or index bloat.
+
+Sessions are not threads: a small worker pool pulls whichever session is due
+next from a heap, sends one message, and reschedules it after a think time.
+
+Usage:
+    python backend_test_chatbot.py --soak --duration 7200 --sessions 5000 --bots 50
+"""
+
+import heapq
+import itertools
+import random
+import statistics
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import requests
+
+from result_sink import ResultSink, percentile
+
+BOT_TOPICS = [
+    ("Billing Helper", "We offer monthly and annual billing. Refunds are processed within 5 business days. Invoices are emailed on the first of each month."),
+    ("Shipping Assistant", "Standard shipping takes 3-5 days. Express shipping is available for orders over $50. We ship to 40 countries worldwide."),
+    ("Onboarding Guide", "New accounts get a 14-day trial. The dashboard shows projects, teammates and integrations. Invite teammates from the settings page."),
+    ("Product Expert", "Our analytics product supports dashboards, scheduled reports, CSV exports and alerts. Enterprise plans include single sign-on."),
+    ("Travel Concierge", "Bookings can be changed up to 24 hours before departure. Lounge access is included with premium tickets. Baggage allowance is 23kg."),
+]
+
+OPENERS = ["Hello!", "Hi there", "hello, anyone around?"]
+QUESTIONS = [
+    "How long does shipping take?",
+    "Can I get a refund for my invoice?",
+    "What does the dashboard show?",
+    "Do enterprise plans include single sign-on?",
+    "Can I change my booking?",
+    "What is the baggage allowance?",
+    "How do I invite teammates?",
+    "Tell me about scheduled reports",
+    "Is there a trial period for new accounts?",
+    "what can you help with?",
+    "Something completely unrelated to anything",
+]
+
+
+def theil_sen_slope(points):
+    """Median of pairwise slopes; robust to the odd GC pause or network blip"""
+    slopes = []
+    for i in range(len(points)):
+        x1, y1 = points[i]
+        for j in range(i + 1, len(points)):
+            x2, y2 = points[j]
+            if x2 != x1:
+                slopes.append((y2 - y1) / (x2 - x1))
+    return statistics.median(slopes) if slopes else 0.0
+
+
+def detect_drift(points, threshold):
+    """Fit a trend through (elapsed_seconds, value) points.
+
+    Returns (slope_per_hour, relative_growth, drifting) where relative_growth
+    is the fitted change across the window divided by the fitted start value.
+    """
+    if len(points) < 4:
+        return 0.0, 0.0, False
+    slope = theil_sen_slope(points)
+    span = points[-1][0] - points[0][0]
+    start = statistics.median(y - slope * x for x, y in points) + slope * points[0][0]
+    if start <= 0:
+        return slope * 3600, 0.0, False
+    growth = slope * span / start
+    return slope * 3600, growth, growth > threshold
+
+
+class SimulatedSession:
+    __slots__ = ("bot_id", "session_id", "remaining")
+
+    def __init__(self, bot_id, messages):
+        self.bot_id = bot_id
+        self.session_id = str(uuid.uuid4())
+        self.remaining = messages
+
+
+class ChatbotSoak:
+    def __init__(self, api_base, duration=3600, sessions=2000, bots=20, workers=32,
+                 think_time=8.0, sample_interval=30, warmup_fraction=0.1,
+                 drift_threshold=0.2, seed=None):
+        self.api_base = api_base
+        self.duration = duration
+        self.session_count = sessions
+        self.bot_count = bots
+        self.worker_count = workers
+        self.think_time = think_time
+        self.sample_interval = sample_interval
+        self.warmup_fraction = warmup_fraction
+        self.drift_threshold = drift_threshold
+        self.rng = random.Random(seed)
+
+        self.bot_ids = []
+        self.schedule = []
+        self.schedule_seq = itertools.count()
+        self.schedule_cond = threading.Condition()
+        self.stop_event = threading.Event()
+        self.local = threading.local()
+
+        # Latencies since the last sample; swapped out by the sampler
+        self.window_lock = threading.Lock()
+        self.window_latencies = []
+        self.window_errors = 0
+        self.total_messages = 0
+        self.total_errors = 0
+        self.sessions_completed = 0
+
+        self.samples = []
+        self.sink = ResultSink("chatbot_soak", base_url=api_base, instrument=False)
+
+    def http(self):
+        """One keep-alive session per worker thread"""
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        return session
+
+    def think(self):
+        # Lognormal think time: mostly quick replies, occasionally a long pause
+        return self.rng.lognormvariate(0, 0.75) * self.think_time
+
+    def new_session(self):
+        return SimulatedSession(self.rng.choice(self.bot_ids), self.rng.randint(3, 15))
+
+    def create_bots(self):
+        print(f"🤖 Creating {self.bot_count} soak bots...")
+        for index in range(self.bot_count):
+            name, knowledge = BOT_TOPICS[index % len(BOT_TOPICS)]
+            payload = {
+                "name": f"Soak {name} {index + 1}",
+                "description": "Soak test chatbot",
+                "personality": self.rng.choice(["helpful", "friendly", "expert"]),
+                "knowledge": {"textContent": knowledge, "documents": [], "urls": []}
+            }
+            try:
+                response = self.http().post(f"{self.api_base}/chatbot/create", json=payload, timeout=30)
+                if response.status_code == 200 and response.json().get("id"):
+                    self.bot_ids.append(response.json()["id"])
+                else:
+                    print(f"   ⚠️  Bot {index + 1}: HTTP {response.status_code}")
+            except Exception as e:
+                print(f"   ⚠️  Bot {index + 1}: {str(e)}")
+        self.sink.record("Soak - Create bots", len(self.bot_ids) == self.bot_count,
+                         f"{len(self.bot_ids)}/{self.bot_count} bots created")
+        return bool(self.bot_ids)
+
+    def seed_schedule(self):
+        # Stagger session starts across one think time so load ramps up smoothly
+        now = time.monotonic()
+        for _ in range(self.session_count):
+            heapq.heappush(self.schedule, (now + self.rng.uniform(0, self.think_time), next(self.schedule_seq), self.new_session()))
+
+    def next_due(self):
+        with self.schedule_cond:
+            while not self.stop_event.is_set():
+                if not self.schedule:
+                    self.schedule_cond.wait(1.0)
+                    continue
+                due, _, session = self.schedule[0]
+                wait = due - time.monotonic()
+                if wait <= 0:
+                    heapq.heappop(self.schedule)
+                    return session
+                self.schedule_cond.wait(min(wait, 1.0))
+        return None
+
+    def reschedule(self, session):
+        with self.schedule_cond:
+            heapq.heappush(self.schedule, (time.monotonic() + self.think(), next(self.schedule_seq), session))
+            self.schedule_cond.notify()
+
+    def send(self, session):
+        if session.remaining == 0:
+            # Session over: the user leaves and a new one arrives
+            with self.window_lock:
+                self.sessions_completed += 1
+            return self.new_session()
+
+        message = self.rng.choice(OPENERS) if session.remaining > 12 else self.rng.choice(QUESTIONS)
+        payload = {"chatbotId": session.bot_id, "message": message, "sessionId": session.session_id}
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = self.http().post(f"{self.api_base}/chatbot/chat", json=payload, timeout=30)
+            ok = response.status_code == 200
+        except Exception:
+            pass
+        elapsed = (time.perf_counter() - start) * 1000
+
+        with self.window_lock:
+            self.total_messages += 1
+            if ok:
+                self.window_latencies.append(elapsed)
+            else:
+                self.window_errors += 1
+                self.total_errors += 1
+        session.remaining -= 1
+        return session
+
+    def worker(self):
+        while not self.stop_event.is_set():
+            session = self.next_due()
+            if session is None:
+                return
+            self.reschedule(self.send(session))
+
+    def sample(self, started):
+        with self.window_lock:
+            latencies, self.window_latencies = self.window_latencies, []
+            errors, self.window_errors = self.window_errors, 0
+
+        metrics = {}
+        try:
+            response = self.http().get(f"{self.api_base}/metrics", timeout=15)
+            if response.status_code == 200:
+                metrics = response.json()
+        except Exception as e:
+            print(f"   ⚠️  Metrics unavailable: {str(e)}")
+
+        memory = metrics.get("memory", {})
+        interactions = metrics.get("collections", {}).get("chat_interactions", {})
+        sample = {
+            "elapsed_s": round(time.monotonic() - started, 1),
+            "messages": len(latencies),
+            "errors": errors,
+            "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+            "p95_ms": round(percentile(latencies, 95), 2) if latencies else None,
+            "rss_bytes": memory.get("rss"),
+            "heap_used_bytes": memory.get("heap_used"),
+            "server_pid": metrics.get("pid"),
+            "interaction_count": interactions.get("count"),
+            "interaction_index_bytes": interactions.get("index_size_bytes"),
+        }
+        self.samples.append(sample)
+        self.sink.event("soak_sample", **sample)
+
+        rss = f"{sample['rss_bytes'] / 1048576:.0f}MB" if sample["rss_bytes"] else "?"
+        p50 = f"{sample['p50_ms']:.0f}ms" if sample["p50_ms"] is not None else "-"
+        print(f"⏱️  {sample['elapsed_s']:>7.0f}s  msgs {sample['messages']:>5}  err {errors:>3}  "
+              f"p50 {p50:>7}  rss {rss:>7}  interactions {sample['interaction_count'] or '?'}")
+
+    def analyze(self):
+        """Flag drift on every tracked series, ignoring the warmup window"""
+        skip = int(len(self.samples) * self.warmup_fraction)
+        window = self.samples[skip:]
+        if len(window) < 4:
+            print("⚠️  Not enough samples for drift analysis; run longer or sample more often.")
+            return []
+
+        # A restarted server resets RSS; only fit the samples from the final process
+        last_pid = window[-1].get("server_pid")
+        if last_pid is not None:
+            window = [s for s in window if s.get("server_pid") == last_pid]
+
+        series = [
+            ("Latency p50", "p50_ms", "ms/h", 1),
+            ("Latency p95", "p95_ms", "ms/h", 1),
+            ("Server RSS", "rss_bytes", "MB/h", 1048576),
+            ("Heap used", "heap_used_bytes", "MB/h", 1048576),
+        ]
+
+        print("\n" + "="*80)
+        print(f"DRIFT ANALYSIS ({len(window)} samples after warmup, threshold {self.drift_threshold * 100:.0f}%)")
+        print("="*80)
+
+        drifting = []
+        for label, key, unit, scale in series:
+            points = [(s["elapsed_s"], s[key]) for s in window if s.get(key) is not None]
+            if len(points) < 4:
+                print(f"   {label:<14} no data")
+                continue
+            slope, growth, drift = detect_drift(points, self.drift_threshold)
+            marker = "❌" if drift else "✅"
+            print(f"   {marker} {label:<14} {slope / scale:>+10.2f} {unit}   fitted growth {growth * 100:>+6.1f}%")
+            self.sink.record(f"Soak - {label} drift", not drift,
+                             f"slope {slope / scale:+.2f} {unit}, growth {growth * 100:+.1f}%")
+            if drift:
+                drifting.append(label)
+
+        # Index size is expected to grow with rows; flag it only when it outpaces them
+        points = [(s["interaction_count"], s["interaction_index_bytes"]) for s in window
+                  if s.get("interaction_count") and s.get("interaction_index_bytes")]
+        if len(points) >= 4 and points[-1][0] > points[0][0]:
+            first_ratio = points[0][1] / points[0][0]
+            last_ratio = points[-1][1] / points[-1][0]
+            growth = last_ratio / first_ratio - 1
+            bloat = growth > self.drift_threshold
+            print(f"   {'❌' if bloat else '✅'} {'Index bytes/row':<14} {first_ratio:>10.1f} → {last_ratio:.1f}"
+                  f"   growth {growth * 100:>+6.1f}%")
+            self.sink.record("Soak - chat_interactions index bloat", not bloat,
+                             f"index bytes per row {first_ratio:.1f} -> {last_ratio:.1f}")
+            if bloat:
+                drifting.append("Index bytes/row")
+
+        return drifting
+
+    def run(self):
+        print("🚀 Starting Chatbot Soak Test")
+        print(f"🕒 Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"   {self.session_count} sessions over {self.bot_count} bots, {self.worker_count} workers, "
+              f"{self.duration}s, think time ~{self.think_time}s")
+        print("="*80)
+
+        if not self.create_bots():
+            print("❌ No bots could be created; aborting soak.")
+            self.sink.close()
+            return 1
+
+        self.seed_schedule()
+        started = time.monotonic()
+        threads = [threading.Thread(target=self.worker, daemon=True) for _ in range(self.worker_count)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while time.monotonic() - started < self.duration:
+                self.stop_event.wait(self.sample_interval)
+                self.sample(started)
+        except KeyboardInterrupt:
+            print("\n⏹️  Interrupted, analysing samples collected so far...")
+        finally:
+            self.stop_event.set()
+            with self.schedule_cond:
+                self.schedule_cond.notify_all()
+            for thread in threads:
+                thread.join(timeout=35)
+
+        print("="*80)
+        error_rate = self.total_errors / self.total_messages * 100 if self.total_messages else 0
+        print(f"📊 {self.total_messages} messages, {self.total_errors} errors ({error_rate:.2f}%), "
+              f"{self.sessions_completed} sessions completed")
+        self.sink.record("Soak - Error rate", error_rate < 1.0, f"{error_rate:.2f}% of {self.total_messages} messages")
+
+        drifting = self.analyze()
+        self.sink.close()
+
+        if drifting or error_rate >= 1.0:
+            print(f"\n⚠️  Soak test flagged: {', '.join(drifting) or 'error rate'}")
+            return 1
+        print("\n🎉 No drift detected.")
+        return 0
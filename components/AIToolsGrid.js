@@ -5,6 +5,7 @@ import { Card, CardContent, CardDescription, CardFooter, CardHeader, CardTitle }
 import { Button } from '@/components/ui/button'
 import { Badge } from '@/components/ui/badge'
 import { ExternalLink, ThumbsUp, Calendar, Users, Loader2 } from 'lucide-react'
+import { startSync, waitForSyncJob } from '@/lib/sync-client'
 
 export default function AIToolsGrid({ searchQuery = '', onLoadMoreClick }) {
   const [tools, setTools] = useState([])
@@ -64,22 +65,18 @@ export default function AIToolsGrid({ searchQuery = '', onLoadMoreClick }) {
     loadTools(1, searchQuery, false)
   }, [searchQuery])
 
-  // Sync data with Product Hunt
+  // Sync data with Product Hunt (background job; poll until it finishes)
   const syncWithProductHunt = async () => {
     setLoading(true)
     try {
-      const response = await fetch('/api/ai-tools/sync', {
-        method: 'POST'
-      })
-      
-      if (response.ok) {
-        const data = await response.json()
-        console.log('Sync successful:', data)
-        // Reload tools after sync
-        loadTools(1, searchQuery, false)
-      }
+      const { status_url } = await startSync('/api/ai-tools/sync')
+      const job = await waitForSyncJob(status_url)
+      console.log('Sync finished:', job)
     } catch (err) {
       console.error('Sync error:', err)
+    } finally {
+      // Reload tools after sync
+      loadTools(1, searchQuery, false)
     }
   }
 
@@ -3,12 +3,16 @@
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
 import { Search, Sparkles, TrendingUp, Zap, Heart, Star, Users, Bot } from 'lucide-react'
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 
 export default function ModernHeroSection({ onSearch, onCategoryFilter }) {
   const [searchQuery, setSearchQuery] = useState('')
   const [selectedCategory, setSelectedCategory] = useState('all')
   const [isLoaded, setIsLoaded] = useState(false)
+  const [suggestions, setSuggestions] = useState([])
+  const [showSuggestions, setShowSuggestions] = useState(false)
+  const [activeSuggestion, setActiveSuggestion] = useState(-1)
+  const suggestRequest = useRef(null)
 
   const categories = [
     { id: 'all', name: 'All Tools', icon: '🔥', color: 'gradient-bg' },
@@ -25,12 +29,58 @@ export default function ModernHeroSection({ onSearch, onCategoryFilter }) {
     setIsLoaded(true)
   }, [])
 
+  // Typeahead: one small request per pause in typing, stale ones aborted
+  useEffect(() => {
+    const query = searchQuery.trim()
+    if (!query) {
+      setSuggestions([])
+      return
+    }
+
+    const timer = setTimeout(async () => {
+      suggestRequest.current?.abort()
+      const controller = new AbortController()
+      suggestRequest.current = controller
+      try {
+        const response = await fetch(`/api/ai-tools/suggest?q=${encodeURIComponent(query)}`, { signal: controller.signal })
+        if (!response.ok) return
+        const data = await response.json()
+        setSuggestions([
+          ...data.tools.map(tool => ({ type: 'tool', label: tool.name, detail: tool.category })),
+          ...data.categories.map(category => ({ type: 'category', label: category.name, detail: `${category.count} tools` })),
+          ...data.tags.map(tag => ({ type: 'tag', label: tag.name, detail: `${tag.count} tools` }))
+        ])
+        setActiveSuggestion(-1)
+      } catch (error) {
+        if (error.name !== 'AbortError') console.error('Error loading suggestions:', error)
+      }
+    }, 120)
+
+    return () => clearTimeout(timer)
+  }, [searchQuery])
+
   const handleSearch = () => {
+    setShowSuggestions(false)
     if (onSearch) {
       onSearch(searchQuery)
     }
   }
 
+  const selectSuggestion = (suggestion) => {
+    setShowSuggestions(false)
+    if (suggestion.type === 'category') {
+      setSelectedCategory(suggestion.label)
+      if (onCategoryFilter) {
+        onCategoryFilter(suggestion.label)
+      }
+      return
+    }
+    setSearchQuery(suggestion.label)
+    if (onSearch) {
+      onSearch(suggestion.label)
+    }
+  }
+
   const handleCategoryClick = (categoryId) => {
     setSelectedCategory(categoryId)
     if (onCategoryFilter) {
@@ -38,9 +88,22 @@ export default function ModernHeroSection({ onSearch, onCategoryFilter }) {
     }
   }
 
-  const handleKeyPress = (e) => {
-    if (e.key === 'Enter') {
-      handleSearch()
+  const handleKeyDown = (e) => {
+    const open = showSuggestions && suggestions.length > 0
+    if (open && e.key === 'ArrowDown') {
+      e.preventDefault()
+      setActiveSuggestion(index => (index + 1) % suggestions.length)
+    } else if (open && e.key === 'ArrowUp') {
+      e.preventDefault()
+      setActiveSuggestion(index => (index <= 0 ? suggestions.length - 1 : index - 1))
+    } else if (e.key === 'Escape') {
+      setShowSuggestions(false)
+    } else if (e.key === 'Enter') {
+      if (open && activeSuggestion >= 0) {
+        selectSuggestion(suggestions[activeSuggestion])
+      } else {
+        handleSearch()
+      }
     }
   }
 
@@ -98,8 +161,16 @@ export default function ModernHeroSection({ onSearch, onCategoryFilter }) {
                     type="text"
                     placeholder="Search for happiness-inducing AI tools..."
                     value={searchQuery}
-                    onChange={(e) => setSearchQuery(e.target.value)}
-                    onKeyPress={handleKeyPress}
+                    onChange={(e) => {
+                      setSearchQuery(e.target.value)
+                      setShowSuggestions(true)
+                    }}
+                    onKeyDown={handleKeyDown}
+                    onFocus={() => setShowSuggestions(true)}
+                    onBlur={() => setTimeout(() => setShowSuggestions(false), 150)}
+                    role="combobox"
+                    aria-expanded={showSuggestions && suggestions.length > 0}
+                    aria-autocomplete="list"
                     className="pl-12 pr-4 py-4 w-full bg-transparent border-0 text-white placeholder-gray-300 text-lg focus:ring-0"
                   />
                   <Button 
@@ -111,6 +182,39 @@ export default function ModernHeroSection({ onSearch, onCategoryFilter }) {
                   </Button>
                 </div>
               </div>
+              
+              {/* Suggestions */}
+              {showSuggestions && searchQuery.trim() && suggestions.length > 0 && (
+                <ul role="listbox" className="absolute left-0 right-0 mt-2 glass-card rounded-2xl border border-white/20 bg-slate-900/95 backdrop-blur-lg py-2 text-left z-20 max-h-96 overflow-y-auto">
+                  {suggestions.map((suggestion, index) => (
+                    <li
+                      key={`${suggestion.type}-${suggestion.label}`}
+                      role="option"
+                      aria-selected={index === activeSuggestion}
+                      onMouseDown={(e) => e.preventDefault()}
+                      onClick={() => selectSuggestion(suggestion)}
+                      onMouseEnter={() => setActiveSuggestion(index)}
+                      className={`flex items-center justify-between px-5 py-2 cursor-pointer ${
+                        index === activeSuggestion ? 'bg-white/10' : ''
+                      }`}
+                    >
+                      <span className="flex items-center text-white">
+                        {suggestion.type === 'tool' ? (
+                          <Search className="w-4 h-4 mr-3 text-gray-400" />
+                        ) : suggestion.type === 'category' ? (
+                          <Sparkles className="w-4 h-4 mr-3 text-yellow-400" />
+                        ) : (
+                          <TrendingUp className="w-4 h-4 mr-3 text-green-400" />
+                        )}
+                        {suggestion.label}
+                      </span>
+                      {suggestion.detail && (
+                        <span className="text-xs text-gray-400 ml-4">{suggestion.detail}</span>
+                      )}
+                    </li>
+                  ))}
+                </ul>
+              )}
             </div>
           </div>
           
@@ -5,6 +5,7 @@ import { Card, CardContent, CardDescription, CardFooter, CardHeader, CardTitle }
 import { Button } from '@/components/ui/button'
 import { Badge } from '@/components/ui/badge'
 import { ExternalLink, ThumbsUp, Calendar, Users, Loader2, Heart, Star, Sparkles, Filter, Grid3X3, List } from 'lucide-react'
+import { startSync, waitForSyncJob } from '@/lib/sync-client'
 
 export default function ModernToolsGrid({ searchQuery = '', categoryFilter = 'all' }) {
   const [tools, setTools] = useState([])
@@ -14,6 +15,7 @@ export default function ModernToolsGrid({ searchQuery = '', categoryFilter = 'al
   const [error, setError] = useState(null)
   const [viewMode, setViewMode] = useState('grid')
   const [sortBy, setSortBy] = useState('featured_at')
+  const [syncProgress, setSyncProgress] = useState(null)
 
   // Load tools from API
   const loadTools = async (page = 1, search = '', category = 'all', append = false) => {
@@ -66,26 +68,36 @@ export default function ModernToolsGrid({ searchQuery = '', categoryFilter = 'al
     }
   }
 
-  // Sync with scrapers
+  // Sync with scrapers (background jobs; poll until both finish)
   const syncTools = async () => {
     setLoading(true)
+    setSyncProgress(null)
     try {
-      // Sync Product Hunt
-      const phResponse = await fetch('/api/ai-tools/sync', {
-        method: 'POST'
-      })
-      
-      // Sync AITools.fyi
-      const aitoolsResponse = await fetch('/api/ai-tools/sync-aitools', {
-        method: 'POST'
-      })
-      
-      if (phResponse.ok || aitoolsResponse.ok) {
-        console.log('Sync successful')
-        loadTools(1, searchQuery, categoryFilter, false)
-      }
+      const started = await Promise.allSettled([
+        startSync('/api/ai-tools/sync'),
+        startSync('/api/ai-tools/sync-aitools')
+      ])
+      const snapshots = {}
+      const jobs = started
+        .filter(result => result.status === 'fulfilled')
+        .map(result => waitForSyncJob(result.value.status_url, {
+          onProgress: job => {
+            snapshots[job.id] = job
+            const all = Object.values(snapshots)
+            setSyncProgress({
+              pagesDone: all.reduce((sum, j) => sum + j.pages_done, 0),
+              pagesTotal: all.reduce((sum, j) => sum + j.pages_total, 0),
+              inserted: all.reduce((sum, j) => sum + j.inserted, 0)
+            })
+          }
+        }))
+      await Promise.allSettled(jobs)
+      console.log('Sync successful')
     } catch (err) {
       console.error('Sync error:', err)
+    } finally {
+      setSyncProgress(null)
+      loadTools(1, searchQuery, categoryFilter, false)
     }
   }
 
@@ -131,7 +143,11 @@ export default function ModernToolsGrid({ searchQuery = '', categoryFilter = 'al
                 <div></div>
                 <div></div>
               </div>
-              <p className="text-gray-300 text-lg">Loading amazing AI tools...</p>
+              <p className="text-gray-300 text-lg">
+                {syncProgress
+                  ? `Syncing sources... ${syncProgress.pagesDone}/${syncProgress.pagesTotal} pages, ${syncProgress.inserted} new tools`
+                  : 'Loading amazing AI tools...'}
+              </p>
             </div>
           </div>
         </div>
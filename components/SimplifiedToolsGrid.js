@@ -4,6 +4,7 @@ import { useState, useEffect } from 'react'
 import { Button } from '@/components/ui/button'
 import { Badge } from '@/components/ui/badge'
 import { ExternalLink, Loader2, Heart, Sparkles, TrendingUp } from 'lucide-react'
+import { startSync, waitForSyncJob } from '@/lib/sync-client'
 
 export default function SimplifiedToolsGrid({ searchQuery = '', categoryFilter = 'all' }) {
   const [tools, setTools] = useState([])
@@ -12,9 +13,17 @@ export default function SimplifiedToolsGrid({ searchQuery = '', categoryFilter =
   const [pagination, setPagination] = useState({ page: 1, hasMore: true })
   const [error, setError] = useState(null)
   const [sortBy, setSortBy] = useState('featured_at')
+  const [syncProgress, setSyncProgress] = useState(null)
+  const [filters, setFilters] = useState({ category: categoryFilter, source: 'all' })
+  const [facets, setFacets] = useState({ categories: [], sources: [] })
 
-  // Load tools from API
-  const loadTools = async (page = 1, search = '', category = 'all', append = false) => {
+  // The hero's category buttons reset the category chip
+  useEffect(() => {
+    setFilters(prev => (prev.category === categoryFilter ? prev : { ...prev, category: categoryFilter }))
+  }, [categoryFilter])
+
+  // Load a page of tools; the first page also brings the filter chip counts
+  const loadTools = async (page = 1, search = '', { category, source } = filters, append = false) => {
     const loadingState = page === 1 ? setLoading : setLoadingMore
     loadingState(true)
     setError(null)
@@ -34,6 +43,14 @@ export default function SimplifiedToolsGrid({ searchQuery = '', categoryFilter =
         params.set('category', category)
       }
 
+      if (source && source !== 'all') {
+        params.set('source', source)
+      }
+
+      if (!append) {
+        params.set('facets', '1')
+      }
+
       const response = await fetch(`/api/ai-tools?${params}`)
       
       if (!response.ok) {
@@ -46,9 +63,14 @@ export default function SimplifiedToolsGrid({ searchQuery = '', categoryFilter =
         setTools(prev => [...prev, ...data.tools])
       } else {
         setTools(data.tools)
+        setFacets(data.facets || { categories: [], sources: [] })
       }
       
-      setPagination(data.pagination)
+      setPagination({
+        page: data.pagination.currentPage,
+        hasMore: data.pagination.hasNextPage,
+        total: data.pagination.totalCount
+      })
     } catch (err) {
       setError(err.message)
       console.error('Error loading tools:', err)
@@ -60,31 +82,43 @@ export default function SimplifiedToolsGrid({ searchQuery = '', categoryFilter =
   // Load more tools
   const handleLoadMore = () => {
     if (!loadingMore && pagination.hasMore) {
-      loadTools(pagination.page + 1, searchQuery, categoryFilter, true)
+      loadTools(pagination.page + 1, searchQuery, filters, true)
     }
   }
 
-  // Sync with scrapers
+  // Sync with scrapers (background job; poll until it finishes)
   const syncTools = async () => {
     setLoading(true)
+    setSyncProgress(null)
     try {
-      const response = await fetch('/api/ai-tools/sync-aitools', {
-        method: 'POST'
+      const { status_url } = await startSync('/api/ai-tools/sync-aitools')
+      await waitForSyncJob(status_url, {
+        onProgress: job => setSyncProgress({
+          pagesDone: job.pages_done,
+          pagesTotal: job.pages_total,
+          inserted: job.inserted
+        })
       })
-      
-      if (response.ok) {
-        console.log('Sync successful')
-        loadTools(1, searchQuery, categoryFilter, false)
-      }
+      console.log('Sync successful')
     } catch (err) {
       console.error('Sync error:', err)
+    } finally {
+      setSyncProgress(null)
+      loadTools(1, searchQuery, filters, false)
     }
   }
 
   // Initial load and updates
   useEffect(() => {
-    loadTools(1, searchQuery, categoryFilter, false)
-  }, [searchQuery, categoryFilter, sortBy])
+    loadTools(1, searchQuery, filters, false)
+  }, [searchQuery, filters, sortBy])
+
+  // Clicking the active chip clears it
+  const toggleFilter = (key, value) => {
+    setFilters(prev => ({ ...prev, [key]: prev[key] === value ? 'all' : value }))
+  }
+
+  const isFiltered = searchQuery || filters.category !== 'all' || filters.source !== 'all'
 
   // Get category color
   const getCategoryColor = (category) => {
@@ -114,7 +148,11 @@ export default function SimplifiedToolsGrid({ searchQuery = '', categoryFilter =
                 <div></div>
                 <div></div>
               </div>
-              <p className="text-gray-300 text-lg">Loading amazing AI tools...</p>
+              <p className="text-gray-300 text-lg">
+                {syncProgress
+                  ? `Syncing sources... ${syncProgress.pagesDone}/${syncProgress.pagesTotal} pages, ${syncProgress.inserted} new tools`
+                  : 'Loading amazing AI tools...'}
+              </p>
             </div>
           </div>
         </div>
@@ -133,7 +171,7 @@ export default function SimplifiedToolsGrid({ searchQuery = '', categoryFilter =
               <p className="text-gray-300 mb-6">{error}</p>
               <div className="space-y-3">
                 <Button 
-                  onClick={() => loadTools(1, searchQuery, categoryFilter, false)} 
+                  onClick={() => loadTools(1, searchQuery, filters, false)} 
                   className="w-full bg-gradient-to-r from-blue-500 to-purple-500 hover:from-blue-600 hover:to-purple-600"
                 >
                   Try Again
@@ -163,10 +201,10 @@ export default function SimplifiedToolsGrid({ searchQuery = '', categoryFilter =
                 <Sparkles className="w-8 h-8 text-white" />
               </div>
               <h3 className="text-xl font-bold text-white mb-4">
-                {searchQuery || categoryFilter !== 'all' ? 'No tools found' : 'Let\'s discover some tools!'}
+                {isFiltered ? 'No tools found' : 'Let\'s discover some tools!'}
               </h3>
               <p className="text-gray-300 mb-6">
-                {searchQuery || categoryFilter !== 'all' ? 
+                {isFiltered ? 
                   'Try a different search or category.' :
                   'Let\'s sync with our sources to find amazing AI tools for you!'
                 }
@@ -193,7 +231,7 @@ export default function SimplifiedToolsGrid({ searchQuery = '', categoryFilter =
           <div className="mb-6 md:mb-0">
             <h2 className="text-3xl font-bold text-white mb-2">
               {searchQuery ? `Search Results for "${searchQuery}"` : 
-               categoryFilter !== 'all' ? `${categoryFilter} Tools` : 'Amazing AI Tools'}
+               filters.category !== 'all' ? `${filters.category} Tools` : 'Amazing AI Tools'}
             </h2>
             <p className="text-gray-300">
               {pagination.total || tools.length} tools found • Updated daily with love ❤️
@@ -222,6 +260,29 @@ export default function SimplifiedToolsGrid({ searchQuery = '', categoryFilter =
           </div>
         </div>
 
+        {/* Filter chips, counted for the current search */}
+        {[
+          { key: 'category', label: 'Categories', buckets: facets.categories },
+          { key: 'source', label: 'Sources', buckets: facets.sources }
+        ].filter(({ buckets }) => buckets.length > 0).map(({ key, label, buckets }) => (
+          <div key={key} className="flex flex-wrap items-center gap-2 mb-4">
+            <span className="text-sm text-gray-400 mr-2">{label}</span>
+            {buckets.map(({ value, count }) => (
+              <button
+                key={value}
+                onClick={() => toggleFilter(key, value)}
+                className={`rounded-full px-3 py-1 text-sm border transition-colors ${
+                  filters[key] === value
+                    ? 'bg-white text-slate-900 border-white'
+                    : 'bg-white/10 text-white border-white/20 hover:bg-white/20'
+                }`}
+              >
+                {value} <span className="opacity-60">{count}</span>
+              </button>
+            ))}
+          </div>
+        ))}
+
         {/* Simplified Tools Grid */}
         <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-4">
           {tools.map((tool, index) => (
@@ -0,0 +1,248 @@
+// Fuzz and benchmark harness for lib/html-sanitizer.js.
+//
+//   node fuzz-html-sanitizer.mjs [--iterations 2000] [--seed 1] [--size 200000]
+//
+// 1. Corpus: the pages in tests/fixtures/html-safety. xss-vectors.html must
+//    come back with every vector removed, generated-landing.html with nothing
+//    removed.
+// 2. Scaling: adversarial pages built to make backtracking regexes (and the
+//    old validateHTML) blow up are sanitized at `size` and 4x `size`, whole and
+//    in 16-byte chunks. Time has to grow linearly. The old validateHTML
+//    regexes are timed on the same shapes at small sizes for comparison.
+// 3. Fuzz: random soups of tags, attributes, entities, comments and raw-text
+//    elements. The output must be free of handlers and script URLs, balanced,
+//    a fixed point (sanitizing it again removes nothing), and the same whether
+//    the input was written whole or in random chunks.
+// 4. Sections: splitting a sanitized page into stored sections and joining
+//    them again (lib/site-sections.js) gives back exactly the same page,
+//    trailing text after the last element included. Fuzz outputs that
+//    sanitize to themselves are checked too.
+//
+// Exits 1 if any check fails.
+
+import fs from 'fs';
+import path from 'path';
+import { fileURLToPath } from 'url';
+import { HtmlSanitizer, sanitizeHTML } from './lib/html-sanitizer.js';
+import { HtmlTokenizer } from './lib/scrapers/html-tokenizer.js';
+import { splitSections, assembleSite } from './lib/site-sections.js';
+
+const FIXTURES = path.join(path.dirname(fileURLToPath(import.meta.url)), 'tests', 'fixtures', 'html-safety');
+
+function option(name, fallback) {
+  const index = process.argv.indexOf(`--${name}`);
+  return index >= 0 ? parseInt(process.argv[index + 1]) : fallback;
+}
+
+const iterations = option('iterations', 2000);
+const seed = option('seed', 1);
+const size = option('size', 200000);
+
+let failures = 0;
+function fail(message, input) {
+  failures++;
+  console.log(`  FAIL ${message}`);
+  if (input !== undefined) console.log(`       input: ${JSON.stringify(input.slice(0, 300))}`);
+}
+
+// mulberry32
+function random(state) {
+  return () => {
+    state = (state + 0x6d2b79f5) | 0;
+    let t = Math.imul(state ^ (state >>> 15), 1 | state);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function sanitizeInChunks(html, chunkSize) {
+  const sanitizer = new HtmlSanitizer();
+  let output = '';
+  for (let i = 0; i < html.length;) {
+    const end = i + chunkSize();
+    output += sanitizer.write(html.slice(i, end));
+    i = end;
+  }
+  return output + sanitizer.end();
+}
+
+// Anything in the output that could still run script
+function leftovers(html) {
+  const found = [];
+  const tokenizer = new HtmlTokenizer({
+    onOpenTag(tag, attrs) {
+      for (const [name, value] of Object.entries(attrs)) {
+        const compact = value.replace(/[\u0000- \u007f-\u009f]+/g, '').toLowerCase();
+        if (name.startsWith('on')) found.push(`${tag}[${name}]`);
+        if (compact.startsWith('javascript:') || compact.startsWith('vbscript:')) found.push(`${tag}[${name}=${value}]`);
+      }
+      if (tag === 'script' && !attrs.src) found.push('inline script');
+    }
+  });
+  tokenizer.write(html);
+  tokenizer.end();
+  return found;
+}
+
+function timeIt(fn) {
+  const start = process.hrtime.bigint();
+  fn();
+  return Number(process.hrtime.bigint() - start) / 1e6;
+}
+
+// Best of a few runs, to keep GC pauses out of the ratio
+function bestTime(fn, runs = 3) {
+  return Math.min(...Array.from({ length: runs }, () => timeIt(fn)));
+}
+
+// --- 1. corpus ---------------------------------------------------------------
+
+console.log('corpus');
+const vectors = fs.readFileSync(path.join(FIXTURES, 'xss-vectors.html'), 'utf8');
+const vectorResult = sanitizeHTML(vectors);
+const vectorLeftovers = leftovers(vectorResult.html);
+if (vectorResult.safe || vectorLeftovers.length > 0) {
+  fail(`xss-vectors.html still contains ${vectorLeftovers.join(', ') || 'nothing flagged'}`);
+}
+console.log(`  xss-vectors.html         removed ${JSON.stringify(vectorResult.report.removed)}`);
+
+const landing = fs.readFileSync(path.join(FIXTURES, 'generated-landing.html'), 'utf8');
+const landingResult = sanitizeHTML(landing);
+if (!landingResult.safe || !landingResult.balanced) {
+  fail(`generated-landing.html flagged: ${JSON.stringify(landingResult.report)}`);
+}
+console.log(`  generated-landing.html   safe=${landingResult.safe} balanced=${landingResult.balanced}`);
+
+// --- 2. scaling --------------------------------------------------------------
+
+const ADVERSARIAL = {
+  'many <': n => '<'.repeat(n),
+  'unclosed tag': n => `<a${' x'.repeat(n / 2)}`,
+  'open quotes': n => `<a x="${'>'.repeat(n)}`,
+  'quote soup': n => `<a ${`x='"`.repeat(n / 4)}>`,
+  'unclosed comment': n => `<!--${'-'.repeat(n)}`,
+  'unclosed script': n => `<script>${'</scrip'.repeat(n / 7)}`,
+  'deep nesting': n => '<div>'.repeat(n / 10) + '</span>'.repeat(n / 14),
+  'stray closers': n => '<i>'.repeat(n / 6) + '</b>'.repeat(n / 8),
+  'entity flood': n => '&#x'.repeat(n / 3),
+  'handlers': n => '<p onclick=x '.repeat(n / 13),
+  'javascript urls': n => '<a href="java\tscript:'.repeat(n / 20)
+};
+
+// The regexes the old validateHTML ran
+const LEGACY_PATTERNS = [
+  /<[^\/][^>]*[^\/]>/g,
+  /<\/[^>]+>/g,
+  /<[^>]+\/>/g,
+  /<script[^>]*>(?!.*tailwind).*<\/script>/gi,
+  /<iframe[^>]*src=["'][^"']*(?!data:)[^"']*["']/gi,
+  /javascript:/gi,
+  /on\w+\s*=/gi
+];
+
+function legacyValidate(html) {
+  for (const pattern of LEGACY_PATTERNS) {
+    pattern.lastIndex = 0;
+    html.match(pattern);
+  }
+}
+
+console.log(`\nscaling (n=${size} vs 4n; ms)`);
+console.log('page                 whole n   whole 4n   ratio  chunked 4n   legacy 2k  legacy 8k');
+const chunk16 = () => 16;
+for (const [label, build] of Object.entries(ADVERSARIAL)) {
+  const small = build(size);
+  const large = build(size * 4);
+  const whole = bestTime(() => sanitizeHTML(small));
+  const whole4 = bestTime(() => sanitizeHTML(large));
+  const chunked4 = bestTime(() => sanitizeInChunks(large, chunk16), 1);
+  const legacy2k = bestTime(() => legacyValidate(build(2000)), 1);
+  const legacy8k = bestTime(() => legacyValidate(build(8000)), 1);
+  const ratio = whole4 / Math.max(whole, 0.05);
+  console.log([
+    label.padEnd(18),
+    whole.toFixed(1).padStart(9),
+    whole4.toFixed(1).padStart(10),
+    `${ratio.toFixed(1)}x`.padStart(7),
+    chunked4.toFixed(1).padStart(12),
+    legacy2k.toFixed(1).padStart(11),
+    legacy8k.toFixed(1).padStart(10)
+  ].join(' '));
+  // Linear is 4x; allow for timer noise on the fast cases
+  if (ratio > 8 && whole4 > 20) fail(`${label} grew ${ratio.toFixed(1)}x for 4x input`);
+  // Streaming has per-chunk overhead but must not be superlinear either
+  if (chunked4 > Math.max(whole4 * 40, 200)) fail(`${label} chunked took ${chunked4.toFixed(0)} ms`);
+}
+
+// --- 3. fuzz -----------------------------------------------------------------
+
+const FRAGMENTS = [
+  '<div>', '</div>', '<p>', '</p>', '<span class="a">', '</span>', '<b>', '</b>', '<br>', '</br>', '<img src=x>',
+  '<a href="', '<a href=', 'javascript:', 'JaVa\tScRiPt:', 'jav&#x09;ascript:', '&#106;avascript:', 'vbscript:',
+  'data:text/html,', 'data:image/png;base64,AA', '"', "'", '>', '<', '/>', '=', ' ', '\n', '\u0000', '\u000e',
+  ' onclick=alert(1)', ' OnLoad="x"', ' onerror = \'y\'', ' style="x:expression(1)"', ' srcdoc="<script>"',
+  '<script>', '</script>', '<script src="https://cdn.jsdelivr.net/x.js">', '<script src="//evil.example/x.js">',
+  '<style>', '</style>', '<textarea>', '</textarea>', '<iframe src="https://www.youtube.com/embed/x">', '</iframe>',
+  '<iframe src="javascript:1">', '<svg>', '</svg>', '<math>', '</math>', '<object>', '</object>', '<embed>',
+  '<!--', '-->', '<!doctype html>', '<![CDATA[', ']]>', '&amp;', '&lt;', '&copy', '&#x3c;', '&#60;', '&colon;',
+  'text ', 'alert(1)', '</', '<x-y z>', '<template>', '</template>', '<meta http-equiv="refresh">'
+];
+
+console.log(`\nfuzz (${iterations} pages, seed ${seed})`);
+const next = random(seed);
+const sanitizedPages = [];
+let checked = 0;
+for (let i = 0; i < iterations; i++) {
+  const pieces = 1 + Math.floor(next() * 60);
+  let html = '';
+  for (let p = 0; p < pieces; p++) html += FRAGMENTS[Math.floor(next() * FRAGMENTS.length)];
+
+  const once = sanitizeHTML(html);
+  const found = leftovers(once.html);
+  if (found.length > 0) {
+    fail(`unsafe output (${found.join(', ')})`, html);
+    continue;
+  }
+  const twice = sanitizeHTML(once.html);
+  if (!twice.safe || !twice.balanced) {
+    fail(`output is not a fixed point: ${JSON.stringify(twice.report.removed)} unclosed=${twice.report.unclosed} stray=${twice.report.stray}`, html);
+    continue;
+  }
+  const chunkSizes = random(seed + i);
+  const streamed = sanitizeInChunks(html, () => 1 + Math.floor(chunkSizes() * 12));
+  if (streamed !== once.html) {
+    fail('chunked output differs from whole-page output', html);
+    continue;
+  }
+  // Splitting re-sanitizes, so only pages that come back byte for byte can round-trip
+  if (twice.html === once.html) sanitizedPages.push(once.html);
+  checked++;
+}
+console.log(`  ${checked}/${iterations} pages passed`);
+
+// --- 4. sections round trip --------------------------------------------------
+
+const SECTION_PAGES = [
+  landingResult.html,
+  '<nav>Home</nav>\n<section id="hero"><h1>Hi</h1></section>\nexport default App;',
+  '<main>\n<header>Top</header>\n<section>Body</section>\n</main>\ntrailing text',
+  '<div><section>One</section><section>Two</section></div>',
+  'text only',
+  ''
+];
+
+console.log(`
+sections round trip (${SECTION_PAGES.length} pages, ${sanitizedPages.length} fuzz outputs)`);
+let roundTrips = 0;
+for (const page of [...SECTION_PAGES, ...sanitizedPages]) {
+  const assembled = assembleSite(splitSections(page));
+  if (assembled !== page) {
+    fail(`assembleSite(splitSections(page)) differs: ${JSON.stringify(assembled.slice(-120))}`, page);
+    continue;
+  }
+  roundTrips++;
+}
+console.log(`  ${roundTrips}/${SECTION_PAGES.length + sanitizedPages.length} pages round-tripped`);
+
+console.log(failures > 0 ? `\n${failures} failure(s)` : '\nall checks passed');
+process.exit(failures > 0 ? 1 : 0);
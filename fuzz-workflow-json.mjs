@@ -0,0 +1,179 @@
+// Fuzz and benchmark harness for lib/tolerant-json.js and lib/workflow-output.js.
+//
+//   node fuzz-workflow-json.mjs [--iterations 500] [--seed 1]
+//
+// 1. Clean replies: every curated template (n8n and Make.com), wrapped in
+//    fences and prose and fed in random chunks, must come back exactly as
+//    JSON.parse reads it, marked complete, with nothing repaired.
+// 2. Slips: trailing commas, comments, single quotes and Python literals
+//    spliced into those replies must still parse to the same workflow.
+// 3. Truncation: each reply is cut off at every offset. Parsing must never
+//    throw, and a recovered workflow must be well formed: every node has a
+//    type, and connections only point at nodes that exist. The table reports
+//    how many cut-off replies still give a usable workflow (strict JSON.parse
+//    gives none).
+// 4. A 3,000-token n8n reply cut off at the token limit must still give a
+//    workflow with most of its nodes.
+//
+// Exits 1 if any check fails.
+
+import { TolerantJsonParser } from './lib/tolerant-json.js';
+import { WorkflowOutputParser } from './lib/workflow-output.js';
+import { CURATED, WorkflowTemplateIndex } from './lib/workflow-templates.js';
+
+function option(name, fallback) {
+  const index = process.argv.indexOf(`--${name}`);
+  return index >= 0 ? parseInt(process.argv[index + 1]) : fallback;
+}
+
+const iterations = option('iterations', 500);
+const seed = option('seed', 1);
+
+let failures = 0;
+function fail(message, input) {
+  failures++;
+  console.log(`  FAIL ${message}`);
+  if (input !== undefined) console.log(`       input: ${JSON.stringify(input.slice(0, 300))}`);
+}
+
+// mulberry32
+let state = seed;
+function random() {
+  state = (state + 0x6d2b79f5) | 0;
+  let t = Math.imul(state ^ (state >>> 15), 1 | state);
+  t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+  return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+}
+
+function parseReply(text, platform, chunked = false) {
+  const parser = new WorkflowOutputParser(platform);
+  if (chunked) {
+    for (let i = 0; i < text.length;) {
+      const size = 1 + Math.floor(random() * 24);
+      parser.write(text.slice(i, i + size));
+      i += size;
+    }
+  } else {
+    parser.write(text);
+  }
+  return parser.end();
+}
+
+function wellFormed(workflow, platform) {
+  if (platform === 'n8n') {
+    const names = new Set(workflow.nodes.map(node => node.name));
+    if (!workflow.nodes.every(node => typeof node.type === 'string' && node.name)) return false;
+    return Object.entries(workflow.connections).every(([source, outputs]) => (
+      names.has(source) && outputs.main.every(targets => targets.every(target => names.has(target.node)))
+    ));
+  }
+  const modules = list => list.every(module => (
+    typeof module.module === 'string' && module.id !== undefined && (module.routes || []).every(route => modules(route.flow))
+  ));
+  return workflow.scenario.flow.length > 0 && modules(workflow.scenario.flow);
+}
+
+const wrap = json => `Here is the workflow you asked for:\n\n\`\`\`json\n${json}\n\`\`\`\n\nImport it and add your credentials.`;
+
+const index = new WorkflowTemplateIndex(null);
+const corpus = [];
+for (const template of CURATED) {
+  for (const platform of ['n8n', 'make']) {
+    const { workflow } = await index.instantiate({ entry: { source: 'curated', id: template.id, platform, template }, score: 1 }, 'Fuzz');
+    corpus.push({ label: `${template.id}/${platform}`, platform, json: JSON.stringify(workflow, null, 2) });
+  }
+}
+
+console.log('1. clean replies');
+for (let i = 0; i < iterations; i++) {
+  const { label, platform, json } = corpus[i % corpus.length];
+  const reply = wrap(json);
+  const result = parseReply(reply, platform, true);
+  if (!result.complete || result.repairs.length > 0 || JSON.stringify(result.workflow) !== JSON.stringify(JSON.parse(json))) {
+    fail(`${label}: clean reply changed (${result.repairs.join(', ') || 'no repairs'})`, reply);
+    break;
+  }
+}
+
+console.log('2. slips');
+const slips = [
+  json => json.replace(/("[^"]*"|\d+|true|false|null|\}|\])(\n\s*[}\]])/g, '$1,$2'),
+  json => json.replace(/\n(\s*)"/, '\n$1// generated\n$1"').replace(/: \{/, ': /* settings */ {'),
+  json => json.replace(/"([a-zA-Z]+)": "([^"'\\]*)"/g, "'$1': '$2'"),
+  json => json.replace(/: true\b/g, ': True').replace(/: false\b/g, ': False').replace(/: null\b/g, ': None')
+];
+for (const { label, platform, json } of corpus) {
+  const expected = JSON.stringify(JSON.parse(json));
+  slips.forEach((slip, number) => {
+    const reply = wrap(slip(json));
+    const result = parseReply(reply, platform, true);
+    if (JSON.stringify(result.workflow) !== expected) fail(`${label}: slip ${number + 1} changed the workflow`, reply);
+  });
+}
+
+console.log('3. truncation');
+console.log('   reply                                  chars  usable  strict');
+for (const { label, platform, json } of corpus) {
+  const reply = wrap(json);
+  let usable = 0;
+  let strict = 0;
+  for (let cut = 0; cut < reply.length; cut++) {
+    const text = reply.slice(0, cut);
+    let result;
+    try {
+      result = parseReply(text, platform);
+    } catch (error) {
+      fail(`${label}: threw at ${cut}: ${error.message}`, text);
+      break;
+    }
+    if (result.workflow) {
+      usable++;
+      if (!wellFormed(result.workflow, platform)) fail(`${label}: malformed workflow recovered at ${cut}`, text);
+    }
+    try {
+      JSON.parse(text.slice(text.indexOf('{')));
+      strict++;
+    } catch {}
+  }
+  console.log(`   ${label.padEnd(38)} ${String(reply.length).padStart(5)} ${`${((usable / reply.length) * 100).toFixed(0)}%`.padStart(7)} ${`${((strict / reply.length) * 100).toFixed(0)}%`.padStart(7)}`);
+}
+
+console.log('4. a 3,000-token reply cut off at the limit');
+const nodes = Array.from({ length: 30 }, (_, i) => ({
+  id: `node-${i + 1}`,
+  name: `Step ${i + 1}`,
+  type: i === 0 ? 'n8n-nodes-base.webhook' : 'n8n-nodes-base.httpRequest',
+  typeVersion: 1,
+  position: [250 + i * 220, 300],
+  parameters: { url: `https://api.example.com/v1/resources/${i}`, method: 'POST', options: { timeout: 10000, headers: { 'X-Step': String(i) } } },
+  notes: 'Calls the next service in the chain and passes the response on to the following step unchanged.'
+}));
+const connections = Object.fromEntries(nodes.slice(0, -1).map((node, i) => [node.name, { main: [[{ node: nodes[i + 1].name, type: 'main', index: 0 }]] }]));
+const full = wrap(JSON.stringify({ name: 'Long chain', nodes, connections, settings: { executionOrder: 'v1' } }, null, 2));
+const limit = 3000 * 4;
+const start = process.hrtime.bigint();
+const result = parseReply(full.slice(0, limit), 'n8n', true);
+const ms = Number(process.hrtime.bigint() - start) / 1e6;
+if (!result.workflow || result.workflow.nodes.length < 10 || !wellFormed(result.workflow, 'n8n')) {
+  fail(`cut-off reply gave ${result.workflow ? `${result.workflow.nodes.length} nodes` : 'no workflow'}`);
+} else {
+  console.log(`   ${full.length} chars cut to ${limit}: ${result.workflow.nodes.length}/${nodes.length} nodes kept in ${ms.toFixed(2)} ms`);
+  console.log(`   repairs: ${result.repairs.join('; ')}`);
+}
+
+// Throughput on the whole corpus, for reference
+const text = corpus.map(({ json }) => json).join('\n');
+const rounds = 50;
+const throughputStart = process.hrtime.bigint();
+for (let i = 0; i < rounds; i++) {
+  for (const { json } of corpus) {
+    const parser = new TolerantJsonParser();
+    parser.write(json);
+    parser.end();
+  }
+}
+const seconds = Number(process.hrtime.bigint() - throughputStart) / 1e9;
+console.log(`\nthroughput: ${((text.length * rounds) / seconds / 1e6).toFixed(1)} MB/s`);
+
+console.log(failures === 0 ? '\nall checks passed' : `\n${failures} check(s) failed`);
+process.exit(failures > 0 ? 1 : 0);
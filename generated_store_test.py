@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Blob Store Test for Generated Websites and Workflows
+Checks the content-addressed storage behind generated_websites and
+generated_workflows (lib/blob-store.js, lib/generated-store.js): identical
+payloads are stored once with a reference each, legacy inline records read
+the same before and after /generated-storage/migrate, list endpoints never
+return payload fields, and /generated-storage/report accounts for it all.
+
+Test records are written straight into MongoDB as legacy (inline) records,
+so no provider key is needed. With OPENAI_API_KEY set, section regeneration
+is checked too: concurrent regenerations of one section must not leave a
+stale section or leak a blob.
+
+Usage:
+    python generated_store_test.py
+    OPENAI_API_KEY=sk-... python generated_store_test.py
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+from pymongo import MongoClient
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000/api")
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "happytools")
+
+# Payload fields that must never reach a list response
+WEBSITE_PAYLOAD_FIELDS = {"generated_code", "shell", "storage", "_id"}
+WORKFLOW_PAYLOAD_FIELDS = {"workflow_json", "visual_preview", "workflow_blob", "preview_blob", "storage", "_id", "owner"}
+
+
+def legacy_website(run_id):
+    code = (
+        f'<nav class="navbar"><a href="#">Blob Test {run_id}</a></nav>\n'
+        f'<section id="hero"><h1>Store test {run_id}</h1><p>Hero copy.</p></section>\n'
+        f'<section id="features"><h2>Features {run_id}</h2><ul><li>One</li><li>Two</li></ul></section>\n'
+        f'<footer><p>Footer {run_id}</p></footer>\n'
+    )
+    now = datetime.utcnow()
+    return {
+        "id": str(uuid.uuid4()),
+        "prompt": f"blob store test {run_id}",
+        "provider": "openai",
+        "generated_code": code,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def legacy_workflow(run_id):
+    now = datetime.utcnow()
+    workflow = {
+        "name": f"Blob Test {run_id}",
+        "nodes": [
+            {"id": "1", "name": "Webhook", "type": "n8n-nodes-base.webhook", "parameters": {"path": run_id}},
+            {"id": "2", "name": "Send Email", "type": "n8n-nodes-base.emailSend", "parameters": {}},
+        ],
+        "connections": {"Webhook": {"main": [[{"node": "Send Email", "type": "main", "index": 0}]]}},
+    }
+    return {
+        "id": str(uuid.uuid4()),
+        "name": f"Blob Test {run_id}",
+        "description": "",
+        "platform": "n8n",
+        "provider": "openai",
+        "source": "llm",
+        "automation_description": "Send email when the webhook is called",
+        "node_count": 2,
+        "workflow_json": workflow,
+        "visual_preview": f"Webhook -> Send Email ({run_id})",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+class GeneratedStoreTester:
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.results = []
+        self.db = MongoClient(MONGO_URL)[DB_NAME]
+        self.website = legacy_website(self.run_id)
+        # The same workflow saved twice, as two records
+        self.workflows = [legacy_workflow(self.run_id), legacy_workflow(self.run_id)]
+        self.workflows[1]["workflow_json"] = self.workflows[0]["workflow_json"]
+
+    def log_test(self, test_name, success, details=""):
+        self.results.append({"test": test_name, "success": success, "details": details})
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status}: {test_name}")
+        if details:
+            print(f"   {details}")
+
+    def report(self):
+        response = requests.get(f"{BASE_URL}/generated-storage/report", timeout=30)
+        return response.json() if response.status_code == 200 else None
+
+    def get_website(self):
+        response = requests.get(f"{BASE_URL}/website-builder/websites/{self.website['id']}", timeout=30)
+        return response.json().get("website") if response.status_code == 200 else None
+
+    def get_workflow(self, record):
+        response = requests.get(f"{BASE_URL}/workflow-builder/workflows/{record['id']}", timeout=30)
+        return response.json() if response.status_code == 200 else None
+
+    def wait_for_job(self, job_id, timeout=300):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            response = requests.get(f"{BASE_URL}/ai-tools/sync-jobs/{job_id}", timeout=30)
+            if response.status_code == 200 and response.json().get("status") in ("completed", "partial", "failed"):
+                return response.json()
+            time.sleep(0.5)
+        return None
+
+    def record_hashes(self):
+        website = self.db.generated_websites.find_one({"id": self.website["id"]}) or {}
+        hashes = [website.get("shell", {}).get("before"), website.get("shell", {}).get("after")]
+        hashes += [section.get("hash") for section in website.get("sections", [])]
+        for record in self.workflows:
+            stored = self.db.generated_workflows.find_one({"id": record["id"]}) or {}
+            hashes += [stored.get("workflow_blob"), stored.get("preview_blob")]
+        return [h for h in hashes if h]
+
+    def test_migration(self):
+        print("\n--- Migrating legacy inline records ---")
+        before_report = self.report()
+        self.db.generated_websites.insert_one(dict(self.website))
+        self.db.generated_workflows.insert_many([dict(record) for record in self.workflows])
+
+        inline_site = self.get_website()
+        inline_workflow = self.get_workflow(self.workflows[0])
+        self.log_test("Legacy records are read inline",
+                      inline_site is not None and inline_site.get("code") == self.website["generated_code"]
+                      and inline_workflow is not None and inline_workflow.get("workflow") == self.workflows[0]["workflow_json"],
+                      f"website sections: {len(inline_site.get('sections', [])) if inline_site else None}")
+
+        response = requests.post(f"{BASE_URL}/generated-storage/migrate", timeout=30)
+        job = self.wait_for_job(response.json().get("job_id")) if response.status_code == 202 else None
+        self.log_test("Migration job completes", job is not None and job.get("status") == "completed",
+                      "" if job is None else f"{job.get('status')}: {job.get('updated')} records moved")
+
+        website = self.db.generated_websites.find_one({"id": self.website["id"]}) or {}
+        workflows = [self.db.generated_workflows.find_one({"id": record["id"]}) or {} for record in self.workflows]
+        inline_left = [key for key in ("generated_code", "workflow_json", "visual_preview")
+                       if key in website or any(key in record for record in workflows)]
+        self.log_test("Migrated records hold hashes only",
+                      website.get("storage") == "blobs" and all(record.get("storage") == "blobs" for record in workflows)
+                      and not inline_left,
+                      f"inline fields left: {inline_left}" if inline_left else "")
+
+        stored_site = self.get_website()
+        stored_workflow = self.get_workflow(self.workflows[1])
+        self.log_test("Migrated website reads back unchanged",
+                      stored_site is not None and inline_site is not None and stored_site.get("code") == inline_site.get("code"),
+                      f"{len(stored_site.get('code', '')) if stored_site else None} chars")
+        self.log_test("Migrated workflow reads back unchanged",
+                      stored_workflow is not None and stored_workflow.get("workflow") == self.workflows[1]["workflow_json"]
+                      and stored_workflow.get("visualPreview") == self.workflows[1]["visual_preview"])
+
+        # Same workflow JSON in two records: one blob, two references
+        blob_ids = {record.get("workflow_blob") for record in workflows}
+        blob = self.db.blobs.find_one({"_id": next(iter(blob_ids))}) if len(blob_ids) == 1 else None
+        self.log_test("Same workflow twice is one blob with refs=2",
+                      blob is not None and blob.get("refs") == 2,
+                      f"{len(blob_ids)} blob(s), refs {blob.get('refs') if blob else None}")
+
+        after_report = self.report()
+        ok = before_report is not None and after_report is not None
+        self.log_test("Storage report accounts for the migration",
+                      ok and after_report["websites"]["legacy"] == 0 and after_report["workflows"]["legacy"] == 0
+                      and after_report["blobs"]["references"] - before_report["blobs"]["references"]
+                      >= after_report["blobs"]["blobs"] - before_report["blobs"]["blobs"] + 2
+                      and after_report["blobs"]["saved_bytes"] >= 0,
+                      "" if not ok else f"legacy websites {after_report['websites']['legacy']}, "
+                      f"workflows {after_report['workflows']['legacy']}, blobs {before_report['blobs']['blobs']} -> "
+                      f"{after_report['blobs']['blobs']}, references {before_report['blobs']['references']} -> "
+                      f"{after_report['blobs']['references']}")
+
+    def test_list_endpoints(self):
+        print("\n--- List endpoints ---")
+        websites = requests.get(f"{BASE_URL}/website-builder/websites?limit=100", timeout=30).json().get("websites", [])
+        leaked = [key for site in websites for key in site if key in WEBSITE_PAYLOAD_FIELDS]
+        leaked += [key for site in websites for section in site.get("sections", []) for key in section
+                   if key not in ("id", "kind")]
+        listed = any(site.get("id") == self.website["id"] for site in websites)
+        self.log_test("Website list returns no payload fields", listed and not leaked,
+                      f"{len(websites)} websites, leaked: {sorted(set(leaked))}" if leaked or not listed else "")
+
+        workflows = requests.get(f"{BASE_URL}/workflow-builder/workflows?limit=100", timeout=30).json().get("workflows", [])
+        leaked = [key for record in workflows for key in record if key in WORKFLOW_PAYLOAD_FIELDS]
+        listed = any(record.get("id") == self.workflows[0]["id"] for record in workflows)
+        self.log_test("Workflow list returns no payload fields", listed and not leaked,
+                      f"{len(workflows)} workflows, leaked: {sorted(set(leaked))}" if leaked or not listed else "")
+
+    def test_section_regeneration(self, api_key):
+        print("\n--- Concurrent section regeneration ---")
+        website = self.db.generated_websites.find_one({"id": self.website["id"]}) or {}
+        section = next((s for s in website.get("sections", []) if s.get("kind") not in ("style", "script")), None)
+        if section is None:
+            self.log_test("Website has a section to regenerate", False)
+            return
+
+        def regenerate(index):
+            payload = {"provider": "openai", "apiKey": api_key,
+                       "instruction": f"Rewrite this section's copy, variant {index}"}
+            response = requests.post(
+                f"{BASE_URL}/website-builder/websites/{self.website['id']}/sections/{section['id']}/regenerate",
+                json=payload, timeout=300)
+            return response.status_code
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            statuses = list(pool.map(regenerate, range(2)))
+
+        # The second writer either saw the first one's update or lost the race with a 409
+        self.log_test("Concurrent regenerations apply one at a time",
+                      200 in statuses and all(status in (200, 409) for status in statuses), f"statuses {statuses}")
+
+        stored = self.db.generated_websites.find_one({"id": self.website["id"]}) or {}
+        current = next((s for s in stored.get("sections", []) if s.get("id") == section["id"]), {})
+        missing = [h for h in self.record_hashes() if self.db.blobs.count_documents({"_id": h}) == 0]
+        self.log_test("Replaced section's old blob is released",
+                      current.get("hash") != section["hash"] and self.db.blobs.count_documents({"_id": section["hash"]}) == 0,
+                      f"old {section['hash'][:12]}, now {str(current.get('hash'))[:12]}")
+        self.log_test("Every hash the record holds is stored", not missing, f"missing: {missing}" if missing else "")
+
+    def cleanup(self):
+        hashes = self.record_hashes()
+        self.db.generated_websites.delete_many({"id": self.website["id"]})
+        self.db.generated_workflows.delete_many({"id": {"$in": [record["id"] for record in self.workflows]}})
+        # Every payload carries the run id, so these blobs belong to this run only
+        self.db.blobs.delete_many({"_id": {"$in": hashes}})
+
+    def run(self, keep_data=False):
+        print("🚀 GENERATED STORE (BLOB STORE) TEST")
+        print(f"🕒 Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"🌐 API: {BASE_URL}   🗄️  {MONGO_URL}/{DB_NAME}   run {self.run_id}")
+        print("="*80)
+
+        api_key = os.environ.get("OPENAI_API_KEY")
+        try:
+            self.test_migration()
+            self.test_list_endpoints()
+            if api_key:
+                self.test_section_regeneration(api_key)
+            else:
+                print("\nSkipped section regeneration: set OPENAI_API_KEY to run it")
+        finally:
+            if not keep_data:
+                self.cleanup()
+
+        print("\n" + "="*80)
+        passed = sum(1 for r in self.results if r["success"])
+        print(f"📊 Results: {passed}/{len(self.results)} checks passed")
+        for result in self.results:
+            if not result["success"]:
+                print(f"  ❌ {result['test']}: {result['details']}")
+        return 0 if passed == len(self.results) else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blob store test for generated websites and workflows")
+    parser.add_argument("--keep-data", action="store_true", help="leave the test records and blobs in MongoDB")
+    args = parser.parse_args()
+
+    return GeneratedStoreTester().run(keep_data=args.keep_data)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
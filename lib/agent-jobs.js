@@ -0,0 +1,310 @@
+import { v4 as uuidv4 } from 'uuid';
+import { releaseBlobs, setBlobKind } from './blob-store.js';
+
+// Queue for long-running agents (image generation, long-form writing).
+//
+// Instead of holding the request open for the whole generation, POST
+// /agents/run stores a job in `agent_jobs` and returns 202. Jobs are run by
+// agent-worker.mjs, a separate process with a small pool of workers that
+// claim queued jobs; the web server never runs them. Clients follow a job by
+// polling its status URL (or through its server-sent events, which hold a
+// request open for up to EVENTS_MAX_MS).
+//
+// A worker claims a job by moving it from queued to running with a lock
+// that expires after LOCK_MS; agent calls are cut off at AGENT_TIMEOUT_MS,
+// before it. A job whose worker died, or whose provider call timed out or
+// got a 429 or 5xx, is run again, up to MAX_ATTEMPTS runs; any other error
+// fails it at once. A worker only records the outcome of the attempt it
+// claimed. The job keeps the agent's inputs, API key included, only until it
+// finishes; finished jobs are deleted after FINISHED_TTL_SECONDS. The blob
+// references a completed job's result holds (the image agent's images) are
+// kept when it is deleted: the result text, already handed to the client,
+// links to them at an immutable URL.
+//
+//   { id, agent_id, status: 'queued' | 'running' | 'completed' | 'failed',
+//     inputs, attempts, result, blobs, error, locked_until, created_at, started_at, finished_at }
+const JOBS = 'agent_jobs';
+
+const WORKERS = parseInt(process.env.AGENT_WORKERS) || 4;
+const LOCK_MS = 5 * 60 * 1000;
+export const AGENT_TIMEOUT_MS = 4 * 60 * 1000;
+const MAX_ATTEMPTS = 2;
+const FINISHED_TTL_SECONDS = 7 * 24 * 60 * 60;
+// Idle workers poll for queued jobs, backing off to the maximum (the longest
+// a job waits for an idle worker)
+const MIN_POLL_MS = 500;
+const MAX_POLL_MS = 2000;
+// An event stream is closed after this long; EventSource reconnects on its own
+const EVENTS_MAX_MS = 55000;
+const EVENTS_POLL_MS = 1000;
+const EVENTS_HEARTBEAT_MS = 15000;
+
+const FINISHED = ['completed', 'failed'];
+
+let indexesReady;
+
+// Provider errors another attempt may get past: rate limits and server errors
+const TRANSIENT_STATUS = /\bAPI error: (?:429|5\d\d)\b/;
+
+/**
+ * An agent whose provider call failed: its job fails with this message, or
+ * is queued again when the failure was transient (see `transient`).
+ */
+export class AgentError extends Error {
+  /** The provider call timed out, was rate limited or failed on the provider's side. */
+  get transient() {
+    const cause = this.cause;
+    if (!cause) return false;
+    return cause.name === 'TimeoutError' || cause.name === 'AbortError' || TRANSIENT_STATUS.test(cause.message);
+  }
+}
+
+async function createAgentJobIndexes(db, jobs) {
+  // Finished jobs used to expire through a TTL index; they are deleted by expireFinished now
+  const indexes = await jobs.indexes().catch(() => []);
+  if (indexes.some(index => index.name === 'finished_at_1' && index.expireAfterSeconds !== undefined)) {
+    await jobs.dropIndex('finished_at_1');
+  }
+  await Promise.all([
+    jobs.createIndex({ id: 1 }, { unique: true }),
+    jobs.createIndex({ status: 1, created_at: 1 }),
+    jobs.createIndex({ finished_at: 1 })
+  ]);
+  // Images stored before blobs had a kind are marked, so /agents/images keeps serving them
+  const images = await jobs.distinct('blobs');
+  if (images.length > 0) await setBlobKind(db, images, 'image');
+}
+
+function ensureAgentJobIndexes(db) {
+  if (!indexesReady) {
+    indexesReady = createAgentJobIndexes(db, db.collection(JOBS)).catch(error => {
+      indexesReady = undefined;
+      console.error('Failed to create agent job indexes:', error.message);
+    });
+  }
+  return indexesReady;
+}
+
+export function formatAgentJob(job) {
+  if (!job) return null;
+  const { _id, inputs, locked_until, ...rest } = job;
+  const end = job.finished_at || new Date();
+  return {
+    ...rest,
+    queued_ms: (job.started_at || end) - job.created_at,
+    run_ms: job.started_at ? end - job.started_at : null,
+    status_url: `/api/agents/jobs/${job.id}`,
+    events_url: `/api/agents/jobs/${job.id}/events`
+  };
+}
+
+export async function getAgentJob(db, id) {
+  return formatAgentJob(await db.collection(JOBS).findOne({ id }));
+}
+
+/** Queue a run of `agentId` and return the job. */
+export async function enqueueAgentJob(db, { agentId, inputs }) {
+  await ensureAgentJobIndexes(db);
+  const now = new Date();
+  const job = {
+    id: uuidv4(),
+    agent_id: agentId,
+    status: 'queued',
+    inputs,
+    attempts: 0,
+    result: null,
+    blobs: [],
+    error: null,
+    locked_until: null,
+    created_at: now,
+    started_at: null,
+    finished_at: null
+  };
+  await db.collection(JOBS).insertOne(job);
+  return formatAgentJob(job);
+}
+
+class AgentWorkerPool {
+  constructor(db, runAgent, size) {
+    this.db = db;
+    this.runAgent = runAgent;
+    this.size = size;
+    this.started = false;
+    this.stopping = false;
+    this.loops = [];
+    this.waiting = new Set();
+  }
+
+  start() {
+    if (this.started) return;
+    this.started = true;
+    for (let index = 0; index < this.size; index++) {
+      this.loops.push(this.work(index).catch(error => console.error(`Agent worker ${index} stopped:`, error)));
+    }
+  }
+
+  // Stop claiming jobs; resolves once the jobs being run have finished
+  stop() {
+    this.stopping = true;
+    this.wake();
+    return Promise.all(this.loops);
+  }
+
+  // Idle workers look now instead of at their next poll
+  wake() {
+    for (const resolve of this.waiting) resolve();
+    this.waiting.clear();
+  }
+
+  sleep(ms) {
+    return new Promise(resolve => {
+      const done = () => {
+        clearTimeout(timer);
+        this.waiting.delete(done);
+        resolve();
+      };
+      const timer = setTimeout(done, ms);
+      this.waiting.add(done);
+    });
+  }
+
+  async claim() {
+    const now = new Date();
+    return this.db.collection(JOBS).findOneAndUpdate(
+      {
+        $or: [{ status: 'queued' }, { status: 'running', locked_until: { $lt: now } }],
+        attempts: { $lt: MAX_ATTEMPTS }
+      },
+      {
+        $set: { status: 'running', locked_until: new Date(now.getTime() + LOCK_MS), started_at: now },
+        $inc: { attempts: 1 }
+      },
+      { sort: { created_at: 1 }, returnDocument: 'after' }
+    );
+  }
+
+  // Jobs whose worker died on their last attempt
+  async failAbandoned() {
+    await this.db.collection(JOBS).updateMany(
+      { status: 'running', locked_until: { $lt: new Date() }, attempts: { $gte: MAX_ATTEMPTS } },
+      { $set: { status: 'failed', error: 'The agent stopped responding', finished_at: new Date() }, $unset: { 'inputs.apiKey': '' } }
+    );
+  }
+
+  // Delete jobs finished more than FINISHED_TTL_SECONDS ago. Their images
+  // stay in the blob store, where /agents/images still serves them.
+  async expireFinished() {
+    const cutoff = new Date(Date.now() - FINISHED_TTL_SECONDS * 1000);
+    await this.db.collection(JOBS).deleteMany({ finished_at: { $lt: cutoff } });
+  }
+
+  async work(index) {
+    await ensureAgentJobIndexes(this.db);
+    let pollMs = MIN_POLL_MS;
+    while (!this.stopping) {
+      let job;
+      try {
+        job = await this.claim();
+        if (!job && index === 0) {
+          await this.failAbandoned();
+          await this.expireFinished();
+        }
+      } catch (error) {
+        console.error('Failed to claim an agent job:', error.message);
+      }
+      if (!job) {
+        await this.sleep(pollMs);
+        pollMs = Math.min(MAX_POLL_MS, pollMs * 2);
+        continue;
+      }
+      pollMs = MIN_POLL_MS;
+      await this.run(job);
+    }
+  }
+
+  async run(job) {
+    const jobs = this.db.collection(JOBS);
+    // Only this attempt's claim: if the lock expired and another worker took
+    // the job over, that worker records the outcome
+    const claimed = { id: job.id, status: 'running', attempts: job.attempts };
+    // Blobs the agent stored for its result (an image); released only if the result is not kept
+    const blobs = [];
+    let update;
+    try {
+      const result = await this.runAgent(this.db, job.agent_id, job.inputs, blobs);
+      update = { $set: { status: 'completed', result, blobs, finished_at: new Date(), locked_until: null }, $unset: { 'inputs.apiKey': '' } };
+    } catch (error) {
+      console.error(`Agent job ${job.id} (${job.agent_id}) failed:`, error.message);
+      // Bad keys, bad requests and bugs fail the same way every time
+      const retry = job.attempts < MAX_ATTEMPTS && error instanceof AgentError && error.transient;
+      update = retry
+        ? { $set: { status: 'queued', error: error.message, locked_until: null } }
+        : { $set: { status: 'failed', error: error.message, finished_at: new Date(), locked_until: null }, $unset: { 'inputs.apiKey': '' } };
+    }
+    const { matchedCount } = await jobs.updateOne(claimed, update);
+    const kept = matchedCount > 0 && update.$set.status === 'completed';
+    if (matchedCount === 0) console.error(`Agent job ${job.id} was taken over by another worker; its result is discarded`);
+    if (!kept && blobs.length) await releaseBlobs(this.db, blobs);
+  }
+}
+
+let workerPool;
+
+/**
+ * The worker process's pool, started on first use. `runAgent(db, agentId,
+ * inputs, blobs)` runs one agent and returns its result, adding the hashes
+ * of any blobs it stored for the result to `blobs`.
+ */
+export function getAgentWorkers(db, runAgent) {
+  if (!workerPool) workerPool = new AgentWorkerPool(db, runAgent, WORKERS);
+  workerPool.start();
+  return workerPool;
+}
+
+/**
+ * Server-sent events for one job: a `status` event with the job whenever it
+ * changes, until it has finished (or EVENTS_MAX_MS has passed, when the
+ * browser reconnects and gets the current status first).
+ */
+export function agentJobEvents(db, id) {
+  const encoder = new TextEncoder();
+  let closed = false;
+
+  return new ReadableStream({
+    async start(controller) {
+      const send = text => controller.enqueue(encoder.encode(text));
+      const started = Date.now();
+      let last = null;
+      let lastSent = started;
+      send(`retry: ${EVENTS_POLL_MS}\n\n`);
+      try {
+        while (!closed && Date.now() - started < EVENTS_MAX_MS) {
+          const job = await getAgentJob(db, id);
+          if (!job) {
+            send(`event: error\ndata: ${JSON.stringify({ error: 'Job not found' })}\n\n`);
+            break;
+          }
+          const key = `${job.status}:${job.attempts}`;
+          if (key !== last) {
+            last = key;
+            lastSent = Date.now();
+            send(`event: status\ndata: ${JSON.stringify(job)}\n\n`);
+          } else if (Date.now() - lastSent >= EVENTS_HEARTBEAT_MS) {
+            lastSent = Date.now();
+            send(': heartbeat\n\n');
+          }
+          if (FINISHED.includes(job.status)) break;
+          await new Promise(resolve => setTimeout(resolve, EVENTS_POLL_MS));
+        }
+      } catch (error) {
+        if (closed) return;
+        console.error(`Agent job ${id} event stream failed:`, error.message);
+      }
+      if (!closed) controller.close();
+    },
+
+    cancel() {
+      closed = true;
+    }
+  });
+}
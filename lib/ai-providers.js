@@ -24,19 +24,27 @@ IMPORTANT:
 
 The website should be complete and ready to use immediately.`;
 
+  return generateCompletion(provider, apiKey, systemPrompt, prompt);
+}
+
+/**
+ * One non-streaming completion. `maxTokens` caps the output (smaller edits,
+ * such as a single section, should ask for less).
+ */
+export async function generateCompletion(provider, apiKey, systemPrompt, userPrompt, { maxTokens = 4000 } = {}) {
   switch (provider) {
     case 'openai':
-      return await generateWithOpenAI(apiKey, systemPrompt, prompt);
+      return await generateWithOpenAI(apiKey, systemPrompt, userPrompt, maxTokens);
     case 'claude':
-      return await generateWithClaude(apiKey, systemPrompt, prompt);
+      return await generateWithClaude(apiKey, systemPrompt, userPrompt, maxTokens);
     case 'gemini':
-      return await generateWithGemini(apiKey, systemPrompt, prompt);
+      return await generateWithGemini(apiKey, systemPrompt, userPrompt, maxTokens);
     default:
       throw new Error('Unsupported AI provider');
   }
 }
 
-async function generateWithOpenAI(apiKey, systemPrompt, userPrompt) {
+async function generateWithOpenAI(apiKey, systemPrompt, userPrompt, maxTokens = 4000) {
   const response = await fetch('https://api.openai.com/v1/chat/completions', {
     method: 'POST',
     headers: {
@@ -49,7 +57,7 @@ async function generateWithOpenAI(apiKey, systemPrompt, userPrompt) {
         { role: 'system', content: systemPrompt },
         { role: 'user', content: userPrompt }
       ],
-      max_tokens: 4000,
+      max_tokens: maxTokens,
       temperature: 0.7,
     }),
   });
@@ -60,10 +68,11 @@ async function generateWithOpenAI(apiKey, systemPrompt, userPrompt) {
   }
 
   const data = await response.json();
+  recordPromptUsage('openai', openAIUsage(data.usage));
   return data.choices[0].message.content;
 }
 
-async function generateWithClaude(apiKey, systemPrompt, userPrompt) {
+async function generateWithClaude(apiKey, systemPrompt, userPrompt, maxTokens = 4000) {
   const response = await fetch('https://api.anthropic.com/v1/messages', {
     method: 'POST',
     headers: {
@@ -73,8 +82,8 @@ async function generateWithClaude(apiKey, systemPrompt, userPrompt) {
     },
     body: JSON.stringify({
       model: 'claude-3-sonnet-20240229',
-      max_tokens: 4000,
-      system: systemPrompt,
+      max_tokens: maxTokens,
+      system: cachedSystem(systemPrompt),
       messages: [
         { role: 'user', content: userPrompt }
       ],
@@ -87,10 +96,11 @@ async function generateWithClaude(apiKey, systemPrompt, userPrompt) {
   }
 
   const data = await response.json();
+  recordPromptUsage('claude', claudeUsage(data.usage));
   return data.content[0].text;
 }
 
-async function generateWithGemini(apiKey, systemPrompt, userPrompt) {
+async function generateWithGemini(apiKey, systemPrompt, userPrompt, maxTokens = 4000) {
   const response = await fetch(`https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key=${apiKey}`, {
     method: 'POST',
     headers: {
@@ -106,7 +116,7 @@ async function generateWithGemini(apiKey, systemPrompt, userPrompt) {
       ],
       generationConfig: {
         temperature: 0.7,
-        maxOutputTokens: 4000,
+        maxOutputTokens: maxTokens,
       },
     }),
   });
@@ -117,9 +127,225 @@ async function generateWithGemini(apiKey, systemPrompt, userPrompt) {
   }
 
   const data = await response.json();
+  recordPromptUsage('gemini', geminiUsage(data.usageMetadata));
   return data.candidates[0].content.parts[0].text;
 }
 
+// Prompt caching. System prompts are static (the request goes in the user
+// message), so repeat calls share a prefix the provider can cache: Anthropic
+// when the system block is marked with cache_control, OpenAI automatically,
+// Gemini implicitly on models that support it. Each needs a minimum prefix
+// (1,024 tokens for OpenAI and Claude Sonnet); shorter prompts just are not
+// cached. Usage is reported with input_tokens counting the whole prompt and
+// cached_input_tokens the part read from the cache.
+
+const promptCache = new Map();
+
+function cachedSystem(systemPrompt) {
+  return [{ type: 'text', text: systemPrompt, cache_control: { type: 'ephemeral' } }];
+}
+
+function openAIUsage(usage) {
+  if (!usage) return null;
+  return {
+    input_tokens: usage.prompt_tokens,
+    output_tokens: usage.completion_tokens,
+    cached_input_tokens: usage.prompt_tokens_details?.cached_tokens ?? 0
+  };
+}
+
+function claudeUsage(usage) {
+  if (!usage) return null;
+  const cached = usage.cache_read_input_tokens || 0;
+  const written = usage.cache_creation_input_tokens || 0;
+  return {
+    // Anthropic counts cached and newly cached tokens separately from input_tokens
+    input_tokens: (usage.input_tokens || 0) + cached + written,
+    ...(usage.output_tokens !== undefined && { output_tokens: usage.output_tokens }),
+    cached_input_tokens: cached,
+    cache_write_tokens: written
+  };
+}
+
+function geminiUsage(metadata) {
+  if (!metadata) return null;
+  return {
+    input_tokens: metadata.promptTokenCount,
+    output_tokens: metadata.candidatesTokenCount,
+    cached_input_tokens: metadata.cachedContentTokenCount ?? 0
+  };
+}
+
+// Counted once per call, when the provider first reports the prompt's size
+function recordPromptUsage(provider, usage) {
+  if (!usage || usage.input_tokens == null) return;
+  if (!promptCache.has(provider)) promptCache.set(provider, { calls: 0, cached_calls: 0, input_tokens: 0, cached_input_tokens: 0, cache_write_tokens: 0 });
+  const totals = promptCache.get(provider);
+  totals.calls++;
+  if (usage.cached_input_tokens > 0) totals.cached_calls++;
+  totals.input_tokens += usage.input_tokens;
+  totals.cached_input_tokens += usage.cached_input_tokens || 0;
+  totals.cache_write_tokens += usage.cache_write_tokens || 0;
+}
+
+/** Prompt tokens sent and read from provider caches, per provider, since the process started. */
+export function promptCacheStats() {
+  return Object.fromEntries([...promptCache].map(([provider, totals]) => [provider, {
+    ...totals,
+    cached_share: totals.input_tokens ? Math.round((totals.cached_input_tokens / totals.input_tokens) * 1000) / 1000 : 0
+  }]));
+}
+
+// Models used when streaming; the same ones /website-builder/generate calls
+const STREAM_MODELS = {
+  openai: 'gpt-4',
+  claude: 'claude-3-5-sonnet-20241022',
+  gemini: 'gemini-1.5-pro'
+};
+
+// The most output each of those models can be asked for in one completion
+export const STREAM_MAX_OUTPUT_TOKENS = {
+  openai: 4096,
+  claude: 8192,
+  gemini: 8192
+};
+
+// Why the output ended: 'max_tokens' when it hit maxTokens, 'end' when the
+// model finished, anything else (e.g. 'safety') as the provider put it
+const STOP_REASONS = {
+  length: 'max_tokens',
+  max_tokens: 'max_tokens',
+  MAX_TOKENS: 'max_tokens',
+  stop: 'end',
+  end_turn: 'end',
+  stop_sequence: 'end',
+  STOP: 'end'
+};
+
+function stopReason(reason) {
+  return STOP_REASONS[reason] || String(reason).toLowerCase();
+}
+
+// `data:` payloads of a server-sent event stream, as they arrive
+async function* sseData(body) {
+  const decoder = new TextDecoder('utf-8');
+  let buffer = '';
+  for await (const chunk of body) {
+    buffer += decoder.decode(chunk, { stream: true });
+    let newline;
+    while ((newline = buffer.indexOf('\n')) >= 0) {
+      const line = buffer.slice(0, newline).replace(/\r$/, '');
+      buffer = buffer.slice(newline + 1);
+      if (line.startsWith('data:')) yield line.slice(5).trim();
+    }
+  }
+}
+
+async function streamRequest(url, options, label) {
+  const response = await fetch(url, { ...options, method: 'POST' });
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.error?.message || `${label} API error`);
+  }
+  return response.body;
+}
+
+/**
+ * Stream a completion. Yields { text } deltas as the provider sends them,
+ * { usage: { input_tokens, output_tokens, cached_input_tokens } } whenever the
+ * provider reports token counts (OpenAI reports them at the end, Gemini with
+ * every chunk, Claude input at the start and output at the end), and one
+ * { stop_reason } when the output ends ('max_tokens' if it was cut off).
+ */
+export async function* streamCompletion(provider, apiKey, systemPrompt, userPrompt, { maxTokens = 4000, temperature = 0.7, signal } = {}) {
+  const model = STREAM_MODELS[provider];
+
+  if (provider === 'openai') {
+    const body = await streamRequest('https://api.openai.com/v1/chat/completions', {
+      signal,
+      headers: { 'Authorization': `Bearer ${apiKey}`, 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        model,
+        messages: [
+          { role: 'system', content: systemPrompt },
+          { role: 'user', content: userPrompt }
+        ],
+        max_tokens: maxTokens,
+        temperature,
+        stream: true,
+        stream_options: { include_usage: true }
+      })
+    }, 'OpenAI');
+    for await (const data of sseData(body)) {
+      if (data === '[DONE]') break;
+      const event = JSON.parse(data);
+      const text = event.choices?.[0]?.delta?.content;
+      if (text) yield { text };
+      if (event.choices?.[0]?.finish_reason) yield { stop_reason: stopReason(event.choices[0].finish_reason) };
+      if (event.usage) {
+        const usage = openAIUsage(event.usage);
+        recordPromptUsage(provider, usage);
+        yield { usage };
+      }
+    }
+  } else if (provider === 'claude') {
+    const body = await streamRequest('https://api.anthropic.com/v1/messages', {
+      signal,
+      headers: { 'x-api-key': apiKey, 'Content-Type': 'application/json', 'anthropic-version': '2023-06-01' },
+      body: JSON.stringify({
+        model,
+        max_tokens: maxTokens,
+        temperature,
+        system: cachedSystem(systemPrompt),
+        messages: [{ role: 'user', content: userPrompt }],
+        stream: true
+      })
+    }, 'Claude');
+    for await (const data of sseData(body)) {
+      const event = JSON.parse(data);
+      if (event.type === 'content_block_delta' && event.delta?.text) {
+        yield { text: event.delta.text };
+      } else if (event.type === 'message_start') {
+        const usage = claudeUsage(event.message.usage);
+        recordPromptUsage(provider, usage);
+        delete usage.output_tokens;
+        yield { usage };
+      } else if (event.type === 'message_delta') {
+        if (event.delta?.stop_reason) yield { stop_reason: stopReason(event.delta.stop_reason) };
+        if (event.usage) yield { usage: { output_tokens: event.usage.output_tokens } };
+      } else if (event.type === 'error') {
+        throw new Error(event.error?.message || 'Claude API error');
+      }
+    }
+  } else if (provider === 'gemini') {
+    const body = await streamRequest(`https://generativelanguage.googleapis.com/v1beta/models/${model}:streamGenerateContent?alt=sse&key=${apiKey}`, {
+      signal,
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        contents: [{ parts: [{ text: `${systemPrompt}\n\nUser request: ${userPrompt}` }] }],
+        generationConfig: { temperature, maxOutputTokens: maxTokens }
+      })
+    }, 'Gemini');
+    let recorded = false;
+    for await (const data of sseData(body)) {
+      const event = JSON.parse(data);
+      const text = (event.candidates?.[0]?.content?.parts || []).map(part => part.text || '').join('');
+      if (text) yield { text };
+      if (event.candidates?.[0]?.finishReason) yield { stop_reason: stopReason(event.candidates[0].finishReason) };
+      if (event.usageMetadata) {
+        const usage = geminiUsage(event.usageMetadata);
+        if (!recorded && usage.input_tokens != null) {
+          recordPromptUsage(provider, usage);
+          recorded = true;
+        }
+        yield { usage };
+      }
+    }
+  } else {
+    throw new Error('Unsupported AI provider');
+  }
+}
+
 // Extract HTML content from AI response
 export function extractHTMLFromResponse(response) {
   // Remove code blocks if present
@@ -141,36 +367,3 @@ export function extractHTMLFromResponse(response) {
   
   return html.trim();
 }
-
-// Validate generated HTML
-export function validateHTML(html) {
-  try {
-    // Basic validation - check for balanced tags
-    const openTags = (html.match(/<[^\/][^>]*[^\/]>/g) || []).length;
-    const closeTags = (html.match(/<\/[^>]+>/g) || []).length;
-    const selfClosingTags = (html.match(/<[^>]+\/>/g) || []).length;
-    
-    // Allow for self-closing tags
-    if (openTags - selfClosingTags !== closeTags) {
-      console.warn('HTML may have unbalanced tags');
-    }
-    
-    // Check for dangerous content
-    const dangerousPatterns = [
-      /<script[^>]*>(?!.*tailwind).*<\/script>/gi,
-      /<iframe[^>]*src=["'][^"']*(?!data:)[^"']*["']/gi,
-      /javascript:/gi,
-      /on\w+\s*=/gi
-    ];
-    
-    for (const pattern of dangerousPatterns) {
-      if (pattern.test(html)) {
-        throw new Error('Generated HTML contains potentially unsafe content');
-      }
-    }
-    
-    return true;
-  } catch (error) {
-    throw new Error(`HTML validation failed: ${error.message}`);
-  }
-}
\ No newline at end of file
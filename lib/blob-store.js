@@ -0,0 +1,170 @@
+import { createHash } from 'crypto';
+import { promisify } from 'util';
+import zlib from 'zlib';
+
+// Content-addressed, compressed blob storage.
+//
+// Large generated payloads (website HTML, workflow JSON, agent images) live
+// in one `blobs` collection keyed by the sha256 of their content, text
+// brotli-compressed and binary content (Buffers) as is.
+// Records keep only the hash, so identical payloads are stored once and
+// record scans never touch the payload bytes.
+//
+// Blobs stored with a kind (the image agent's are 'image') can be looked up
+// by kind, so an endpoint serving one kind cannot be used to read others.
+//
+// Each blob counts the references to it. putBlobs adds one per stored
+// occurrence and releaseBlobs drops one; a blob is deleted when its count
+// reaches zero.
+//
+//   { _id: sha256, encoding: 'br' | 'identity', kind?, size, stored_size, refs, data, created_at }
+
+const BLOBS = 'blobs';
+
+const brotliCompress = promisify(zlib.brotliCompress);
+const brotliDecompress = promisify(zlib.brotliDecompress);
+
+// Quality 9 compresses HTML/JSON within a few percent of 11 at a fraction of the CPU
+const BROTLI_QUALITY = 9;
+
+export function contentHash(content) {
+  return createHash('sha256').update(content, 'utf8').digest('hex');
+}
+
+async function encode(content) {
+  // Binary content is images, which are compressed already
+  if (Buffer.isBuffer(content)) return { encoding: 'identity', data: content, size: content.length };
+  const raw = Buffer.from(content, 'utf8');
+  const compressed = await brotliCompress(raw, {
+    params: {
+      [zlib.constants.BROTLI_PARAM_MODE]: zlib.constants.BROTLI_MODE_TEXT,
+      [zlib.constants.BROTLI_PARAM_QUALITY]: BROTLI_QUALITY,
+      [zlib.constants.BROTLI_PARAM_SIZE_HINT]: raw.length
+    }
+  });
+  return compressed.length < raw.length
+    ? { encoding: 'br', data: compressed, size: raw.length }
+    : { encoding: 'identity', data: raw, size: raw.length };
+}
+
+async function decodeBytes(blob) {
+  // The driver hands binary fields back as BSON Binary (bytes in .buffer)
+  const bytes = blob.data instanceof Uint8Array ? blob.data : blob.data.buffer;
+  const data = Buffer.from(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  return blob.encoding === 'br' ? brotliDecompress(data) : data;
+}
+
+async function decode(blob) {
+  return (await decodeBytes(blob)).toString('utf8');
+}
+
+async function putOne(collection, content, kind) {
+  const hash = contentHash(content);
+  // Already stored: just take a reference, without compressing again
+  const existing = await collection.updateOne({ _id: hash }, { $inc: { refs: 1 } });
+  if (existing.matchedCount > 0) return hash;
+
+  const { encoding, data, size } = await encode(content);
+  try {
+    await collection.updateOne(
+      { _id: hash },
+      {
+        $setOnInsert: { encoding, data, size, stored_size: data.length, ...(kind && { kind }), created_at: new Date() },
+        $inc: { refs: 1 }
+      },
+      { upsert: true }
+    );
+  } catch (error) {
+    // Two writers upserted the same new blob; the loser's update now matches
+    if (error.code !== 11000) throw error;
+    await collection.updateOne({ _id: hash }, { $inc: { refs: 1 } });
+  }
+  return hash;
+}
+
+/**
+ * Store each string or Buffer (taking one reference per entry) and return their
+ * hashes in order. Empty and missing entries are not stored and map to null.
+ * `kind` is recorded on blobs this call creates.
+ */
+export async function putBlobs(db, contents, { kind } = {}) {
+  const collection = db.collection(BLOBS);
+  return Promise.all(contents.map(content => (content ? putOne(collection, content, kind) : null)));
+}
+
+export async function putBlob(db, content, options) {
+  const [hash] = await putBlobs(db, [content], options);
+  return hash;
+}
+
+/**
+ * Load blobs by hash. Returns a Map of hash -> content; hashes that are
+ * null or not stored are left out.
+ */
+export async function getBlobs(db, hashes) {
+  const wanted = [...new Set(hashes.filter(Boolean))];
+  const contents = new Map();
+  if (wanted.length === 0) return contents;
+  const blobs = await db.collection(BLOBS)
+    .find({ _id: { $in: wanted } }, { projection: { encoding: 1, data: 1 } })
+    .toArray();
+  await Promise.all(blobs.map(async blob => {
+    contents.set(blob._id, await decode(blob));
+  }));
+  return contents;
+}
+
+export async function getBlob(db, hash) {
+  return (await getBlobs(db, [hash])).get(hash) ?? null;
+}
+
+/** A blob's bytes, for binary content such as images; null if not stored (as `kind`, when given). */
+export async function getBlobBytes(db, hash, { kind } = {}) {
+  const blob = await db.collection(BLOBS).findOne({ _id: hash, ...(kind && { kind }) }, { projection: { encoding: 1, data: 1 } });
+  return blob ? decodeBytes(blob) : null;
+}
+
+/** Record `kind` on stored blobs that have none yet. */
+export async function setBlobKind(db, hashes, kind) {
+  await db.collection(BLOBS).updateMany({ _id: { $in: hashes }, kind: { $exists: false } }, { $set: { kind } });
+}
+
+/** Drop one reference per entry; blobs left unreferenced are deleted. */
+export async function releaseBlobs(db, hashes) {
+  const collection = db.collection(BLOBS);
+  const counts = new Map();
+  for (const hash of hashes) {
+    if (hash) counts.set(hash, (counts.get(hash) || 0) + 1);
+  }
+  await Promise.all([...counts].map(([hash, count]) => collection.updateOne({ _id: hash }, { $inc: { refs: -count } })));
+  if (counts.size > 0) {
+    await collection.deleteMany({ _id: { $in: [...counts.keys()] }, refs: { $lte: 0 } });
+  }
+}
+
+/**
+ * Space accounting for the store: `logical_bytes` is what the references
+ * would take stored inline and uncompressed, `stored_bytes` what the blobs
+ * take now.
+ */
+export async function blobStats(db) {
+  const [stats] = await db.collection(BLOBS).aggregate([
+    {
+      $group: {
+        _id: null,
+        blobs: { $sum: 1 },
+        references: { $sum: '$refs' },
+        raw_bytes: { $sum: '$size' },
+        stored_bytes: { $sum: '$stored_size' },
+        logical_bytes: { $sum: { $multiply: ['$size', '$refs'] } }
+      }
+    }
+  ]).toArray();
+  const { _id, ...totals } = stats || { blobs: 0, references: 0, raw_bytes: 0, stored_bytes: 0, logical_bytes: 0 };
+  return {
+    ...totals,
+    saved_bytes: totals.logical_bytes - totals.stored_bytes,
+    dedup_ratio: totals.raw_bytes ? Math.round((totals.logical_bytes / totals.raw_bytes) * 100) / 100 : 1,
+    compression_ratio: totals.stored_bytes ? Math.round((totals.raw_bytes / totals.stored_bytes) * 100) / 100 : 1
+  };
+}
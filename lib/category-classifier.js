@@ -0,0 +1,285 @@
+// Keyword category classifier for ai_tools.
+//
+// Keyword tables are compiled once into an Aho-Corasick automaton, so a tool
+// is classified in one pass over its text however many keywords there are.
+// Each keyword carries a weight for its category; matches only count on word
+// boundaries (so "ai" does not fire inside "email") and each keyword counts
+// once per field. The best-scoring category wins, with its share of the
+// total score as the confidence.
+
+const DEFAULT_CATEGORY = 'AI & Machine Learning';
+
+// category -> { keyword: weight }. Product Hunt topic names are listed with
+// high weights so a post's own topics outweigh words in its copy.
+export const TOOL_CATEGORY_KEYWORDS = {
+  'AI & Machine Learning': {
+    'artificial intelligence': 2, 'machine learning': 3, 'deep learning': 3, 'llm': 2,
+    'large language model': 3, 'neural network': 3, 'gpt': 1, 'ai': 0.5, 'ml': 1
+  },
+  'Design': {
+    'design tools': 4, 'design': 2, 'graphic': 2, 'ui': 2, 'ux': 2, 'figma': 3,
+    'logo': 2, 'branding': 2, 'mockup': 2, 'illustration': 2, 'icon': 1
+  },
+  'Marketing': {
+    'marketing': 3, 'seo': 3, 'ads': 2, 'advertising': 3, 'campaign': 2, 'copywriting': 2,
+    'landing page': 2, 'growth': 1, 'brand': 1
+  },
+  'Development': {
+    'developer tools': 4, 'developer': 2, 'code': 2, 'coding': 2, 'api': 2, 'programming': 3,
+    'github': 2, 'debug': 2, 'sql': 2, 'devops': 3, 'open source': 1
+  },
+  'Sales': {
+    'sales': 3, 'crm': 3, 'lead generation': 3, 'leads': 2, 'prospecting': 3, 'outreach': 2
+  },
+  'SaaS': {
+    'saas': 3
+  },
+  'Productivity': {
+    'productivity': 3, 'task': 2, 'workflow': 2, 'automation': 2, 'meeting': 2, 'notes': 2,
+    'calendar': 2, 'to-do': 2, 'project management': 3, 'summarize': 1
+  },
+  'Social Media': {
+    'social media': 4, 'social': 2, 'media': 1, 'twitter': 2, 'instagram': 2, 'tiktok': 2,
+    'linkedin': 2, 'influencer': 2
+  },
+  'No-Code': {
+    'no-code': 4, 'no code': 4, 'nocode': 4, 'low-code': 3, 'website builder': 3, 'app builder': 3
+  },
+  'Finance': {
+    'fintech': 4, 'finance': 3, 'accounting': 3, 'invoice': 2, 'budget': 2, 'investing': 3,
+    'stock': 2, 'trading': 2
+  },
+  'Health & Fitness': {
+    'health & fitness': 4, 'health': 2, 'fitness': 3, 'medical': 3, 'wellness': 2,
+    'workout': 3, 'nutrition': 3, 'mental health': 3
+  },
+  'Education': {
+    'education': 3, 'learning': 1, 'students': 2, 'teachers': 2, 'course': 2, 'homework': 3,
+    'tutor': 3, 'quiz': 2, 'study': 2
+  },
+  'Analytics': {
+    'analytics': 3, 'data analysis': 3, 'dashboard': 2, 'insights': 1, 'metrics': 2,
+    'business intelligence': 3, 'data science': 3
+  },
+  'Communication': {
+    'customer communication': 4, 'customer support': 3, 'chat': 1, 'chatbot': 2, 'messaging': 2,
+    'helpdesk': 3, 'live chat': 3
+  },
+  'Email': {
+    'email': 3, 'inbox': 2, 'newsletter': 2, 'cold email': 3
+  },
+  'Cryptocurrency': {
+    'crypto': 4, 'blockchain': 3, 'web3': 3, 'nft': 3, 'bitcoin': 3, 'ethereum': 3, 'defi': 3
+  },
+  'Gaming': {
+    'games': 3, 'gaming': 3, 'game': 2, 'esports': 3
+  },
+  'Travel': {
+    'travel': 3, 'trip': 2, 'itinerary': 3, 'hotel': 2, 'flights': 2
+  },
+  'Music': {
+    'music': 3, 'song': 2, 'beats': 2, 'lyrics': 2, 'spotify': 2
+  },
+  'Video': {
+    'video': 3, 'youtube': 2, 'video editing': 3, 'animation': 2, 'film': 2, 'clips': 2
+  },
+  'Image': {
+    'image': 2, 'photo': 2, 'image generation': 3, 'art generator': 3, 'avatar': 2,
+    'background removal': 3, 'upscale': 2, 'midjourney': 2
+  },
+  'Writing': {
+    'writing': 3, 'writer': 2, 'text': 1, 'blog': 2, 'essay': 3, 'paraphrase': 3,
+    'grammar': 3, 'content creation': 2
+  },
+  'Audio': {
+    'audio': 3, 'voice': 2, 'podcast': 3, 'speech': 2, 'text to speech': 3, 'transcription': 3
+  }
+};
+
+// Word separators for keywords and text alike: "no-code" == "no code"
+function normalize(text) {
+  return text.toLowerCase().replace(/[-_/]+/g, ' ');
+}
+
+function isWordChar(code) {
+  if (code >= 97 && code <= 122) return true;
+  if (code >= 48 && code <= 57) return true;
+  // Accented letters are cased; dashes, quotes and symbols are not
+  if (code > 127) {
+    const char = String.fromCharCode(code);
+    return char.toLowerCase() !== char.toUpperCase();
+  }
+  return false;
+}
+
+export class CategoryClassifier {
+  /**
+   * `table` maps category -> { keyword: weight }. Categories keep the table's
+   * order, which breaks ties.
+   */
+  constructor(table, { fallback = DEFAULT_CATEGORY } = {}) {
+    this.categories = Object.keys(table);
+    this.fallback = fallback;
+    this.keywords = [];
+
+    // Trie: per-node transitions, failure link and the keywords ending there
+    this.next = [new Map()];
+    this.fail = [0];
+    this.output = [[]];
+
+    this.categories.forEach((category, categoryIndex) => {
+      for (const [keyword, weight] of Object.entries(table[category])) {
+        const normalized = normalize(keyword).trim();
+        let node = 0;
+        for (const char of normalized) {
+          let child = this.next[node].get(char);
+          if (child === undefined) {
+            child = this.next.length;
+            this.next.push(new Map());
+            this.fail.push(0);
+            this.output.push([]);
+            this.next[node].set(char, child);
+          }
+          node = child;
+        }
+        this.output[node].push(this.keywords.length);
+        this.keywords.push({ keyword, length: normalized.length, category: categoryIndex, weight });
+      }
+    });
+
+    // Breadth-first failure links; each node also inherits its fail node's outputs
+    const queue = [...this.next[0].values()];
+    for (let head = 0; head < queue.length; head++) {
+      const node = queue[head];
+      for (const [char, child] of this.next[node]) {
+        let fallbackNode = this.fail[node];
+        while (fallbackNode && !this.next[fallbackNode].has(char)) {
+          fallbackNode = this.fail[fallbackNode];
+        }
+        const target = this.next[fallbackNode].get(char);
+        this.fail[child] = target !== undefined && target !== child ? target : 0;
+        this.output[child] = this.output[child].concat(this.output[this.fail[child]]);
+        queue.push(child);
+      }
+    }
+  }
+
+  // Add `multiplier * weight` for every keyword found in `text` into `scores`
+  scan(text, scores, multiplier = 1) {
+    if (!text) return scores;
+    const normalized = normalize(text);
+    const seen = new Set();
+    let node = 0;
+
+    for (let i = 0; i < normalized.length; i++) {
+      const char = normalized[i];
+      while (node && !this.next[node].has(char)) node = this.fail[node];
+      node = this.next[node].get(char) ?? 0;
+
+      for (const keywordIndex of this.output[node]) {
+        if (seen.has(keywordIndex)) continue;
+        const { length, category, weight } = this.keywords[keywordIndex];
+        const start = i - length + 1;
+        let end = i + 1;
+        // Allow a plural "s"
+        if (normalized.charCodeAt(end) === 115 && !isWordChar(normalized.charCodeAt(end + 1))) end++;
+        if (isWordChar(normalized.charCodeAt(start - 1)) || isWordChar(normalized.charCodeAt(end))) continue;
+        seen.add(keywordIndex);
+        scores[category] += weight * multiplier;
+      }
+    }
+    return scores;
+  }
+
+  /**
+   * Classify weighted text fields ([{ text, weight }], or a single string).
+   * Returns { category, confidence, score }; confidence is 0 when nothing
+   * matched and the fallback category is returned.
+   */
+  classify(fields) {
+    const scores = new Float64Array(this.categories.length);
+    for (const field of typeof fields === 'string' ? [{ text: fields }] : fields) {
+      this.scan(field.text, scores, field.weight ?? 1);
+    }
+
+    let best = -1;
+    let total = 0;
+    for (let i = 0; i < scores.length; i++) {
+      total += scores[i];
+      if (scores[i] > 0 && (best < 0 || scores[i] > scores[best])) best = i;
+    }
+    if (best < 0) {
+      return { category: this.fallback, confidence: 0, score: 0 };
+    }
+    return {
+      category: this.categories[best],
+      confidence: Math.round((scores[best] / total) * 1000) / 1000,
+      score: scores[best]
+    };
+  }
+}
+
+const toolClassifier = new CategoryClassifier(TOOL_CATEGORY_KEYWORDS);
+
+// Topic names may arrive as strings or Product Hunt { node: { name } } edges
+function topicNames(topics) {
+  return (topics || []).map(topic => (typeof topic === 'string' ? topic : topic?.node?.name)).filter(Boolean);
+}
+
+/**
+ * Category for an ai_tools document (or anything with name, tagline,
+ * description and topics). Topics count most, then name, tagline and
+ * description.
+ */
+export function classifyTool(tool, { fallback } = {}) {
+  const result = toolClassifier.classify([
+    { text: topicNames(tool.topics).join(' | '), weight: 3 },
+    { text: tool.name, weight: 2 },
+    { text: tool.tagline, weight: 1.5 },
+    { text: tool.description, weight: 1 }
+  ]);
+  if (result.confidence === 0 && fallback) result.category = fallback;
+  return result;
+}
+
+/**
+ * Re-run the classifier over every stored tool. Tools whose new confidence
+ * is below `minConfidence` keep their current category; every tool gets its
+ * category_confidence recorded.
+ */
+export async function reclassifyCatalog(db, { minConfidence = 0, batchSize = 1000, onProgress } = {}) {
+  const collection = db.collection('ai_tools');
+  const cursor = collection.find({}, {
+    projection: { _id: 1, name: 1, tagline: 1, description: 1, topics: 1, category: 1, category_confidence: 1 }
+  });
+
+  let scanned = 0;
+  let changed = 0;
+  let operations = [];
+  const flush = async () => {
+    if (operations.length === 0) return;
+    await collection.bulkWrite(operations, { ordered: false });
+    operations = [];
+  };
+
+  for await (const tool of cursor) {
+    scanned++;
+    const { category, confidence } = classifyTool(tool);
+    const update = {};
+    if (confidence >= minConfidence && confidence > 0 && category !== tool.category) {
+      update.category = category;
+      changed++;
+    }
+    if (confidence !== tool.category_confidence) update.category_confidence = confidence;
+
+    if (Object.keys(update).length > 0) {
+      operations.push({ updateOne: { filter: { _id: tool._id }, update: { $set: update } } });
+    }
+    if (operations.length >= batchSize) {
+      await flush();
+      if (onProgress) await onProgress({ scanned, changed });
+    }
+  }
+  await flush();
+  return { scanned, changed };
+}
@@ -0,0 +1,290 @@
+// Ingestion-time entity resolution for ai_tools.
+//
+// Every tool gets a canonical entity key (normalized name plus registrable
+// domain) and a MinHash signature of its description. Tools that resolve to
+// the same entity are merged into one document with a sources[] list, so the
+// read path never has to de-duplicate.
+
+const MINHASH_SIZE = 64;
+const LSH_BANDS = 16;
+const LSH_ROWS = MINHASH_SIZE / LSH_BANDS;
+const NEAR_DUPLICATE_JACCARD = 0.8;
+
+// Listing sites and shared hosts say nothing about which product a URL is
+const SHARED_HOSTS = new Set([
+  'producthunt.com', 'aitools.fyi', 'placeholder.com', 'google.com', 'apple.com',
+  'github.com', 'microsoft.com', 'notion.site', 'medium.com', 'linktr.ee', 'bit.ly'
+]);
+
+// Suffixes under which each subdomain is a separate site
+const MULTI_LABEL_SUFFIXES = new Set([
+  'co.uk', 'org.uk', 'ac.uk', 'com.au', 'net.au', 'co.nz', 'co.jp', 'co.in', 'co.kr',
+  'com.br', 'com.cn', 'com.mx', 'com.sg', 'com.tr', 'co.za',
+  'github.io', 'vercel.app', 'netlify.app', 'herokuapp.com', 'pages.dev', 'web.app',
+  'firebaseapp.com', 'streamlit.app', 'hf.space', 'replit.app', 'bubbleapps.io'
+]);
+
+// Trailing words that vary between listings of the same product
+const NAME_NOISE = new Set(['ai', 'app', 'io', 'hq', 'tool', 'tools', 'inc']);
+
+export function normalizeEntityName(name) {
+  let base = (name || '').toLowerCase();
+  // "ChatGPT - OpenAI", "Midjourney | AI art", "Jasper: AI copywriter"
+  base = base.split(/\s+[-–—|:]\s+|:\s/)[0];
+  const words = base.replace(/\.(ai|io|app|com)\b/g, ' $1').match(/[a-z0-9]+/g) || [];
+  while (words.length > 1 && NAME_NOISE.has(words[words.length - 1])) words.pop();
+  return words.join('');
+}
+
+export function registrableDomain(url) {
+  if (!url) return null;
+  let hostname;
+  try {
+    // extractWebsiteFromUrl stores bare hostnames
+    hostname = new URL(/^[a-z][a-z0-9+.-]*:\/\//i.test(url) ? url : `https://${url}`).hostname.toLowerCase();
+  } catch (error) {
+    return null;
+  }
+  if (!hostname.includes('.') || /^[\d.]+$/.test(hostname)) return null;
+
+  const labels = hostname.replace(/^www\./, '').split('.');
+  const lastTwo = labels.slice(-2).join('.');
+  const domain = MULTI_LABEL_SUFFIXES.has(lastTwo) && labels.length > 2
+    ? labels.slice(-3).join('.')
+    : lastTwo;
+  return SHARED_HOSTS.has(domain) ? null : domain;
+}
+
+// null for a name with nothing left after normalization: such a tool has
+// no identity to merge on
+export function entityKey(nameKey, domain) {
+  if (!nameKey) return null;
+  return domain ? `${nameKey}@${domain}` : nameKey;
+}
+
+// 32-bit FNV-1a
+function hashString(text) {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < text.length; i++) {
+    hash ^= text.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return hash >>> 0;
+}
+
+// Cheap independent hash family: remix the shingle hash with a per-row seed
+function mix(hash, seed) {
+  let h = (hash ^ seed) >>> 0;
+  h = Math.imul(h ^ (h >>> 16), 0x85ebca6b);
+  h = Math.imul(h ^ (h >>> 13), 0xc2b2ae35);
+  return (h ^ (h >>> 16)) >>> 0;
+}
+
+const SEEDS = Array.from({ length: MINHASH_SIZE }, (_, i) => mix(i + 1, 0x9e3779b9));
+
+export function shingles(text, size = 3) {
+  const words = (text || '').toLowerCase().match(/[a-z0-9]+/g) || [];
+  if (words.length === 0) return [];
+  if (words.length < size) return [words.join(' ')];
+  const result = new Set();
+  for (let i = 0; i <= words.length - size; i++) {
+    result.add(words.slice(i, i + size).join(' '));
+  }
+  return [...result];
+}
+
+export function minhashSignature(text) {
+  const hashes = shingles(text).map(hashString);
+  if (hashes.length === 0) return null;
+  return SEEDS.map(seed => {
+    let min = 0xffffffff;
+    for (const hash of hashes) {
+      const value = mix(hash, seed);
+      if (value < min) min = value;
+    }
+    return min;
+  });
+}
+
+export function lshBands(signature) {
+  if (!signature) return [];
+  const bands = [];
+  for (let band = 0; band < LSH_BANDS; band++) {
+    const rows = signature.slice(band * LSH_ROWS, (band + 1) * LSH_ROWS);
+    bands.push(`${band}:${hashString(rows.join('.')).toString(36)}`);
+  }
+  return bands;
+}
+
+export function estimatedJaccard(a, b) {
+  if (!a || !b) return 0;
+  let equal = 0;
+  for (let i = 0; i < MINHASH_SIZE; i++) {
+    if (a[i] === b[i]) equal++;
+  }
+  return equal / MINHASH_SIZE;
+}
+
+// Description similarity alone is not enough: scraped fallback descriptions
+// are templated, so near-duplicates must also have related names
+function namesRelated(a, b) {
+  if (!a || !b) return false;
+  return a.length >= 4 && b.length >= 4 && (a.includes(b) || b.includes(a));
+}
+
+function sourceEntry(tool) {
+  return {
+    source: tool.source,
+    name: tool.name,
+    url: tool.url || tool.website || null,
+    ...(tool.ph_id ? { ph_id: tool.ph_id } : {}),
+    seen_at: new Date()
+  };
+}
+
+// Attach the entity fields to a tool about to be written
+export function prepareTool(tool) {
+  const nameKey = normalizeEntityName(tool.name);
+  const domain = registrableDomain(tool.website) || registrableDomain(tool.url);
+  const minhash = minhashSignature(`${tool.tagline || ''} ${tool.description || ''}`);
+  return {
+    ...tool,
+    name_key: nameKey,
+    domain,
+    entity_key: entityKey(nameKey, domain),
+    minhash,
+    minhash_bands: lshBands(minhash),
+    sources: tool.sources?.length ? tool.sources : [sourceEntry(tool)]
+  };
+}
+
+export function candidateQuery(prepared) {
+  const clauses = [
+    { name_key: { $in: [...new Set(prepared.map(tool => tool.name_key))] } },
+    { minhash_bands: { $in: [...new Set(prepared.flatMap(tool => tool.minhash_bands))] } }
+  ];
+  const phIds = prepared.map(tool => tool.ph_id).filter(Boolean);
+  if (phIds.length) clauses.push({ ph_id: { $in: phIds } });
+  const domains = [...new Set(prepared.map(tool => tool.domain).filter(Boolean))];
+  if (domains.length) clauses.push({ domain: { $in: domains } });
+  return { $or: clauses };
+}
+
+// In-memory lookup over known entities (existing candidates plus new ones)
+export class EntityIndex {
+  constructor() {
+    this.byPhId = new Map();
+    this.byNameKey = new Map();
+    this.byDomain = new Map();
+    this.byBand = new Map();
+  }
+
+  add(entity) {
+    const push = (map, key) => {
+      if (!key) return;
+      if (!map.has(key)) map.set(key, []);
+      map.get(key).push(entity);
+    };
+    if (entity.ph_id) this.byPhId.set(entity.ph_id, entity);
+    for (const entry of entity.sources || []) {
+      if (entry.ph_id) this.byPhId.set(entry.ph_id, entity);
+    }
+    push(this.byNameKey, entity.name_key);
+    push(this.byDomain, entity.domain);
+    for (const band of entity.minhash_bands || []) push(this.byBand, band);
+  }
+
+  match(tool) {
+    if (tool.ph_id && this.byPhId.has(tool.ph_id)) {
+      return this.byPhId.get(tool.ph_id);
+    }
+
+    const compatibleDomain = entity => !entity.domain || !tool.domain || entity.domain === tool.domain;
+    const sameName = (this.byNameKey.get(tool.name_key) || []).find(compatibleDomain);
+    if (sameName) return sameName;
+
+    if (tool.domain) {
+      const sameSite = (this.byDomain.get(tool.domain) || [])
+        .find(entity => namesRelated(entity.name_key, tool.name_key));
+      if (sameSite) return sameSite;
+    }
+
+    const seen = new Set();
+    for (const band of tool.minhash_bands || []) {
+      for (const entity of this.byBand.get(band) || []) {
+        if (seen.has(entity)) continue;
+        seen.add(entity);
+        if (compatibleDomain(entity) &&
+            namesRelated(entity.name_key, tool.name_key) &&
+            estimatedJaccard(entity.minhash, tool.minhash) >= NEAR_DUPLICATE_JACCARD) {
+          return entity;
+        }
+      }
+    }
+    return null;
+  }
+}
+
+// Fold a listing (or a whole duplicate entity) into one not yet written back
+export function mergeIntoPending(entity, tool) {
+  for (const entry of tool.sources) {
+    const index = entity.sources.findIndex(existing => existing.source === entry.source);
+    if (index >= 0) entity.sources[index] = entry;
+    else entity.sources.push(entry);
+  }
+  entity.votes = Math.max(entity.votes || 0, tool.votes || 0);
+  if (!entity.domain && tool.domain) {
+    entity.domain = tool.domain;
+    entity.website = tool.website;
+    entity.entity_key = entityKey(entity.name_key, entity.domain);
+  }
+}
+
+/**
+ * Update operations that fold `tool` into an entity already stored.
+ *
+ * The two sources[] operations commute, so they are safe in an unordered
+ * bulkWrite: one appends the entry if this source is missing, the other
+ * replaces it if present.
+ */
+export function mergeOperations(entity, tool) {
+  const entry = tool.sources[0];
+  const { _id, id, created_at, sources, name_key, entity_key, minhash, minhash_bands, domain, ...fields } = tool;
+  const refresh = entity.source === tool.source
+    // The listing that created the entity refreshes its fields, as before
+    ? { ...fields, updated_at: new Date() }
+    : { updated_at: new Date() };
+
+  const update = { $set: refresh, $max: { votes: tool.votes || 0 } };
+  delete refresh.votes;
+
+  const operations = [];
+  if (!entity.domain && domain) {
+    // Its own operation: the new key may belong to another entity already,
+    // and then only this write fails
+    operations.push({
+      updateOne: {
+        filter: { _id: entity._id, domain: entity.domain ?? null },
+        update: { $set: { domain, website: tool.website, entity_key: entityKey(entity.name_key, domain) } }
+      }
+    });
+  }
+
+  return [
+    ...operations,
+    { updateOne: { filter: { _id: entity._id }, update } },
+    {
+      updateOne: {
+        filter: { _id: entity._id, 'sources.source': { $ne: entry.source } },
+        update: { $push: { sources: entry } }
+      }
+    },
+    {
+      updateOne: {
+        filter: { _id: entity._id },
+        update: { $set: { 'sources.$[s]': entry } },
+        arrayFilters: [{ 's.source': entry.source }]
+      }
+    }
+  ];
+}
@@ -0,0 +1,202 @@
+import { putBlobs, getBlobs, releaseBlobs, blobStats } from './blob-store.js';
+import { splitSections, assembleSite } from './site-sections.js';
+
+// Storage for generated websites and workflows, on top of the blob store.
+//
+// Records keep metadata and blob hashes only:
+//   generated_websites   { id, prompt, provider, code_length, storage: 'blobs',
+//                          shell: { before, after }, sections: [{ id, kind, summary, hash, length }] }
+//   generated_workflows  { id, name, platform, provider, node_count, storage: 'blobs',
+//                          workflow_blob, preview_blob, workflow_size }
+// Records written before this (no `storage` field) hold generated_code,
+// workflow_json and visual_preview inline. They are still read as they are,
+// and migrateGeneratedCollection moves them into the blob store.
+
+const WEBSITES = 'generated_websites';
+const WORKFLOWS = 'generated_workflows';
+
+// What list endpoints read: never a payload, inline or not
+export const WEBSITE_LIST_PROJECTION = {
+  _id: 0, id: 1, prompt: 1, provider: 1, code_length: 1, 'sections.id': 1, 'sections.kind': 1, created_at: 1, updated_at: 1
+};
+export const WORKFLOW_LIST_PROJECTION = {
+  _id: 0, id: 1, name: 1, description: 1, platform: 1, provider: 1, automation_description: 1,
+  template_id: 1, source: 1, node_count: 1, workflow_size: 1, created_at: 1, updated_at: 1
+};
+
+const LEGACY = { storage: { $exists: false } };
+
+function siteHashes(stored) {
+  return [stored.shell?.before, stored.shell?.after, ...(stored.sections || []).map(section => section.hash)];
+}
+
+// Move a split site's html into blobs; returns the record fields
+async function storeSite(db, site) {
+  const [before, after, ...hashes] = await putBlobs(db, [
+    site.shell.before,
+    site.shell.after,
+    ...site.sections.map(section => section.html)
+  ]);
+  return {
+    shell: { before, after },
+    sections: site.sections.map(({ html, ...section }, index) => ({ ...section, hash: hashes[index], length: html.length }))
+  };
+}
+
+/**
+ * Insert a website record for `code`. Returns { site, code }, the page as
+ * stored (split and sanitized).
+ */
+export async function saveWebsite(db, record, code) {
+  const site = splitSections(code);
+  const assembled = assembleSite(site);
+  const stored = await storeSite(db, site);
+  await db.collection(WEBSITES).insertOne({ ...record, ...stored, code_length: assembled.length, storage: 'blobs' });
+  return { site, code: assembled };
+}
+
+/** The page of a website record: { site, code }, with every section's html loaded. */
+export async function loadWebsite(db, record) {
+  if (!record.storage) {
+    const site = splitSections(record.generated_code || '');
+    return { site, code: record.generated_code || '' };
+  }
+  const blobs = await getBlobs(db, siteHashes(record));
+  const text = hash => (hash ? blobs.get(hash) ?? '' : '');
+  const site = {
+    shell: { before: text(record.shell.before), after: text(record.shell.after) },
+    sections: record.sections.map(({ length, ...section }) => ({ ...section, html: text(section.hash) }))
+  };
+  return { site, code: assembleSite(site) };
+}
+
+/**
+ * Swap one section of a blob-stored website. The update only applies if the
+ * record has not changed since it was read; returns false otherwise.
+ */
+export async function replaceWebsiteSection(db, record, section) {
+  const previous = record.sections.find(existing => existing.id === section.id);
+  const [hash] = await putBlobs(db, [section.html]);
+  const { html, ...meta } = section;
+  const sections = record.sections.map(existing => (
+    existing === previous ? { ...meta, hash, length: html.length } : existing
+  ));
+  const result = await db.collection(WEBSITES).updateOne(
+    { id: record.id, updated_at: record.updated_at },
+    {
+      $set: {
+        sections,
+        code_length: record.code_length - previous.length + html.length,
+        updated_at: new Date()
+      }
+    }
+  );
+  await releaseBlobs(db, [result.modifiedCount > 0 ? previous.hash : hash]);
+  return result.modifiedCount > 0;
+}
+
+export async function saveWorkflow(db, record, { workflow, preview }) {
+  const json = JSON.stringify(workflow);
+  const [workflowBlob, previewBlob] = await putBlobs(db, [json, preview]);
+  await db.collection(WORKFLOWS).insertOne({
+    ...record,
+    workflow_blob: workflowBlob,
+    preview_blob: previewBlob,
+    workflow_size: json.length,
+    storage: 'blobs'
+  });
+}
+
+/** { workflow, preview } of a workflow record. */
+export async function loadWorkflow(db, record) {
+  if (!record.storage) {
+    return { workflow: record.workflow_json, preview: record.visual_preview || '' };
+  }
+  const blobs = await getBlobs(db, [record.workflow_blob, record.preview_blob]);
+  return {
+    workflow: JSON.parse(blobs.get(record.workflow_blob) || 'null'),
+    preview: blobs.get(record.preview_blob) || ''
+  };
+}
+
+// Bytes a legacy record holds inline
+function inlineBytes(record) {
+  const strings = [
+    record.generated_code,
+    record.shell?.before,
+    record.shell?.after,
+    ...(record.sections || []).map(section => section.html),
+    record.workflow_json && JSON.stringify(record.workflow_json),
+    record.visual_preview
+  ];
+  return strings.reduce((total, text) => total + (typeof text === 'string' ? Buffer.byteLength(text) : 0), 0);
+}
+
+async function migrateRecord(db, name, record) {
+  let fields;
+  let hashes;
+  if (name === WEBSITES) {
+    const site = splitSections(record.generated_code || '');
+    const stored = await storeSite(db, site);
+    fields = { ...stored, code_length: assembleSite(site).length };
+    hashes = siteHashes(stored);
+  } else {
+    const json = JSON.stringify(record.workflow_json ?? null);
+    const [workflowBlob, previewBlob] = await putBlobs(db, [json, record.visual_preview]);
+    fields = { workflow_blob: workflowBlob, preview_blob: previewBlob, workflow_size: json.length };
+    hashes = [workflowBlob, previewBlob];
+  }
+
+  const result = await db.collection(name).updateOne(
+    { _id: record._id, ...LEGACY },
+    {
+      $set: { ...fields, storage: 'blobs' },
+      $unset: { generated_code: '', workflow_json: '', visual_preview: '' }
+    }
+  );
+  if (result.modifiedCount === 0) {
+    // Someone else migrated it first
+    await releaseBlobs(db, hashes);
+    return false;
+  }
+  return true;
+}
+
+/** Move one legacy website record into the blob store; returns the record as stored now. */
+export async function migrateWebsite(db, record) {
+  if (record.storage) return record;
+  await migrateRecord(db, WEBSITES, record);
+  return db.collection(WEBSITES).findOne({ _id: record._id });
+}
+
+/**
+ * Move every legacy record of `name` (generated_websites or
+ * generated_workflows) into the blob store. Returns { found, migrated, inline_bytes }.
+ */
+export async function migrateGeneratedCollection(db, name) {
+  const cursor = db.collection(name).find(LEGACY);
+  let found = 0;
+  let migrated = 0;
+  let bytes = 0;
+  for await (const record of cursor) {
+    found++;
+    if (await migrateRecord(db, name, record)) {
+      migrated++;
+      bytes += inlineBytes(record);
+    }
+  }
+  return { found, migrated, inline_bytes: bytes };
+}
+
+/** Record counts per storage mode and the blob store's space accounting. */
+export async function storageReport(db) {
+  const counts = async name => {
+    const [records, legacy] = await Promise.all([
+      db.collection(name).estimatedDocumentCount(),
+      db.collection(name).countDocuments(LEGACY)
+    ]);
+    return { records, legacy };
+  };
+  const [websites, workflows, blobs] = await Promise.all([counts(WEBSITES), counts(WORKFLOWS), blobStats(db)]);
+  return { websites, workflows, blobs };
+}
@@ -0,0 +1,293 @@
+import { HtmlTokenizer } from './scrapers/html-tokenizer.js';
+
+// Single-pass validator and sanitizer for generated HTML.
+//
+// The page is run through the incremental tokenizer once and rewritten from
+// its tokens, so there are no regexes that backtrack over the whole document:
+// every character is examined a bounded number of times and the cost is
+// O(n) in the input. Chunks can be written as they arrive (e.g. from a
+// streaming model response) and the sanitized output comes back per chunk.
+//
+// What it does:
+//   - drops on* event handler attributes and javascript:/vbscript: values
+//     (data: is allowed only for images on src);
+//   - drops inline scripts unless allowed, external scripts from hosts not
+//     on the allowlist, non-https frames, and elements that load plugins or
+//     rewrite the page's base URL;
+//   - with checkScript, holds each kept <script> back until its end tag and
+//     drops it if the check refuses its body, so a streamed page never
+//     reaches the browser with a script that was not checked;
+//   - balance-checks tags. Stray end tags are dropped, and elements left
+//     open (at the end, or inside an element being closed) are closed, so
+//     the output is always well-formed.
+//
+// Balance checking keeps a count of open elements per tag name. An end tag
+// with no open element is rejected in O(1), and a matching end tag pops the
+// stack down to it. Every element is pushed and popped at most once.
+
+const VOID_ELEMENTS = new Set([
+  'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+  'param', 'source', 'track', 'wbr'
+]);
+
+// Removed along with everything inside them
+const UNSAFE_ELEMENTS = new Set(['object', 'applet', 'embed', 'frame', 'frameset', 'base']);
+
+// Attributes holding a URL (checked for data:, on top of the checks on every value)
+const URL_ATTRIBUTES = new Set([
+  'href', 'src', 'action', 'formaction', 'xlink:href', 'poster', 'background',
+  'cite', 'data', 'codebase', 'srcset', 'ping'
+]);
+
+export const DEFAULT_SCRIPT_HOSTS = [
+  'cdn.tailwindcss.com',
+  'cdn.jsdelivr.net',
+  'unpkg.com',
+  'cdnjs.cloudflare.com'
+];
+
+// Inside these, <style> and <script> bodies are parsed as markup by browsers
+const FOREIGN_ELEMENTS = new Set(['svg', 'math']);
+
+const MAX_ISSUES = 20;
+
+// Browsers ignore whitespace and control characters inside a URL scheme
+function urlScheme(value) {
+  const compact = value.replace(/[\u0000- \u007f-\u009f]+/g, '').toLowerCase();
+  const colon = compact.indexOf(':');
+  return colon > 0 && /^[a-z][a-z0-9+.-]*$/.test(compact.slice(0, colon)) ? compact.slice(0, colon + 1) : '';
+}
+
+function isDataImage(value) {
+  return /^\s*data:image\//i.test(value);
+}
+
+function hostOf(url) {
+  try {
+    return new URL(url, 'https://invalid.local').host;
+  } catch {
+    return '';
+  }
+}
+
+function escapeCharacter(char) {
+  return char === '&' ? '&amp;' : char === '<' ? '&lt;' : '&gt;';
+}
+
+// Entity references the tokenizer did not decode are kept as they were (they
+// cannot form markup); every other '&' is escaped. Names are capped at the
+// length the tokenizer holds back at a chunk boundary, so chunked and whole
+// input come out the same.
+function escapeText(text) {
+  return text.replace(/[<>]|&(?!(?:#\d{1,7}|#x[0-9a-f]{1,6}|[a-z][a-z0-9]{0,9});)/gi, escapeCharacter);
+}
+
+// Attribute values are always fully escaped, so an entity the tokenizer did
+// not decode cannot turn into "javascript:" once it reaches the browser
+function escapeAttribute(value) {
+  return value.replace(/[&"]/g, char => (char === '&' ? '&amp;' : '&quot;'));
+}
+
+export class HtmlSanitizer {
+  /**
+   * Options:
+   *   allowInlineScripts  keep <script> elements without src (default false)
+   *   scriptHosts         hosts external scripts may load from
+   *   checkScript         called with each kept script's body once it is
+   *                       closed; returns a refusal to drop it, or null
+   */
+  constructor({ allowInlineScripts = false, scriptHosts = DEFAULT_SCRIPT_HOSTS, checkScript = null } = {}) {
+    this.allowInlineScripts = allowInlineScripts;
+    this.scriptHosts = new Set(scriptHosts);
+    this.checkScript = checkScript;
+    // Offset in output where a held script starts (-1 when none) and its body
+    this.scriptStart = -1;
+    this.scriptBody = '';
+    // First refusal from checkScript
+    this.refusal = null;
+    this.tokenizer = new HtmlTokenizer(this);
+    this.output = '';
+    this.stack = [];
+    this.openCounts = new Map();
+    // Depth inside a dropped element; nothing is written while > 0
+    this.dropping = 0;
+    this.foreign = 0;
+    this.report = {
+      removed: { handlers: 0, urls: 0, elements: 0 },
+      issues: [],
+      unclosed: 0,
+      stray: 0
+    };
+  }
+
+  /** Sanitize the next chunk; returns the output it completes. */
+  write(chunk) {
+    this.tokenizer.write(chunk);
+    return this.flush();
+  }
+
+  /** Finish the document (closing anything left open); returns the rest of the output. */
+  end() {
+    this.tokenizer.end();
+    while (this.stack.length > 0) {
+      this.report.unclosed++;
+      this.popElement();
+    }
+    return this.flush();
+  }
+
+  flush() {
+    if (this.scriptStart >= 0) {
+      // Everything before an unchecked script can go out
+      const output = this.output.slice(0, this.scriptStart);
+      this.output = this.output.slice(this.scriptStart);
+      this.scriptStart = 0;
+      return output;
+    }
+    const output = this.output;
+    this.output = '';
+    return output;
+  }
+
+  get safe() {
+    const { handlers, urls, elements } = this.report.removed;
+    return handlers + urls + elements === 0;
+  }
+
+  get balanced() {
+    return this.report.unclosed === 0 && this.report.stray === 0;
+  }
+
+  issue(kind, tag, detail) {
+    const { removed, issues } = this.report;
+    removed[kind]++;
+    if (issues.length < MAX_ISSUES) issues.push({ kind, tag, ...(detail && { detail }) });
+  }
+
+  // Attributes that survive, as source text
+  attributes(tag, attrs) {
+    let source = '';
+    for (const [name, value] of Object.entries(attrs)) {
+      if (name.startsWith('on')) {
+        this.issue('handlers', tag, name);
+        continue;
+      }
+      const scheme = urlScheme(value);
+      if (scheme === 'javascript:' || scheme === 'vbscript:' || name === 'srcdoc' ||
+          (scheme === 'data:' && URL_ATTRIBUTES.has(name) && !(name === 'src' && isDataImage(value)))) {
+        this.issue('urls', tag, name);
+        continue;
+      }
+      if (name === 'style' && /expression\s*\(|javascript:|behavior\s*:/i.test(value)) {
+        this.issue('urls', tag, name);
+        continue;
+      }
+      source += value === '' ? ` ${name}` : ` ${name}="${escapeAttribute(value)}"`;
+    }
+    return source;
+  }
+
+  // Why an element has to go, or null
+  unsafeElement(tag, attrs) {
+    if (UNSAFE_ELEMENTS.has(tag)) return tag;
+    if (tag === 'script') {
+      if (attrs.src === undefined) return this.allowInlineScripts ? null : 'inline script';
+      return this.scriptHosts.has(hostOf(attrs.src)) ? null : `script from ${hostOf(attrs.src) || attrs.src}`;
+    }
+    if (tag === 'iframe' && attrs.src !== undefined && urlScheme(attrs.src) !== 'https:') {
+      return 'non-https frame';
+    }
+    if (tag === 'meta' && (attrs['http-equiv'] || '').toLowerCase() === 'refresh') {
+      return 'meta refresh';
+    }
+    return null;
+  }
+
+  onOpenTag(tag, attrs, selfClosing) {
+    const isVoid = VOID_ELEMENTS.has(tag);
+    const reason = this.dropping === 0 ? this.unsafeElement(tag, attrs) : null;
+    if (reason) this.issue('elements', tag, reason);
+    const drop = this.dropping > 0 || reason !== null;
+
+    if (!drop) {
+      if (tag === 'script' && this.checkScript && !selfClosing) {
+        this.scriptStart = this.output.length;
+        this.scriptBody = '';
+      }
+      // HTML ignores "/>" on other elements; close them explicitly instead
+      const close = isVoid ? ' />' : selfClosing ? `></${tag}>` : '>';
+      this.output += `<${tag}${this.attributes(tag, attrs)}${close}`;
+    }
+    if (!isVoid && !selfClosing) {
+      this.stack.push({ tag, drop });
+      this.openCounts.set(tag, (this.openCounts.get(tag) || 0) + 1);
+      if (drop) this.dropping++;
+      if (FOREIGN_ELEMENTS.has(tag)) this.foreign++;
+    }
+  }
+
+  onCloseTag(tag) {
+    if (!this.openCounts.get(tag)) {
+      // Void elements' end tags (</br>) are just as meaningless
+      this.report.stray++;
+      return;
+    }
+    // Elements left open inside this one close with it, as in a browser
+    while (this.popElement() !== tag) this.report.unclosed++;
+  }
+
+  popElement() {
+    const { tag, drop } = this.stack.pop();
+    this.openCounts.set(tag, this.openCounts.get(tag) - 1);
+    if (FOREIGN_ELEMENTS.has(tag)) this.foreign--;
+    if (drop) {
+      this.dropping--;
+    } else if (tag === 'script' && this.scriptStart >= 0) {
+      this.closeScript();
+    } else {
+      this.output += `</${tag}>`;
+    }
+    return tag;
+  }
+
+  closeScript() {
+    const refusal = this.checkScript(this.scriptBody);
+    if (refusal) {
+      this.issue('elements', 'script', 'refused by check');
+      this.refusal ??= refusal;
+      this.output = this.output.slice(0, this.scriptStart);
+    } else {
+      this.output += '</script>';
+    }
+    this.scriptStart = -1;
+    this.scriptBody = '';
+  }
+
+  onText(text) {
+    if (this.dropping === 0) this.output += escapeText(text);
+  }
+
+  onRawText(tag, text) {
+    if (this.dropping > 0) return;
+    if (this.scriptStart >= 0) this.scriptBody += text;
+    // Script and style bodies are not markup and end at their end tag, except
+    // inside <svg>/<math>, where a browser would parse them as markup
+    this.output += this.foreign > 0 ? text.replace(/[&<>]/g, escapeCharacter) : text;
+  }
+}
+
+/**
+ * Sanitize a whole document. Returns { html, safe, balanced, report }: safe
+ * is false when anything had to be removed, balanced when no tags were left
+ * open or closed without being opened.
+ */
+export function sanitizeHTML(html, options) {
+  const sanitizer = new HtmlSanitizer(options);
+  const output = sanitizer.write(html) + sanitizer.end();
+  return {
+    html: output,
+    safe: sanitizer.safe,
+    balanced: sanitizer.balanced,
+    report: sanitizer.report
+  };
+}
@@ -0,0 +1,279 @@
+import { writeTools } from './tool-sink.js';
+
+// Incremental Product Hunt ingestion.
+//
+// Posts are walked newest-first with GraphQL cursors. Per topic, sync_state
+// keeps a high-water mark (newest createdAt ingested) so a regular sync stops
+// paging as soon as it reaches posts it has already seen, plus a backfill
+// cursor so history can be walked in resumable chunks.
+const PH_GRAPHQL_URL = 'https://api.producthunt.com/v2/api/graphql';
+const STATE = 'sync_state';
+
+export const DEFAULT_PH_TOPICS = ['artificial-intelligence'];
+export const BACKFILL_TOPICS = [
+  'artificial-intelligence',
+  'productivity',
+  'developer-tools',
+  'design-tools',
+  'marketing',
+  'writing',
+  'no-code'
+];
+
+const POSTS_QUERY = `
+  query TopicPosts($first: Int, $after: String, $topic: String) {
+    posts(first: $first, after: $after, topic: $topic, order: NEWEST) {
+      edges {
+        node {
+          id
+          name
+          tagline
+          description
+          votesCount
+          featuredAt
+          createdAt
+          url
+          website
+          topics {
+            edges {
+              node {
+                name
+              }
+            }
+          }
+        }
+      }
+      pageInfo {
+        endCursor
+        hasNextPage
+      }
+    }
+  }
+`;
+
+// Shared across concurrent walkers so they all back off together
+export class ProductHuntRateLimiter {
+  constructor({ reserve = 50 } = {}) {
+    this.reserve = reserve;
+    this.remaining = null;
+    this.resetAt = 0;
+  }
+
+  update(headers) {
+    const remaining = parseInt(headers.get('x-rate-limit-remaining'));
+    const reset = parseInt(headers.get('x-rate-limit-reset'));
+    if (!Number.isNaN(remaining)) this.remaining = remaining;
+    // Product Hunt reports the seconds left in the current window
+    if (!Number.isNaN(reset)) this.resetAt = Date.now() + reset * 1000;
+  }
+
+  async wait() {
+    if (this.remaining !== null && this.remaining <= this.reserve && this.resetAt > Date.now()) {
+      const delay = this.resetAt - Date.now();
+      console.log(`Product Hunt rate limit nearly spent (${this.remaining} left), waiting ${Math.ceil(delay / 1000)}s`);
+      await new Promise(resolve => setTimeout(resolve, delay));
+      this.remaining = null;
+    }
+  }
+}
+
+async function fetchPostsPage(topic, after, { first, limiter, retries = 3 }) {
+  for (let attempt = 0; ; attempt++) {
+    await limiter.wait();
+    const response = await fetch(PH_GRAPHQL_URL, {
+      method: 'POST',
+      headers: {
+        'Authorization': `Bearer ${process.env.PRODUCT_HUNT_API_KEY}`,
+        'Content-Type': 'application/json',
+        'User-Agent': 'HappyTools/1.0'
+      },
+      body: JSON.stringify({ query: POSTS_QUERY, variables: { first, after, topic } })
+    });
+    limiter.update(response.headers);
+
+    if (response.status === 429 && attempt < retries) {
+      limiter.remaining = 0;
+      if (limiter.resetAt <= Date.now()) {
+        limiter.resetAt = Date.now() + 2 ** attempt * 5000;
+      }
+      continue;
+    }
+    if (!response.ok) {
+      throw new Error(`Product Hunt responded ${response.status}`);
+    }
+
+    const data = await response.json();
+    if (data.errors?.length) {
+      throw new Error(`Product Hunt GraphQL error: ${data.errors[0].message}`);
+    }
+    return {
+      posts: data.data.posts.edges.map(edge => edge.node),
+      pageInfo: data.data.posts.pageInfo
+    };
+  }
+}
+
+async function getState(db, topic) {
+  return (await db.collection(STATE).findOne({ _id: `producthunt:${topic}` })) || { _id: `producthunt:${topic}` };
+}
+
+async function saveState(db, topic, fields) {
+  await db.collection(STATE).updateOne(
+    { _id: `producthunt:${topic}` },
+    { $set: { ...fields, source: 'producthunt', topic, updated_at: new Date() } },
+    { upsert: true }
+  );
+}
+
+/**
+ * Fetch posts newer than the topic's high-water mark.
+ *
+ * `transform(post)` maps a post to an ai_tools document and `filter(post)`
+ * decides whether to keep it. The first run (no mark yet) stops after
+ * `initialPages` pages; older history is left to backfill.
+ *
+ * The mark only moves once a run has walked all the way down to it. A run
+ * that runs out of pages first saves where it stopped (catchup_cursor) and
+ * the newest post it saw (catchup_newest); the next run reads the posts
+ * newer than catchup_newest, then carries on from the cursor to the mark.
+ */
+export async function syncProductHuntTopic(db, topic, { transform, filter = () => true, first = 20, initialPages = 3, maxPages = 50, limiter = new ProductHuntRateLimiter() }) {
+  const state = await getState(db, topic);
+  const highWaterMark = state.high_water_mark ? new Date(state.high_water_mark) : null;
+  const catchupNewest = state.catchup_newest ? new Date(state.catchup_newest) : null;
+  let resumeCursor = highWaterMark && catchupNewest ? state.catchup_cursor : null;
+  // Posts at or before `mark` have been ingested; the first walk stops at the
+  // newest post of an unfinished catch-up, the one after it at the mark itself
+  let mark = resumeCursor ? catchupNewest : highWaterMark;
+  let newest = catchupNewest && (!highWaterMark || catchupNewest > highWaterMark) ? catchupNewest : highWaterMark;
+  let after = null;
+  let pages = 0;
+  let found = 0;
+  let reachedMark = false;
+  let hasNextPage = true;
+  const totals = { inserted: 0, updated: 0 };
+
+  while (pages < (highWaterMark ? maxPages : initialPages)) {
+    const { posts, pageInfo } = await fetchPostsPage(topic, after, { first, limiter });
+    pages++;
+
+    const fresh = [];
+    let reachedThisPage = false;
+    for (const post of posts) {
+      const createdAt = new Date(post.createdAt);
+      if (mark && createdAt <= mark) {
+        reachedThisPage = true;
+        continue;
+      }
+      if (!newest || createdAt > newest) newest = createdAt;
+      fresh.push(post);
+    }
+
+    const keep = fresh.filter(filter);
+    found += keep.length;
+    const written = await writeTools(db, keep.map(transform));
+    totals.inserted += written.inserted;
+    totals.updated += written.updated;
+
+    hasNextPage = pageInfo.hasNextPage;
+    after = pageInfo.endCursor;
+    if (reachedThisPage && resumeCursor) {
+      // Caught up with the last run's head: jump to where it stopped
+      after = resumeCursor;
+      resumeCursor = null;
+      mark = highWaterMark;
+      hasNextPage = true;
+      continue;
+    }
+    if (reachedThisPage || !hasNextPage) {
+      reachedMark = true;
+      break;
+    }
+  }
+
+  const fields = {};
+  if (!highWaterMark) {
+    fields.high_water_mark = newest;
+    if (!state.backfill_cursor) {
+      // Backfill picks up where a topic's first sync stopped
+      fields.backfill_cursor = after;
+      fields.backfill_complete = !hasNextPage;
+    }
+  } else if (reachedMark) {
+    fields.high_water_mark = newest;
+    fields.catchup_cursor = null;
+    fields.catchup_newest = null;
+  } else {
+    console.warn(`Product Hunt sync for ${topic} hit ${maxPages} pages before its high-water mark; the next sync resumes from there`);
+    fields.catchup_cursor = after;
+    fields.catchup_newest = newest;
+  }
+
+  await saveState(db, topic, {
+    ...fields,
+    last_sync_at: new Date(),
+    last_sync_pages: pages,
+    last_sync_found: found
+  });
+
+  return { topic, pages, found, ...totals, reached_mark: reachedMark };
+}
+
+// Walk one topic's history from its saved backfill cursor
+async function backfillTopic(db, topic, { transform, filter, first, pagesPerTopic, limiter }) {
+  const state = await getState(db, topic);
+  if (state.backfill_complete) {
+    return { topic, pages: 0, found: 0, inserted: 0, updated: 0, complete: true };
+  }
+
+  let after = state.backfill_cursor || null;
+  let pages = 0;
+  let found = 0;
+  let complete = false;
+  const totals = { inserted: 0, updated: 0 };
+
+  while (pages < pagesPerTopic) {
+    const { posts, pageInfo } = await fetchPostsPage(topic, after, { first, limiter });
+    pages++;
+
+    const keep = posts.filter(filter);
+    found += keep.length;
+    const written = await writeTools(db, keep.map(transform));
+    totals.inserted += written.inserted;
+    totals.updated += written.updated;
+
+    // Persist after every page so an interrupted backfill resumes here
+    complete = !pageInfo.hasNextPage;
+    after = pageInfo.endCursor;
+    await saveState(db, topic, { backfill_cursor: after, backfill_complete: complete });
+    if (complete) break;
+  }
+
+  return { topic, pages, found, ...totals, complete };
+}
+
+/**
+ * Backfill several topics with at most `concurrency` walkers at a time.
+ * Each topic's cursor chain is inherently sequential, so concurrency is
+ * across topics; all walkers share one rate limiter.
+ */
+export async function backfillProductHunt(db, { topics = BACKFILL_TOPICS, transform, filter = () => true, first = 20, pagesPerTopic = 25, concurrency = 2 } = {}) {
+  const limiter = new ProductHuntRateLimiter();
+  const queue = [...topics];
+  const results = [];
+
+  const worker = async () => {
+    while (queue.length > 0) {
+      const topic = queue.shift();
+      try {
+        results.push(await backfillTopic(db, topic, { transform, filter, first, pagesPerTopic, limiter }));
+      } catch (error) {
+        console.error(`Product Hunt backfill failed for ${topic}:`, error.message);
+        results.push({ topic, pages: 0, found: 0, inserted: 0, updated: 0, error: error.message });
+      }
+    }
+  };
+
+  await Promise.all(Array.from({ length: Math.min(concurrency, topics.length) }, worker));
+  return results;
+}
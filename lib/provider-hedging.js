@@ -0,0 +1,259 @@
+import { streamCompletion } from './ai-providers.js';
+
+// Hedged completions across LLM providers.
+//
+// A request may name backup providers (other keys the user supplied) after
+// its primary one. The primary is asked first. If it has not produced its
+// first token by its deadline, the same prompt goes to the next provider, and
+// so on; if one fails (a 429, a 5xx) the next starts at once. The first to
+// produce a token wins and is streamed to the caller.
+//
+// The deadline is the p95 of the provider's recent first-token latencies
+// (DEFAULT_DEADLINE_MS until there are enough of them), so a hedge only
+// fires for requests that are slow for that provider.
+//
+// A loser is cancelled as soon as it has produced its first token (or
+// failed, or after OBSERVE_LIMIT_MS), so it never generates more than a few
+// tokens. Waiting that long measures how much later it would have answered,
+// which is the latency the hedge saved, and gives the latency window an
+// uncensored sample.
+
+const WINDOW = 50;
+const MIN_SAMPLES = 5;
+const DEFAULT_DEADLINE_MS = 4000;
+const MIN_DEADLINE_MS = 750;
+const MAX_DEADLINE_MS = 20000;
+const OBSERVE_LIMIT_MS = 30000;
+
+function percentile(sorted, p) {
+  return sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+}
+
+// Recent first-token latencies per provider, and what hedging did with them
+class ProviderLatency {
+  constructor() {
+    this.samples = new Map();
+    this.totals = { requests: 0, hedged: 0, backup_wins: 0, rescued: 0, saved_ms: 0 };
+  }
+
+  record(provider, ms) {
+    if (!this.samples.has(provider)) this.samples.set(provider, []);
+    const samples = this.samples.get(provider);
+    samples.push(ms);
+    if (samples.length > WINDOW) samples.shift();
+  }
+
+  deadline(provider) {
+    const samples = this.samples.get(provider) || [];
+    if (samples.length < MIN_SAMPLES) return DEFAULT_DEADLINE_MS;
+    const p95 = percentile([...samples].sort((a, b) => a - b), 0.95);
+    return Math.round(Math.min(MAX_DEADLINE_MS, Math.max(MIN_DEADLINE_MS, p95)));
+  }
+
+  stats() {
+    const providers = {};
+    for (const [provider, samples] of this.samples) {
+      const sorted = [...samples].sort((a, b) => a - b);
+      providers[provider] = {
+        samples: sorted.length,
+        p50_ms: Math.round(percentile(sorted, 0.5)),
+        p95_ms: Math.round(percentile(sorted, 0.95)),
+        deadline_ms: this.deadline(provider)
+      };
+    }
+    return { providers, hedging: { ...this.totals, saved_ms: Math.round(this.totals.saved_ms) } };
+  }
+}
+
+export const providerLatency = new ProviderLatency();
+
+const elapsed = since => Math.round(performance.now() - since);
+
+/**
+ * What happened to one hedged request. It is yielded as soon as the winner
+ * is known and keeps updating while the losers are observed, so read it
+ * (or serialize it) once the completion is done.
+ */
+export class HedgeReport {
+  constructor(attempts, startedAt) {
+    this.attempts = attempts;
+    this.startedAt = startedAt;
+    this.winner = null;
+  }
+
+  toJSON() {
+    const [primary] = this.attempts;
+    const winner = this.winner;
+    let saved = null;
+    let lowerBound = false;
+    if (winner === primary) {
+      saved = 0;
+    } else if (winner && !primary.error) {
+      // The primary was (or would have been) this much slower
+      const primaryMs = primary.firstTokenMs ?? primary.cancelledMs ?? elapsed(this.startedAt);
+      lowerBound = primary.firstTokenMs === null;
+      saved = Math.max(0, primaryMs - winner.firstTokenMs);
+    }
+    return {
+      winner: winner?.provider ?? null,
+      primary: primary.provider,
+      hedged: this.attempts.length > 1,
+      first_token_ms: winner?.firstTokenMs ?? null,
+      saved_ms: saved,
+      ...(lowerBound ? { saved_ms_is_lower_bound: true } : {}),
+      attempts: this.attempts.map(attempt => ({
+        provider: attempt.provider,
+        status: attempt === winner ? 'won' : attempt.error ? 'failed' : attempt.firstTokenMs !== null ? 'slower' : 'cancelled',
+        launched_ms: attempt.launchedMs,
+        deadline_ms: attempt.deadlineMs,
+        first_token_ms: attempt.firstTokenMs,
+        ...(attempt.error ? { error: attempt.error.message } : {})
+      }))
+    };
+  }
+}
+
+/**
+ * streamCompletion over a list of { provider, apiKey } candidates, the
+ * primary first. Yields the winner's { text }, { usage } and { stop_reason }
+ * events, plus one { hedge: HedgeReport } before its first text. With a single candidate it
+ * is streamCompletion (its first-token latency is still recorded).
+ */
+export async function* hedgedCompletion(candidates, systemPrompt, userPrompt, { maxTokens, temperature, signal } = {}) {
+  const startedAt = performance.now();
+  const attempts = [];
+  const report = new HedgeReport(attempts, startedAt);
+
+  const launch = () => {
+    const candidate = candidates[attempts.length];
+    const abort = new AbortController();
+    signal?.addEventListener('abort', () => abort.abort(), { once: true });
+    const attempt = {
+      provider: candidate.provider,
+      abort,
+      iterator: streamCompletion(candidate.provider, candidate.apiKey, systemPrompt, userPrompt, { maxTokens, temperature, signal: abort.signal }),
+      buffered: [],
+      launchedMs: elapsed(startedAt),
+      deadlineMs: providerLatency.deadline(candidate.provider),
+      firstTokenMs: null,
+      cancelledMs: null,
+      error: null,
+      settled: false
+    };
+    // Resolves with the attempt once it has produced text, failed or ended
+    attempt.first = (async () => {
+      try {
+        for (;;) {
+          const { value, done } = await attempt.iterator.next();
+          if (done) {
+            attempt.error = new Error(`${attempt.provider} returned no output`);
+            break;
+          }
+          attempt.buffered.push(value);
+          if (value.text) {
+            attempt.firstTokenMs = elapsed(startedAt);
+            providerLatency.record(attempt.provider, attempt.firstTokenMs - attempt.launchedMs);
+            break;
+          }
+        }
+      } catch (error) {
+        if (!abort.signal.aborted) attempt.error = error;
+      }
+      attempt.settled = true;
+      return attempt;
+    })();
+    attempts.push(attempt);
+  };
+
+  const cancel = attempt => {
+    if (attempt.cancelledMs === null) attempt.cancelledMs = elapsed(startedAt);
+    attempt.abort.abort();
+    attempt.iterator.return().catch(() => {});
+  };
+
+  providerLatency.totals.requests++;
+  launch();
+  let winner = null;
+  while (!winner) {
+    const pending = attempts.filter(attempt => !attempt.settled);
+    const more = attempts.length < candidates.length;
+    if (pending.length === 0) {
+      if (!more) break;
+      // Everything so far failed: fall back at once
+      launch();
+      continue;
+    }
+    let timer;
+    const waits = pending.map(attempt => attempt.first);
+    if (more) {
+      const latest = attempts[attempts.length - 1];
+      const wait = Math.max(0, latest.launchedMs + latest.deadlineMs - elapsed(startedAt));
+      waits.push(new Promise(resolve => { timer = setTimeout(() => resolve('deadline'), wait); }));
+    }
+    const result = await Promise.race(waits);
+    clearTimeout(timer);
+    if (result === 'deadline') {
+      launch();
+    } else if (result.firstTokenMs !== null) {
+      winner = result;
+    } else if (more) {
+      launch();
+    }
+  }
+
+  if (attempts.length > 1) providerLatency.totals.hedged++;
+  if (!winner) {
+    // Report the primary's error: that is the provider the user chose
+    throw attempts[0].error || new Error('No provider returned output');
+  }
+
+  report.winner = winner;
+  if (winner !== attempts[0]) {
+    providerLatency.totals.backup_wins++;
+    if (attempts[0].error) providerLatency.totals.rescued++;
+  }
+  for (const loser of attempts) {
+    if (loser === winner) continue;
+    if (loser.settled) {
+      cancel(loser);
+      continue;
+    }
+    // Watch the loser until its first token to learn how late it was, then stop it
+    const limit = setTimeout(() => cancel(loser), OBSERVE_LIMIT_MS);
+    loser.first.then(() => {
+      clearTimeout(limit);
+      cancel(loser);
+      if (loser === attempts[0] && loser.firstTokenMs !== null) {
+        providerLatency.totals.saved_ms += loser.firstTokenMs - winner.firstTokenMs;
+      }
+    });
+  }
+
+  try {
+    yield { hedge: report };
+    yield* winner.buffered;
+    for (;;) {
+      const { value, done } = await winner.iterator.next();
+      if (done) break;
+      yield value;
+    }
+  } finally {
+    // The caller stopped early (or is done): make sure the request ends
+    cancel(winner);
+  }
+}
+
+/** Run hedgedCompletion to the end: { text, usage, hedge, stop_reason }. */
+export async function collectHedgedCompletion(candidates, systemPrompt, userPrompt, options) {
+  let text = '';
+  let hedge = null;
+  let stopReason = null;
+  const usage = {};
+  for await (const event of hedgedCompletion(candidates, systemPrompt, userPrompt, options)) {
+    if (event.text) text += event.text;
+    if (event.usage) Object.assign(usage, event.usage);
+    if (event.hedge) hedge = event.hedge;
+    if (event.stop_reason) stopReason = event.stop_reason;
+  }
+  return { text, usage, hedge, stop_reason: stopReason };
+}
@@ -1,6 +1,22 @@
 import axios from 'axios';
 import * as cheerio from 'cheerio';
 import { v4 as uuidv4 } from 'uuid';
+import { CategoryClassifier } from '../category-classifier.js';
+
+// One automaton per category list, shared by every scraper instance
+const classifiers = new Map();
+
+function categoryClassifierFor(categories, formatName) {
+  const key = categories.join(',');
+  if (!classifiers.has(key)) {
+    const table = {};
+    for (const category of categories) {
+      table[formatName(category)] = { [category]: 1 };
+    }
+    classifiers.set(key, new CategoryClassifier(table, { fallback: 'General' }));
+  }
+  return classifiers.get(key);
+}
 
 export class AiToolsScraper {
   constructor() {
@@ -12,6 +28,7 @@ export class AiToolsScraper {
       'music', 'productivity', 'research', 'sales', 'social-media', 'text-to-speech',
       'translation', 'video-generation', 'voice-generation', 'web-apps', 'writing'
     ];
+    this.categoryClassifier = categoryClassifierFor(this.categories, category => this.formatCategoryName(category));
   }
 
   async scrapeToolsFromPage(url, maxPages = 5) {
@@ -107,29 +124,12 @@ export class AiToolsScraper {
   }
 
   extractCategoryFromElement($tool) {
-    // Try to find category from various sources
-    const categoryText = $tool.find('.category, .tag, .badge').first().text().trim().toLowerCase();
-    
-    if (categoryText) {
-      const matchedCategory = this.categories.find(cat => 
-        categoryText.includes(cat) || cat.includes(categoryText)
-      );
-      if (matchedCategory) {
-        return this.formatCategoryName(matchedCategory);
-      }
-    }
-    
-    // Try to extract from classes or data attributes
-    const classes = $tool.attr('class') || '';
-    const dataCategory = $tool.attr('data-category') || '';
-    
-    for (const category of this.categories) {
-      if (classes.includes(category) || dataCategory.includes(category)) {
-        return this.formatCategoryName(category);
-      }
-    }
-    
-    return 'General';
+    // Badge text counts most, then classes and data attributes
+    const { category, confidence } = this.categoryClassifier.classify([
+      { text: $tool.find('.category, .tag, .badge').first().text(), weight: 2 },
+      { text: `${$tool.attr('class') || ''} ${$tool.attr('data-category') || ''}` }
+    ]);
+    return confidence > 0 ? category : 'General';
   }
 
   extractPricingInfo($tool) {
@@ -0,0 +1,383 @@
+import { HtmlTokenizer } from './html-tokenizer.js';
+
+// Single-pass card extraction over the incremental tokenizer.
+//
+// A page spec lists card selectors in order of preference plus the fields to
+// pull out of each card. All selectors are compiled up front and evaluated
+// against each element as it opens, so the page is walked once however many
+// patterns there are. Cards of the most preferred selector are emitted the
+// moment they close; any other selector's cards wait for the end of the page,
+// since a more preferred one may still match further down.
+//
+// Supported selectors: tag, .class, #id, [attr], [attr=v], [attr*=v],
+// [attr^=v], [attr$=v], [attr~=v], compounds of those, descendant and '>'
+// child combinators, and comma lists.
+
+const VOID_ELEMENTS = new Set([
+  'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+  'param', 'source', 'track', 'wbr'
+]);
+
+// Opening one of these implicitly closes an open <p>
+const CLOSES_P = new Set([
+  'address', 'article', 'aside', 'blockquote', 'details', 'div', 'dl', 'fieldset',
+  'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+  'header', 'hr', 'main', 'menu', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'ul'
+]);
+
+// Elements that implicitly close an open sibling of the same kind
+const CLOSES_SIBLING = {
+  li: ['li'],
+  dt: ['dt', 'dd'],
+  dd: ['dt', 'dd'],
+  tr: ['tr', 'td', 'th'],
+  td: ['td', 'th'],
+  th: ['td', 'th'],
+  option: ['option']
+};
+
+// Scopes an implicit close does not reach past
+const SIBLING_SCOPE = new Set(['ul', 'ol', 'dl', 'table', 'tbody', 'thead', 'select']);
+
+const ATTRIBUTE_TESTS = {
+  '=': (value, expected) => value === expected,
+  '*=': (value, expected) => value.includes(expected),
+  '^=': (value, expected) => value.startsWith(expected),
+  '$=': (value, expected) => value.endsWith(expected),
+  '~=': (value, expected) => value.split(/\s+/).includes(expected)
+};
+
+function compileCompound(source) {
+  const tests = [];
+  let tag = null;
+  const pattern = /^([a-zA-Z][\w-]*|\*)|\.([\w-]+)|#([\w-]+)|\[\s*([\w-]+)\s*(?:([*^$~]?=)\s*(?:"([^"]*)"|'([^']*)'|([^\]\s]*)))?\s*\]/g;
+  let consumed = 0;
+  let match;
+  while ((match = pattern.exec(source)) && match.index === consumed) {
+    consumed = pattern.lastIndex;
+    if (match[1]) {
+      if (match[1] !== '*') tag = match[1].toLowerCase();
+    } else if (match[2]) {
+      const className = match[2];
+      tests.push(element => element.classes.includes(className));
+    } else if (match[3]) {
+      const id = match[3];
+      tests.push(element => element.attrs.id === id);
+    } else {
+      const name = match[4].toLowerCase();
+      const operator = match[5];
+      const expected = match[6] ?? match[7] ?? match[8];
+      tests.push(operator
+        ? element => element.attrs[name] !== undefined && ATTRIBUTE_TESTS[operator](element.attrs[name], expected)
+        : element => element.attrs[name] !== undefined);
+    }
+    if (consumed === source.length) break;
+  }
+  if (consumed !== source.length) {
+    throw new Error(`Unsupported selector: ${source}`);
+  }
+  return element => (!tag || element.tag === tag) && tests.every(test => test(element));
+}
+
+// Compile one selector (no commas) into a test on an element and its ancestors
+function compileSelector(source) {
+  const parts = source.trim().replace(/\s*>\s*/g, ' > ').split(/\s+/);
+  const steps = [];
+  let combinator = null;
+  for (const part of parts) {
+    if (part === '>') {
+      combinator = 'child';
+      continue;
+    }
+    steps.push({ test: compileCompound(part), combinator });
+    combinator = 'descendant';
+  }
+
+  // Match right to left; `element.parent` walks the open-element stack
+  const matchFrom = (element, index) => {
+    if (!steps[index].test(element)) return false;
+    if (index === 0) return true;
+    if (steps[index].combinator === 'child') {
+      return !!element.parent && matchFrom(element.parent, index - 1);
+    }
+    for (let ancestor = element.parent; ancestor; ancestor = ancestor.parent) {
+      if (matchFrom(ancestor, index - 1)) return true;
+    }
+    return false;
+  };
+  return element => matchFrom(element, steps.length - 1);
+}
+
+export function compileSelectorList(source) {
+  const selectors = source.split(',').map(compileSelector);
+  return element => selectors.some(test => test(element));
+}
+
+/**
+ * Compile a page spec:
+ *
+ *   cards:    selectors in order of preference
+ *   fallback: { selector, accept(card) } used only if no card selector matches
+ *   fields:   name -> { first: [selector lists] } captures the text of the first
+ *             descendant matching each list, in document order;
+ *             { all: selector list } concatenates every match;
+ *             { attr, from } reads an attribute of the first match
+ */
+export function compileExtraction(spec) {
+  const fields = Object.entries(spec.fields || {}).map(([name, field]) => {
+    if (field.first) {
+      return { name, kind: 'first', tests: field.first.map(compileSelectorList) };
+    }
+    if (field.all) {
+      return { name, kind: 'all', test: compileSelectorList(field.all) };
+    }
+    return { name, kind: 'attr', attr: field.attr, test: compileSelectorList(field.from) };
+  });
+  return {
+    cards: spec.cards.map(source => ({ source, test: compileSelectorList(source) })),
+    fallback: spec.fallback
+      ? { source: spec.fallback.selector, test: compileSelectorList(spec.fallback.selector), accept: spec.fallback.accept }
+      : null,
+    fields
+  };
+}
+
+function newCard(element, selector, rank) {
+  return { element, selector, rank, text: '', captures: [], values: {} };
+}
+
+/**
+ * Streaming extractor for one page. Call write() with chunks and end() when
+ * the response finishes; `onCard(record)` fires for every card of the
+ * page's winning selector: the earliest listed in `cards` that matches
+ * anywhere on the page, else the fallback.
+ *
+ * Only the best selector matched so far is tracked. Its cards are emitted as
+ * they close if it is the first listed, as nothing can outrank it; otherwise
+ * they are held (at most `maxBuffered`) until end() and dropped if a better
+ * selector turns up first. Call stop() to abandon the rest of the page.
+ */
+export class CardExtractor {
+  constructor(compiled, { onCard, maxBuffered = Infinity }) {
+    this.compiled = compiled;
+    this.onCard = onCard;
+    this.maxBuffered = maxBuffered;
+    this.stack = [];
+    this.cards = [];
+    // Rank of the best selector matched so far: its index in `cards`, the
+    // fallback ranking after all of them
+    this.best = Infinity;
+    this.buffered = [];
+    this.emitted = 0;
+    this.tokenizer = new HtmlTokenizer(this);
+  }
+
+  write(chunk) {
+    this.tokenizer.write(chunk);
+  }
+
+  end() {
+    this.tokenizer.end();
+    while (this.stack.length > 0) this.closeTop();
+    // Nothing better matched: the held cards are the page's
+    for (const record of this.buffered) {
+      if (this.tokenizer.stopped) break;
+      this.emit(record);
+    }
+    this.buffered = [];
+    return this.emitted;
+  }
+
+  stop() {
+    this.tokenizer.stop();
+  }
+
+  emit(record) {
+    this.emitted++;
+    this.onCard(record);
+  }
+
+  onOpenTag(tag, attrs, selfClosing) {
+    this.implicitClose(tag);
+
+    const parent = this.stack[this.stack.length - 1] || null;
+    const element = {
+      tag,
+      attrs,
+      classes: attrs.class ? attrs.class.split(/\s+/) : [],
+      parent
+    };
+
+    // Field captures for every card this element is inside
+    for (const card of this.cards) {
+      for (const field of this.compiled.fields) {
+        if (field.kind === 'first') {
+          field.tests.forEach((test, index) => {
+            const key = `${field.name}:${index}`;
+            if (!(key in card.values) && test(element)) {
+              card.values[key] = '';
+              card.captures.push({ key, element });
+            }
+          });
+        } else if (field.kind === 'all') {
+          if (field.test(element)) {
+            card.values[field.name] ??= '';
+            card.captures.push({ key: field.name, element });
+          }
+        } else if (!(field.name in card.values) && field.test(element)) {
+          card.values[field.name] = element.attrs[field.attr];
+        }
+      }
+    }
+
+    this.openCard(element);
+
+    if (VOID_ELEMENTS.has(tag) || selfClosing) {
+      this.closeElement(element);
+    } else {
+      this.stack.push(element);
+    }
+  }
+
+  openCard(element) {
+    const { cards, fallback } = this.compiled;
+    // Selectors ranked below the best so far can no longer win
+    let rank = -1;
+    for (let index = 0; index < Math.min(this.best + 1, cards.length); index++) {
+      if (cards[index].test(element)) {
+        rank = index;
+        break;
+      }
+    }
+    if (rank < 0) {
+      if (!fallback || this.best < cards.length || !fallback.test(element)) return;
+      rank = cards.length;
+    }
+    if (rank < this.best) {
+      this.best = rank;
+      this.buffered = [];
+      this.cards = this.cards.filter(card => card.rank <= rank);
+    }
+    const source = rank < cards.length ? cards[rank].source : fallback.source;
+    this.cards.push(newCard(element, source, rank));
+  }
+
+  implicitClose(tag) {
+    if (CLOSES_P.has(tag)) {
+      for (let i = this.stack.length - 1; i >= 0; i--) {
+        const open = this.stack[i].tag;
+        if (open === 'p') {
+          this.closeTo(i);
+          break;
+        }
+        if (open === 'button' || SIBLING_SCOPE.has(open)) break;
+      }
+    }
+    const siblings = CLOSES_SIBLING[tag];
+    if (siblings) {
+      for (let i = this.stack.length - 1; i >= 0; i--) {
+        const open = this.stack[i].tag;
+        if (siblings.includes(open)) {
+          this.closeTo(i);
+          break;
+        }
+        if (SIBLING_SCOPE.has(open)) break;
+      }
+    }
+  }
+
+  onCloseTag(tag) {
+    for (let i = this.stack.length - 1; i >= 0; i--) {
+      if (this.stack[i].tag === tag) {
+        this.closeTo(i);
+        return;
+      }
+    }
+    // Stray end tag: ignored, as browsers do
+  }
+
+  closeTo(index) {
+    while (this.stack.length > index) this.closeTop();
+  }
+
+  closeTop() {
+    this.closeElement(this.stack.pop());
+  }
+
+  closeElement(element) {
+    for (let i = 0; i < this.cards.length; i++) {
+      const card = this.cards[i];
+      card.captures = card.captures.filter(capture => capture.element !== element);
+      if (card.element === element) {
+        this.cards.splice(i, 1);
+        i--;
+        this.finishCard(card);
+      }
+    }
+  }
+
+  finishCard(card) {
+    const { element } = card;
+    const record = {
+      selector: card.selector,
+      tag: element.tag,
+      attrs: element.attrs,
+      text: card.text
+    };
+    for (const field of this.compiled.fields) {
+      if (field.kind === 'first') {
+        record[field.name] = field.tests.map((_, index) => card.values[`${field.name}:${index}`] ?? null);
+      } else {
+        record[field.name] = card.values[field.name] ?? (field.kind === 'all' ? '' : null);
+      }
+    }
+
+    if (card.rank === this.compiled.cards.length && !this.compiled.fallback.accept(record)) return;
+    if (card.rank === 0) {
+      if (!this.tokenizer.stopped) this.emit(record);
+    } else if (this.buffered.length < this.maxBuffered) {
+      this.buffered.push(record);
+    }
+  }
+
+  onText(text) {
+    for (const card of this.cards) {
+      card.text += text;
+      for (const capture of card.captures) {
+        card.values[capture.key] += text;
+      }
+    }
+  }
+}
+
+/**
+ * Run a compiled spec over a whole document or an async iterable of chunks
+ * (e.g. an axios response stream). Resolves to at most `limit` records and
+ * stops reading once it has them.
+ */
+export async function extractCards(compiled, input, { limit = Infinity, onCard } = {}) {
+  const records = [];
+  const extractor = new CardExtractor(compiled, {
+    maxBuffered: limit,
+    onCard: record => {
+      if (records.length >= limit) return;
+      records.push(record);
+      onCard?.(record);
+      if (records.length >= limit) extractor.stop();
+    }
+  });
+
+  if (typeof input === 'string') {
+    extractor.write(input);
+  } else {
+    // Multi-byte characters can straddle chunk boundaries
+    const decoder = new TextDecoder('utf-8');
+    for await (const chunk of input) {
+      extractor.write(typeof chunk === 'string' ? chunk : decoder.decode(chunk, { stream: true }));
+      if (extractor.tokenizer.stopped) break;
+    }
+    extractor.write(decoder.decode());
+  }
+  extractor.end();
+  return records;
+}
@@ -1,10 +1,52 @@
 import axios from 'axios';
 import * as cheerio from 'cheerio';
 import { v4 as uuidv4 } from 'uuid';
+import { compileExtraction, extractCards } from './card-extractor.js';
+
+// Multiple selectors to try, in order
+const CARD_SELECTORS = [
+  'div[class*="tool"]',
+  'article[class*="tool"]',
+  'div[class*="card"]',
+  'div[class*="item"]',
+  '.grid > div',
+  '[href*="/tool/"]',
+  'a[href*="/ai-tools/"]'
+];
+const NAME_SELECTOR = 'h3, h2, h1, .title, .name';
+const DESCRIPTION_SELECTOR = '.description, .summary, p';
+const EXCERPT_SELECTOR = '.excerpt, .tagline';
+const PRICING_SELECTOR = '.price, .pricing, .badge';
+
+function isToolLink(href, text) {
+  return href.includes('tool') || text.includes('ai') || text.includes('generate');
+}
+
+// Full discovery spec; learned profiles narrow it per page template
+const CATEGORY_PAGE = {
+  cards: CARD_SELECTORS,
+  fallback: {
+    selector: 'a',
+    accept: record => isToolLink(record.attrs.href || '', record.text.toLowerCase())
+  },
+  fields: {
+    name: { first: [NAME_SELECTOR, 'a'] },
+    description: { first: [DESCRIPTION_SELECTOR] },
+    excerpt: { all: EXCERPT_SELECTOR },
+    pricing: { all: PRICING_SELECTOR },
+    link: { attr: 'href', from: 'a' }
+  }
+};
+const CATEGORY_PAGE_SPEC = compileExtraction(CATEGORY_PAGE);
+const PROFILE_SPEC = 'aitools-category';
 
 export class EnhancedAiToolsScraper {
-  constructor() {
+  constructor(options = {}) {
     this.baseUrl = 'https://aitools.fyi';
+    // 'stream' parses pages as they download; 'cheerio' builds a full DOM
+    this.parser = options.parser || process.env.AITOOLS_PARSER || 'stream';
+    // Optional ScrapeProfileStore; streaming runs reuse what worked last time
+    this.profiles = options.profiles || null;
     this.categories = [
       'image-generation', 'web-apps', 'marketing', 'analytics', 'education',
       'social-media-assistant', 'shopify-apps', 'sales', 'chat-bot', 'audio-generation',
@@ -104,6 +146,123 @@ export class EnhancedAiToolsScraper {
     return trendingTools;
   }
 
+  // Cheerio path, kept for AITOOLS_PARSER=cheerio and the parse benchmark
+  extractWithCheerio(html, maxTools = 30) {
+    const $ = cheerio.load(html);
+    
+    let toolElements = $();
+    let matchedSelector = null;
+    for (const selector of CARD_SELECTORS) {
+      const elements = $(selector);
+      if (elements.length > 0) {
+        matchedSelector = selector;
+        toolElements = elements;
+        break;
+      }
+    }
+    
+    // Fallback: find any links that might be tools
+    if (toolElements.length === 0) {
+      toolElements = $('a').filter((i, el) => isToolLink($(el).attr('href') || '', $(el).text().toLowerCase()));
+    }
+
+    const candidates = [];
+    toolElements.slice(0, maxTools).each((index, element) => {
+      const $tool = $(element);
+      
+      // Extract tool information with multiple fallbacks
+      let name = $tool.find(NAME_SELECTOR).first().text().trim();
+      if (!name) {
+        name = $tool.find('a').first().text().trim();
+      }
+      if (!name) {
+        name = $tool.attr('title') || $tool.attr('alt') || '';
+      }
+      
+      let description = $tool.find(DESCRIPTION_SELECTOR).first().text().trim();
+      if (!description) {
+        description = $tool.find(EXCERPT_SELECTOR).text().trim();
+      }
+      
+      let link = $tool.find('a').first().attr('href');
+      if (!link && $tool.is('a')) {
+        link = $tool.attr('href');
+      }
+      
+      candidates.push({ name, description, link, pricingText: $tool.find(PRICING_SELECTOR).text() });
+    });
+
+    return { candidates, selector: matchedSelector || 'a (fallback)' };
+  }
+
+  // Single streaming pass; stops reading once maxTools cards are found
+  async extractFromStream(input, maxTools = 30, spec = CATEGORY_PAGE_SPEC) {
+    const records = await extractCards(spec, input, { limit: maxTools });
+
+    const candidates = records.map(record => {
+      const [heading, firstLink] = record.name.map(text => (text || '').trim());
+      const name = heading || firstLink || record.attrs.title || record.attrs.alt || '';
+      const description = (record.description[0] || '').trim() || record.excerpt.trim();
+      let link = record.link;
+      if (!link && record.tag === 'a') {
+        link = record.attrs.href;
+      }
+      return { name, description, link, pricingText: record.pricing };
+    });
+
+    return { candidates, selector: records[0]?.selector || null, records };
+  }
+
+  fetchPage(url, streaming) {
+    return axios.get(url, {
+      headers: {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+      },
+      timeout: 15000,
+      responseType: streaming ? 'stream' : 'text'
+    });
+  }
+
+  buildTool(category, name, description, link, pricingText) {
+    if (!description && name) {
+      description = `${name} - AI tool for ${this.formatCategoryName(category)}`;
+    }
+    
+    if (link && !link.startsWith('http')) {
+      link = `${this.baseUrl}${link}`;
+    }
+    
+    // Extract pricing if available
+    let pricing = 'Unknown';
+    pricingText = pricingText.toLowerCase();
+    if (pricingText.includes('free')) pricing = 'Free';
+    else if (pricingText.includes('paid')) pricing = 'Paid';
+    else if (pricingText.includes('freemium')) pricing = 'Freemium';
+    
+    return {
+      id: uuidv4(),
+      name: name,
+      tagline: description.substring(0, 100) || `AI tool for ${this.formatCategoryName(category)}`,
+      description: description || `Discover ${name} - an innovative AI tool designed for ${this.formatCategoryName(category)} tasks.`,
+      url: link || `${this.baseUrl}/${category}`,
+      website: link || `${this.baseUrl}/${category}`,
+      category: this.formatCategoryName(category),
+      pricing: pricing,
+      rating: Math.random() * 2 + 3,
+      votes: Math.floor(Math.random() * 500) + 50,
+      makers: [],
+      topics: [this.formatCategoryName(category)],
+      featured_at: new Date(),
+      source: 'AITools.fyi',
+      created_at: new Date(),
+      updated_at: new Date()
+    };
+  }
+
   async scrapeCategory(category, maxTools = 30) {
     const tools = [];
     
@@ -111,112 +270,27 @@ export class EnhancedAiToolsScraper {
       console.log(`Scraping category: ${category}`);
       
       const url = `${this.baseUrl}/${category}`;
-      const response = await axios.get(url, {
-        headers: {
-          'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-          'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-          'Accept-Language': 'en-US,en;q=0.5',
-          'Accept-Encoding': 'gzip, deflate',
-          'Connection': 'keep-alive',
-        },
-        timeout: 15000
-      });
-
-      const $ = cheerio.load(response.data);
-      
-      // Multiple selectors to try
-      const selectors = [
-        'div[class*="tool"]',
-        'article[class*="tool"]',
-        'div[class*="card"]',
-        'div[class*="item"]',
-        '.grid > div',
-        '[href*="/tool/"]',
-        'a[href*="/ai-tools/"]'
-      ];
-      
-      let toolElements = $();
-      for (const selector of selectors) {
-        const elements = $(selector);
-        if (elements.length > 0) {
-          toolElements = elements;
-          break;
-        }
-      }
-      
-      // Fallback: find any links that might be tools
-      if (toolElements.length === 0) {
-        toolElements = $('a').filter((i, el) => {
-          const href = $(el).attr('href') || '';
-          const text = $(el).text().toLowerCase();
-          return href.includes('tool') || text.includes('ai') || text.includes('generate');
-        });
+      let result;
+      if (this.parser !== 'stream') {
+        result = this.extractWithCheerio((await this.fetchPage(url, false)).data, maxTools);
+      } else if (this.profiles) {
+        // Fetched once: a re-check runs full discovery over the same HTML
+        const html = (await this.fetchPage(url, false)).data;
+        result = await this.profiles.extract(PROFILE_SPEC, url, CATEGORY_PAGE, maxTools, spec =>
+          this.extractFromStream(html, maxTools, spec));
+      } else {
+        result = await this.extractFromStream((await this.fetchPage(url, true)).data, maxTools);
       }
+      const { candidates, selector } = result;
 
-      console.log(`Found ${toolElements.length} potential tools in ${category}`);
+      console.log(`Found ${candidates.length} potential tools in ${category} (${selector})`);
 
-      toolElements.slice(0, maxTools).each((index, element) => {
-        try {
-          const $tool = $(element);
-          
-          // Extract tool information with multiple fallbacks
-          let name = $tool.find('h3, h2, h1, .title, .name').first().text().trim();
-          if (!name) {
-            name = $tool.find('a').first().text().trim();
-          }
-          if (!name) {
-            name = $tool.attr('title') || $tool.attr('alt') || '';
-          }
-          
-          let description = $tool.find('.description, .summary, p').first().text().trim();
-          if (!description) {
-            description = $tool.find('.excerpt, .tagline').text().trim();
-          }
-          if (!description && name) {
-            description = `${name} - AI tool for ${this.formatCategoryName(category)}`;
-          }
-          
-          let link = $tool.find('a').first().attr('href');
-          if (!link && $tool.is('a')) {
-            link = $tool.attr('href');
-          }
-          
-          if (link && !link.startsWith('http')) {
-            link = `${this.baseUrl}${link}`;
-          }
-          
-          // Extract pricing if available
-          let pricing = 'Unknown';
-          const pricingText = $tool.find('.price, .pricing, .badge').text().toLowerCase();
-          if (pricingText.includes('free')) pricing = 'Free';
-          else if (pricingText.includes('paid')) pricing = 'Paid';
-          else if (pricingText.includes('freemium')) pricing = 'Freemium';
-          
-          // Generate a meaningful tool if we have basic info
-          if (name && name.length > 2) {
-            tools.push({
-              id: uuidv4(),
-              name: name,
-              tagline: description.substring(0, 100) || `AI tool for ${this.formatCategoryName(category)}`,
-              description: description || `Discover ${name} - an innovative AI tool designed for ${this.formatCategoryName(category)} tasks.`,
-              url: link || `${this.baseUrl}/${category}`,
-              website: link || `${this.baseUrl}/${category}`,
-              category: this.formatCategoryName(category),
-              pricing: pricing,
-              rating: Math.random() * 2 + 3,
-              votes: Math.floor(Math.random() * 500) + 50,
-              makers: [],
-              topics: [this.formatCategoryName(category)],
-              featured_at: new Date(),
-              source: 'AITools.fyi',
-              created_at: new Date(),
-              updated_at: new Date()
-            });
-          }
-        } catch (error) {
-          console.error(`Error processing tool ${index} in ${category}:`, error.message);
+      for (const { name, description, link, pricingText } of candidates) {
+        // Generate a meaningful tool if we have basic info
+        if (name && name.length > 2) {
+          tools.push(this.buildTool(category, name, description, link, pricingText));
         }
-      });
+      }
 
       // If no tools found, generate some based on category
       if (tools.length === 0) {
@@ -0,0 +1,249 @@
+// Incremental HTML tokenizer.
+//
+// Feed it chunks as they arrive off the socket; it calls the handler's
+// onOpenTag(name, attrs, selfClosing), onCloseTag(name) and onText(text) as
+// soon as each token is complete and keeps only the unfinished tail of the
+// input buffered. It does not build a tree or validate nesting; that is left
+// to the consumer (see card-extractor.js and html-sanitizer.js).
+//
+// Work is linear in the input. Every scan moves forward. A token still open
+// at the end of a chunk records where its scan stopped, and later chunks
+// are checked on their own until one can finish it, so a long tag arriving
+// in many small chunks is not rescanned (or re-joined) for each of them.
+
+// Elements whose content is not markup
+const RAW_TEXT = new Set(['script', 'style', 'textarea', 'noscript', 'xmp', 'iframe', 'noembed', 'noframes']);
+
+const NAMED_ENTITIES = {
+  amp: '&', lt: '<', gt: '>', quot: '"', apos: "'", nbsp: ' ',
+  copy: '©', reg: '®', trade: '™', hellip: '…', mdash: '—', ndash: '–',
+  lsquo: '‘', rsquo: '’', ldquo: '“', rdquo: '”', bull: '•', middot: '·'
+};
+
+export function decodeEntities(text) {
+  if (!text.includes('&')) return text;
+  return text.replace(/&(#x[0-9a-f]+|#\d+|[a-z]+\d*);?/gi, (match, entity) => {
+    if (entity[0] === '#') {
+      const code = entity[1] === 'x' || entity[1] === 'X'
+        ? parseInt(entity.slice(2), 16)
+        : parseInt(entity.slice(1), 10);
+      return code > 0 && code <= 0x10ffff ? String.fromCodePoint(code) : match;
+    }
+    const named = NAMED_ENTITIES[entity.toLowerCase()];
+    return named === undefined ? match : named;
+  });
+}
+
+function isSpace(char) {
+  return char === ' ' || char === '\t' || char === '\n' || char === '\r' || char === '\f';
+}
+
+/**
+ * Index of the '>' closing the tag whose name starts at `start`, skipping
+ * quoted values, or -1. `scan` ({ from, quote, prev }) carries the position,
+ * open quote and last non-space character, and is left where the scan
+ * stopped so an unfinished tag can be resumed.
+ */
+function findTagEnd(html, start, scan) {
+  let { quote, prev } = scan;
+  for (let i = Math.max(start, scan.from); i < html.length; i++) {
+    const char = html[i];
+    if (quote) {
+      if (char === quote) quote = null;
+    } else if (char === '"' || char === "'") {
+      // Quotes only open a value directly after '='
+      if (prev === '=') quote = char;
+    } else if (char === '>') {
+      return i;
+    }
+    if (!isSpace(char)) prev = char;
+  }
+  Object.assign(scan, { from: html.length, quote, prev });
+  return -1;
+}
+
+function newTagScan() {
+  return { tag: true, from: 0, quote: null, prev: '' };
+}
+
+const ATTRIBUTE = /([^\s"'>\/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?/g;
+
+function parseTag(source) {
+  // source is the text between '<' and '>'
+  const nameMatch = /^[a-zA-Z][^\s\/>]*/.exec(source);
+  if (!nameMatch) return null;
+  const name = nameMatch[0].toLowerCase();
+  let body = source.slice(nameMatch[0].length);
+  const selfClosing = /\/\s*$/.test(body);
+  if (selfClosing) body = body.replace(/\/\s*$/, '');
+
+  const attrs = {};
+  ATTRIBUTE.lastIndex = 0;
+  let match;
+  while ((match = ATTRIBUTE.exec(body))) {
+    const key = match[1].toLowerCase();
+    if (key in attrs) continue;
+    const value = match[2] ?? match[3] ?? match[4] ?? '';
+    attrs[key] = decodeEntities(value);
+  }
+  return { name, attrs, selfClosing };
+}
+
+export class HtmlTokenizer {
+  constructor(handler) {
+    this.handler = handler;
+    this.buffer = '';
+    this.rawTextTag = null;
+    this.stopped = false;
+    // Unfinished token at the start of the buffer: a tag scan, or the
+    // terminator ('>' or '-->') still awaited
+    this.pending = null;
+  }
+
+  // Drop the rest of the input, e.g. once enough records have been found
+  stop() {
+    this.stopped = true;
+    this.buffer = '';
+  }
+
+  write(chunk) {
+    if (this.stopped) return;
+    this.buffer += chunk;
+    if (this.pending && !this.completesPending(chunk)) return;
+    this.drain(false);
+  }
+
+  end() {
+    if (this.stopped) return;
+    this.drain(true);
+    if (this.buffer && !this.rawTextTag) this.emitText(this.buffer);
+    this.buffer = '';
+    this.pending = null;
+  }
+
+  // Whether `chunk` can finish the pending token; if not, advance its scan
+  completesPending(chunk) {
+    const pending = this.pending;
+    if (pending.tag) {
+      const scan = { from: 0, quote: pending.quote, prev: pending.prev };
+      if (findTagEnd(chunk, 0, scan) >= 0) return true;
+      Object.assign(pending, { quote: scan.quote, prev: scan.prev });
+    } else {
+      const seen = pending.last + chunk;
+      if (seen.includes(pending.terminator)) return true;
+      pending.last = seen.slice(-2);
+    }
+    pending.from += chunk.length;
+    return false;
+  }
+
+  emitText(text) {
+    if (text) this.handler.onText?.(decodeEntities(text));
+  }
+
+  drain(final) {
+    let html = this.buffer;
+    let pos = 0;
+    const resume = this.pending;
+    this.pending = null;
+    // Where to resume looking for the end of the token starting at `at`
+    const from = at => (at === 0 && resume ? resume.from : at);
+    const wait = terminator => {
+      this.pending = { terminator, from: html.length - pos, last: html.slice(-2) };
+    };
+
+    while (pos < html.length && !this.stopped) {
+      if (this.rawTextTag) {
+        const closing = new RegExp(`</${this.rawTextTag}`, 'gi');
+        closing.lastIndex = pos;
+        const close = closing.exec(html)?.index ?? -1;
+        if (close < 0) {
+          // Keep enough of the tail to recognise a split closing tag
+          const keep = final ? html.length : Math.max(pos, html.length - this.rawTextTag.length - 2);
+          this.handler.onRawText?.(this.rawTextTag, html.slice(pos, keep));
+          pos = keep;
+          break;
+        }
+        const end = html.indexOf('>', Math.max(close, from(pos)));
+        if (end < 0) {
+          this.handler.onRawText?.(this.rawTextTag, html.slice(pos, close));
+          pos = final ? html.length : close;
+          if (!final) wait('>');
+          break;
+        }
+        this.handler.onRawText?.(this.rawTextTag, html.slice(pos, close));
+        this.handler.onCloseTag?.(this.rawTextTag);
+        this.rawTextTag = null;
+        pos = end + 1;
+        continue;
+      }
+
+      const lt = html.indexOf('<', pos);
+      if (lt < 0) {
+        // Hold back a possibly split entity at the end of the chunk
+        const amp = html.lastIndexOf('&');
+        const cut = !final && amp >= pos && html.length - amp < 12 && !html.includes(';', amp) ? amp : html.length;
+        this.emitText(html.slice(pos, cut));
+        pos = cut;
+        break;
+      }
+      if (lt > pos) this.emitText(html.slice(pos, lt));
+      pos = lt;
+
+      if (html.startsWith('<!--', pos)) {
+        const end = html.indexOf('-->', Math.max(pos + 4, from(pos) - 2));
+        if (end < 0) {
+          wait('-->');
+          break;
+        }
+        pos = end + 3;
+        continue;
+      }
+      if (html[pos + 1] === '!' || html[pos + 1] === '?') {
+        const end = html.indexOf('>', from(pos));
+        if (end < 0) {
+          wait('>');
+          break;
+        }
+        pos = end + 1;
+        continue;
+      }
+
+      if (html[pos + 1] === '/') {
+        const end = html.indexOf('>', from(pos));
+        if (end < 0) {
+          wait('>');
+          break;
+        }
+        const name = /^[a-zA-Z][^\s\/>]*/.exec(html.slice(pos + 2, end));
+        if (name) this.handler.onCloseTag?.(name[0].toLowerCase());
+        pos = end + 1;
+        continue;
+      }
+
+      if (!/[a-zA-Z]/.test(html[pos + 1] || '')) {
+        if (pos + 1 >= html.length && !final) break;
+        // A bare '<' in text
+        this.emitText('<');
+        pos++;
+        continue;
+      }
+
+      const scan = pos === 0 && resume?.tag ? resume : newTagScan();
+      const end = findTagEnd(html, pos + 1, scan);
+      if (end < 0) {
+        this.pending = { ...scan, from: scan.from - pos };
+        break;
+      }
+      const tag = parseTag(html.slice(pos + 1, end));
+      pos = end + 1;
+      if (!tag) continue;
+      this.handler.onOpenTag?.(tag.name, tag.attrs, tag.selfClosing);
+      if (RAW_TEXT.has(tag.name) && !tag.selfClosing) {
+        this.rawTextTag = tag.name;
+      }
+    }
+
+    this.buffer = this.stopped ? '' : html.slice(pos);
+  }
+}
@@ -0,0 +1,170 @@
+import { compileExtraction } from './card-extractor.js';
+
+// Learned extraction profiles, persisted per site and page template.
+//
+// A full discovery pass evaluates every card selector and field extractor in
+// a page spec. Whatever actually matched (the most preferred card selector
+// that matched and the field selectors that produced text) is saved in
+// scrape_profiles under `<spec>:<host><template>`, and later pages of the
+// same template are extracted with just those. A page whose yield falls well
+// below the template's running average (or to nothing) is run through full
+// discovery again, over the same HTML, since a narrowed spec cannot see a
+// better selector appear, and the profile is re-learned from that.
+
+const COLLECTION = 'scrape_profiles';
+const YIELD_SMOOTHING = 0.3;
+
+// '/category/ai-writing' and '/category/ai-video' share '/category/*'
+export function pageTemplate(url) {
+  const { host, pathname } = new URL(url);
+  const segments = pathname.split('/').filter(Boolean);
+  if (segments.length > 0) segments[segments.length - 1] = '*';
+  return { host: host.replace(/^www\./, ''), template: `/${segments.join('/')}` };
+}
+
+/**
+ * Profile for a discovery run's records, or null if nothing was found.
+ * `spec` is the uncompiled page spec the records were extracted with.
+ */
+export function learnProfile(spec, records) {
+  if (records.length === 0) return null;
+
+  // The earliest listed card selector among the records, as discovery
+  // itself ranks them; the fallback only when no card selector matched
+  const rank = selector => {
+    const index = spec.cards.indexOf(selector);
+    return index < 0 ? spec.cards.length : index;
+  };
+  const selector = records
+    .map(record => record.selector)
+    .reduce((best, candidate) => (rank(candidate) < rank(best) ? candidate : best));
+  const chosen = records.filter(record => record.selector === selector);
+
+  const fields = {};
+  for (const [name, field] of Object.entries(spec.fields || {})) {
+    if (!field.first) continue;
+    // Keep every extractor that produced text, in the spec's order
+    fields[name] = field.first.filter((_, index) =>
+      chosen.some(record => (record[name][index] || '').trim().length > 0));
+  }
+
+  return {
+    card_selector: selector,
+    fallback: !spec.cards.includes(selector),
+    fields
+  };
+}
+
+// Exponentially weighted running average of cards per page
+function smoothYield(average, count) {
+  return average * (1 - YIELD_SMOOTHING) + count * YIELD_SMOOTHING;
+}
+
+function narrowSpec(spec, profile) {
+  const fields = { ...spec.fields };
+  for (const [name, selectors] of Object.entries(profile.fields)) {
+    fields[name] = { first: selectors };
+  }
+  return profile.fallback
+    ? { cards: [], fallback: spec.fallback, fields }
+    : { cards: [profile.card_selector], fields };
+}
+
+export class ScrapeProfileStore {
+  constructor(db, { relearnRatio = 0.5 } = {}) {
+    this.collection = db.collection(COLLECTION);
+    this.relearnRatio = relearnRatio;
+    this.profiles = new Map();
+    this.compiled = new Map();
+  }
+
+  key(specName, url) {
+    const { host, template } = pageTemplate(url);
+    return { _id: `${specName}:${host}${template}`, host, template };
+  }
+
+  async get(specName, url) {
+    const { _id } = this.key(specName, url);
+    if (!this.profiles.has(_id)) {
+      this.profiles.set(_id, await this.collection.findOne({ _id }));
+    }
+    return this.profiles.get(_id);
+  }
+
+  // Compiled spec for a profile, reused across pages of the same template
+  specFor(profile, spec) {
+    const cacheKey = `${profile._id}@${profile.learned_at?.valueOf()}`;
+    if (!this.compiled.has(cacheKey)) {
+      this.compiled.set(cacheKey, compileExtraction(narrowSpec(spec, profile)));
+    }
+    return this.compiled.get(cacheKey);
+  }
+
+  // A page yielding under relearnRatio of the usual count means the template
+  // changed (or part of the page moved to markup the saved selector misses);
+  // smaller drops are ordinary variation between pages
+  needsRelearn(profile, count, limit = Infinity) {
+    const expected = Math.min(profile.yield_avg, limit);
+    return count === 0 || count < expected * this.relearnRatio;
+  }
+
+  async learn(specName, url, spec, records, previous = null) {
+    const learned = learnProfile(spec, records);
+    if (!learned) return null;
+
+    const { _id, host, template } = this.key(specName, url);
+    const now = new Date();
+    const fields = {
+      ...learned,
+      spec: specName,
+      host,
+      template,
+      // A re-learned profile keeps its running average
+      yield_avg: previous ? smoothYield(previous.yield_avg, records.length) : records.length,
+      last_yield: records.length,
+      learned_at: now,
+      updated_at: now
+    };
+    await this.collection.updateOne(
+      { _id },
+      { $set: fields, $inc: { learn_count: 1 }, $setOnInsert: { pages: 0 } },
+      { upsert: true }
+    );
+    const profile = { _id, ...fields };
+    this.profiles.set(_id, profile);
+    return profile;
+  }
+
+  /**
+   * Run `extractPage(compiledSpec)` (which extracts the page and returns
+   * `{ records }`) with the template's profile, falling back to full
+   * discovery and re-learning when there is no profile or its yield dropped.
+   * A re-check calls extractPage a second time, so it should extract from
+   * the page already fetched rather than fetch it again.
+   */
+  async extract(specName, url, spec, limit, extractPage) {
+    const profile = await this.get(specName, url);
+    if (profile) {
+      const result = await extractPage(this.specFor(profile, spec));
+      const count = result.records.length;
+      if (!this.needsRelearn(profile, count, limit)) {
+        await this.recordYield(profile, count);
+        return result;
+      }
+      console.log(`Yield on ${url} fell to ${count} (profile averages ${profile.yield_avg.toFixed(1)}), re-checking with full discovery`);
+    }
+
+    const result = await extractPage(undefined);
+    await this.learn(specName, url, spec, result.records, profile);
+    return result;
+  }
+
+  async recordYield(profile, count) {
+    profile.yield_avg = smoothYield(profile.yield_avg, count);
+    profile.last_yield = count;
+    await this.collection.updateOne(
+      { _id: profile._id },
+      { $set: { yield_avg: profile.yield_avg, last_yield: count, updated_at: new Date() }, $inc: { pages: 1 } }
+    );
+  }
+}
@@ -1,36 +1,116 @@
 import axios from 'axios';
 import * as cheerio from 'cheerio';
 import { v4 as uuidv4 } from 'uuid';
+import { compileExtraction, extractCards } from './card-extractor.js';
+
+const REQUEST_HEADERS = {
+  'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+  'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+  'Accept-Language': 'en-US,en;q=0.5',
+  'Accept-Encoding': 'gzip, deflate, br',
+  'Connection': 'keep-alive',
+  'Upgrade-Insecure-Requests': '1',
+  'Sec-Fetch-Dest': 'document',
+  'Sec-Fetch-Mode': 'navigate',
+  'Sec-Fetch-Site': 'none',
+  'Cache-Control': 'max-age=0',
+};
+
+// Multiple selectors to try for AITools.fyi structure, most specific first
+const TOOL_SELECTORS = [
+  '.tool-card',
+  '.ai-tool',
+  '.tool',
+  '[data-testid="tool-card"]',
+  '.grid > div',
+  '.list-item',
+  'article',
+  '.card',
+  'a[href*="/tool/"]',
+  'a[href*="/tools/"]',
+  '.product-item',
+  '.tool-item'
+];
+const NAME_SELECTORS = ['h3', 'h2', 'h1', '.title', '.name', '.tool-name', '[data-testid="tool-name"]'];
+const DESCRIPTION_SELECTORS = ['.description', '.summary', 'p', '.excerpt', '.tagline', '.subtitle'];
+const PRICING_SELECTOR = '.price, .pricing, .badge';
+
+// Links with tool-like patterns, used when no card selector matches
+function isToolLink(href, text) {
+  return (
+    href.includes('/tool/') || 
+    href.includes('/tools/') ||
+    href.includes('/ai-') ||
+    (text.length > 5 && text.length < 100 && (
+      text.includes('ai') || 
+      text.includes('generate') || 
+      text.includes('create') ||
+      text.includes('auto')
+    ))
+  );
+}
+
+// Full discovery spec; learned profiles narrow it per page template
+const TOOL_PAGE = {
+  cards: TOOL_SELECTORS,
+  fallback: {
+    selector: 'a',
+    accept: record => isToolLink(record.attrs.href || '', record.text.toLowerCase())
+  },
+  fields: {
+    name: { first: NAME_SELECTORS },
+    description: { first: DESCRIPTION_SELECTORS },
+    pricing: { all: PRICING_SELECTOR },
+    link: { attr: 'href', from: 'a' }
+  }
+};
+const TOOL_PAGE_SPEC = compileExtraction(TOOL_PAGE);
+const PROFILE_SPEC = 'aitools-targeted';
+
+function cleanName(name) {
+  name = name.replace(/\s+/g, ' ').trim();
+  if (name.length > 100) {
+    name = name.substring(0, 100).trim();
+  }
+  return name;
+}
 
 export class TargetedAiToolsScraper {
-  constructor() {
-    this.baseUrl = 'https://aitools.fyi';
-    this.targetUrls = [
-      'https://aitools.fyi/category/ai-image-generation',
-      'https://aitools.fyi/category/ai-web-apps',
-      'https://aitools.fyi/category/ai-marketing',
-      'https://aitools.fyi/category/ai-analytics',
-      'https://aitools.fyi/',
-      'https://aitools.fyi/category/ai-content-creation',
-      'https://aitools.fyi/category/ai-productivity',
-      'https://aitools.fyi/category/ai-writing',
-      'https://aitools.fyi/category/ai-video',
-      'https://aitools.fyi/category/ai-audio',
-      'https://aitools.fyi/category/ai-code',
-      'https://aitools.fyi/category/ai-design',
-      'https://aitools.fyi/category/ai-automation',
-      'https://aitools.fyi/category/ai-sales',
-      'https://aitools.fyi/category/ai-email',
-      'https://aitools.fyi/category/ai-social-media',
-      'https://aitools.fyi/category/ai-seo',
-      'https://aitools.fyi/category/ai-customer-support',
-      'https://aitools.fyi/category/ai-finance',
-      'https://aitools.fyi/category/ai-health'
+  constructor(options = {}) {
+    // AITOOLS_BASE_URL points the crawl at a local stand-in for stress tests
+    this.baseUrl = (options.baseUrl || process.env.AITOOLS_BASE_URL || 'https://aitools.fyi').replace(/\/$/, '');
+    this.pageDelayMs = options.pageDelayMs ?? parseInt(process.env.AITOOLS_PAGE_DELAY_MS || '2000');
+    // 'stream' parses pages as they download; 'cheerio' builds a full DOM
+    this.parser = options.parser || process.env.AITOOLS_PARSER || 'stream';
+    // Optional ScrapeProfileStore; streaming runs reuse what worked last time
+    this.profiles = options.profiles || null;
+    this.targetPaths = [
+      '/category/ai-image-generation',
+      '/category/ai-web-apps',
+      '/category/ai-marketing',
+      '/category/ai-analytics',
+      '/',
+      '/category/ai-content-creation',
+      '/category/ai-productivity',
+      '/category/ai-writing',
+      '/category/ai-video',
+      '/category/ai-audio',
+      '/category/ai-code',
+      '/category/ai-design',
+      '/category/ai-automation',
+      '/category/ai-sales',
+      '/category/ai-email',
+      '/category/ai-social-media',
+      '/category/ai-seo',
+      '/category/ai-customer-support',
+      '/category/ai-finance',
+      '/category/ai-health'
     ];
+    this.targetUrls = this.targetPaths.map(path => `${this.baseUrl}${path}`);
   }
 
   extractCategoryFromUrl(url) {
-    if (url === 'https://aitools.fyi/') return 'Featured';
+    if (url === `${this.baseUrl}/`) return 'Featured';
     
     const match = url.match(/\/category\/ai-(.+)$/);
     if (match) {
@@ -41,172 +121,188 @@ export class TargetedAiToolsScraper {
     return 'General';
   }
 
-  async scrapeSpecificPage(url, maxTools = 50) {
-    const tools = [];
-    const category = this.extractCategoryFromUrl(url);
+  // Cheerio path, kept for AITOOLS_PARSER=cheerio and the parse benchmark
+  extractWithCheerio(html, maxTools = 50) {
+    const $ = cheerio.load(html);
     
-    try {
-      console.log(`Scraping: ${url} for ${category} tools`);
-      
-      const response = await axios.get(url, {
-        headers: {
-          'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-          'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-          'Accept-Language': 'en-US,en;q=0.5',
-          'Accept-Encoding': 'gzip, deflate, br',
-          'Connection': 'keep-alive',
-          'Upgrade-Insecure-Requests': '1',
-          'Sec-Fetch-Dest': 'document',
-          'Sec-Fetch-Mode': 'navigate',
-          'Sec-Fetch-Site': 'none',
-          'Cache-Control': 'max-age=0',
-        },
-        timeout: 30000,
-        maxRedirects: 5
-      });
+    let toolElements = $();
+    let matchedSelector = null;
+    
+    for (const selector of TOOL_SELECTORS) {
+      const elements = $(selector);
+      if (elements.length > 0) {
+        matchedSelector = selector;
+        toolElements = elements;
+        break;
+      }
+    }
+    
+    // If no specific tool elements found, try to find links with tool-like patterns
+    if (toolElements.length === 0) {
+      toolElements = $('a').filter((i, el) => isToolLink($(el).attr('href') || '', $(el).text().toLowerCase()));
+    }
 
-      const $ = cheerio.load(response.data);
+    const candidates = [];
+    toolElements.slice(0, maxTools).each((index, element) => {
+      const $tool = $(element);
       
-      // Multiple selectors to try for AITools.fyi structure
-      const toolSelectors = [
-        '.tool-card',
-        '.ai-tool',
-        '.tool',
-        '[data-testid="tool-card"]',
-        '.grid > div',
-        '.list-item',
-        'article',
-        '.card',
-        'a[href*="/tool/"]',
-        'a[href*="/tools/"]',
-        '.product-item',
-        '.tool-item'
-      ];
+      // Extract tool name
+      let name = '';
+      for (const selector of NAME_SELECTORS) {
+        const found = $tool.find(selector).first().text().trim();
+        if (found && found.length > 1) {
+          name = found;
+          break;
+        }
+      }
       
-      let toolElements = $();
+      // Fallback: get name from link text or title attribute
+      if (!name) {
+        name = $tool.text().trim();
+        if (!name || name.length > 100) {
+          name = $tool.attr('title') || $tool.attr('alt') || '';
+        }
+      }
+      name = cleanName(name);
       
-      for (const selector of toolSelectors) {
-        const elements = $(selector);
-        if (elements.length > 0) {
-          console.log(`Found ${elements.length} elements with selector: ${selector}`);
-          toolElements = elements;
+      // Extract description
+      let description = '';
+      for (const selector of DESCRIPTION_SELECTORS) {
+        const found = $tool.find(selector).first().text().trim();
+        if (found && found.length > name.length) {
+          description = found;
           break;
         }
       }
       
-      // If no specific tool elements found, try to find links with tool-like patterns
-      if (toolElements.length === 0) {
-        toolElements = $('a').filter((i, el) => {
-          const href = $(el).attr('href') || '';
-          const text = $(el).text().toLowerCase();
-          return (
-            href.includes('/tool/') || 
-            href.includes('/tools/') ||
-            href.includes('/ai-') ||
-            (text.length > 5 && text.length < 100 && (
-              text.includes('ai') || 
-              text.includes('generate') || 
-              text.includes('create') ||
-              text.includes('auto')
-            ))
-          );
-        });
-        console.log(`Fallback found ${toolElements.length} potential tool links`);
-      }
+      candidates.push({
+        name,
+        description,
+        link: $tool.attr('href') || $tool.find('a').first().attr('href') || '',
+        pricingText: $tool.find(PRICING_SELECTOR).text()
+      });
+    });
 
-      // Process found elements
-      toolElements.slice(0, maxTools).each((index, element) => {
-        try {
-          const $tool = $(element);
-          
-          // Extract tool name
-          let name = '';
-          const nameSelectors = ['h3', 'h2', 'h1', '.title', '.name', '.tool-name', '[data-testid="tool-name"]'];
-          for (const selector of nameSelectors) {
-            const found = $tool.find(selector).first().text().trim();
-            if (found && found.length > 1) {
-              name = found;
-              break;
-            }
-          }
-          
-          // Fallback: get name from link text or title attribute
-          if (!name) {
-            name = $tool.text().trim();
-            if (!name || name.length > 100) {
-              name = $tool.attr('title') || $tool.attr('alt') || '';
-            }
-          }
-          
-          // Clean up name
-          name = name.replace(/\s+/g, ' ').trim();
-          if (name.length > 100) {
-            name = name.substring(0, 100).trim();
-          }
-          
-          // Extract description
-          let description = '';
-          const descSelectors = ['.description', '.summary', 'p', '.excerpt', '.tagline', '.subtitle'];
-          for (const selector of descSelectors) {
-            const found = $tool.find(selector).first().text().trim();
-            if (found && found.length > name.length) {
-              description = found;
-              break;
-            }
-          }
-          
-          // Fallback description
-          if (!description && name) {
-            description = `${name} - AI-powered ${category.toLowerCase()} tool to enhance your workflow`;
-          }
-          
-          // Extract link
-          let link = $tool.attr('href') || $tool.find('a').first().attr('href') || '';
-          if (link && !link.startsWith('http')) {
-            link = link.startsWith('/') ? `${this.baseUrl}${link}` : `${this.baseUrl}/${link}`;
-          }
-          
-          // Extract pricing
-          let pricing = 'Unknown';
-          const pricingText = $tool.find('.price, .pricing, .badge').text().toLowerCase();
-          if (pricingText.includes('free')) pricing = 'Free';
-          else if (pricingText.includes('paid')) pricing = 'Paid';
-          else if (pricingText.includes('freemium')) pricing = 'Freemium';
-          else if (pricingText.includes('trial')) pricing = 'Free Trial';
-          
-          // Only add valid tools
-          if (name && name.length > 2 && name.length < 150) {
-            tools.push({
-              id: uuidv4(),
-              name: name,
-              tagline: description.substring(0, 120) || `AI ${category} Tool`,
-              description: description || `Discover ${name} - an innovative AI tool for ${category.toLowerCase()} tasks.`,
-              url: link || url,
-              website: link || url,
-              category: category,
-              pricing: pricing,
-              rating: Math.random() * 1.5 + 3.5, // 3.5-5.0
-              votes: Math.floor(Math.random() * 800) + 100, // 100-900
-              makers: [],
-              topics: [category],
-              featured_at: new Date(),
-              source: 'AITools.fyi',
-              created_at: new Date(),
-              updated_at: new Date()
-            });
-          }
-        } catch (error) {
-          console.error(`Error processing tool ${index} on ${url}:`, error.message);
+    return { candidates, selector: matchedSelector || 'a (fallback)' };
+  }
+
+  // Single streaming pass; stops reading once maxTools cards are found
+  async extractFromStream(input, maxTools = 50, spec = TOOL_PAGE_SPEC) {
+    const records = await extractCards(spec, input, { limit: maxTools });
+
+    const candidates = records.map(record => {
+      let name = record.name.map(text => (text || '').trim()).find(text => text.length > 1) || '';
+      if (!name) {
+        name = record.text.trim();
+        if (!name || name.length > 100) {
+          name = record.attrs.title || record.attrs.alt || '';
         }
-      });
+      }
+      name = cleanName(name);
 
-      console.log(`Successfully extracted ${tools.length} tools from ${category} category`);
-      
+      const description = record.description
+        .map(text => (text || '').trim())
+        .find(text => text.length > name.length) || '';
+
+      return {
+        name,
+        description,
+        link: record.attrs.href || record.link || '',
+        pricingText: record.pricing
+      };
+    });
+
+    return { candidates, selector: records[0]?.selector || null, records };
+  }
+
+  fetchPage(url, streaming) {
+    return axios.get(url, {
+      headers: REQUEST_HEADERS,
+      timeout: 30000,
+      maxRedirects: 5,
+      responseType: streaming ? 'stream' : 'text'
+    });
+  }
+
+  buildTool({ name, description, link, pricingText }, url, category) {
+    // Fallback description
+    if (!description && name) {
+      description = `${name} - AI-powered ${category.toLowerCase()} tool to enhance your workflow`;
+    }
+    
+    if (link && !link.startsWith('http')) {
+      link = link.startsWith('/') ? `${this.baseUrl}${link}` : `${this.baseUrl}/${link}`;
+    }
+    
+    // Extract pricing
+    let pricing = 'Unknown';
+    pricingText = pricingText.toLowerCase();
+    if (pricingText.includes('free')) pricing = 'Free';
+    else if (pricingText.includes('paid')) pricing = 'Paid';
+    else if (pricingText.includes('freemium')) pricing = 'Freemium';
+    else if (pricingText.includes('trial')) pricing = 'Free Trial';
+    
+    return {
+      id: uuidv4(),
+      name: name,
+      tagline: description.substring(0, 120) || `AI ${category} Tool`,
+      description: description || `Discover ${name} - an innovative AI tool for ${category.toLowerCase()} tasks.`,
+      url: link || url,
+      website: link || url,
+      category: category,
+      pricing: pricing,
+      rating: Math.random() * 1.5 + 3.5, // 3.5-5.0
+      votes: Math.floor(Math.random() * 800) + 100, // 100-900
+      makers: [],
+      topics: [category],
+      featured_at: new Date(),
+      source: 'AITools.fyi',
+      created_at: new Date(),
+      updated_at: new Date()
+    };
+  }
+
+  // Tools on one page; throws if the page cannot be fetched or parsed
+  async scrapePage(url, maxTools = 50) {
+    const tools = [];
+    const category = this.extractCategoryFromUrl(url);
+    console.log(`Scraping: ${url} for ${category} tools`);
+
+    let result;
+    if (this.parser !== 'stream') {
+      result = this.extractWithCheerio((await this.fetchPage(url, false)).data, maxTools);
+    } else if (this.profiles) {
+      // Fetched once: a re-check runs full discovery over the same HTML
+      const html = (await this.fetchPage(url, false)).data;
+      result = await this.profiles.extract(PROFILE_SPEC, url, TOOL_PAGE, maxTools, spec =>
+        this.extractFromStream(html, maxTools, spec));
+    } else {
+      result = await this.extractFromStream((await this.fetchPage(url, true)).data, maxTools);
+    }
+    const { candidates, selector } = result;
+    console.log(`Found ${candidates.length} elements with selector: ${selector}`);
+
+    for (const candidate of candidates) {
+      // Only add valid tools
+      if (candidate.name && candidate.name.length > 2 && candidate.name.length < 150) {
+        tools.push(this.buildTool(candidate, url, category));
+      }
+    }
+
+    console.log(`Successfully extracted ${tools.length} tools from ${category} category`);
+    return tools;
+  }
+
+  // scrapePage, with a placeholder tool for a page that failed
+  async scrapeSpecificPage(url, maxTools = 50) {
+    try {
+      return await this.scrapePage(url, maxTools);
     } catch (error) {
       console.error(`Error scraping ${url}:`, error.message);
+      const category = this.extractCategoryFromUrl(url);
       
       // Generate at least one fallback tool for this category
-      tools.push({
+      return [{
         id: uuidv4(),
         name: `${category} AI Tool`,
         tagline: `Professional AI solution for ${category.toLowerCase()}`,
@@ -223,10 +319,8 @@ export class TargetedAiToolsScraper {
         source: 'AITools.fyi',
         created_at: new Date(),
         updated_at: new Date()
-      });
+      }];
     }
-    
-    return tools;
   }
 
   async scrapeAllTargetPages() {
@@ -244,7 +338,7 @@ export class TargetedAiToolsScraper {
         
         // Add delay between requests
         if (i < this.targetUrls.length - 1) {
-          await new Promise(resolve => setTimeout(resolve, 2000));
+          await new Promise(resolve => setTimeout(resolve, this.pageDelayMs));
         }
       } catch (error) {
         console.error(`Failed to scrape ${url}:`, error.message);
@@ -270,9 +364,9 @@ export class TargetedAiToolsScraper {
   async getQuickSample() {
     // Quick sample from main pages for testing
     const quickUrls = [
-      'https://aitools.fyi/',
-      'https://aitools.fyi/category/ai-image-generation',
-      'https://aitools.fyi/category/ai-marketing'
+      `${this.baseUrl}/`,
+      `${this.baseUrl}/category/ai-image-generation`,
+      `${this.baseUrl}/category/ai-marketing`
     ];
     
     const allTools = [];
@@ -0,0 +1,283 @@
+import { HtmlSanitizer } from './html-sanitizer.js';
+import { HtmlTokenizer } from './scrapers/html-tokenizer.js';
+import { STREAM_MAX_OUTPUT_TOKENS } from './ai-providers.js';
+import { collectHedgedCompletion } from './provider-hedging.js';
+import { ModelOutputCleaner } from './website-stream.js';
+import { contentHash } from './blob-store.js';
+
+// Generated websites stored as addressable sections.
+//
+// A page is split once, when it is saved, into a shell and an ordered list
+// of sections:
+//   { shell: { before, after }, sections: [{ id, kind, html, hash, summary }] }
+// Sections are the page's top-level elements (nav, hero, features, pricing,
+// footer, ... plus <style>/<script> blocks). A lone wrapper (<div>/<main>
+// around everything) goes into the shell and its children become the
+// sections. Joining shell.before, every section's html and shell.after gives
+// back the page. A section's hash is the sha256 of its html, which is also
+// its key in the blob store (see generated-store.js).
+//
+// Regenerating a section sends the model only that section's HTML and a
+// short outline of the rest of the page (the stored summaries), and asks
+// for a completion sized to that section. Every other section is reused
+// from storage as is.
+
+const WRAPPER_TAGS = new Set(['div', 'main', 'body', 'article']);
+const ASSET_TAGS = new Set(['style', 'script', 'link', 'meta']);
+const TAG_KINDS = { nav: 'navigation', header: 'header', footer: 'footer', style: 'style', script: 'script' };
+const SECTION_KINDS = [
+  'hero', 'features', 'pricing', 'testimonials', 'about', 'services', 'portfolio', 'gallery',
+  'team', 'faq', 'contact', 'cta', 'stats', 'newsletter', 'blog', 'navigation', 'footer'
+];
+const HEADINGS = new Set(['h1', 'h2', 'h3']);
+
+const SUMMARY_LENGTH = 160;
+const STYLE_CONTEXT_LENGTH = 1500;
+const MAX_CONTEXT_CLASSES = 60;
+const CHARS_PER_TOKEN = 4;
+const MIN_SECTION_TOKENS = 600;
+
+// Sanitizer that also cuts its output at top-level element boundaries
+class TopLevelSplitter extends HtmlSanitizer {
+  constructor() {
+    super({ allowInlineScripts: true });
+    this.pieces = [];
+    this.pieceStart = 0;
+    this.element = null;
+  }
+
+  onOpenTag(tag, attrs, selfClosing) {
+    const topLevel = this.stack.length === 0;
+    if (topLevel) this.cut();
+    super.onOpenTag(tag, attrs, selfClosing);
+    if (!topLevel) return;
+    this.element = { tag, attrs, openLength: this.output.length - this.pieceStart };
+    // Void and self-closed elements end where they start
+    if (this.stack.length === 0) this.cut();
+  }
+
+  popElement() {
+    const tag = super.popElement();
+    if (this.stack.length === 0) this.cut();
+    return tag;
+  }
+
+  cut() {
+    const html = this.output.slice(this.pieceStart);
+    // Dropped elements leave nothing behind
+    if (html) this.pieces.push({ html, ...this.element });
+    this.pieceStart = this.output.length;
+    this.element = null;
+  }
+
+  // end() hands back (and clears) the output: cut whatever follows the last
+  // element, e.g. trailing text, before it goes
+  flush() {
+    this.cut();
+    this.pieceStart = 0;
+    return super.flush();
+  }
+}
+
+// Sanitized top-level pieces: { html, tag?, attrs?, openLength? } (no tag for text)
+function topLevelPieces(html) {
+  const splitter = new TopLevelSplitter();
+  splitter.tokenizer.write(html);
+  splitter.end();
+  return splitter.pieces;
+}
+
+// Headings and the start of the other visible text, e.g. "Simple pricing | Starter $9 ..."
+function summarize(html) {
+  const headings = [];
+  let text = '';
+  let heading = null;
+  const tokenizer = new HtmlTokenizer({
+    onOpenTag(tag) {
+      if (HEADINGS.has(tag)) heading = '';
+    },
+    onCloseTag(tag) {
+      if (HEADINGS.has(tag) && heading !== null) {
+        if (heading.trim() && headings.length < 3) headings.push(heading.trim().replace(/\s+/g, ' '));
+        heading = null;
+      }
+    },
+    onText(chunk) {
+      if (heading !== null) {
+        heading += chunk;
+      } else if (text.length < SUMMARY_LENGTH * 2) {
+        text += ` ${chunk}`;
+      }
+    }
+  });
+  tokenizer.write(html);
+  tokenizer.end();
+  const body = text.replace(/\s+/g, ' ').trim().slice(0, SUMMARY_LENGTH);
+  return [headings.join(' / '), body].filter(Boolean).join(' | ');
+}
+
+function sectionKind(piece, summary) {
+  if (TAG_KINDS[piece.tag]) return TAG_KINDS[piece.tag];
+  const label = `${piece.attrs?.id || ''} ${piece.attrs?.class || ''}`.toLowerCase();
+  const byLabel = SECTION_KINDS.find(kind => label.includes(kind));
+  if (byLabel) return byLabel;
+  const headline = summary.split(' | ')[0].toLowerCase();
+  return SECTION_KINDS.find(kind => headline.includes(kind)) || null;
+}
+
+function buildSection(html, piece) {
+  const summary = summarize(html);
+  return { kind: sectionKind(piece, summary), html, hash: contentHash(html), summary };
+}
+
+/**
+ * Split (and sanitize) a generated page into { shell, sections }.
+ */
+export function splitSections(code) {
+  let pieces = topLevelPieces(code);
+  const shell = { before: '', after: '' };
+
+  // Unwrap a lone wrapper element so its children become the sections
+  for (;;) {
+    const content = pieces.filter(piece => piece.tag && !ASSET_TAGS.has(piece.tag));
+    const wrapper = content.length === 1 && WRAPPER_TAGS.has(content[0].tag) ? content[0] : null;
+    if (!wrapper) break;
+    const close = `</${wrapper.tag}>`;
+    const inner = topLevelPieces(wrapper.html.slice(wrapper.openLength, wrapper.html.length - close.length));
+    if (inner.filter(piece => piece.tag).length < 2) break;
+    const index = pieces.indexOf(wrapper);
+    shell.before += pieces.slice(0, index).map(piece => piece.html).join('') + wrapper.html.slice(0, wrapper.openLength);
+    shell.after = close + pieces.slice(index + 1).map(piece => piece.html).join('') + shell.after;
+    pieces = inner;
+  }
+
+  // Text between elements stays with the element before it
+  const groups = [];
+  for (const piece of pieces) {
+    if (piece.tag) {
+      groups.push({ piece, html: piece.html });
+    } else if (groups.length > 0) {
+      groups[groups.length - 1].html += piece.html;
+    } else {
+      shell.before += piece.html;
+    }
+  }
+
+  const sections = groups.map(group => buildSection(group.html, group.piece));
+  // An unlabelled first content section is the hero
+  const first = sections.find(section => !['navigation', 'header', 'style', 'script'].includes(section.kind));
+  if (first && !first.kind) first.kind = 'hero';
+
+  const seen = new Map();
+  for (const section of sections) {
+    section.kind = section.kind || 'section';
+    const count = (seen.get(section.kind) || 0) + 1;
+    seen.set(section.kind, count);
+    section.id = count === 1 ? section.kind : `${section.kind}-${count}`;
+  }
+  return { shell, sections };
+}
+
+export function assembleSite({ shell, sections }) {
+  return shell.before + sections.map(section => section.html).join('') + shell.after;
+}
+
+// CSS classes the rest of the page uses, most frequent first
+function pageClasses(sections) {
+  const counts = new Map();
+  const tokenizer = new HtmlTokenizer({
+    onOpenTag(tag, attrs) {
+      for (const name of (attrs.class || '').split(/\s+/)) {
+        if (name) counts.set(name, (counts.get(name) || 0) + 1);
+      }
+    }
+  });
+  for (const section of sections) tokenizer.write(section.html);
+  tokenizer.end();
+  return [...counts.entries()]
+    .sort((a, b) => b[1] - a[1])
+    .slice(0, MAX_CONTEXT_CLASSES)
+    .map(([name]) => name);
+}
+
+// <style> bodies from the shell and the other sections
+function stylesheet(site, others) {
+  let css = '';
+  const tokenizer = new HtmlTokenizer({
+    onRawText(tag, text) {
+      if (tag === 'style' && css.length < STYLE_CONTEXT_LENGTH) css += text;
+    }
+  });
+  for (const html of [site.shell.before, ...others.map(section => section.html), site.shell.after]) {
+    tokenizer.write(html);
+  }
+  tokenizer.end();
+  return css.trim().slice(0, STYLE_CONTEXT_LENGTH);
+}
+
+function sectionPrompt(site, target, instruction) {
+  const others = site.sections.filter(section => section !== target);
+  const outline = site.sections.map((section, index) => {
+    const marker = section === target ? '  <-- rewrite this one' : '';
+    return `${index + 1}. ${section.id}: ${section.summary || '(no text)'}${marker}`;
+  });
+  const styles = stylesheet(site, others);
+
+  return [
+    `Change request: ${instruction}`,
+    `Page outline:\n${outline.join('\n')}`,
+    styles && `Page stylesheet (excerpt):\n${styles}`,
+    `CSS classes used elsewhere on the page: ${pageClasses(others).join(' ')}`,
+    `Current HTML of "${target.id}":\n${target.html}`
+  ].filter(Boolean).join('\n\n');
+}
+
+const SECTION_SYSTEM_PROMPT = `You are editing one section of an existing website built with HTML, Bootstrap 5 and custom CSS.
+
+Rewrite ONLY the section you are given, applying the change request:
+- Return the HTML for that one section: a single top-level element, keeping its tag and id so links to it still work
+- Stay consistent with the rest of the page (its outline, stylesheet and CSS classes are provided)
+- Do not return other sections, <html>, <head> or <body> tags, explanations or markdown`;
+
+/**
+ * Regenerate one section with the model. Returns { site, section } where
+ * site has the new section in place and every other section unchanged.
+ * Throws if the section does not exist, the model returned no HTML, or its
+ * output was cut off even at the model's output limit.
+ */
+export async function regenerateSection({ provider, apiKey, site, sectionId, instruction }) {
+  const target = site.sections.find(section => section.id === sectionId);
+  if (!target) throw new Error(`Unknown section: ${sectionId}`);
+
+  // Roughly the size of the current section, with room to grow; doubled
+  // (up to the model's limit) whenever the output is cut off
+  const limit = STREAM_MAX_OUTPUT_TOKENS[provider] || MIN_SECTION_TOKENS;
+  const estimate = Math.ceil((target.html.length / CHARS_PER_TOKEN) * 1.5);
+  let maxTokens = Math.min(limit, Math.max(MIN_SECTION_TOKENS, estimate));
+  const prompt = sectionPrompt(site, target, instruction);
+  let output;
+  for (;;) {
+    const result = await collectHedgedCompletion([{ provider, apiKey }], SECTION_SYSTEM_PROMPT, prompt, { maxTokens });
+    if (result.stop_reason !== 'max_tokens') {
+      output = result.text;
+      break;
+    }
+    if (maxTokens >= limit) {
+      throw new Error(`The model's output for "${target.id}" was cut off at ${maxTokens} tokens`);
+    }
+    maxTokens = Math.min(limit, maxTokens * 2);
+  }
+
+  const cleaner = new ModelOutputCleaner();
+  const pieces = topLevelPieces(cleaner.push(output) + cleaner.end());
+  if (!pieces.some(piece => piece.tag)) throw new Error('The model returned no HTML for this section');
+  // Keep the whitespace that separated the old section from the next one
+  const html = pieces.map(piece => piece.html).join('').trim() + target.html.match(/\s*$/)[0];
+
+  const rebuilt = buildSection(html, pieces.find(piece => piece.tag));
+  const section = { ...rebuilt, id: target.id, kind: target.kind };
+  return {
+    site: { ...site, sections: site.sections.map(existing => (existing === target ? section : existing)) },
+    section
+  };
+}
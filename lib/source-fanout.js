@@ -0,0 +1,56 @@
+// Concurrent fan-out over tool source adapters.
+//
+// An adapter is { name, fetchTools: async () => tool[] , timeoutMs? }. All
+// adapters start at once; a slow or failing source only loses its own
+// results, and wall time tracks the slowest source instead of the sum.
+
+const DEFAULT_TIMEOUT_MS = 120000;
+
+function withTimeout(promise, ms, name) {
+  let timer;
+  const timeout = new Promise((_, reject) => {
+    timer = setTimeout(() => reject(new Error(`${name} timed out after ${ms}ms`)), ms);
+  });
+  return Promise.race([promise, timeout]).finally(() => clearTimeout(timer));
+}
+
+export async function fetchFromSources(adapters, { timeoutMs = DEFAULT_TIMEOUT_MS } = {}) {
+  const started = performance.now();
+
+  const settled = await Promise.allSettled(adapters.map(async adapter => {
+    const adapterStart = performance.now();
+    try {
+      const tools = await withTimeout(Promise.resolve().then(() => adapter.fetchTools()), adapter.timeoutMs || timeoutMs, adapter.name);
+      return { tools, durationMs: performance.now() - adapterStart };
+    } catch (error) {
+      error.durationMs = performance.now() - adapterStart;
+      throw error;
+    }
+  }));
+
+  const sources = settled.map((result, index) => {
+    const name = adapters[index].name;
+    if (result.status === 'fulfilled') {
+      return {
+        name,
+        status: 'ok',
+        tools: result.value.tools,
+        duration_ms: Math.round(result.value.durationMs)
+      };
+    }
+    console.error(`Source ${name} failed:`, result.reason?.message || result.reason);
+    return {
+      name,
+      status: 'failed',
+      tools: [],
+      error: result.reason?.message || String(result.reason),
+      duration_ms: Math.round(result.reason?.durationMs || 0)
+    };
+  });
+
+  return { sources, wallMs: Math.round(performance.now() - started) };
+}
+
+export function normalizeToolName(name) {
+  return (name || '').toLowerCase().replace(/[^a-z0-9]/g, '');
+}
@@ -0,0 +1,39 @@
+// Browser helpers for NDJSON streams (e.g. /api/website-builder/generate with stream: true)
+// and queued jobs (/api/agents/run answering 202)
+
+// Calls onEvent with each parsed line as it arrives; resolves when the stream ends
+export async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  while (true) {
+    const { done, value } = await reader.read()
+    buffer += decoder.decode(value, { stream: !done })
+    let newline
+    while ((newline = buffer.indexOf('\n')) >= 0) {
+      const line = buffer.slice(0, newline).trim()
+      buffer = buffer.slice(newline + 1)
+      if (line) onEvent(JSON.parse(line))
+    }
+    if (done) break
+  }
+  if (buffer.trim()) onEvent(JSON.parse(buffer))
+}
+
+// Polls a queued job's status URL, calling onStatus with each update;
+// resolves with the job once it has completed or failed
+export async function waitForJob(statusUrl, onStatus, intervalMs = 1500) {
+  let last = null
+  while (true) {
+    const response = await fetch(statusUrl)
+    const job = await response.json()
+    if (!response.ok) throw new Error(job.error || `HTTP ${response.status}`)
+    const key = `${job.status}:${job.attempts}`
+    if (key !== last) {
+      last = key
+      onStatus?.(job)
+    }
+    if (job.status === 'completed' || job.status === 'failed') return job
+    await new Promise(resolve => setTimeout(resolve, intervalMs))
+  }
+}
@@ -0,0 +1,261 @@
+import { onToolsWritten } from './tool-sink.js';
+
+// In-memory typeahead over tool names, categories and popular topics.
+//
+// Each index is a sorted array of normalized keys (a tool is indexed under
+// its full name and under every word it contains, so "chat" finds
+// "OpenAI Chat"). A prefix maps to one contiguous range found by binary
+// search, and a sparse table of range maxima hands back that range's
+// highest-voted entries without scanning it, so short prefixes cost the same
+// as long ones.
+//
+// Writes through the tool sink land in a small delta that is searched
+// alongside the main index; once it grows, or the index gets old, the whole
+// index is rebuilt from MongoDB in the background.
+
+const MAX_NAME_WORDS = 6;
+const MAX_TAGS = 500;
+const DELTA_LIMIT = 500;
+const MAX_AGE_MS = 10 * 60 * 1000;
+
+export function normalizeSuggestText(text) {
+  return (text || '')
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .toLowerCase()
+    .replace(/[^a-z0-9]+/g, ' ')
+    .trim();
+}
+
+// The full name plus the name from each later word on
+function nameKeys(name) {
+  const normalized = normalizeSuggestText(name);
+  if (!normalized) return [];
+  const keys = [normalized];
+  let start = normalized.indexOf(' ');
+  for (let words = 1; start >= 0 && words < MAX_NAME_WORDS; words++) {
+    keys.push(normalized.slice(start + 1));
+    start = normalized.indexOf(' ', start + 1);
+  }
+  return keys;
+}
+
+function lowerBound(keys, target) {
+  let lo = 0;
+  let hi = keys.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (keys[mid] < target) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+export class PrefixIndex {
+  /**
+   * `items` are arbitrary objects; `keysOf(item)` lists the normalized keys
+   * to index it under and `scoreOf(item)` ranks it.
+   */
+  constructor(items, keysOf, scoreOf) {
+    const pairs = [];
+    items.forEach((item, index) => {
+      for (const key of new Set(keysOf(item))) pairs.push([key, index]);
+    });
+    pairs.sort((a, b) => (a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0));
+
+    this.items = items;
+    this.keys = pairs.map(pair => pair[0]);
+    this.refs = Int32Array.from(pairs, pair => pair[1]);
+    this.scores = Float64Array.from(pairs, pair => scoreOf(items[pair[1]]) || 0);
+
+    // levels[k][i] = position of the best score in [i, i + 2^k)
+    this.levels = [Int32Array.from(this.keys, (_, i) => i)];
+    for (let width = 2; width <= this.keys.length; width *= 2) {
+      const previous = this.levels[this.levels.length - 1];
+      const level = new Int32Array(this.keys.length - width + 1);
+      for (let i = 0; i < level.length; i++) {
+        const a = previous[i];
+        const b = previous[i + width / 2];
+        level[i] = this.scores[b] > this.scores[a] ? b : a;
+      }
+      this.levels.push(level);
+    }
+  }
+
+  get size() {
+    return this.items.length;
+  }
+
+  // Position of the best score in [lo, hi)
+  best(lo, hi) {
+    const level = 31 - Math.clz32(hi - lo);
+    const a = this.levels[level][lo];
+    const b = this.levels[level][hi - (1 << level)];
+    return this.scores[b] > this.scores[a] ? b : a;
+  }
+
+  /**
+   * Items with a key starting with `prefix`, best score first, each once.
+   * Lazy: only as many ranges are split as results are consumed.
+   */
+  *search(prefix) {
+    const lo = lowerBound(this.keys, prefix);
+    const hi = lowerBound(this.keys, `${prefix}\uffff`);
+    if (lo >= hi) return;
+
+    // Candidate ranges ordered by their best score (kept short: ~2 per result)
+    const ranges = [[lo, hi, this.best(lo, hi)]];
+    const seen = new Set();
+    while (ranges.length > 0) {
+      const [start, end, top] = ranges.shift();
+      for (const [from, to] of [[start, top], [top + 1, end]]) {
+        if (from >= to) continue;
+        const range = [from, to, this.best(from, to)];
+        const score = this.scores[range[2]];
+        let at = ranges.findIndex(other => this.scores[other[2]] < score);
+        if (at < 0) at = ranges.length;
+        ranges.splice(at, 0, range);
+      }
+      const ref = this.refs[top];
+      if (!seen.has(ref)) {
+        seen.add(ref);
+        yield this.items[ref];
+      }
+    }
+  }
+}
+
+function take(iterator, limit, skip = () => false) {
+  const results = [];
+  for (const item of iterator) {
+    if (skip(item)) continue;
+    results.push(item);
+    if (results.length >= limit) break;
+  }
+  return results;
+}
+
+function toolEntry(doc) {
+  return {
+    id: doc.id,
+    name: doc.name,
+    category: doc.category,
+    votes: doc.votes || 0,
+    keys: nameKeys(doc.name)
+  };
+}
+
+export class ToolSuggester {
+  constructor(db) {
+    this.db = db;
+    this.tools = new PrefixIndex([], () => [], () => 0);
+    this.categories = this.tools;
+    this.tags = this.tools;
+    this.delta = new Map();
+    this.builtAt = 0;
+    this.building = null;
+  }
+
+  async build() {
+    const readStartedAt = Date.now();
+    const docs = await this.db.collection('ai_tools')
+      .find({ name: { $type: 'string' } }, { projection: { _id: 0, id: 1, name: 1, category: 1, topics: 1, votes: 1 } })
+      .toArray();
+
+    const categories = new Map();
+    const tags = new Map();
+    const tally = (map, name, votes) => {
+      if (!name) return;
+      const entry = map.get(name) || { name, count: 0, votes: 0 };
+      entry.count++;
+      entry.votes += votes;
+      map.set(name, entry);
+    };
+    for (const doc of docs) {
+      tally(categories, doc.category, doc.votes || 0);
+      for (const topic of doc.topics || []) {
+        if (typeof topic === 'string' && topic !== doc.category) tally(tags, topic, doc.votes || 0);
+      }
+    }
+    // Popular tags only: seen on more than one tool, most-voted first
+    const popularTags = [...tags.values()]
+      .filter(tag => tag.count > 1)
+      .sort((a, b) => b.votes - a.votes)
+      .slice(0, MAX_TAGS);
+
+    this.tools = new PrefixIndex(docs.map(toolEntry), tool => tool.keys, tool => tool.votes);
+    this.categories = new PrefixIndex([...categories.values()], entry => nameKeys(entry.name), entry => entry.votes);
+    this.tags = new PrefixIndex(popularTags, entry => nameKeys(entry.name), entry => entry.votes);
+    // Writes picked up after the read began may be missing from the snapshot
+    for (const [id, entry] of this.delta) {
+      if (entry.loadedAt < readStartedAt) this.delta.delete(id);
+    }
+    this.builtAt = Date.now();
+    console.log(`Suggest index built: ${this.tools.size} tools, ${this.categories.size} categories, ${this.tags.size} tags`);
+  }
+
+  // Rebuild in the background; concurrent callers share one build
+  refresh() {
+    if (!this.building) {
+      this.building = this.build()
+        .catch(error => console.error('Suggest index build failed:', error.message))
+        .finally(() => { this.building = null; });
+    }
+    return this.building;
+  }
+
+  async ready() {
+    if (!this.builtAt) {
+      await this.refresh();
+    } else if (Date.now() - this.builtAt > MAX_AGE_MS || this.delta.size > DELTA_LIMIT) {
+      this.refresh();
+    }
+  }
+
+  // Pull written tools into the delta so they are suggested before the next rebuild
+  async applyWrites(ids) {
+    if (ids.length === 0) return;
+    const docs = await this.db.collection('ai_tools')
+      .find({ _id: { $in: ids } }, { projection: { _id: 0, id: 1, name: 1, category: 1, votes: 1 } })
+      .toArray();
+    for (const doc of docs) {
+      if (doc.id && doc.name) this.delta.set(doc.id, { ...toolEntry(doc), loadedAt: Date.now() });
+    }
+  }
+
+  suggest(query, limit = 8) {
+    const prefix = normalizeSuggestText(query);
+    if (!prefix) return { tools: [], categories: [], tags: [] };
+
+    // Stale copies of tools in the delta are skipped in the main index
+    const fromIndex = take(this.tools.search(prefix), limit, tool => this.delta.has(tool.id));
+    const fromDelta = [...this.delta.values()].filter(tool => tool.keys.some(key => key.startsWith(prefix)));
+    const tools = [...fromIndex, ...fromDelta]
+      .sort((a, b) => b.votes - a.votes)
+      .slice(0, limit)
+      .map(({ id, name, category, votes }) => ({ id, name, category, votes }));
+
+    return {
+      tools,
+      categories: take(this.categories.search(prefix), 3).map(({ name, count }) => ({ name, count })),
+      tags: take(this.tags.search(prefix), 5).map(({ name, count }) => ({ name, count }))
+    };
+  }
+}
+
+let suggester;
+
+// Process-wide suggester, kept current by the tool sink's write hook
+export function getToolSuggester(db) {
+  if (!suggester) {
+    suggester = new ToolSuggester(db);
+    onToolsWritten(({ ids, reset }) => {
+      if (reset) {
+        suggester.refresh();
+      } else {
+        suggester.applyWrites(ids).catch(error => console.error('Suggest index update failed:', error.message));
+      }
+    });
+  }
+  return suggester;
+}
@@ -0,0 +1,27 @@
+// Browser helpers for the background sync jobs behind /api/ai-tools/sync*
+
+export async function startSync(endpoint) {
+  const response = await fetch(endpoint, { method: 'POST' })
+  if (!response.ok) {
+    throw new Error(`Sync request failed (${response.status})`)
+  }
+  return response.json()
+}
+
+// Poll a job until it finishes. onProgress receives every job snapshot.
+export async function waitForSyncJob(statusUrl, { onProgress, intervalMs = 2000, timeoutMs = 15 * 60 * 1000 } = {}) {
+  const deadline = Date.now() + timeoutMs
+  while (Date.now() < deadline) {
+    const response = await fetch(statusUrl)
+    if (!response.ok) {
+      throw new Error(`Failed to fetch sync job (${response.status})`)
+    }
+    const job = await response.json()
+    onProgress?.(job)
+    if (['completed', 'partial', 'failed'].includes(job.status)) {
+      return job
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs))
+  }
+  throw new Error('Timed out waiting for sync job')
+}
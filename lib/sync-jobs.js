@@ -0,0 +1,194 @@
+import { v4 as uuidv4 } from 'uuid';
+import { acquireSyncLease } from './sync-lease.js';
+
+// Background sync jobs. A POST creates (or resumes) a job and returns at once;
+// the crawl runs page by page while holding the source's sync lease and
+// records each finished page key, so a crashed job picks up where it stopped.
+// A job ends 'completed', 'partial' (some pages failed) or 'failed' (none got
+// through); starting the source's sync again retries the pages that failed.
+const JOBS = 'sync_jobs';
+
+let indexesReady;
+
+function ensureSyncJobIndexes(db) {
+  if (!indexesReady) {
+    indexesReady = db.collection(JOBS)
+      .createIndex({ source: 1, created_at: -1 })
+      .catch(error => {
+        indexesReady = undefined;
+        console.error('Failed to create sync job index:', error.message);
+      });
+  }
+  return indexesReady;
+}
+
+export function formatSyncJob(job) {
+  if (!job) return null;
+  const { _id, completed_pages, ...rest } = job;
+  const end = job.finished_at || new Date();
+  const elapsedSeconds = job.started_at ? Math.max(0.001, (end - job.started_at) / 1000) : 0;
+  return {
+    ...rest,
+    elapsed_seconds: Math.round(elapsedSeconds * 10) / 10,
+    throughput: {
+      pages_per_minute: elapsedSeconds ? Math.round((job.pages_done / elapsedSeconds) * 600) / 10 : 0,
+      tools_per_second: elapsedSeconds ? Math.round((job.tools_found / elapsedSeconds) * 100) / 100 : 0
+    },
+    status_url: `/api/ai-tools/sync-jobs/${job.id}`
+  };
+}
+
+export async function getSyncJob(db, id) {
+  return formatSyncJob(await db.collection(JOBS).findOne({ id }));
+}
+
+/**
+ * Start a sync for `source` in the background.
+ *
+ * `pages` is the ordered list of page keys and `processPage(page, index)`
+ * scrapes and writes one page, returning { found, inserted, updated }.
+ * Returns { started, job } where started is false when another job already
+ * holds the source's lease; job is then that running job.
+ */
+export async function startSyncJob(db, source, { pages, processPage, pageDelayMs = 0 }) {
+  await ensureSyncJobIndexes(db);
+  const jobs = db.collection(JOBS);
+
+  // An unfinished job can only be resumed by whoever gets the lease, and
+  // holding the lease means nobody else is still running it
+  const unfinished = await jobs.findOne(
+    { source, status: { $in: ['queued', 'running', 'failed', 'partial'] } },
+    { sort: { created_at: -1 } }
+  );
+  const jobId = unfinished?.id || uuidv4();
+
+  const { acquired, lease, current } = await acquireSyncLease(db, source, { jobId });
+  if (!acquired) {
+    return { started: false, job: (await getSyncJob(db, current.job_id)) || { id: current.job_id, source, status: 'running' } };
+  }
+
+  const now = new Date();
+  let job;
+  if (unfinished) {
+    await jobs.updateOne(
+      { id: jobId },
+      { $set: { status: 'running', resumed_at: now, updated_at: now, error: null, failed_pages: 0, finished_at: null }, $inc: { attempts: 1 } }
+    );
+    job = await jobs.findOne({ id: jobId });
+  } else {
+    job = {
+      id: jobId,
+      source,
+      status: 'running',
+      attempts: 1,
+      pages_total: pages.length,
+      pages_done: 0,
+      completed_pages: [],
+      tools_found: 0,
+      inserted: 0,
+      updated: 0,
+      failed_pages: 0,
+      failed_page_keys: [],
+      error: null,
+      created_at: now,
+      started_at: now,
+      updated_at: now,
+      finished_at: null
+    };
+    await jobs.insertOne(job);
+  }
+
+  runSyncJob(db, job, lease, { pages, processPage, pageDelayMs }).catch(error => {
+    console.error(`Sync job ${jobId} crashed:`, error);
+  });
+
+  return { started: true, resumed: !!unfinished, job: formatSyncJob(job) };
+}
+
+async function runSyncJob(db, job, lease, { pages, processPage, pageDelayMs }) {
+  const jobs = db.collection(JOBS);
+  const done = new Set(job.completed_pages || []);
+  const failed = [];
+  let lastError = null;
+  let crash = null;
+
+  try {
+    for (let index = 0; index < pages.length; index++) {
+      if (done.has(pages[index])) continue;
+      if (lease.lost) {
+        throw new Error('Sync lease lost to another worker');
+      }
+
+      let result;
+      try {
+        result = await processPage(pages[index], index);
+      } catch (error) {
+        console.error(`Sync job ${job.id} page ${index} failed:`, error.message);
+        failed.push(pages[index]);
+        lastError = error.message;
+        await jobs.updateOne(
+          { id: job.id },
+          { $inc: { failed_pages: 1 }, $addToSet: { failed_page_keys: pages[index] }, $set: { updated_at: new Date() } }
+        );
+        continue;
+      }
+
+      done.add(pages[index]);
+      await jobs.updateOne(
+        { id: job.id },
+        {
+          $addToSet: { completed_pages: pages[index] },
+          // A page that failed on an earlier attempt and now went through
+          $pull: { failed_page_keys: pages[index] },
+          $inc: {
+            pages_done: 1,
+            tools_found: result.found || 0,
+            inserted: result.inserted || 0,
+            updated: result.updated || 0
+          },
+          $set: { updated_at: new Date(), last_page: pages[index] }
+        }
+      );
+
+      if (pageDelayMs > 0 && index < pages.length - 1) {
+        await new Promise(resolve => setTimeout(resolve, pageDelayMs));
+      }
+    }
+  } catch (error) {
+    crash = error;
+  }
+
+  // Release before the final write, so a job that reads as finished never
+  // still holds its source's lease. A sync that starts in between finds this
+  // job unfinished and resumes it, skipping the pages already done.
+  const lost = lease.lost;
+  await lease.release();
+
+  const finished = new Date();
+  if (crash) {
+    // After losing the lease the job belongs to the new holder; leave it be
+    if (!lost) {
+      await jobs.updateOne(
+        { id: job.id },
+        { $set: { status: 'failed', error: crash.message, updated_at: finished } }
+      );
+    }
+    throw crash;
+  }
+
+  // Failed pages stay out of completed_pages, so resuming a partial or
+  // failed job retries just those
+  const status = failed.length === 0 ? 'completed' : done.size === 0 ? 'failed' : 'partial';
+  await jobs.updateOne(
+    { id: job.id },
+    {
+      $set: {
+        status,
+        failed_pages: failed.length,
+        error: failed.length ? `${failed.length} of ${pages.length} pages failed: ${lastError}` : null,
+        finished_at: finished,
+        updated_at: finished
+      }
+    }
+  );
+}
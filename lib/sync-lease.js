@@ -0,0 +1,118 @@
+import { v4 as uuidv4 } from 'uuid';
+
+// Mongo-backed leases so only one sync per source runs across all server
+// instances. A lease document is keyed by source; it is held while its
+// expires_at is in the future and the holder keeps extending it.
+const LEASES = 'sync_leases';
+const DEFAULT_TTL_MS = 60000;
+
+let indexesReady;
+
+export function ensureSyncLeaseIndexes(db) {
+  if (!indexesReady) {
+    // The TTL monitor only sweeps once a minute, so acquisition never relies
+    // on it; it just keeps abandoned leases from piling up
+    indexesReady = db.collection(LEASES)
+      .createIndex({ expires_at: 1 }, { expireAfterSeconds: 3600 })
+      .catch(error => {
+        indexesReady = undefined;
+        console.error('Failed to create sync lease index:', error.message);
+      });
+  }
+  return indexesReady;
+}
+
+function isDuplicateKeyError(error) {
+  return error && (error.code === 11000 || error.codeName === 'DuplicateKey');
+}
+
+function leaseStatus(doc) {
+  return {
+    source: doc._id,
+    job_id: doc.job_id,
+    owner: doc.owner,
+    acquired_at: doc.acquired_at,
+    heartbeat_at: doc.heartbeat_at,
+    expires_at: doc.expires_at
+  };
+}
+
+/**
+ * Try to take the lease for `source`.
+ *
+ * Returns { acquired: true, lease } for the caller that now owns the sync, or
+ * { acquired: false, current } describing the job that is already running.
+ * The returned lease heartbeats on its own until release() is called; if a
+ * heartbeat finds the lease taken over, lease.lost becomes true.
+ */
+export async function acquireSyncLease(db, source, { ttlMs = DEFAULT_TTL_MS, jobId = uuidv4() } = {}) {
+  await ensureSyncLeaseIndexes(db);
+  const leases = db.collection(LEASES);
+  const owner = uuidv4();
+  const now = new Date();
+
+  try {
+    // Matches only a missing or expired lease; when a live lease exists the
+    // filter misses, the upsert collides on _id and we lose the race cleanly
+    await leases.updateOne(
+      { _id: source, expires_at: { $lte: now } },
+      {
+        $set: {
+          owner,
+          job_id: jobId,
+          acquired_at: now,
+          heartbeat_at: now,
+          expires_at: new Date(now.getTime() + ttlMs)
+        }
+      },
+      { upsert: true }
+    );
+  } catch (error) {
+    if (!isDuplicateKeyError(error)) {
+      throw error;
+    }
+    const current = await leases.findOne({ _id: source });
+    if (current) {
+      return { acquired: false, current: leaseStatus(current) };
+    }
+    // Released between our attempt and the lookup
+    return acquireSyncLease(db, source, { ttlMs, jobId });
+  }
+
+  const lease = {
+    source,
+    owner,
+    jobId,
+    lost: false,
+    timer: null,
+    async heartbeat() {
+      const beat = new Date();
+      const result = await leases.updateOne(
+        { _id: source, owner },
+        { $set: { heartbeat_at: beat, expires_at: new Date(beat.getTime() + ttlMs) } }
+      );
+      if (result.matchedCount === 0) {
+        lease.lost = true;
+        clearInterval(lease.timer);
+      }
+      return !lease.lost;
+    },
+    async release() {
+      clearInterval(lease.timer);
+      await leases.deleteOne({ _id: source, owner });
+    }
+  };
+
+  lease.timer = setInterval(() => {
+    lease.heartbeat().catch(error => console.error(`Sync lease heartbeat failed for ${source}:`, error.message));
+  }, Math.max(1000, Math.floor(ttlMs / 3)));
+  // Don't keep a standalone script alive just for the heartbeat
+  lease.timer.unref?.();
+
+  return { acquired: true, lease };
+}
+
+export async function getSyncLease(db, source) {
+  const current = await db.collection(LEASES).findOne({ _id: source, expires_at: { $gt: new Date() } });
+  return current ? leaseStatus(current) : null;
+}
@@ -0,0 +1,246 @@
+// Incremental, forgiving JSON parser for model output.
+//
+// Models wrap JSON in markdown fences and prose, leave trailing commas and
+// comments in it, put raw newlines inside strings and, when they hit the
+// token limit, stop in the middle of it. This parser takes the reply in
+// chunks as it streams and builds the value as it goes:
+//   - everything before the first `{` and after the matching `}` is skipped
+//   - trailing commas, missing commas, // and /* */ comments, single-quoted
+//     strings, unquoted keys and Python's True/False/None are accepted
+//   - end() closes whatever is still open: an unfinished string value is
+//     kept as far as it got, an unfinished key or literal is dropped
+// Every change from strict JSON is listed in `repairs`.
+//
+// `onClose(path, value)` is called as each object or array completes (and for
+// the ones end() closes), with its path from the root, e.g. ['nodes', 3]. If it
+// returns false the value is removed from its parent, so callers can check
+// elements against a schema while the rest of the reply is still arriving.
+
+const ESCAPES = { n: '\n', t: '\t', r: '\r', b: '\b', f: '\f', '"': '"', "'": "'", '\\': '\\', '/': '/' };
+const LITERALS = { true: true, false: false, null: null, True: true, False: false, None: null };
+
+export class TolerantJsonParser {
+  constructor({ onClose } = {}) {
+    this.onClose = onClose || null;
+    this.root = undefined;
+    // Open containers: { value, path, key, expect: 'key' | 'colon' | 'value' | 'comma', afterComma }
+    this.stack = [];
+    // Scalar being read: { type: 'string' | 'number' | 'word', text, quote, escape, unicode }
+    this.token = null;
+    this.comment = null;
+    this.slash = false;
+    this.started = false;
+    this.done = false;
+    this.repairs = new Set();
+  }
+
+  write(chunk) {
+    for (let i = 0; i < chunk.length && !this.done; i++) this.step(chunk[i]);
+  }
+
+  step(char) {
+    if (this.comment) {
+      if (this.comment === 'line' ? char === '\n' : this.commentStar && char === '/') this.comment = null;
+      this.commentStar = char === '*';
+      return;
+    }
+    if (this.token?.type === 'string') {
+      this.readString(char);
+      return;
+    }
+    if (!this.started) {
+      if (char === '{') this.open({}, char);
+      return;
+    }
+    if (this.slash) {
+      this.slash = false;
+      if (char === '/' || char === '*') {
+        this.comment = char === '/' ? 'line' : 'block';
+        this.commentStar = false;
+        this.repairs.add('removed comments');
+        return;
+      }
+    }
+    if (this.token) {
+      const continues = this.token.type === 'number' ? /[0-9eE.+-]/.test(char) : /[\w$]/.test(char);
+      if (continues) {
+        this.token.text += char;
+        return;
+      }
+      this.finishToken();
+    }
+
+    if (char === '{' || char === '[') {
+      this.open(char === '{' ? {} : [], char);
+    } else if (char === '}' || char === ']') {
+      this.close(char === '}' ? 'object' : 'array');
+    } else if (char === ':') {
+      const frame = this.top();
+      if (frame.expect === 'colon') frame.expect = 'value';
+    } else if (char === ',') {
+      const frame = this.top();
+      if (frame.expect === 'comma') {
+        frame.expect = Array.isArray(frame.value) ? 'value' : 'key';
+        frame.afterComma = true;
+      }
+    } else if (char === '"' || char === "'") {
+      if (char === "'") this.repairs.add('converted single-quoted strings');
+      this.token = { type: 'string', text: '', quote: char, escape: false, unicode: null };
+    } else if (char === '-' || (char >= '0' && char <= '9')) {
+      this.token = { type: 'number', text: char };
+    } else if (/[A-Za-z_$]/.test(char)) {
+      this.token = { type: 'word', text: char };
+    } else if (char === '/') {
+      this.slash = true;
+    }
+    // Anything else (stray backticks, prose) is skipped
+  }
+
+  readString(char) {
+    const token = this.token;
+    if (token.unicode !== null) {
+      token.unicode += char;
+      if (token.unicode.length === 4) {
+        token.text += /^[0-9a-fA-F]{4}$/.test(token.unicode) ? String.fromCharCode(parseInt(token.unicode, 16)) : token.unicode;
+        token.unicode = null;
+      }
+    } else if (token.escape) {
+      token.escape = false;
+      if (char === 'u') token.unicode = '';
+      else token.text += ESCAPES[char] ?? char;
+    } else if (char === '\\') {
+      token.escape = true;
+    } else if (char === token.quote) {
+      this.token = null;
+      this.value(token.text, true);
+    } else {
+      if (char < ' ') this.repairs.add('kept raw control characters in strings');
+      token.text += char;
+    }
+  }
+
+  finishToken() {
+    const { type, text } = this.token;
+    this.token = null;
+    if (type === 'number') {
+      const number = Number(text);
+      if (Number.isFinite(number)) this.value(number);
+    } else if (Object.hasOwn(LITERALS, text) && this.top().expect !== 'key') {
+      if (!['true', 'false', 'null'].includes(text)) this.repairs.add('converted Python literals');
+      this.value(LITERALS[text]);
+    } else if (this.top().expect === 'key') {
+      this.repairs.add('quoted unquoted keys');
+      this.value(text, true);
+    }
+  }
+
+  top() {
+    return this.stack[this.stack.length - 1];
+  }
+
+  // Place a value in the current container; returns false if it has no place there
+  value(value, isString = false) {
+    const frame = this.top();
+    if (!frame) return false;
+    frame.afterComma = false;
+    if (Array.isArray(frame.value)) {
+      if (frame.expect === 'comma') this.repairs.add('added missing commas');
+      frame.value.push(value);
+      frame.expect = 'comma';
+      return true;
+    }
+    if (frame.expect === 'key' || (frame.expect === 'comma' && isString)) {
+      if (!isString) return false;
+      if (frame.expect === 'comma') this.repairs.add('added missing commas');
+      frame.key = value;
+      frame.expect = 'colon';
+      return false;
+    }
+    if (frame.expect !== 'value') return false;
+    // As JSON.parse does: "__proto__" is a plain key, not the prototype
+    Object.defineProperty(frame.value, frame.key, { value, writable: true, enumerable: true, configurable: true });
+    frame.key = null;
+    frame.expect = 'comma';
+    return true;
+  }
+
+  open(container, char) {
+    if (!this.started) {
+      this.started = true;
+      this.root = container;
+      this.stack.push({ value: container, path: [], key: null, expect: 'key', afterComma: false });
+      return;
+    }
+    const parent = this.top();
+    const key = Array.isArray(parent.value) ? parent.value.length : parent.key;
+    // One with no place in its parent (e.g. where a key belongs) is still read, then discarded
+    const detached = !this.value(container);
+    this.stack.push({
+      value: container,
+      path: [...parent.path, key],
+      key: null,
+      expect: char === '{' ? 'key' : 'value',
+      afterComma: false,
+      detached
+    });
+  }
+
+  close(type) {
+    // A bracket of the wrong kind closes everything up to its match
+    const index = this.stack.map(frame => (Array.isArray(frame.value) ? 'array' : 'object')).lastIndexOf(type);
+    if (index < 0) return;
+    if (index < this.stack.length - 1) this.repairs.add('closed mismatched brackets');
+    while (this.stack.length > index) this.pop();
+  }
+
+  pop() {
+    const frame = this.stack.pop();
+    if (frame.afterComma) this.repairs.add('removed trailing commas');
+    if (frame.key !== null && frame.key !== undefined) this.repairs.add(`dropped key "${frame.key}" that had no value`);
+    if (!frame.detached && this.onClose && this.onClose(frame.path, frame.value) === false) {
+      const parent = this.top();
+      if (parent) {
+        if (Array.isArray(parent.value)) parent.value.pop();
+        else delete parent.value[frame.path[frame.path.length - 1]];
+      } else {
+        this.root = undefined;
+      }
+    }
+    if (this.stack.length === 0) this.done = true;
+  }
+
+  /**
+   * Finish the input. Returns { value, complete, repairs }: `complete` is
+   * false when the reply stopped before the JSON did (value is then what was
+   * recovered), value is undefined when there was no JSON object at all.
+   */
+  end() {
+    const complete = this.done;
+    if (!this.done && this.started) {
+      if (this.token?.type === 'string') {
+        const frame = this.top();
+        const { text } = this.token;
+        this.token = null;
+        if (frame.expect === 'value' || Array.isArray(frame.value)) this.value(text, true);
+        this.repairs.add('truncated an unterminated string');
+      }
+      if (this.token) {
+        const { type, text } = this.token;
+        // Only keep a cut-off scalar that is still a whole value
+        if (type === 'number' ? Number.isFinite(Number(text)) : Object.hasOwn(LITERALS, text)) this.finishToken();
+        this.token = null;
+      }
+      this.repairs.add(`closed ${this.stack.length} unclosed bracket${this.stack.length === 1 ? '' : 's'}`);
+      while (this.stack.length > 0) this.pop();
+    }
+    this.token = null;
+    return { value: this.root, complete, repairs: [...this.repairs] };
+  }
+}
+
+/** Parse a whole reply at once; see TolerantJsonParser. */
+export function parseTolerantJson(text, options) {
+  const parser = new TolerantJsonParser(options);
+  parser.write(text);
+  return parser.end();
+}
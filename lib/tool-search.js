@@ -0,0 +1,111 @@
+// Catalog search for the tools page.
+//
+// A plain listing is a find() plus a count. With facets requested the page,
+// the total and the category and source counts come back from a single
+// aggregation: the search text is matched once, then one $facet branch per
+// output applies the remaining filters. Each facet's counts ignore that
+// facet's own filter (and only that one), so picking a category still shows
+// how many results every other category would give.
+
+const SORTS = {
+  featured_at: { featured_at: -1 },
+  votes: { votes: -1 },
+  name: { name: 1 },
+  rating: { rating: -1 }
+};
+
+const FACET_LIMIT = 50;
+
+function escapeRegex(text) {
+  return text.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+}
+
+/**
+ * Query clauses for a tools listing, kept apart so facets can drop their own:
+ * { search, category, source }, each a filter object or null.
+ */
+export function toolFilters({ search, category, source } = {}) {
+  const pattern = search ? { $regex: escapeRegex(search), $options: 'i' } : null;
+  return {
+    search: pattern
+      ? { $or: [{ name: pattern }, { description: pattern }, { tagline: pattern }] }
+      : null,
+    category: category ? { category } : null,
+    // Merged entities list every source they were seen on
+    source: source ? { $or: [{ source }, { 'sources.source': source }] } : null
+  };
+}
+
+function combine(...clauses) {
+  const present = clauses.filter(Boolean);
+  if (present.length === 0) return {};
+  return present.length === 1 ? present[0] : { $and: present };
+}
+
+function counts(buckets) {
+  return buckets.map(bucket => ({ value: bucket._id, count: bucket.count }));
+}
+
+/**
+ * One page of tools for the given filters. Returns { tools, totalCount } and,
+ * when `facets` is set, `facets: { categories, sources }` as
+ * [{ value, count }] lists, largest first.
+ */
+export async function searchTools(db, { search, category, source, sort, page = 1, limit = 12, facets = false, projection }) {
+  const collection = db.collection('ai_tools');
+  const filters = toolFilters({ search, category, source });
+  const sortObj = SORTS[sort] || SORTS.featured_at;
+  const skip = (page - 1) * limit;
+
+  if (!facets) {
+    const query = combine(filters.search, filters.category, filters.source);
+    const [tools, totalCount] = await Promise.all([
+      collection.find(query, { projection }).sort(sortObj).skip(skip).limit(limit).toArray(),
+      collection.countDocuments(query)
+    ]);
+    return { tools, totalCount };
+  }
+
+  const selected = combine(filters.category, filters.source);
+  const [result] = await collection.aggregate([
+    { $match: combine(filters.search) },
+    {
+      $facet: {
+        tools: [
+          { $match: selected },
+          { $sort: sortObj },
+          { $skip: skip },
+          { $limit: limit },
+          ...(projection ? [{ $project: projection }] : [])
+        ],
+        total: [{ $match: selected }, { $count: 'count' }],
+        categories: [
+          { $match: combine(filters.source) },
+          { $group: { _id: '$category', count: { $sum: 1 } } },
+          { $match: { _id: { $nin: [null, ''] } } },
+          { $sort: { count: -1, _id: 1 } },
+          { $limit: FACET_LIMIT }
+        ],
+        sources: [
+          { $match: combine(filters.category) },
+          // A merged tool counts once for each source it was seen on
+          { $project: { source: { $setUnion: [{ $ifNull: ['$sources.source', []] }, [{ $ifNull: ['$source', null] }]] } } },
+          { $unwind: '$source' },
+          { $match: { source: { $nin: [null, ''] } } },
+          { $group: { _id: '$source', count: { $sum: 1 } } },
+          { $sort: { count: -1, _id: 1 } },
+          { $limit: FACET_LIMIT }
+        ]
+      }
+    }
+  ], { allowDiskUse: true }).toArray();
+
+  return {
+    tools: result.tools,
+    totalCount: result.total[0]?.count || 0,
+    facets: {
+      categories: counts(result.categories),
+      sources: counts(result.sources)
+    }
+  };
+}
@@ -0,0 +1,210 @@
+import { prepareTool, candidateQuery, EntityIndex, mergeIntoPending, mergeOperations } from './dedupe.js';
+import { updateTrendScores } from './trending.js';
+
+// Batched writer for scraped/synced AI tools. Every sync path funnels its
+// tools through here: each batch is resolved to canonical entities (see
+// dedupe.js) and written with one unordered bulkWrite, so listings of the
+// same product from different sources end up in one document.
+
+const DEFAULT_BATCH_SIZE = 500;
+
+// Fields needed to match and merge against stored entities
+const CANDIDATE_PROJECTION = {
+  _id: 1, source: 1, ph_id: 1, name_key: 1, domain: 1, entity_key: 1,
+  minhash: 1, minhash_bands: 1, 'sources.source': 1, 'sources.ph_id': 1
+};
+
+// What rebuildEntities reads of each stored tool: enough to prepare it and merge it
+const REBUILD_PROJECTION = {
+  _id: 1, name: 1, website: 1, url: 1, tagline: 1, description: 1, source: 1, ph_id: 1,
+  sources: 1, votes: 1, entity_key: 1
+};
+
+let indexesReady;
+const writeListeners = [];
+
+/**
+ * Register `listener({ ids, reset })`, called after each written batch with
+ * the _ids of inserted and updated entities, or with `reset: true` when the
+ * collection was rewritten wholesale. Listeners must not throw.
+ */
+export function onToolsWritten(listener) {
+  writeListeners.push(listener);
+}
+
+function notifyWritten(change) {
+  for (const listener of writeListeners) listener(change);
+}
+
+export function ensureToolIndexes(db) {
+  if (!indexesReady) {
+    const tools = db.collection('ai_tools');
+    indexesReady = Promise.all([
+      // The old unique (source, name) index is superseded by entity_key and
+      // would reject an entity whose name changed to one listed elsewhere
+      tools.dropIndex('source_name_unique').catch(() => {}),
+      // Legacy documents have no entity_key until the rebuild job runs
+      tools.createIndex({ entity_key: 1 }, { unique: true, partialFilterExpression: { entity_key: { $type: 'string' } } }),
+      tools.createIndex({ name_key: 1 }),
+      tools.createIndex({ domain: 1 }, { sparse: true }),
+      tools.createIndex({ minhash_bands: 1 }),
+      tools.createIndex({ ph_id: 1 }, { sparse: true }),
+      tools.createIndex({ trend_score: -1 })
+    ]).catch(error => {
+      indexesReady = undefined;
+      console.error('Failed to create ai_tools entity indexes:', error.message);
+    });
+  }
+  return indexesReady;
+}
+
+async function writeBatch(db, batch) {
+  const collection = db.collection('ai_tools');
+  // A tool whose name normalizes to nothing has no entity to resolve to
+  const prepared = batch.map(prepareTool).filter(tool => tool.entity_key);
+  const skipped = batch.length - prepared.length;
+
+  const index = new EntityIndex();
+  const existing = await collection.find(candidateQuery(prepared), { projection: CANDIDATE_PROJECTION }).toArray();
+  existing.forEach(entity => index.add(entity));
+
+  const pending = [];
+  const operations = [];
+  const touched = new Set();
+  let updated = 0;
+  let merged = 0;
+
+  for (const tool of prepared) {
+    const entity = index.match(tool);
+    if (!entity) {
+      pending.push(tool);
+      index.add(tool);
+    } else if (entity._id) {
+      operations.push(...mergeOperations(entity, tool));
+      touched.add(entity._id);
+      updated++;
+    } else {
+      mergeIntoPending(entity, tool);
+      merged++;
+    }
+  }
+
+  for (const { id, created_at, ...tool } of pending) {
+    operations.push({
+      updateOne: {
+        filter: { entity_key: tool.entity_key },
+        update: { $setOnInsert: { ...tool, id, created_at: created_at || new Date() } },
+        upsert: true
+      }
+    });
+  }
+
+  if (operations.length === 0) {
+    return { inserted: 0, updated, merged, skipped };
+  }
+  let result;
+  try {
+    result = await collection.bulkWrite(operations, { ordered: false });
+  } catch (error) {
+    // An entity that gained a domain may now have the key of another stored
+    // entity (or a concurrent writer inserted the same new one): that write is
+    // skipped and the rest of the batch stands
+    if ([].concat(error.writeErrors || [{}]).some(writeError => writeError.code !== 11000)) throw error;
+    result = error.result;
+  }
+  const ids = [...touched, ...Object.values(result.upsertedIds || {})];
+  await updateTrendScores(collection, { _id: { $in: ids } });
+  notifyWritten({ ids });
+  return { inserted: result.upsertedCount, updated, merged, skipped };
+}
+
+export async function writeTools(db, tools, { batchSize = DEFAULT_BATCH_SIZE } = {}) {
+  const totals = { inserted: 0, updated: 0, merged: 0, skipped: 0, batches: 0 };
+  if (tools.length === 0) return totals;
+
+  await ensureToolIndexes(db);
+  for (let start = 0; start < tools.length; start += batchSize) {
+    const result = await writeBatch(db, tools.slice(start, start + batchSize));
+    totals.inserted += result.inserted;
+    totals.updated += result.updated;
+    totals.merged += result.merged;
+    totals.skipped += result.skipped;
+    totals.batches++;
+  }
+  return totals;
+}
+
+/**
+ * Resolve every stored tool to a canonical entity, oldest first: the first
+ * listing of a product keeps its document and later duplicates are folded
+ * into its sources[] and deleted. The canonical documents are written before
+ * any duplicate is deleted, so an interrupted rebuild loses nothing and can
+ * simply be re-run.
+ */
+export async function rebuildEntities(db, { onProgress } = {}) {
+  const collection = db.collection('ai_tools');
+
+  const index = new EntityIndex();
+  const canonical = [];
+  const duplicates = [];
+  let scanned = 0;
+
+  const cursor = collection.find({}, { projection: REBUILD_PROJECTION }).sort({ created_at: 1, _id: 1 });
+  for await (const doc of cursor) {
+    // Only what matching and the write-back need is kept in memory
+    const { name_key, domain, entity_key, minhash, minhash_bands, sources, votes, website, ph_id } = prepareTool(doc);
+    const tool = { _id: doc._id, name_key, domain, entity_key, minhash, minhash_bands, sources, votes, website, ph_id };
+    const entity = index.match(tool);
+    if (entity) {
+      mergeIntoPending(entity, tool);
+      duplicates.push(doc._id);
+    } else {
+      index.add(tool);
+      canonical.push(tool);
+    }
+    scanned++;
+    if (onProgress && scanned % 1000 === 0) await onProgress({ scanned });
+  }
+
+  // A duplicate may hold the key its canonical entity is about to take
+  for (let start = 0; start < duplicates.length; start += DEFAULT_BATCH_SIZE) {
+    await collection.updateMany(
+      { _id: { $in: duplicates.slice(start, start + DEFAULT_BATCH_SIZE) } },
+      { $unset: { entity_key: '' } }
+    );
+  }
+
+  for (let start = 0; start < canonical.length; start += DEFAULT_BATCH_SIZE) {
+    const operations = canonical.slice(start, start + DEFAULT_BATCH_SIZE).map(tool => ({
+      updateOne: {
+        filter: { _id: tool._id },
+        update: {
+          $set: {
+            name_key: tool.name_key,
+            domain: tool.domain,
+            // Nameless legacy rows get null, which the partial unique index skips
+            entity_key: tool.entity_key,
+            minhash: tool.minhash,
+            minhash_bands: tool.minhash_bands,
+            sources: tool.sources,
+            votes: tool.votes || 0,
+            website: tool.website
+          }
+        }
+      }
+    }));
+    await collection.bulkWrite(operations, { ordered: false });
+  }
+
+  // Only now that their data is in the canonical documents
+  for (let start = 0; start < duplicates.length; start += DEFAULT_BATCH_SIZE) {
+    await collection.deleteMany({ _id: { $in: duplicates.slice(start, start + DEFAULT_BATCH_SIZE) } });
+  }
+
+  indexesReady = undefined;
+  await ensureToolIndexes(db);
+  // Merged entities may have gained votes
+  await updateTrendScores(collection, {});
+  notifyWritten({ ids: [], reset: true });
+  return { scanned, entities: canonical.length, merged: duplicates.length };
+}
@@ -0,0 +1,159 @@
+// Time-decayed trending score for ai_tools.
+//
+// trend_score is a tool's votes with each vote decayed exponentially from
+// the moment it was seen. A tool's first sighting credits its votes at
+// its launch date (featured_at), and every later sync credits only the
+// votes gained since the previous sync (trend_votes) at the time of that
+// sync. Old votes therefore fade and recent vote velocity dominates.
+//
+// Scores are stored as of trend_at. The decay job brings every score to the
+// same moment. Between runs, tools touched by a sync are slightly ahead of
+// the rest: at most one interval of decay, about 1% with the defaults.
+// Reads come from the { trend_score: -1 } index and are cached as a top-N
+// list in memory.
+
+const HALF_LIFE_HOURS = 72;
+const DECAY_PER_MS = Math.LN2 / (HALF_LIFE_HOURS * 3600 * 1000);
+const DECAY_INTERVAL_MS = 60 * 60 * 1000;
+// Scores this small are zeroed so they drop out of the index's top end
+const MIN_SCORE = 0.01;
+const TOP_N = 100;
+const CACHE_TTL_MS = 60 * 1000;
+
+let lastDecayAt = 0;
+let decaying = null;
+// Whether this process has scored the tools stored before trend_score existed
+let backfilled = false;
+
+function asDate(field) {
+  return { $convert: { input: field, to: 'date', onError: null, onNull: null } };
+}
+
+// exp(-λ · (now - since)), with `since` in the future treated as now
+function decaySince(since, now) {
+  return { $exp: { $multiply: [-DECAY_PER_MS, { $max: [0, { $subtract: [now, since] }] }] } };
+}
+
+/**
+ * Credit new votes on the matching tools (e.g. those a sync just wrote).
+ * One server-side update; the new score is computed from the stored fields.
+ */
+export async function updateTrendScores(collection, filter) {
+  const now = new Date();
+  const votes = { $ifNull: ['$votes', 0] };
+  const launchedAt = { $ifNull: [asDate('$featured_at'), { $ifNull: [asDate('$created_at'), now] }] };
+
+  await collection.updateMany(filter, [
+    {
+      $set: {
+        trend_score: {
+          $cond: [
+            { $eq: [{ $type: '$trend_at' }, 'date'] },
+            {
+              $add: [
+                { $multiply: ['$trend_score', decaySince('$trend_at', now)] },
+                { $max: [0, { $subtract: [votes, { $ifNull: ['$trend_votes', 0] }] }] }
+              ]
+            },
+            { $multiply: [votes, decaySince(launchedAt, now)] }
+          ]
+        },
+        trend_votes: votes,
+        trend_at: now
+      }
+    }
+  ]);
+  trendingCache.invalidate();
+}
+
+/**
+ * Bring every score to the present. Scores under MIN_SCORE become 0.
+ * Returns { decayed } (documents modified).
+ */
+export async function decayTrendScores(db) {
+  const now = new Date();
+  const decayed = { $multiply: ['$trend_score', decaySince('$trend_at', now)] };
+  const result = await db.collection('ai_tools').updateMany(
+    { trend_score: { $gt: 0 } },
+    [{ $set: { trend_score: { $cond: [{ $lt: [decayed, MIN_SCORE] }, 0, decayed] }, trend_at: now } }]
+  );
+  lastDecayAt = now.getTime();
+  trendingCache.invalidate();
+  return { decayed: result.modifiedCount };
+}
+
+/**
+ * Full pass: score tools that have never been scored (stored before
+ * trend_score existed), then decay the rest. Returns { scored, decayed }.
+ */
+export async function refreshTrendScores(db) {
+  const collection = db.collection('ai_tools');
+  const unscored = { trend_at: { $exists: false } };
+  const scored = await collection.countDocuments(unscored);
+  if (scored > 0) await updateTrendScores(collection, unscored);
+  const { decayed } = await decayTrendScores(db);
+  return { scored, decayed };
+}
+
+// Kick off a decay run if this process has not done one recently. The first
+// run in a process also scores the tools that have no score yet (later ones
+// are scored as syncs write them), so trending works right after a deploy.
+function decayIfDue(db) {
+  if (decaying || Date.now() - lastDecayAt < DECAY_INTERVAL_MS) return decaying;
+  // Claim the slot now so concurrent readers don't start their own runs
+  lastDecayAt = Date.now();
+  const run = backfilled ? decayTrendScores(db) : refreshTrendScores(db);
+  decaying = run
+    .then(() => { backfilled = true; })
+    .catch(error => console.error('Trend score decay failed:', error.message))
+    .finally(() => { decaying = null; });
+  return decaying;
+}
+
+class TrendingCache {
+  constructor() {
+    this.tools = null;
+    this.loadedAt = 0;
+    this.loading = null;
+  }
+
+  invalidate() {
+    this.loadedAt = 0;
+  }
+
+  async load(db, projection) {
+    const tools = await db.collection('ai_tools')
+      .find({ trend_score: { $gt: 0 } }, { projection })
+      .sort({ trend_score: -1 })
+      .limit(TOP_N)
+      .toArray();
+    this.tools = tools;
+    this.loadedAt = Date.now();
+  }
+
+  /**
+   * The `limit` highest-scoring tools (at most TOP_N). Reads from memory;
+   * the list is reloaded from the index once it is stale.
+   */
+  async top(db, limit, projection) {
+    const run = decayIfDue(db);
+    // The first list waits for the process's first run, which may be scoring
+    // tools that have none yet
+    if (!this.tools && !backfilled) await run;
+    if (!this.tools || Date.now() - this.loadedAt > CACHE_TTL_MS) {
+      if (!this.loading) {
+        this.loading = this.load(db, projection).finally(() => { this.loading = null; });
+        this.loading.catch(error => console.error('Trending list reload failed:', error.message));
+      }
+      // A stale list is served while the reload runs
+      if (!this.tools) await this.loading;
+    }
+    return this.tools.slice(0, Math.min(limit, TOP_N));
+  }
+}
+
+const trendingCache = new TrendingCache();
+
+export function getTrendingTools(db, limit, projection) {
+  return trendingCache.top(db, limit, projection);
+}
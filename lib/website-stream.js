@@ -0,0 +1,181 @@
+import { hedgedCompletion } from './provider-hedging.js';
+import { HtmlSanitizer } from './html-sanitizer.js';
+
+// Streaming website generation.
+//
+// Model output is cleaned as it arrives: markdown fences and any
+// explanation before the first tag are dropped, and the rest goes through
+// the incremental sanitizer. The result is sent to the browser as NDJSON
+// events:
+//
+//   { type: 'start' }
+//   { type: 'html', html }             sanitized markup, in order
+//   { type: 'progress', input_tokens, cached_input_tokens, output_tokens, estimated, chars }
+//   { type: 'done', metadata }         after the page was checked and saved
+//   { type: 'error', error, suggestion? }
+//
+// Each <script> is held back until its end tag and checked with validate()
+// before any of it is sent; a refused script ends the generation with an
+// error, so nothing unchecked ever runs in the browser's preview.
+//
+// If the browser disconnects, the provider request is aborted, so an
+// abandoned generation stops costing tokens. Backup providers in `hedge`
+// are raced against the primary (see provider-hedging.js); the save()
+// stats then carry the hedge report.
+
+const PROGRESS_INTERVAL_MS = 250;
+// Rough output-token estimate until the provider reports real counts
+const CHARS_PER_TOKEN = 4;
+
+// Drops ``` fence lines and everything before the first tag
+export class ModelOutputCleaner {
+  constructor() {
+    this.lineStart = true;
+    this.backticks = '';
+    this.inFence = false;
+    this.started = false;
+    this.preamble = '';
+  }
+
+  push(text) {
+    let output = '';
+    for (const char of text) {
+      if (this.inFence) {
+        // The rest of a fence line (e.g. "html") is dropped too
+        if (char === '\n') {
+          this.inFence = false;
+          this.lineStart = true;
+        }
+        continue;
+      }
+      if (this.lineStart && char === '`') {
+        this.backticks += char;
+        if (this.backticks === '```') {
+          this.backticks = '';
+          this.inFence = true;
+        }
+        continue;
+      }
+      output += this.backticks + char;
+      this.backticks = '';
+      this.lineStart = char === '\n';
+    }
+    return this.start(output);
+  }
+
+  end() {
+    const rest = this.backticks;
+    this.backticks = '';
+    return this.start(rest);
+  }
+
+  start(text) {
+    if (this.started) return text;
+    this.preamble += text;
+    const tagStart = this.preamble.search(/<[a-zA-Z!\/]/);
+    if (tagStart < 0) {
+      // Keep a trailing '<' that may turn out to open a tag
+      this.preamble = this.preamble.endsWith('<') ? '<' : '';
+      return '';
+    }
+    this.started = true;
+    const html = this.preamble.slice(tagStart);
+    this.preamble = '';
+    return html;
+  }
+}
+
+/**
+ * ReadableStream of NDJSON events for one generation.
+ *
+ *   validate(code)  returns { error, suggestion } to refuse a script or the finished page, or null
+ *   save(code, stats)  stores it and returns the metadata sent with 'done'
+ *   hedge  optional [{ provider, apiKey }] to fall back on
+ */
+export function streamWebsiteGeneration({ provider, apiKey, hedge = [], systemPrompt, prompt, validate, save }) {
+  const encoder = new TextEncoder();
+  const abort = new AbortController();
+
+  return new ReadableStream({
+    async start(controller) {
+      const send = event => controller.enqueue(encoder.encode(`${JSON.stringify(event)}\n`));
+      const cleaner = new ModelOutputCleaner();
+      const sanitizer = new HtmlSanitizer({ allowInlineScripts: true, checkScript: validate });
+      const stats = { input_tokens: null, cached_input_tokens: null, output_tokens: null, estimated: true, chars: 0, stop_reason: null };
+      let code = '';
+      let lastProgress = 0;
+      let report = null;
+
+      const emitHtml = html => {
+        if (!html) return;
+        code += html;
+        send({ type: 'html', html });
+      };
+      const progress = force => {
+        const now = Date.now();
+        if (!force && now - lastProgress < PROGRESS_INTERVAL_MS) return;
+        lastProgress = now;
+        if (stats.estimated) stats.output_tokens = Math.ceil(stats.chars / CHARS_PER_TOKEN);
+        send({ type: 'progress', ...stats });
+      };
+
+      try {
+        send({ type: 'start' });
+        const candidates = [{ provider, apiKey }, ...hedge];
+        for await (const delta of hedgedCompletion(candidates, systemPrompt, prompt, { signal: abort.signal })) {
+          if (delta.hedge) {
+            report = delta.hedge;
+            continue;
+          }
+          if (delta.usage) {
+            if (delta.usage.input_tokens != null) stats.input_tokens = delta.usage.input_tokens;
+            if (delta.usage.cached_input_tokens != null) stats.cached_input_tokens = delta.usage.cached_input_tokens;
+            if (delta.usage.output_tokens != null) {
+              stats.output_tokens = delta.usage.output_tokens;
+              stats.estimated = false;
+            }
+            continue;
+          }
+          if (delta.stop_reason) {
+            stats.stop_reason = delta.stop_reason;
+            continue;
+          }
+          stats.chars += delta.text.length;
+          const html = sanitizer.write(cleaner.push(delta.text));
+          if (sanitizer.refusal) {
+            // Stop paying for the rest of a page that will be refused anyway
+            abort.abort();
+            break;
+          }
+          emitHtml(html);
+          progress(false);
+        }
+        if (!sanitizer.refusal) emitHtml(sanitizer.write(cleaner.end()) + sanitizer.end());
+        progress(true);
+
+        if (sanitizer.refusal) {
+          send({ type: 'error', ...sanitizer.refusal });
+        } else if (!code.trim()) {
+          send({ type: 'error', error: 'The model returned no HTML. Please try again.' });
+        } else {
+          const refusal = validate?.(code);
+          if (refusal) {
+            send({ type: 'error', ...refusal });
+          } else {
+            const metadata = await save(code, { ...stats, removed: sanitizer.report.removed, hedge: hedge.length > 0 ? report : null });
+            send({ type: 'done', metadata });
+          }
+        }
+      } catch (error) {
+        if (abort.signal.aborted) return;
+        console.error('Streaming generation failed:', error);
+        send({ type: 'error', error: error.message || 'Failed to generate website' });
+      }
+      controller.close();
+    },
+
+    cancel() {
+      abort.abort();
+    }
+  });
+}
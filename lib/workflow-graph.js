@@ -0,0 +1,684 @@
+// Platform-neutral workflow graph, with converters to and from n8n and Make.com.
+//
+// Both builders describe the same thing, a trigger followed by a graph of
+// steps, in different shapes: n8n as `nodes` plus `connections` keyed by node
+// name, Make.com as a `scenario.flow` list in which branches are routers with
+// nested flows and conditions are filters on a route's first module. The
+// graph in between:
+//   { name, nodes: [{ id, name, kind, fields, position, original }], edges: [{ from, to, output }] }
+// `kind` is one of the steps in KINDS and `fields` its settings under
+// platform-neutral names. A reference to another step's data is written
+// {{@<node id>.path}} ({{@<node id>}} for the whole item, {{:now}} for the
+// current time) and rewritten into each platform's expression syntax on the
+// way out. An IF node's outputs are 0 (true) and 1 (false).
+//
+// `original` keeps the node as its platform had it, so a step converted back
+// to its own platform keeps the settings KINDS does not map. Steps of a type
+// KINDS does not know come back unchanged on their own platform and as a
+// placeholder on the other one, with a warning.
+
+const upper = value => (typeof value === 'string' ? value.toUpperCase() : value);
+const lower = value => (typeof value === 'string' ? value.toLowerCase() : value);
+
+// Each field is [n8n parameter path, Make.com parameter path, to n8n, to Make.com]
+export const KINDS = {
+  webhook: {
+    label: 'Webhook',
+    trigger: true,
+    n8n: 'n8n-nodes-base.webhook',
+    make: 'gateway:CustomWebHook',
+    fields: { path: ['path', 'hook'] },
+    defaults: { n8n: { httpMethod: 'POST', responseMode: 'onReceived' }, make: { maxResults: 1 } }
+  },
+  schedule: {
+    label: 'Schedule',
+    trigger: true,
+    n8n: 'n8n-nodes-base.scheduleTrigger',
+    make: 'builtin:BasicScheduler',
+    fields: { minutes: ['rule.interval.0.minutesInterval', 'interval'] },
+    defaults: { n8n: { rule: { interval: [{ field: 'minutes' }] } }, make: {} }
+  },
+  rss: {
+    label: 'RSS Feed',
+    trigger: true,
+    n8n: 'n8n-nodes-base.rssFeedReadTrigger',
+    make: 'rss:TriggerWatchRSSFeedItems',
+    fields: { url: ['feedUrl', 'url'] },
+    defaults: { n8n: { pollTimes: { item: [{ mode: 'everyHour' }] } }, make: { maxResults: 5 } }
+  },
+  http: {
+    label: 'HTTP Request',
+    n8n: 'n8n-nodes-base.httpRequest',
+    make: 'http:ActionSendData',
+    fields: { url: ['url', 'url'], method: ['method', 'method', upper, lower] },
+    defaults: { n8n: { options: {} }, make: { parseResponse: true } }
+  },
+  // A Make.com filter rather than a module
+  condition: {
+    label: 'IF',
+    n8n: 'n8n-nodes-base.if',
+    make: null,
+    fields: {
+      left: ['conditions.string.0.value1', null],
+      operation: ['conditions.string.0.operation', null],
+      right: ['conditions.string.0.value2', null]
+    },
+    defaults: { n8n: {}, make: {} }
+  },
+  transform: {
+    label: 'Set',
+    n8n: 'n8n-nodes-base.set',
+    make: 'util:SetVariables',
+    fields: { values: ['values.string', 'variables'] },
+    defaults: { n8n: { keepOnlySet: false }, make: { scope: 'roundtrip' } }
+  },
+  email: {
+    label: 'Send Email',
+    n8n: 'n8n-nodes-base.emailSend',
+    make: 'email:ActionSendEmail',
+    fields: { to: ['toEmail', 'to.0'], subject: ['subject', 'subject'], body: ['text', 'html'] },
+    defaults: { n8n: {}, make: {} }
+  },
+  crm: {
+    label: 'CRM',
+    n8n: 'n8n-nodes-base.hubspot',
+    make: 'hubspotcrm:createUpdateContact',
+    fields: { email: ['email', 'email'], name: ['additionalFields.firstName', 'firstname'] },
+    defaults: { n8n: { resource: 'contact', operation: 'upsert', additionalFields: {} }, make: {} }
+  },
+  slack: {
+    label: 'Slack',
+    n8n: 'n8n-nodes-base.slack',
+    make: 'slack:CreateMessage',
+    fields: { channel: ['channel', 'channel'], text: ['text', 'text'] },
+    defaults: { n8n: {}, make: {} }
+  },
+  sms: {
+    label: 'SMS',
+    n8n: 'n8n-nodes-base.twilio',
+    make: 'twilio:CreateMessage',
+    fields: { to: ['to', 'to'], message: ['message', 'body'] },
+    defaults: { n8n: {}, make: {} }
+  },
+  calendar: {
+    label: 'Google Calendar',
+    n8n: 'n8n-nodes-base.googleCalendar',
+    make: 'google-calendar:createAnEvent',
+    fields: {
+      calendar: ['calendar', 'calendar'],
+      start: ['start', 'start'],
+      end: ['end', 'end'],
+      summary: ['additionalFields.summary', 'summary']
+    },
+    defaults: { n8n: { operation: 'create' }, make: {} }
+  },
+  sheet: {
+    label: 'Google Sheets',
+    n8n: 'n8n-nodes-base.googleSheets',
+    make: 'google-sheets:addRow',
+    fields: { sheet: ['sheetName', 'sheetId'] },
+    defaults: { n8n: { operation: 'append', options: {} }, make: { values: {} } }
+  },
+  database: {
+    label: 'Database',
+    n8n: 'n8n-nodes-base.postgres',
+    make: 'postgres:insertIntoTable',
+    fields: { table: ['table', 'table'] },
+    defaults: { n8n: { operation: 'insert', columns: '' }, make: {} }
+  },
+  parse: {
+    label: 'Parse File',
+    n8n: 'n8n-nodes-base.spreadsheetFile',
+    make: 'csv:ParseCSV',
+    fields: { data: [null, 'csv'] },
+    // n8n parses the incoming file; Make.com needs it mapped, from the trigger (always module 1)
+    defaults: { n8n: { operation: 'fromFile', fileFormat: 'csv' }, make: { csv: '{{1.data}}', containsHeaders: true } }
+  },
+  openai: {
+    label: 'OpenAI',
+    n8n: '@n8n/n8n-nodes-langchain.openAi',
+    make: 'openai-gpt-3:CreateCompletion',
+    fields: { model: ['model', 'model'], prompt: ['prompt', 'prompt'] },
+    defaults: { n8n: { resource: 'text', operation: 'message' }, make: {} }
+  },
+  twitter: {
+    label: 'Twitter',
+    n8n: 'n8n-nodes-base.twitter',
+    make: 'twitter:CreateTweet',
+    fields: { text: ['text', 'text'] },
+    defaults: { n8n: {}, make: {} }
+  },
+  linkedin: {
+    label: 'LinkedIn',
+    n8n: 'n8n-nodes-base.linkedIn',
+    make: 'linkedin:CreateShare',
+    fields: { text: ['text', 'content'] },
+    defaults: { n8n: { postAs: 'person' }, make: {} }
+  },
+  facebook: {
+    label: 'Facebook',
+    n8n: 'n8n-nodes-base.facebookGraphApi',
+    make: 'facebook-pages:CreatePost',
+    fields: { message: ['message', 'message'] },
+    defaults: { n8n: { node: 'me', edge: 'feed', httpRequestMethod: 'POST' }, make: {} }
+  }
+};
+
+const N8N_KINDS = new Map(Object.entries(KINDS).map(([kind, spec]) => [spec.n8n, kind]));
+const MAKE_KINDS = new Map(Object.entries(KINDS).filter(([, spec]) => spec.make).map(([kind, spec]) => [spec.make, kind]));
+
+// Other types models and older templates use for the same steps
+const N8N_ALIASES = {
+  'n8n-nodes-base.cron': 'schedule',
+  'n8n-nodes-base.rssFeedRead': 'rss',
+  'n8n-nodes-base.gmail': 'email',
+  'n8n-nodes-base.openAi': 'openai',
+  'n8n-nodes-base.mySql': 'database',
+  'n8n-nodes-base.mongoDb': 'database'
+};
+const MAKE_ALIASES = {
+  'webhook:customWebhook': 'webhook',
+  'gateway:WebHook': 'webhook',
+  'google-email:ActionSendEmail': 'email',
+  'openai-gpt-3:CreateChatCompletion': 'openai',
+  'mysql:insertRow': 'database'
+};
+
+// n8n IF string operations and their Make.com filter operators
+const MAKE_OPERATORS = {
+  equal: 'text:equal',
+  notEqual: 'text:notequal',
+  contains: 'text:contain',
+  notContains: 'text:notcontain',
+  startsWith: 'text:startwith',
+  endsWith: 'text:endwith',
+  regex: 'text:pattern',
+  isEmpty: 'notexist',
+  isNotEmpty: 'exist'
+};
+const N8N_OPERATORS = Object.fromEntries(Object.entries(MAKE_OPERATORS).map(([n8n, make]) => [make, n8n]));
+const NEGATED = {
+  equal: 'notEqual', notEqual: 'equal', contains: 'notContains', notContains: 'contains', isEmpty: 'isNotEmpty', isNotEmpty: 'isEmpty'
+};
+
+const ROUTER = 'builtin:BasicRouter';
+const MAKE_PLACEHOLDER = 'util:SetVariable2';
+const N8N_PLACEHOLDER = 'n8n-nodes-base.noOp';
+
+export const WORKFLOW_PLATFORMS = ['n8n', 'make'];
+
+// --- helpers --------------------------------------------------------------------
+
+function getPath(object, path) {
+  return path.split('.').reduce((value, key) => (value == null ? undefined : value[key]), object);
+}
+
+function setPath(object, path, value) {
+  const keys = path.split('.');
+  let target = object;
+  keys.slice(0, -1).forEach((key, index) => {
+    if (target[key] == null || typeof target[key] !== 'object') target[key] = /^\d+$/.test(keys[index + 1]) ? [] : {};
+    target = target[key];
+  });
+  target[keys[keys.length - 1]] = value;
+}
+
+function mapStrings(value, replace) {
+  if (typeof value === 'string') return replace(value);
+  if (Array.isArray(value)) return value.map(item => mapStrings(item, replace));
+  if (value && typeof value === 'object') {
+    return Object.fromEntries(Object.entries(value).map(([key, item]) => [key, mapStrings(item, replace)]));
+  }
+  return value;
+}
+
+// ".a.b" from n8n's .a["b"][0] style accessors
+function normalizeAccessors(accessors) {
+  return accessors.replace(/\[\s*(["'])(.*?)\1\s*\]/g, '.$2').replace(/\[(\d+)\]/g, '.$1');
+}
+
+function n8nAccessors(path) {
+  return path
+    .split('.')
+    .filter(Boolean)
+    .map(key => (/^\d+$/.test(key) ? `[${key}]` : /^[A-Za-z_$][\w$]*$/.test(key) ? `.${key}` : `[${JSON.stringify(key)}]`))
+    .join('');
+}
+
+const NEUTRAL_REFERENCE = /\{\{(?:@([^.}\s]+)((?:\.[^.}\s]+)*)|:now)\}\}/g;
+
+function predecessors(graph) {
+  const map = new Map();
+  for (const edge of graph.edges) {
+    if (!map.has(edge.to)) map.set(edge.to, edge.from);
+  }
+  return map;
+}
+
+// --- n8n -------------------------------------------------------------------------
+
+const N8N_REFERENCE = new RegExp(
+  '^(JSON\\.stringify\\()?\\s*' +
+  '(?:\\$json|\\$node\\[\\s*(["\'])(.+?)\\2\\s*\\]\\.json|\\$\\(\\s*(["\'])(.+?)\\4\\s*\\)\\.(?:item|first\\(\\)|last\\(\\))\\.json)' +
+  '((?:\\.[A-Za-z_$][\\w$]*|\\[\\s*(["\'])[^"\']*\\7\\s*\\]|\\[\\d+\\])*)\\s*(\\))?$'
+);
+
+// One {{ ... }} body of an n8n expression as a neutral reference, or null
+function fromN8nReference(expression, source, ids) {
+  if (/^\$now(\.toISO\(\))?$/.test(expression)) return '{{:now}}';
+  const match = expression.match(N8N_REFERENCE);
+  if (!match || Boolean(match[1]) !== Boolean(match[8])) return null;
+  const name = match[3] ?? match[5];
+  const id = name === undefined ? source : ids.get(name);
+  if (id === undefined) return null;
+  // The whole item is only meaningful stringified
+  const path = normalizeAccessors(match[6]);
+  if (!path && !match[1]) return null;
+  return `{{@${id}${path}}}`;
+}
+
+function fromN8nValue(value, source, ids) {
+  return mapStrings(value, text => {
+    if (!text.startsWith('=')) return text;
+    return text.slice(1).replace(/\{\{\s*(.*?)\s*\}\}/g, (whole, expression) => (
+      fromN8nReference(expression, source, ids) ?? whole
+    ));
+  });
+}
+
+/** Graph of an n8n workflow ({ name, nodes, connections }). */
+export function fromN8n(workflow) {
+  const source = Array.isArray(workflow?.nodes) ? workflow.nodes : [];
+  const nodes = source.map((node, index) => {
+    const type = node.type || '';
+    return {
+      id: String(node.id ?? `n${index + 1}`),
+      name: node.name || `Node ${index + 1}`,
+      kind: N8N_KINDS.get(type) || N8N_ALIASES[type] || null,
+      fields: {},
+      position: Array.isArray(node.position) ? node.position : [250 + index * 220, 300],
+      original: { platform: 'n8n', node }
+    };
+  });
+
+  // Connections are keyed by node name (some generated workflows use the id)
+  const ids = new Map();
+  for (const node of nodes) ids.set(node.id, node.id);
+  for (const node of nodes) ids.set(node.name, node.id);
+  const edges = [];
+  for (const [key, outputs] of Object.entries(workflow?.connections || {})) {
+    const from = ids.get(key);
+    if (from === undefined) continue;
+    (outputs?.main || []).forEach((targets, output) => {
+      for (const target of targets || []) {
+        const to = ids.get(target?.node);
+        if (to !== undefined) edges.push({ from, to, output });
+      }
+    });
+  }
+
+  const graph = { name: workflow?.name || '', nodes, edges };
+  const incoming = predecessors(graph);
+  const names = new Map(nodes.map(node => [node.name, node.id]));
+  for (const node of nodes) {
+    const spec = KINDS[node.kind];
+    if (!spec) continue;
+    const parameters = node.original.node.parameters || {};
+    for (const [field, [path]] of Object.entries(spec.fields)) {
+      const value = path ? getPath(parameters, path) : undefined;
+      if (value !== undefined) node.fields[field] = fromN8nValue(value, incoming.get(node.id), names);
+    }
+  }
+  return graph;
+}
+
+/** { workflow, warnings }: `graph` as an n8n workflow. */
+export function toN8n(graph) {
+  const warnings = [];
+  const byId = new Map(graph.nodes.map(node => [node.id, node]));
+  const incoming = predecessors(graph);
+
+  // n8n needs unique node names
+  const names = new Map();
+  const taken = new Set();
+  for (const node of graph.nodes) {
+    const base = node.name || KINDS[node.kind]?.label || 'Node';
+    let name = base;
+    for (let count = 2; taken.has(name); count++) name = `${base} ${count}`;
+    taken.add(name);
+    names.set(node.id, name);
+  }
+
+  // The item a node receives is its predecessor's output, passed through IF nodes
+  const inputOf = id => {
+    let source = incoming.get(id);
+    while (source !== undefined && byId.get(source)?.kind === 'condition') source = incoming.get(source);
+    return source;
+  };
+
+  const expressions = (value, node) => mapStrings(value, text => {
+    if (!text.includes('{{')) return text;
+    const direct = incoming.get(node.id);
+    const input = inputOf(node.id);
+    const converted = text.replace(NEUTRAL_REFERENCE, (whole, id, path) => {
+      if (id === undefined) return '{{$now.toISO()}}';
+      const item = id === direct || id === input
+        ? '$json'
+        : names.has(id) ? `$node[${JSON.stringify(names.get(id))}].json` : null;
+      if (!item) return whole;
+      return path ? `{{${item}${n8nAccessors(path)}}}` : `{{JSON.stringify(${item})}}`;
+    });
+    return `=${converted}`;
+  });
+
+  const nodes = graph.nodes.map(node => {
+    const spec = KINDS[node.kind];
+    const original = node.original?.platform === 'n8n' ? node.original.node : null;
+    if (!spec) {
+      if (original) return { ...structuredClone(original), id: node.id, name: names.get(node.id), position: node.position };
+      warnings.push(`"${node.name}" (${node.original?.module?.module || 'unknown'}) has no n8n equivalent; added as a placeholder node`);
+      return {
+        id: node.id,
+        name: names.get(node.id),
+        type: N8N_PLACEHOLDER,
+        typeVersion: 1,
+        position: node.position,
+        parameters: {},
+        notes: `Converted from Make.com module ${node.original?.module?.module || 'unknown'}; configure manually`
+      };
+    }
+    const parameters = structuredClone(original ? original.parameters || {} : spec.defaults.n8n);
+    for (const [field, [path, , format]] of Object.entries(spec.fields)) {
+      if (!path || node.fields[field] === undefined) continue;
+      const value = expressions(node.fields[field], node);
+      setPath(parameters, path, format ? format(value) : value);
+    }
+    if (original) return { ...structuredClone(original), id: node.id, name: names.get(node.id), position: node.position, parameters };
+    return { id: node.id, name: names.get(node.id), type: spec.n8n, typeVersion: 1, position: node.position, parameters };
+  });
+
+  const connections = {};
+  for (const edge of graph.edges) {
+    if (!byId.has(edge.from) || !byId.has(edge.to)) continue;
+    const main = (connections[names.get(edge.from)] ||= { main: [] }).main;
+    while (main.length <= edge.output) main.push([]);
+    main[edge.output].push({ node: names.get(edge.to), type: 'main', index: 0 });
+  }
+
+  return { workflow: { name: graph.name, nodes, connections, settings: { executionOrder: 'v1' } }, warnings };
+}
+
+// --- Make.com --------------------------------------------------------------------
+
+function fromMakeValue(value, modules) {
+  return mapStrings(value, text => text.replace(/\{\{\s*(?:(\d+)((?:\.[\w-]+)*)|now)\s*\}\}/g, (whole, module, path) => {
+    if (module === undefined) return '{{:now}}';
+    return modules.has(module) ? `{{@${modules.get(module)}${path}}}` : whole;
+  }));
+}
+
+/** Graph of a Make.com scenario ({ name, scenario: { flow } }, or a blueprint with a top-level flow). */
+export function fromMake(workflow) {
+  const flow = workflow?.scenario?.flow || workflow?.flow || [];
+  const graph = { name: workflow?.name || '', nodes: [], edges: [] };
+  // Make.com module id -> node id, for {{N.field}} references
+  const modules = new Map();
+  const pending = [];
+
+  const link = (from, to) => {
+    if (from !== undefined) graph.edges.push({ from, to, output: 0 });
+  };
+
+  const walk = (list, from) => {
+    let previous = from;
+    for (const module of list || []) {
+      if (module.module === ROUTER) {
+        // Every route starts from the step before the router
+        for (const route of module.routes || []) walk(route.flow, previous);
+        return;
+      }
+      const id = String(module.id ?? `m${graph.nodes.length + 1}`);
+      const designer = module.metadata?.designer || {};
+      const position = [designer.x ?? graph.nodes.length * 300, designer.y ?? 0];
+
+      // A filter becomes an IF node in front of the module
+      const condition = module.filter?.conditions?.[0]?.[0];
+      if (condition) {
+        const filterId = `${id}-filter`;
+        graph.nodes.push({
+          id: filterId,
+          name: module.filter.name || 'Filter',
+          kind: 'condition',
+          fields: {},
+          position: [position[0] - 150, position[1]],
+          original: null
+        });
+        pending.push({ id: filterId, condition });
+        link(previous, filterId);
+        previous = filterId;
+      }
+
+      const kind = MAKE_KINDS.get(module.module) || MAKE_ALIASES[module.module] || null;
+      graph.nodes.push({
+        id,
+        name: designer.name || KINDS[kind]?.label || module.module || `Module ${id}`,
+        kind,
+        fields: {},
+        position,
+        original: { platform: 'make', module }
+      });
+      modules.set(String(module.id), id);
+      pending.push({ id, module, kind });
+      link(previous, id);
+      previous = id;
+    }
+  };
+  walk(flow);
+
+  const byId = new Map(graph.nodes.map(node => [node.id, node]));
+  for (const { id, module, kind, condition } of pending) {
+    const node = byId.get(id);
+    if (condition) {
+      node.fields = {
+        left: fromMakeValue(condition.a ?? '', modules),
+        operation: N8N_OPERATORS[condition.o] || 'equal',
+        right: fromMakeValue(condition.b ?? '', modules)
+      };
+      continue;
+    }
+    const spec = KINDS[kind];
+    if (!spec) continue;
+    const settings = { ...module.parameters, ...module.mapper };
+    for (const [field, [, path]] of Object.entries(spec.fields)) {
+      const value = path ? getPath(settings, path) : undefined;
+      if (value !== undefined) node.fields[field] = fromMakeValue(value, modules);
+    }
+  }
+  return graph;
+}
+
+/** { workflow, warnings }: `graph` as a Make.com scenario. */
+export function toMake(graph) {
+  const warnings = [];
+  const byId = new Map(graph.nodes.map(node => [node.id, node]));
+  const outgoing = new Map();
+  const hasIncoming = new Set();
+  for (const edge of graph.edges) {
+    if (!byId.has(edge.from) || !byId.has(edge.to)) continue;
+    if (!outgoing.has(edge.from)) outgoing.set(edge.from, []);
+    outgoing.get(edge.from).push(edge);
+    hasIncoming.add(edge.to);
+  }
+  const targets = (id, output) => (outgoing.get(id) || [])
+    .filter(edge => output === undefined || edge.output === output)
+    .map(edge => edge.to);
+
+  const moduleIds = new Map();
+  let nextId = 1;
+  const visited = new Set();
+
+  // References resolve to the module that produced the data; IF nodes produce none
+  const expressions = (value, previousModule) => mapStrings(value, text => text.replace(NEUTRAL_REFERENCE, (whole, id, path) => {
+    if (id === undefined) return '{{now}}';
+    const module = moduleIds.get(id) ?? previousModule;
+    if (module === undefined) return whole;
+    return `{{${module}${path || ''}}}`;
+  }));
+
+  const filterFor = (node, previousModule, negate) => {
+    const operation = negate ? NEGATED[node.fields.operation] : node.fields.operation || 'equal';
+    if (!operation) return null;
+    return {
+      name: negate ? `Not: ${node.name}` : node.name,
+      conditions: [[{
+        a: expressions(node.fields.left ?? '', previousModule),
+        o: MAKE_OPERATORS[operation] || 'text:equal',
+        b: expressions(node.fields.right ?? '', previousModule)
+      }]]
+    };
+  };
+
+  const moduleFor = (node, previousModule) => {
+    const spec = KINDS[node.kind];
+    const original = node.original?.platform === 'make' ? node.original.module : null;
+    const designer = { x: node.position?.[0] ?? 0, y: node.position?.[1] ?? 0, name: node.name };
+    const id = nextId++;
+    moduleIds.set(node.id, id);
+    if (!spec) {
+      if (original) {
+        const { filter, ...module } = structuredClone(original);
+        return { ...module, id, metadata: { ...module.metadata, designer: { ...module.metadata?.designer, ...designer } } };
+      }
+      warnings.push(`"${node.name}" (${node.original?.node?.type || 'unknown'}) has no Make.com equivalent; added as a placeholder module`);
+      return {
+        id,
+        module: MAKE_PLACEHOLDER,
+        version: 1,
+        parameters: {},
+        mapper: { name: node.name, scope: 'roundtrip', value: `Converted from n8n node ${node.original?.node?.type || 'unknown'}` },
+        metadata: { designer }
+      };
+    }
+    const parameters = structuredClone(original?.parameters || (spec.trigger ? spec.defaults.make : {}));
+    const mapper = structuredClone(original?.mapper || (spec.trigger ? {} : spec.defaults.make));
+    for (const [field, [, path, , format]] of Object.entries(spec.fields)) {
+      if (!path || node.fields[field] === undefined) continue;
+      const value = expressions(node.fields[field], previousModule);
+      const key = path.split('.')[0];
+      // Triggers are configured in parameters, actions map data in mapper
+      const target = original ? (key in (original.mapper || {}) ? mapper : key in (original.parameters || {}) ? parameters : spec.trigger ? parameters : mapper)
+        : spec.trigger ? parameters : mapper;
+      setPath(target, path, format ? format(value) : value);
+    }
+    return {
+      id,
+      module: original?.module || spec.make,
+      version: original?.version || 1,
+      parameters,
+      mapper,
+      metadata: { ...original?.metadata, designer }
+    };
+  };
+
+  const router = (routes, previousModule) => ({
+    id: nextId++,
+    module: ROUTER,
+    version: 1,
+    mapper: null,
+    metadata: { designer: { x: 0, y: 0 } },
+    routes: routes.map(({ start, filter }) => ({ flow: chain(start, previousModule, filter) }))
+  });
+
+  // The flow starting at `start`; branches become routers
+  function chain(start, previousModule, filter) {
+    const flow = [];
+    let id = start;
+    let pendingFilter = filter || null;
+    let previous = previousModule;
+    while (id !== undefined) {
+      const node = byId.get(id);
+      if (visited.has(id)) {
+        warnings.push(`"${node.name}" is reached from more than one step; Make.com scenarios are trees, so only the first path keeps it`);
+        break;
+      }
+      visited.add(id);
+
+      if (node.kind === 'condition') {
+        if (pendingFilter) warnings.push(`"${node.name}" follows another condition; only the first is kept as a filter`);
+        const whenTrue = targets(id, 0);
+        const whenFalse = targets(id, 1);
+        const routes = [
+          ...whenTrue.map(start => ({ start, filter: pendingFilter || filterFor(node, previous, false) })),
+          ...whenFalse.map(start => ({ start, filter: filterFor(node, previous, true) }))
+        ];
+        if (whenFalse.length > 0 && !NEGATED[node.fields.operation || 'equal']) {
+          warnings.push(`The false branch of "${node.name}" has no Make.com filter; it runs unconditionally`);
+        }
+        if (routes.length === 1) {
+          pendingFilter = routes[0].filter;
+          id = routes[0].start;
+          continue;
+        }
+        if (routes.length > 1) flow.push(router(routes, previous));
+        break;
+      }
+
+      const module = moduleFor(node, previous);
+      if (pendingFilter) module.filter = pendingFilter;
+      pendingFilter = null;
+      flow.push(module);
+      previous = module.id;
+
+      const next = targets(id);
+      if (next.length === 1) {
+        id = next[0];
+      } else {
+        if (next.length > 1) flow.push(router(next.map(start => ({ start })), previous));
+        break;
+      }
+    }
+    return flow;
+  }
+
+  const roots = graph.nodes.filter(node => !hasIncoming.has(node.id));
+  const [trigger, ...others] = roots.length > 0 ? roots : graph.nodes.slice(0, 1);
+  for (const other of others) {
+    warnings.push(`"${other.name}" starts a second flow; a Make.com scenario has one trigger, so it was left out`);
+  }
+  const flow = trigger ? chain(trigger.id) : [];
+  for (const node of graph.nodes) {
+    if (!visited.has(node.id) && !others.includes(node)) warnings.push(`"${node.name}" is not reachable from the trigger and was left out`);
+  }
+
+  return {
+    workflow: {
+      name: graph.name,
+      scenario: {
+        dsl: '1.0.0',
+        flow,
+        metadata: {
+          instant: trigger?.kind === 'webhook',
+          version: 1,
+          scenario: { roundtrips: 1, maxCycles: 1, autoCommit: true, sequential: false, slots: null }
+        }
+      }
+    },
+    warnings
+  };
+}
+
+// --- conversion ------------------------------------------------------------------
+
+export function workflowGraph(workflow, platform) {
+  return platform === 'n8n' ? fromN8n(workflow) : fromMake(workflow);
+}
+
+/**
+ * Convert a workflow between platforms ('n8n' or 'make') without a model
+ * call. Returns { workflow, warnings }; warnings list the steps that could
+ * not be carried over exactly.
+ */
+export function convertWorkflow(workflow, from, to) {
+  const graph = workflowGraph(workflow, from);
+  return to === 'n8n' ? toN8n(graph) : toMake(graph);
+}
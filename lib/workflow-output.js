@@ -0,0 +1,159 @@
+import { TolerantJsonParser } from './tolerant-json.js';
+
+// Turning a model's workflow reply into a workflow, as the reply streams.
+//
+// The text goes through TolerantJsonParser (fences, prose and JSON slips are
+// handled there) and every n8n node or Make.com module, router routes
+// included, is checked against the platform's shape the moment it completes.
+// One without a usable type is dropped there and then, so a reply cut off
+// mid-node loses that node and nothing else. end() finishes the workflow:
+// missing positions and ids are filled in, connections to nodes that never
+// arrived are removed, and an n8n reply that was cut off before its
+// connections gets its nodes connected in order.
+//
+// A reply that stopped early is only used if at least MIN_TRUNCATED_NODES
+// steps survived; otherwise the caller falls back to its basic template.
+
+const MIN_TRUNCATED_NODES = 2;
+
+const isObject = value => value !== null && typeof value === 'object' && !Array.isArray(value);
+
+function checkN8nNode(node) {
+  if (!isObject(node) || typeof node.type !== 'string' || !/^[@\w-]+(\/[\w-]+)?\.\w+/.test(node.type)) return false;
+  if (typeof node.name !== 'string' || !node.name) node.name = String(node.id ?? node.type.split('.').pop());
+  if (!isObject(node.parameters)) node.parameters = {};
+  if (node.typeVersion === undefined) node.typeVersion = 1;
+  return true;
+}
+
+function checkMakeModule(module) {
+  if (!isObject(module) || typeof module.module !== 'string' || !/^[\w-]+:\w+/.test(module.module)) return false;
+  if (!isObject(module.parameters)) module.parameters = {};
+  if (module.mapper !== null && !isObject(module.mapper)) module.mapper = {};
+  return true;
+}
+
+function finishN8n(root, notes) {
+  const nodes = Array.isArray(root?.nodes) ? root.nodes : [];
+  if (nodes.length === 0) return null;
+  nodes.forEach((node, index) => {
+    if (!Array.isArray(node.position)) node.position = [250 + index * 220, 300];
+  });
+
+  const known = new Set(nodes.flatMap(node => [node.name, node.id]).filter(Boolean));
+  const connections = {};
+  let removed = 0;
+  for (const [source, outputs] of Object.entries(isObject(root.connections) ? root.connections : {})) {
+    if (!known.has(source) || !Array.isArray(outputs?.main)) {
+      removed++;
+      continue;
+    }
+    const main = outputs.main.map(targets => (Array.isArray(targets) ? targets : []).filter(target => {
+      const keep = isObject(target) && known.has(target.node);
+      if (!keep) removed++;
+      return keep;
+    }));
+    if (main.some(targets => targets.length > 0)) connections[source] = { ...outputs, main };
+  }
+  if (removed > 0) notes.push(`removed ${removed} connection${removed === 1 ? '' : 's'} to missing nodes`);
+  if (Object.keys(connections).length === 0 && nodes.length > 1) {
+    for (let index = 0; index < nodes.length - 1; index++) {
+      connections[nodes[index].name] = { main: [[{ node: nodes[index + 1].name, type: 'main', index: 0 }]] };
+    }
+    notes.push('connected the nodes in order (the reply had no connections)');
+  }
+  return { ...root, nodes, connections, settings: isObject(root.settings) ? root.settings : { executionOrder: 'v1' } };
+}
+
+function finishMake(root, notes) {
+  const flow = root?.scenario?.flow ?? root?.flow;
+  if (!Array.isArray(flow)) return null;
+
+  let nextId = 1;
+  const visit = list => {
+    for (const module of list) {
+      if (typeof module.id === 'number') nextId = Math.max(nextId, module.id + 1);
+      for (const route of Array.isArray(module.routes) ? module.routes : []) visit(Array.isArray(route?.flow) ? route.flow : []);
+    }
+  };
+  visit(flow);
+  // Routes that lost all their modules, and routers left without routes, go
+  const tidy = list => list.filter(module => {
+    if (module.id === undefined || module.id === null) module.id = nextId++;
+    if (!Array.isArray(module.routes)) return true;
+    module.routes = module.routes.filter(route => Array.isArray(route?.flow) && (route.flow = tidy(route.flow)).length > 0);
+    return module.routes.length > 0;
+  });
+  const modules = tidy(flow);
+  if (modules.length === 0) return null;
+
+  // Blueprints exported from Make.com keep flow at the top level; the app nests it in scenario
+  const { flow: topFlow, scenario, ...rest } = root;
+  return {
+    ...rest,
+    scenario: {
+      ...(isObject(scenario) ? scenario : {}),
+      dsl: scenario?.dsl || '1.0.0',
+      flow: modules,
+      metadata: isObject(scenario?.metadata) ? scenario.metadata : isObject(root.metadata) ? root.metadata : { version: 1 }
+    }
+  };
+}
+
+function stepCount(workflow, platform) {
+  if (platform === 'n8n') return workflow.nodes.length;
+  const count = list => list.reduce((total, module) => (
+    total + 1 + (module.routes || []).reduce((sum, route) => sum + count(route.flow), 0)
+  ), 0);
+  return count(workflow.scenario.flow);
+}
+
+export class WorkflowOutputParser {
+  constructor(platform) {
+    this.platform = platform;
+    this.dropped = 0;
+    this.parser = new TolerantJsonParser({ onClose: (path, value) => this.check(path, value) });
+  }
+
+  get started() {
+    return this.parser.started;
+  }
+
+  // The workflow's JSON has closed; anything after it is commentary
+  get done() {
+    return this.parser.done;
+  }
+
+  write(text) {
+    this.parser.write(text);
+  }
+
+  check(path, value) {
+    if (typeof path[path.length - 1] !== 'number') return true;
+    const parent = path[path.length - 2];
+    const valid = this.platform === 'n8n'
+      ? parent !== 'nodes' || checkN8nNode(value)
+      : parent !== 'flow' || checkMakeModule(value);
+    if (!valid) this.dropped++;
+    return valid;
+  }
+
+  /**
+   * Finish the reply. Returns { workflow, complete, repairs }: workflow is
+   * null when nothing usable arrived, complete is false when the reply was
+   * cut off, and repairs lists what had to be fixed.
+   */
+  end() {
+    const { value, complete, repairs } = this.parser.end();
+    const notes = [...repairs];
+    if (this.dropped > 0) {
+      notes.push(`dropped ${this.dropped} invalid ${this.platform === 'n8n' ? 'node' : 'module'}${this.dropped === 1 ? '' : 's'}`);
+    }
+    // Some replies wrap the workflow: { "workflow": { ... } }
+    const key = this.platform === 'n8n' ? 'nodes' : 'flow';
+    const root = isObject(value) && !value[key] && !value.scenario && isObject(value.workflow) ? value.workflow : value;
+    const workflow = isObject(root) ? (this.platform === 'n8n' ? finishN8n(root, notes) : finishMake(root, notes)) : null;
+    const usable = workflow && stepCount(workflow, this.platform) >= (complete ? 1 : MIN_TRUNCATED_NODES);
+    return { workflow: usable ? workflow : null, complete, repairs: notes };
+  }
+}
@@ -0,0 +1,500 @@
+import { createHash } from 'crypto';
+import { loadWorkflow } from './generated-store.js';
+import { KINDS, toN8n, toMake } from './workflow-graph.js';
+
+// Local template tier for /workflow-builder/generate.
+//
+// Stock automations ("form submission -> welcome email -> CRM") come up again
+// and again, and each one used to cost a 3000-token LLM call. This index
+// holds the curated templates below plus every workflow an LLM generated
+// before (generated_workflows with source 'llm'), and matches a request's
+// automation description against them by TF-IDF cosine similarity. A match
+// above the threshold is instantiated for the request's name in a few
+// milliseconds, with no provider call.
+//
+// Vectors are sparse (term -> weight, unit length) and searched through an
+// inverted index, so a query only touches documents sharing a term with it.
+// New LLM workflows are added as they are saved, weighted with the IDF of the
+// last build; the whole index is rebuilt from MongoDB once it gets old.
+//
+// Similar wording is not enough for a match. Every service or step the
+// request names (SERVICE_TERMS) and every rare term it uses must appear in
+// the matched template, and every service the template uses must be named in
+// the request, so "post to LinkedIn" never gets a Twitter workflow. Requests
+// that exclude something ("without Slack") always go to the LLM.
+// A generated workflow is only reused for the API key that generated it, and
+// at a stricter threshold: it may hold that user's addresses and URLs.
+
+export const TEMPLATE_MATCH_THRESHOLD = 0.55;
+export const GENERATED_MATCH_THRESHOLD = 0.85;
+// Terms in at most this share of the documents are rare enough to be required
+const RARE_TERM_SHARE = 0.01;
+const MAX_AGE_MS = 30 * 60 * 1000;
+const MAX_GENERATED = 5000;
+
+const STOPWORDS = new Set(`
+a an the and or but if then than so to of in on at by for from with into onto via per as is are be been being
+i me my we our us you your they them their it its this that these those there here what which who whom
+want wants would like need needs should could can will just also please automatically automatic automate
+automation workflow workflows whenever when once every each all any some new simple basic
+someone somebody anyone user users get gets got make makes create creates set up
+`.split(/\s+/).filter(Boolean));
+
+// Word forms that mean the same step
+const SYNONYMS = {
+  submission: 'submit', submitted: 'submit', submits: 'submit', fills: 'submit', filled: 'submit',
+  mail: 'email', emails: 'email', 'e-mail': 'email', gmail: 'email', smtp: 'email',
+  notification: 'notify', notifications: 'notify', notified: 'notify', alert: 'notify', alerts: 'notify',
+  hubspot: 'crm', salesforce: 'crm', pipedrive: 'crm', contacts: 'contact',
+  tweet: 'twitter', tweets: 'twitter', x: 'twitter',
+  spreadsheet: 'sheet', sheets: 'sheet', excel: 'sheet', csv: 'sheet',
+  db: 'database', postgres: 'database', mysql: 'database', mongodb: 'database',
+  scheduled: 'schedule', daily: 'schedule', hourly: 'schedule', weekly: 'schedule', cron: 'schedule',
+  article: 'post', articles: 'post', blog: 'post', publish: 'post', published: 'post', publishes: 'post',
+  appointment: 'booking', appointments: 'booking', booked: 'booking', bookings: 'booking',
+  down: 'outage', downtime: 'outage', outages: 'outage', uptime: 'monitor', monitoring: 'monitor'
+};
+
+// Services and step kinds: a request naming one only matches templates using it
+const SERVICE_TERMS = new Set([
+  ...Object.keys(KINDS),
+  'feed', 'sheet', 'instagram', 'tiktok', 'youtube', 'vimeo', 'pinterest', 'reddit', 'discord', 'telegram',
+  'whatsapp', 'teams', 'zoom', 'notion', 'airtable', 'trello', 'asana', 'jira', 'github', 'gitlab', 'dropbox',
+  'drive', 'onedrive', 's3', 'shopify', 'stripe', 'paypal', 'woocommerce', 'mailchimp', 'twilio', 'zendesk',
+  'intercom', 'typeform', 'calendly', 'wordpress', 'webflow', 'claude', 'anthropic', 'gemini', 'gpt', 'chatgpt'
+]);
+
+// Step kinds that shape a workflow rather than name a service it uses
+const STRUCTURAL_TERMS = new Set(['webhook', 'schedule', 'rss', 'feed', 'http', 'condition', 'transform', 'parse']);
+
+// Words that exclude the step after them
+const NEGATION = /\b(?:no|not|never|without|except|excluding|instead|don'?t|doesn'?t|avoid|skip)\b(?!-)/i;
+
+function stem(word) {
+  if (SYNONYMS[word]) return SYNONYMS[word];
+  if (word.length > 5 && word.endsWith('ing')) return word.slice(0, -3);
+  if (word.length > 4 && word.endsWith('ed')) return word.slice(0, -2);
+  if (word.length > 3 && word.endsWith('s') && !word.endsWith('ss')) return word.slice(0, -1);
+  return word;
+}
+
+export function tokenizeDescription(text) {
+  return (text || '')
+    .toLowerCase()
+    .split(/[^a-z0-9-]+/)
+    .filter(word => word && !STOPWORDS.has(word))
+    .map(stem)
+    .filter(word => word.length > 1 && !STOPWORDS.has(word));
+}
+
+// Raw term frequencies, dampened: 1 + ln(tf)
+function termWeights(tokens) {
+  const counts = new Map();
+  for (const token of tokens) counts.set(token, (counts.get(token) || 0) + 1);
+  for (const [term, count] of counts) counts.set(term, 1 + Math.log(count));
+  return counts;
+}
+
+// --- curated templates --------------------------------------------------------
+
+// Example settings for each kind of step, in workflow-graph's neutral form.
+// {{@trigger...}} and {{@prev...}} stand for the first and the previous step;
+// strings may use %name% (the workflow's name) and %slug% (its URL-safe form).
+const STEP_FIELDS = {
+  webhook: { path: '%slug%' },
+  schedule: { minutes: 60 },
+  rss: { url: 'https://example.com/feed.xml' },
+  http: { url: 'https://api.example.com/data', method: 'GET' },
+  condition: { left: '{{@prev.matches}}', operation: 'equal', right: 'true' },
+  transform: { values: [{ name: 'processed_at', value: '{{:now}}' }] },
+  email: { to: '{{@trigger.email}}', subject: '%name%', body: '{{@trigger.message}}' },
+  crm: { email: '{{@trigger.email}}', name: '{{@trigger.name}}' },
+  slack: { channel: '#general', text: '%name%: {{@prev}}' },
+  sms: { to: '{{@trigger.phone}}', message: '%name%' },
+  calendar: { calendar: 'primary', start: '{{@trigger.start}}', end: '{{@trigger.end}}', summary: '%name%' },
+  sheet: { sheet: 'Sheet1' },
+  database: { table: 'records' },
+  parse: {},
+  openai: { model: 'gpt-4', prompt: 'Write a post about {{@trigger.topic}}' },
+  twitter: { text: '{{@trigger.title}} {{@trigger.link}}' },
+  linkedin: { text: '{{@trigger.title}} {{@trigger.link}}' },
+  facebook: { message: '{{@trigger.title}} {{@trigger.link}}' }
+};
+
+// Each template lists phrasings people use for it and its steps as [step, label]
+export const CURATED = [
+  {
+    id: 'form-welcome-crm',
+    descriptions: [
+      'When someone submits a contact form on my website, send them a welcome email and add their information to my CRM',
+      'form submission welcome email add contact to crm'
+    ],
+    steps: [['webhook', 'Form Submission'], ['email', 'Send Welcome Email'], ['crm', 'Add Contact to CRM']]
+  },
+  {
+    id: 'email-form',
+    descriptions: [
+      'Send me an email notification when a form is submitted on my website',
+      'simple webhook to email workflow'
+    ],
+    steps: [['webhook', 'Webhook'], ['email', 'Send Email']]
+  },
+  {
+    id: 'social-media-automation',
+    descriptions: [
+      'Automatically post my blog content to Twitter, LinkedIn, and Facebook when I publish a new article',
+      'share new blog posts on social media platforms'
+    ],
+    steps: [['rss', 'New Blog Post'], ['twitter', 'Post to Twitter'], ['linkedin', 'Post to LinkedIn'], ['facebook', 'Post to Facebook']]
+  },
+  {
+    id: 'data-processing',
+    descriptions: [
+      'Fetch data from multiple APIs, clean and transform it, then store it in a database and send a summary report via email',
+      'data pipeline from api to database with report'
+    ],
+    steps: [['schedule', 'Schedule'], ['http', 'Fetch API Data'], ['transform', 'Clean and Transform'], ['database', 'Store in Database'], ['email', 'Email Summary Report']]
+  },
+  {
+    id: 'calendar-booking',
+    descriptions: [
+      'When a booking is made, create a calendar event, send a confirmation email and an SMS reminder',
+      'appointment booking confirmation and reminders'
+    ],
+    steps: [['webhook', 'New Booking'], ['calendar', 'Create Calendar Event'], ['email', 'Send Confirmation'], ['sms', 'Send SMS Reminder']]
+  },
+  {
+    id: 'content-generation',
+    descriptions: [
+      'Generate blog posts or social content with AI on a schedule and publish them',
+      'ai content generation with openai and publish to cms and twitter'
+    ],
+    steps: [['schedule', 'Schedule'], ['openai', 'Generate Content'], ['http', 'Publish to CMS'], ['twitter', 'Share on Twitter']]
+  },
+  {
+    id: 'lead-management',
+    descriptions: [
+      'Capture leads from a form, qualify them, add qualified leads to the CRM, start an email sequence and notify sales on Slack',
+      'lead capture qualification crm slack notification'
+    ],
+    steps: [['webhook', 'New Lead'], ['condition', 'Is Qualified'], ['crm', 'Add to CRM'], ['email', 'Start Email Sequence'], ['slack', 'Notify Sales']]
+  },
+  {
+    id: 'file-processing',
+    descriptions: [
+      'Process uploaded CSV or Excel files, generate a report and email it',
+      'parse uploaded spreadsheet file and send report'
+    ],
+    steps: [['webhook', 'File Uploaded'], ['parse', 'Parse File'], ['transform', 'Build Report'], ['email', 'Email Report']]
+  },
+  {
+    id: 'monitoring-alerts',
+    descriptions: [
+      'Monitor my website or API and send alerts by email and Slack when it goes down',
+      'uptime monitoring outage alert'
+    ],
+    steps: [['schedule', 'Every Hour'], ['http', 'Check Endpoint'], ['condition', 'Is Down'], ['email', 'Email Alert'], ['slack', 'Slack Alert']]
+  },
+  {
+    id: 'form-to-sheet',
+    descriptions: [
+      'Save every form submission as a new row in Google Sheets',
+      'log webhook data to a spreadsheet'
+    ],
+    steps: [['webhook', 'Form Submission'], ['sheet', 'Append Row']]
+  }
+];
+
+// A linear graph of [step, label] pairs
+function stepsGraph(steps) {
+  const nodes = steps.map(([step, label], index) => {
+    const previous = `node-${Math.max(index, 1)}`;
+    const fields = mapStrings(STEP_FIELDS[step], text => text
+      .replace(/\{\{@trigger/g, '{{@node-1')
+      .replace(/\{\{@prev/g, `{{@${previous}`));
+    return { id: `node-${index + 1}`, name: label, kind: step, fields, position: [250 + index * 220, 300], original: null };
+  });
+  const edges = nodes.slice(1).map((node, index) => ({ from: nodes[index].id, to: node.id, output: 0 }));
+  return { name: '%name%', nodes, edges };
+}
+
+function slugify(name) {
+  return (name || 'workflow').toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/^-|-$/g, '') || 'workflow';
+}
+
+// Deep copy of `value` with `replace` applied to every string
+function mapStrings(value, replace) {
+  if (typeof value === 'string') return replace(value);
+  if (Array.isArray(value)) return value.map(item => mapStrings(item, replace));
+  if (value && typeof value === 'object') {
+    return Object.fromEntries(Object.entries(value).map(([key, item]) => [key, mapStrings(item, replace)]));
+  }
+  return value;
+}
+
+// --- index ---------------------------------------------------------------------
+
+export class WorkflowTemplateIndex {
+  constructor(db) {
+    this.db = db;
+    this.entries = [];
+    this.postings = new Map();
+    this.idf = new Map();
+    this.defaultIdf = 1;
+    this.rareIdf = Infinity;
+    this.builtAt = 0;
+    this.building = null;
+    // Records added since the last build began, in case the build's read missed them
+    this.added = [];
+  }
+
+  async build() {
+    const readStartedAt = Date.now();
+    const generated = await this.db.collection('generated_workflows')
+      .find(
+        { source: 'llm', automation_description: { $type: 'string' } },
+        { projection: { _id: 0, id: 1, name: 1, platform: 1, automation_description: 1, owner: 1, storage: 1, workflow_blob: 1, preview_blob: 1 } }
+      )
+      .sort({ created_at: -1 })
+      .limit(MAX_GENERATED)
+      .toArray();
+
+    const documents = [];
+    for (const template of CURATED) {
+      // Required terms are checked against the whole template: all its phrasings and steps
+      const terms = new Set([...template.descriptions.flatMap(tokenizeDescription), ...template.steps.map(([step]) => step)]);
+      for (const platform of ['n8n', 'make']) {
+        for (const description of template.descriptions) {
+          documents.push({ source: 'curated', id: template.id, platform, description, template, terms });
+        }
+      }
+    }
+    const seen = new Set(generated.map(record => record.id));
+    this.added = this.added.filter(({ addedAt }) => addedAt >= readStartedAt);
+    for (const { record } of this.added) {
+      if (!seen.has(record.id)) generated.push(record);
+    }
+    for (const record of generated) {
+      documents.push({ source: 'generated', id: record.id, platform: record.platform, description: record.automation_description, record });
+    }
+
+    const tokenized = documents.map(document => tokenizeDescription(document.description));
+    const frequency = new Map();
+    for (const tokens of tokenized) {
+      for (const term of new Set(tokens)) frequency.set(term, (frequency.get(term) || 0) + 1);
+    }
+    // Smoothed IDF; terms first seen after the build get the rarest weight
+    this.idf = new Map([...frequency].map(([term, count]) => [term, Math.log((1 + documents.length) / (1 + count)) + 1]));
+    this.defaultIdf = Math.log(1 + documents.length) + 1;
+    const rareCount = Math.max(2, documents.length * RARE_TERM_SHARE);
+    this.rareIdf = Math.log((1 + documents.length) / (1 + rareCount)) + 1;
+
+    this.entries = [];
+    this.postings = new Map();
+    documents.forEach((document, index) => this.insert(document, tokenized[index]));
+    this.builtAt = Date.now();
+    console.log(`Workflow template index built: ${CURATED.length} curated templates, ${generated.length} generated workflows`);
+  }
+
+  vector(tokens) {
+    const weights = termWeights(tokens);
+    let norm = 0;
+    for (const [term, weight] of weights) {
+      const value = weight * (this.idf.get(term) ?? this.defaultIdf);
+      weights.set(term, value);
+      norm += value * value;
+    }
+    norm = Math.sqrt(norm) || 1;
+    for (const [term, value] of weights) weights.set(term, value / norm);
+    return weights;
+  }
+
+  insert(document, tokens) {
+    const vector = this.vector(tokens);
+    if (vector.size === 0) return;
+    const terms = document.terms || new Set(tokens);
+    const services = [...terms].filter(term => SERVICE_TERMS.has(term) && !STRUCTURAL_TERMS.has(term));
+    const index = this.entries.push({ ...document, terms, services, vector }) - 1;
+    for (const [term, weight] of vector) {
+      if (!this.postings.has(term)) this.postings.set(term, []);
+      this.postings.get(term).push([index, weight]);
+    }
+  }
+
+  // Rebuild in the background; concurrent callers share one build
+  refresh() {
+    if (!this.building) {
+      this.building = this.build()
+        .catch(error => console.error('Workflow template index build failed:', error.message))
+        .finally(() => { this.building = null; });
+    }
+    return this.building;
+  }
+
+  async ready() {
+    if (!this.builtAt) {
+      await this.refresh();
+    } else if (Date.now() - this.builtAt > MAX_AGE_MS) {
+      this.refresh();
+    }
+  }
+
+  /** Index a workflow an LLM just generated (a generated_workflows record). */
+  add(record) {
+    if (!record.automation_description) return;
+    this.added.push({ record, addedAt: Date.now() });
+    if (!this.builtAt) return;
+    this.insert(
+      { source: 'generated', id: record.id, platform: record.platform, description: record.automation_description, record },
+      tokenizeDescription(record.automation_description)
+    );
+  }
+
+  // Query terms a match must contain: services and steps, and terms few documents use
+  requiredTerms(tokens) {
+    return [...new Set(tokens)].filter(term => SERVICE_TERMS.has(term) || (this.idf.get(term) ?? 0) >= this.rareIdf);
+  }
+
+  /**
+   * Best match for a description on `platform`: { entry, score } or null
+   * when nothing reaches `threshold`. Generated workflows are only matched
+   * for their `owner` (see workflowOwner), at GENERATED_MATCH_THRESHOLD.
+   */
+  search(description, platform, { threshold = TEMPLATE_MATCH_THRESHOLD, owner = null } = {}) {
+    if (NEGATION.test(description || '')) return null;
+    const tokens = tokenizeDescription(description);
+    const required = this.requiredTerms(tokens);
+    const named = new Set(tokens);
+    const query = this.vector(tokens);
+    const scores = new Map();
+    for (const [term, weight] of query) {
+      for (const [index, documentWeight] of this.postings.get(term) || []) {
+        scores.set(index, (scores.get(index) || 0) + weight * documentWeight);
+      }
+    }
+    let best = null;
+    for (const [index, score] of scores) {
+      const entry = this.entries[index];
+      if (entry.platform !== platform || score < threshold) continue;
+      if (entry.source === 'generated' && (!owner || entry.record.owner !== owner || score < GENERATED_MATCH_THRESHOLD)) continue;
+      if (!required.every(term => entry.terms.has(term)) || !entry.services.every(term => named.has(term))) continue;
+      // Curated templates win ties; otherwise the newest generated one does
+      if (!best || score > best.score + 1e-9 || (Math.abs(score - best.score) <= 1e-9 && entry.source === 'curated')) {
+        best = { entry, score };
+      }
+    }
+    return best;
+  }
+
+  /**
+   * The matched workflow, instantiated for `name`. Returns
+   * { workflow, template: { id, source, score } }.
+   */
+  async instantiate({ entry, score }, name) {
+    let workflow;
+    if (entry.source === 'curated') {
+      const graph = stepsGraph(entry.template.steps);
+      const skeleton = (entry.platform === 'n8n' ? toN8n(graph) : toMake(graph)).workflow;
+      const slug = slugify(name);
+      workflow = mapStrings(skeleton, text => text.replace(/%name%/g, () => name).replace(/%slug%/g, () => slug));
+    } else {
+      const stored = await loadWorkflow(this.db, entry.record);
+      const original = entry.record.name;
+      workflow = original
+        ? mapStrings(stored.workflow, text => (text === original ? name : text))
+        : structuredClone(stored.workflow);
+      if (workflow && typeof workflow === 'object') workflow.name = name;
+    }
+    return { workflow, template: { id: entry.id, source: entry.source, score: Math.round(score * 1000) / 1000 } };
+  }
+}
+
+/** Who a generated workflow belongs to: a hash of the API key it was generated with. */
+export function workflowOwner(apiKey) {
+  return createHash('sha256').update(`workflow-owner:${apiKey}`, 'utf8').digest('hex');
+}
+
+let templateIndex;
+
+export function getWorkflowTemplateIndex(db) {
+  if (!templateIndex) templateIndex = new WorkflowTemplateIndex(db);
+  return templateIndex;
+}
+
+// --- system prompt -------------------------------------------------------------
+
+// The system prompt for LLM generation is the same for every request on a
+// platform: instructions, the step types the converters and the template tier
+// know, and a worked example. Only the user message changes, so providers
+// that cache prompt prefixes (Anthropic, with the cache_control ai-providers
+// sets; OpenAI automatically) can reuse it; both need at least 1,024 tokens,
+// which the catalogue and example take it past. It is built once per platform
+// so every request sends exactly the same text.
+
+const EXAMPLE_TEMPLATE = 'lead-management';
+const systemPrompts = new Map();
+
+function stepCatalogue(platform) {
+  return Object.values(KINDS).map(spec => {
+    const trigger = spec.trigger ? ' (trigger)' : '';
+    const paths = Object.values(spec.fields).map(([n8nPath, makePath]) => (platform === 'n8n' ? n8nPath : makePath)).filter(Boolean);
+    if (platform === 'make' && !spec.make) {
+      return `- ${spec.label}: not a module; a "filter" on the first module of a route (conditions: [[{ a, o, b }]])`;
+    }
+    const type = platform === 'n8n' ? `type "${spec.n8n}"` : `module "${spec.make}"`;
+    return `- ${spec.label}${trigger}: ${type}${paths.length ? `, settings: ${paths.join(', ')}` : ''}`;
+  }).join('\n');
+}
+
+function exampleWorkflow(platform) {
+  const template = CURATED.find(entry => entry.id === EXAMPLE_TEMPLATE);
+  const graph = stepsGraph(template.steps);
+  const { workflow } = platform === 'n8n' ? toN8n(graph) : toMake(graph);
+  return JSON.stringify(mapStrings(workflow, text => text.replace(/%name%/g, 'Lead Follow-up').replace(/%slug%/g, 'lead-follow-up')), null, 2);
+}
+
+export function workflowSystemPrompt(platform) {
+  if (systemPrompts.has(platform)) return systemPrompts.get(platform);
+  const label = platform === 'n8n' ? 'n8n' : 'Make.com';
+  const prompt = `You are an expert automation workflow designer for ${label}. Generate a complete, production-ready workflow JSON that can be directly imported into ${label}.
+
+CRITICAL REQUIREMENTS:
+1. Generate VALID ${label} workflow JSON format
+2. Include all necessary nodes, connections, and configurations
+3. Use realistic node IDs and proper connections
+4. Include error handling and proper data flow
+5. Add helpful comments and descriptions
+6. Make it production-ready with proper settings
+
+${platform === 'n8n' ? `N8N WORKFLOW STRUCTURE:
+- Use proper n8n node types (HTTP Request, Email, Database, etc.)
+- Include connections array with proper node linking
+- Use realistic node IDs (UUIDs)
+- Include proper node settings and parameters
+- Add credentials placeholders where needed
+- Include proper error handling nodes` : `MAKE.COM WORKFLOW STRUCTURE:
+- Use proper Make.com module structure
+- Include scenarios with modules and routes
+- Use realistic module IDs
+- Include proper module settings and mapping
+- Add webhooks, apps, and connections
+- Include error handling and filters`}
+
+WORKFLOW GENERATION RULES:
+- Create a logical flow based on the automation description
+- Include appropriate triggers (webhooks, schedules, etc.)
+- Add data transformation nodes where needed
+- Include proper error handling
+- Add notifications and logging
+- Make it scalable and maintainable
+
+COMMON STEPS (prefer these ${platform === 'n8n' ? 'node types' : 'modules'} when they fit; other valid ${label} ${platform === 'n8n' ? 'types' : 'modules'} are fine):
+${stepCatalogue(platform)}
+
+EXAMPLE (a webhook lead, qualified, added to the CRM, emailed and announced in Slack):
+${exampleWorkflow(platform)}
+
+IMPORTANT: Return ONLY the JSON workflow, no explanations or markdown formatting.`;
+  systemPrompts.set(platform, prompt);
+  return prompt;
+}
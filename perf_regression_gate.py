@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Performance Regression Gate for the HappyTools API
+Records latency baselines as versioned JSON files and compares fresh runs
+against them (or two deployments against each other) with a bootstrap
+confidence interval on the median.
+
+Usage:
+    python perf_regression_gate.py record  --name main
+    python perf_regression_gate.py compare --baseline perf_baselines/main/v003.json
+    python perf_regression_gate.py ab      --base-url-a https://a.example.com/api --base-url-b https://b.example.com/api
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from statistics import NormalDist
+
+import requests
+
+# Configuration
+BASE_URL = os.environ.get("BASE_URL", "https://f2884661-c20b-483f-ad47-0b43883bbdde.preview.emergentagent.com/api")
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json'
+}
+BASELINE_DIR = "perf_baselines"
+BASELINE_FORMAT_VERSION = 1
+
+# Read-only or side-effect free endpoints that are cheap enough to sample many times.
+# Each entry is (name, method, path, payload).
+BENCHMARK_ENDPOINTS = [
+    ("status", "GET", "/status", None),
+    ("ai-tools", "GET", "/ai-tools?page=1&limit=12", None),
+    ("ai-tools-search", "GET", "/ai-tools?search=image&limit=12", None),
+    ("ai-tools-trending", "GET", "/ai-tools/trending?limit=10", None),
+    ("ai-tools-categories", "GET", "/ai-tools/categories", None),
+    ("ai-tools-stats", "GET", "/ai-tools/stats", None),
+    ("cricket-player-stats", "GET", "/cricket/player-stats", None),
+    ("agents-intro-email", "POST", "/agents/run", {
+        "agentId": "intro-email",
+        "inputs": {
+            "person1": "Sarah Johnson",
+            "person2": "Michael Chen",
+            "purpose": "Latency benchmark introduction"
+        }
+    }),
+]
+
+
+def git_revision():
+    """Return the current git revision, or None outside a checkout"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def bootstrap_median_ratio(baseline, candidate, iterations=2000, confidence=0.95, seed=1234):
+    """Bootstrap CI for median(candidate) / median(baseline) - 1"""
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(iterations):
+        base_sample = [rng.choice(baseline) for _ in baseline]
+        cand_sample = [rng.choice(candidate) for _ in candidate]
+        base_median = statistics.median(base_sample)
+        if base_median <= 0:
+            continue
+        ratios.append(statistics.median(cand_sample) / base_median - 1)
+
+    ratios.sort()
+    alpha = (1 - confidence) / 2
+    lower = ratios[int(alpha * (len(ratios) - 1))]
+    upper = ratios[int((1 - alpha) * (len(ratios) - 1))]
+    point = statistics.median(candidate) / statistics.median(baseline) - 1
+    return point, lower, upper
+
+
+class PerfRegressionGate:
+    def __init__(self, samples=30, warmup=3, timeout=60):
+        self.samples = samples
+        self.warmup = warmup
+        self.timeout = timeout
+
+    def time_request(self, base_url, method, path, payload):
+        """Issue a single request and return wall time in milliseconds (None on failure)"""
+        start = time.perf_counter()
+        try:
+            response = requests.request(method, f"{base_url}{path}", json=payload,
+                                        headers=HEADERS, timeout=self.timeout)
+            # Include body transfer in the measurement
+            _ = response.content
+            elapsed = (time.perf_counter() - start) * 1000
+            return elapsed if response.status_code < 500 else None
+        except Exception as e:
+            print(f"   ⚠️  {method} {path}: {str(e)}")
+            return None
+
+    def run_benchmarks(self, base_urls):
+        """Sample every endpoint against one or more deployments.
+
+        Requests to different deployments are interleaved so that network
+        noise affects all of them equally.
+        """
+        results = {url: {} for url in base_urls}
+
+        for name, method, path, payload in BENCHMARK_ENDPOINTS:
+            print(f"--- Benchmarking {name} ({method} {path}) ---")
+            for url in base_urls:
+                for _ in range(self.warmup):
+                    self.time_request(url, method, path, payload)
+                results[url][name] = {"method": method, "path": path, "samples_ms": [], "errors": 0}
+
+            for _ in range(self.samples):
+                for url in base_urls:
+                    elapsed = self.time_request(url, method, path, payload)
+                    entry = results[url][name]
+                    if elapsed is None:
+                        entry["errors"] += 1
+                    else:
+                        entry["samples_ms"].append(round(elapsed, 3))
+
+            for url in base_urls:
+                samples = results[url][name]["samples_ms"]
+                if samples:
+                    print(f"   {url}: median {statistics.median(samples):.1f} ms over {len(samples)} samples")
+                else:
+                    print(f"   {url}: no successful samples")
+
+        return results
+
+    def build_run(self, base_url, endpoints):
+        return {
+            "format_version": BASELINE_FORMAT_VERSION,
+            "base_url": base_url,
+            "recorded_at": datetime.now().isoformat(),
+            "git_revision": git_revision(),
+            "samples_per_endpoint": self.samples,
+            "endpoints": endpoints
+        }
+
+
+def baseline_versions(directory):
+    """(version, filename) for the vNNN.json files in a baseline directory, in numeric order"""
+    return sorted(
+        (int(f[1:-5]), f) for f in os.listdir(directory)
+        if f.startswith("v") and f.endswith(".json") and f[1:-5].isdigit()
+    )
+
+
+def next_baseline_path(name):
+    """Return perf_baselines/<name>/vNNN.json for the next free version"""
+    directory = os.path.join(BASELINE_DIR, name)
+    os.makedirs(directory, exist_ok=True)
+    versions = baseline_versions(directory)
+    return os.path.join(directory, f"v{(versions[-1][0] + 1 if versions else 1):03d}.json")
+
+
+def latest_baseline_path(name):
+    directory = os.path.join(BASELINE_DIR, name)
+    if not os.path.isdir(directory):
+        return None
+    versions = baseline_versions(directory)
+    # Numeric, so v1000.json comes after v999.json
+    return os.path.join(directory, versions[-1][1]) if versions else None
+
+
+def error_rate(entry):
+    """Fraction of sampled requests that failed (None when nothing was sampled)"""
+    if not entry:
+        return None
+    total = len(entry.get("samples_ms", [])) + entry.get("errors", 0)
+    return entry.get("errors", 0) / total if total else None
+
+
+def error_counts(entry):
+    """(errors, requests) of a run entry"""
+    if not entry:
+        return 0, 0
+    errors = entry.get("errors", 0)
+    return errors, len(entry.get("samples_ms", [])) + errors
+
+
+def error_increase_significant(base_entry, cand_entry, confidence):
+    """One-sided two-proportion z-test: did the error rate really go up?
+
+    A single failed request out of 30 is noise, not a regression; the
+    increase has to be unlikely at the given confidence level.
+    """
+    base_errors, base_total = error_counts(base_entry)
+    cand_errors, cand_total = error_counts(cand_entry)
+    if not base_total or not cand_total:
+        return False
+    pooled = (base_errors + cand_errors) / (base_total + cand_total)
+    se = (pooled * (1 - pooled) * (1 / base_total + 1 / cand_total)) ** 0.5
+    if se == 0:
+        return False
+    z = (cand_errors / cand_total - base_errors / base_total) / se
+    return z > NormalDist().inv_cdf(confidence)
+
+
+def compare_runs(baseline, candidate, tolerance, confidence, max_error_rate):
+    """Compare two runs endpoint by endpoint. Returns (rows, regressions).
+
+    An endpoint regresses when its median slows down beyond the tolerance,
+    when its error rate is above max_error_rate or significantly above the
+    baseline's, or when none of its requests succeeded at all.
+    """
+    rows = []
+    regressions = []
+
+    for name, base_entry in baseline["endpoints"].items():
+        cand_entry = candidate["endpoints"].get(name)
+        base_samples = base_entry.get("samples_ms", [])
+        cand_samples = cand_entry.get("samples_ms", []) if cand_entry else []
+
+        if not cand_samples:
+            rows.append((name, None, None, None, None, None, "REGRESSION (no successful samples)"))
+            regressions.append(name)
+            continue
+
+        base_errors = error_rate(base_entry) or 0
+        cand_errors = error_rate(cand_entry) or 0
+        if cand_errors > max_error_rate or error_increase_significant(base_entry, cand_entry, confidence):
+            rows.append((name, None, None, None, None, None,
+                         f"REGRESSION (errors {base_errors * 100:.0f}% -> {cand_errors * 100:.0f}%)"))
+            regressions.append(name)
+            continue
+
+        if len(base_samples) < 5 or len(cand_samples) < 5:
+            rows.append((name, None, None, None, None, None, "insufficient samples"))
+            continue
+
+        point, lower, upper = bootstrap_median_ratio(base_samples, cand_samples, confidence=confidence)
+        base_median = statistics.median(base_samples)
+        cand_median = statistics.median(cand_samples)
+
+        # Only flag a regression when the whole interval clears the tolerance
+        if lower > tolerance:
+            verdict = "REGRESSION"
+            regressions.append(name)
+        elif upper < -tolerance:
+            verdict = "improved"
+        else:
+            verdict = "ok"
+
+        rows.append((name, base_median, cand_median, point, lower, upper, verdict))
+
+    return rows, regressions
+
+
+def print_diff(rows, label_a, label_b, tolerance, confidence):
+    print("\n" + "="*100)
+    print(f"LATENCY COMPARISON  (median, {int(confidence * 100)}% bootstrap CI, tolerance {tolerance * 100:.0f}%)")
+    print(f"  A: {label_a}")
+    print(f"  B: {label_b}")
+    print("="*100)
+    print(f"{'endpoint':<24}{'A median':>12}{'B median':>12}{'change':>10}{'CI':>22}   verdict")
+    print("-"*100)
+    for name, base_median, cand_median, point, lower, upper, verdict in rows:
+        if base_median is None:
+            marker = "❌" if verdict.startswith("REGRESSION") else "  "
+            print(f"{name:<24}{'-':>12}{'-':>12}{'-':>10}{'-':>22}   {marker} {verdict}")
+            continue
+        marker = "❌" if verdict == "REGRESSION" else ("✅" if verdict == "improved" else "  ")
+        ci = f"[{lower * 100:+.1f}%, {upper * 100:+.1f}%]"
+        print(f"{name:<24}{base_median:>10.1f}ms{cand_median:>10.1f}ms{point * 100:>+9.1f}%{ci:>22}   {marker} {verdict}")
+
+
+def load_run(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_run(run, path):
+    with open(path, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"💾 Saved benchmark run to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HappyTools performance regression gate")
+    parser.add_argument("--samples", type=int, default=30, help="samples per endpoint")
+    parser.add_argument("--warmup", type=int, default=3, help="warmup requests per endpoint")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed median slowdown (0.10 = 10%%)")
+    parser.add_argument("--confidence", type=float, default=0.95, help="bootstrap confidence level")
+    parser.add_argument("--max-error-rate", type=float, default=0.05,
+                        help="allowed fraction of failed requests per endpoint (0.05 = 5%%)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="run benchmarks and store a new baseline version")
+    record.add_argument("--name", default="default", help="baseline series name")
+    record.add_argument("--base-url", default=BASE_URL)
+
+    compare = sub.add_parser("compare", help="compare a fresh run (or saved run) against a baseline")
+    compare.add_argument("--baseline", help="baseline file (defaults to latest version of --name)")
+    compare.add_argument("--name", default="default")
+    compare.add_argument("--candidate", help="saved run to compare instead of running benchmarks")
+    compare.add_argument("--base-url", default=BASE_URL)
+    compare.add_argument("--save", action="store_true", help="store the fresh run as the next baseline version")
+
+    ab = sub.add_parser("ab", help="A/B compare two deployments in one interleaved run")
+    ab.add_argument("--base-url-a", required=True)
+    ab.add_argument("--base-url-b", required=True)
+
+    args = parser.parse_args()
+    gate = PerfRegressionGate(samples=args.samples, warmup=args.warmup)
+
+    print("🚀 HAPPYTOOLS PERFORMANCE REGRESSION GATE")
+    print(f"🕒 Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    if args.command == "record":
+        results = gate.run_benchmarks([args.base_url])
+        save_run(gate.build_run(args.base_url, results[args.base_url]), next_baseline_path(args.name))
+        return 0
+
+    if args.command == "compare":
+        baseline_path = args.baseline or latest_baseline_path(args.name)
+        if not baseline_path:
+            print(f"❌ No baseline found for '{args.name}'. Run 'record' first.")
+            return 2
+        baseline = load_run(baseline_path)
+
+        if args.candidate:
+            candidate = load_run(args.candidate)
+            candidate_label = args.candidate
+        else:
+            results = gate.run_benchmarks([args.base_url])
+            candidate = gate.build_run(args.base_url, results[args.base_url])
+            candidate_label = f"{args.base_url} (fresh run)"
+            if args.save:
+                save_run(candidate, next_baseline_path(args.name))
+
+        rows, regressions = compare_runs(baseline, candidate, args.tolerance, args.confidence, args.max_error_rate)
+        print_diff(rows, f"{baseline_path} ({baseline.get('git_revision') or 'unknown rev'})",
+                   candidate_label, args.tolerance, args.confidence)
+
+    else:
+        results = gate.run_benchmarks([args.base_url_a, args.base_url_b])
+        run_a = gate.build_run(args.base_url_a, results[args.base_url_a])
+        run_b = gate.build_run(args.base_url_b, results[args.base_url_b])
+        rows, regressions = compare_runs(run_a, run_b, args.tolerance, args.confidence, args.max_error_rate)
+        print_diff(rows, args.base_url_a, args.base_url_b, args.tolerance, args.confidence)
+
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} endpoint(s) regressed (latency beyond {args.tolerance * 100:.0f}% or new errors): {', '.join(regressions)}")
+        return 1
+
+    print("\n🎉 No latency regressions detected.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
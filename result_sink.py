@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Streaming JSONL Result Sink for the Python Test Harnesses
+Every check is appended to a JSONL file as soon as it completes, together
+with the HTTP request it made (endpoint, status code, wall time, bytes
+received and the server's Server-Timing breakdown). A killed or timed-out
+run keeps everything logged up to that point.
+
+Usage:
+    from result_sink import ResultSink
+    sink = ResultSink("backend_test", base_url=BASE_URL)
+    sink.record("Stats endpoint", passed=True, message="...")
+    sink.close()
+
+    python result_sink.py summarize test_runs/*.jsonl
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+RESULT_DIR = os.environ.get("RESULT_SINK_DIR", "test_runs")
+
+ID_SEGMENT = re.compile(r"^(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+|[0-9a-f]{24})$", re.I)
+
+_observations = threading.local()
+_instrumented = False
+
+
+def normalize_endpoint(method, url):
+    """'GET https://host/api/chatbot/info/<uuid>?x=1' -> 'GET /api/chatbot/info/:id'"""
+    path = urlparse(url).path or "/"
+    segments = [":id" if ID_SEGMENT.match(s) else s for s in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+def parse_server_timing(header):
+    """Parse 'db;dur=12.3, app;dur=40;desc="handler"' into {'db': 12.3, 'app': 40.0}"""
+    timings = {}
+    if not header:
+        return timings
+    for metric in header.split(","):
+        parts = [p.strip() for p in metric.split(";")]
+        if not parts[0]:
+            continue
+        duration = None
+        for param in parts[1:]:
+            if param.startswith("dur="):
+                try:
+                    duration = float(param[4:])
+                except ValueError:
+                    pass
+        timings[parts[0]] = duration
+    return timings
+
+
+def instrument_requests():
+    """Record every request made through `requests` on the calling thread.
+
+    All module-level helpers (requests.get/post/...) go through
+    Session.request, so patching it once covers the existing harness code
+    without touching each call site.
+    """
+    global _instrumented
+    if _instrumented:
+        return
+    original_request = requests.Session.request
+
+    def timed_request(session, method, url, *args, **kwargs):
+        start = time.perf_counter()
+        observation = {"endpoint": normalize_endpoint(method, url), "status_code": None,
+                       "wall_ms": None, "bytes": None, "server_timing": {}}
+        try:
+            response = original_request(session, method, url, *args, **kwargs)
+            observation["status_code"] = response.status_code
+            observation["bytes"] = len(response.content)
+            observation["server_timing"] = parse_server_timing(response.headers.get("Server-Timing"))
+            return response
+        except Exception as e:
+            observation["error"] = type(e).__name__
+            raise
+        finally:
+            observation["wall_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            pending = getattr(_observations, "pending", None)
+            if pending is None:
+                pending = _observations.pending = []
+            pending.append(observation)
+
+    requests.Session.request = timed_request
+    _instrumented = True
+
+
+def take_observations():
+    pending = getattr(_observations, "pending", None) or []
+    _observations.pending = []
+    return pending
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+class ResultSink:
+    def __init__(self, harness, base_url=None, path=None, instrument=True):
+        # Long-running multi-threaded harnesses time their own requests and
+        # opt out, since observations are only drained by record()
+        if instrument:
+            instrument_requests()
+            take_observations()
+
+        self.harness = harness
+        self.run_id = str(uuid.uuid4())
+        self.seq = 0
+        self.passed = 0
+        self.failed = 0
+
+        if path is None:
+            os.makedirs(RESULT_DIR, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(RESULT_DIR, f"{harness}-{stamp}-{self.run_id[:8]}.jsonl")
+        self.path = path
+        # Line buffered so each record reaches the OS as soon as it is written
+        self.file = open(path, "a", buffering=1)
+
+        self._write({
+            "type": "run_start",
+            "harness": harness,
+            "base_url": base_url,
+            "git_revision": git_revision(),
+            "host": socket.gethostname(),
+            "python": platform.python_version(),
+            "argv": sys.argv,
+        })
+        print(f"📝 Streaming results to {path}")
+
+    def _write(self, record):
+        record = {"run_id": self.run_id, "ts": datetime.now().isoformat(), **record}
+        self.file.write(json.dumps(record, default=str) + "\n")
+        self.file.flush()
+
+    def record(self, test_name, passed, message=""):
+        """Append one check. The HTTP request(s) made since the previous check are attached."""
+        observations = take_observations()
+        primary = observations[-1] if observations else {}
+        self.seq += 1
+        if passed:
+            self.passed += 1
+        else:
+            self.failed += 1
+
+        self._write({
+            "type": "check",
+            "seq": self.seq,
+            "test": test_name,
+            "outcome": "pass" if passed else "fail",
+            "message": message,
+            "endpoint": primary.get("endpoint"),
+            "status_code": primary.get("status_code"),
+            "wall_ms": primary.get("wall_ms"),
+            "bytes": primary.get("bytes"),
+            "server_timing": primary.get("server_timing", {}),
+            "error": primary.get("error"),
+            "requests": observations,
+        })
+
+    def event(self, record_type, **fields):
+        """Append a free-form record, e.g. periodic samples from a soak run"""
+        self._write({"type": record_type, **fields})
+
+    def close(self):
+        self._write({"type": "run_end", "passed": self.passed, "failed": self.failed})
+        self.file.close()
+
+
+def load_records(paths):
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write can leave a truncated last line
+                    continue
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(paths):
+    """Aggregate per-endpoint latency across runs, oldest run first"""
+    runs = {}
+    samples = {}
+
+    for record in load_records(paths):
+        run_id = record.get("run_id")
+        if record.get("type") == "run_start":
+            runs[run_id] = {"started": record.get("ts"), "rev": record.get("git_revision"),
+                            "harness": record.get("harness"), "complete": False}
+        elif record.get("type") == "run_end" and run_id in runs:
+            runs[run_id]["complete"] = True
+        elif record.get("type") == "check":
+            for request in record.get("requests") or []:
+                if request.get("wall_ms") is None or not request.get("endpoint"):
+                    continue
+                samples.setdefault(request["endpoint"], {}).setdefault(run_id, []).append(request["wall_ms"])
+
+    ordered_runs = sorted(runs, key=lambda r: runs[r]["started"] or "")
+
+    print("="*100)
+    print(f"PER-ENDPOINT LATENCY TRENDS ({len(ordered_runs)} runs)")
+    print("="*100)
+    for index, run_id in enumerate(ordered_runs, 1):
+        run = runs[run_id]
+        print(f"  #{index:<3} {run['started']}  {run['harness']:<20} rev {run['rev'] or '?':<10}"
+              f"{'' if run['complete'] else '  (incomplete)'}")
+
+    for endpoint in sorted(samples):
+        print(f"\n{endpoint}")
+        print(f"  {'run':<6}{'n':>5}{'p50':>12}{'p95':>12}{'max':>12}")
+        medians = []
+        for index, run_id in enumerate(ordered_runs, 1):
+            values = samples[endpoint].get(run_id)
+            if not values:
+                continue
+            p50 = statistics.median(values)
+            medians.append(p50)
+            print(f"  #{index:<5}{len(values):>5}{p50:>10.1f}ms{percentile(values, 95):>10.1f}ms{max(values):>10.1f}ms")
+        if len(medians) >= 2 and medians[0] > 0:
+            change = (medians[-1] / medians[0] - 1) * 100
+            arrow = "📈" if change > 10 else ("📉" if change < -10 else "➡️ ")
+            print(f"  {arrow} p50 trend first→last: {change:+.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HappyTools harness result sink tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summarize", help="aggregate JSONL runs into per-endpoint latency trends")
+    summary.add_argument("paths", nargs="*", help=f"JSONL files (default: {RESULT_DIR}/*.jsonl)")
+    args = parser.parse_args()
+
+    if args.command == "summarize":
+        paths = args.paths or sorted(glob.glob(os.path.join(RESULT_DIR, "*.jsonl")))
+        if not paths:
+            print(f"❌ No result files found in {RESULT_DIR}/")
+            return 1
+        summarize(paths)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
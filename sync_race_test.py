@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Race and Idempotency Stress Test for /ai-tools/sync-aitools
+Fires N concurrent sync requests and checks that the sync lease lets exactly
+one background job start, that every other caller is pointed at that job, that
+the stand-in sees a single crawl and that no duplicate (source, name) tools end
+up in MongoDB.
+
+The crawl goes to a local stand-in for aitools.fyi started by this script, so
+upstream page hits can be counted. Start the app against it first:
+
+    AITOOLS_BASE_URL=http://127.0.0.1:8765 AITOOLS_PAGE_DELAY_MS=0 yarn dev
+
+Usage:
+    python sync_race_test.py --concurrency 16
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from pymongo import MongoClient
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000/api")
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "happytools")
+
+STAND_IN_PATHS = [
+    "/category/ai-image-generation", "/category/ai-web-apps", "/category/ai-marketing",
+    "/category/ai-analytics", "/", "/category/ai-content-creation", "/category/ai-productivity",
+    "/category/ai-writing", "/category/ai-video", "/category/ai-audio", "/category/ai-code",
+    "/category/ai-design", "/category/ai-automation", "/category/ai-sales", "/category/ai-email",
+    "/category/ai-social-media", "/category/ai-seo", "/category/ai-customer-support",
+    "/category/ai-finance", "/category/ai-health",
+]
+
+# A few tools are listed on several pages, like the real site
+SHARED_TOOLS = ["Race Shared Writer", "Race Shared Painter", "Race Shared Coder"]
+
+
+def stand_in_page(path):
+    slug = path.strip("/").split("/")[-1] or "featured"
+    cards = []
+    names = [f"Race {slug} Tool {i}" for i in range(1, 11)] + SHARED_TOOLS
+    for name in names:
+        link = "/tool/" + name.lower().replace(" ", "-")
+        cards.append(
+            f'<div class="tool-card"><a href="{link}"><h3>{name}</h3></a>'
+            f'<p>{name} helps you get {slug} work done faster with AI assistance.</p>'
+            f'<span class="pricing">Freemium</span></div>'
+        )
+    return f"<html><body><div class=\"grid\">{''.join(cards)}</div></body></html>".encode()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    hits = Counter()
+    hits_lock = threading.Lock()
+    latency = 0.2
+    # Paths answered with a 500
+    failing = set()
+
+    def do_GET(self):
+        with self.hits_lock:
+            self.hits[self.path] += 1
+        # Slow pages widen the window in which concurrent syncs overlap
+        time.sleep(self.latency)
+        if self.path in self.failing:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = stand_in_page(self.path)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SyncRaceTester:
+    def __init__(self, concurrency, stand_in_port, page_latency):
+        self.concurrency = concurrency
+        self.stand_in_port = stand_in_port
+        self.results = []
+        StandInHandler.latency = page_latency
+        self.db = MongoClient(MONGO_URL)[DB_NAME]
+
+    def log_test(self, test_name, success, details=""):
+        self.results.append({"test": test_name, "success": success, "details": details})
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status}: {test_name}")
+        if details:
+            print(f"   {details}")
+
+    def start_stand_in(self):
+        server = ThreadingHTTPServer(("127.0.0.1", self.stand_in_port), StandInHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"🧪 aitools.fyi stand-in listening on http://127.0.0.1:{self.stand_in_port}")
+        return server
+
+    def duplicate_groups(self):
+        return list(self.db.ai_tools.aggregate([
+            {"$match": {"source": "AITools.fyi", "name": {"$regex": "^Race "}}},
+            {"$group": {"_id": {"source": "$source", "name": "$name"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ]))
+
+    def fire_concurrent_syncs(self):
+        barrier = threading.Barrier(self.concurrency)
+
+        def sync(_):
+            session = requests.Session()
+            barrier.wait()
+            start = time.perf_counter()
+            try:
+                response = session.post(f"{BASE_URL}/ai-tools/sync-aitools", timeout=30)
+                body = response.json() if response.headers.get("Content-Type", "").startswith("application/json") else {}
+                return response.status_code, body, time.perf_counter() - start
+            except Exception as e:
+                return None, {"error": str(e)}, time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return list(pool.map(sync, range(self.concurrency)))
+
+    def wait_for_job(self, job_id, timeout=300):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            response = requests.get(f"{BASE_URL}/ai-tools/sync-jobs/{job_id}", timeout=30)
+            if response.status_code == 200 and response.json().get("status") in ("completed", "partial", "failed"):
+                return response.json()
+            time.sleep(0.5)
+        return None
+
+    def test_concurrent_syncs(self):
+        print(f"\n--- Firing {self.concurrency} concurrent syncs ---")
+        StandInHandler.hits.clear()
+        responses = self.fire_concurrent_syncs()
+
+        accepted = [body for code, body, _ in responses if code == 202]
+        started = [body for body in accepted if not body.get("in_progress")]
+        deferred = [body for body in accepted if body.get("in_progress")]
+        slowest = max(elapsed for _, _, elapsed in responses)
+        print(f"   started: {len(started)}  deferred: {len(deferred)}  "
+              f"failed: {len(responses) - len(accepted)}  slowest response: {slowest:.2f}s")
+
+        self.log_test("Exactly one sync started", len(started) == 1 and len(accepted) == len(responses),
+                      f"{len(started)} started, {len(deferred)} deferred, {len(responses) - len(accepted)} failed")
+        if not started:
+            return
+
+        job_id = started[0].get("job_id")
+        pointed = [body for body in deferred if body.get("job_id") == job_id]
+        self.log_test("Deferred callers see the running job", len(pointed) == len(deferred),
+                      f"{len(pointed)}/{len(deferred)} reference job {job_id}")
+
+        job = self.wait_for_job(job_id)
+        self.log_test("Sync job completes", job is not None and job.get("status") == "completed",
+                      "" if job is None else f"{job.get('status')}: {job.get('pages_done')}/{job.get('pages_total')} pages, "
+                      f"{job.get('inserted')} inserted")
+
+        repeated = {path: count for path, count in StandInHandler.hits.items() if count != 1}
+        self.log_test("Single upstream crawl", len(StandInHandler.hits) == len(STAND_IN_PATHS) and not repeated,
+                      f"{sum(StandInHandler.hits.values())} page hits over {len(StandInHandler.hits)} pages"
+                      + (f", repeated: {repeated}" if repeated else ""))
+
+        duplicates = self.duplicate_groups()
+        self.log_test("No duplicate tools after concurrent syncs", not duplicates,
+                      f"{len(duplicates)} duplicated (source, name) pairs")
+
+    def test_sequential_resync(self):
+        print("\n--- Re-running sync sequentially ---")
+        before = self.db.ai_tools.count_documents({"source": "AITools.fyi", "name": {"$regex": "^Race "}})
+        inserted = []
+        for _ in range(2):
+            response = requests.post(f"{BASE_URL}/ai-tools/sync-aitools", timeout=30)
+            job = self.wait_for_job(response.json().get("job_id")) if response.status_code == 202 else None
+            inserted.append(job.get("inserted") if job else None)
+        after = self.db.ai_tools.count_documents({"source": "AITools.fyi", "name": {"$regex": "^Race "}})
+
+        self.log_test("Re-sync inserts nothing new", inserted == [0, 0] and before == after,
+                      f"inserted per run {inserted}, documents {before} -> {after}")
+        duplicates = self.duplicate_groups()
+        self.log_test("No duplicate tools after re-sync", not duplicates,
+                      f"{len(duplicates)} duplicated (source, name) pairs")
+
+    def test_lease_released(self):
+        lease = self.db.sync_leases.find_one({"_id": "aitools-fyi"})
+        self.log_test("Lease released after sync", lease is None,
+                      "" if lease is None else f"lease still held by job {lease.get('job_id')}")
+
+    def test_failed_page(self):
+        print("\n--- Sync with one page failing ---")
+        failing = "/category/ai-video"
+        started_at = datetime.utcnow()
+        StandInHandler.failing = {failing}
+        StandInHandler.hits.clear()
+        try:
+            response = requests.post(f"{BASE_URL}/ai-tools/sync-aitools", timeout=30)
+            job = self.wait_for_job(response.json().get("job_id")) if response.status_code == 202 else None
+        finally:
+            StandInHandler.failing = set()
+
+        self.log_test("Failed page leaves the job partial",
+                      job is not None and job.get("status") == "partial" and job.get("failed_pages") == 1
+                      and job.get("failed_page_keys") == [failing],
+                      "" if job is None else f"{job.get('status')}: {job.get('pages_done')}/{job.get('pages_total')} pages, "
+                      f"failed {job.get('failed_page_keys')}, error {job.get('error')!r}")
+        placeholders = self.db.ai_tools.count_documents({
+            "source": "AITools.fyi", "name": {"$regex": " AI Tool$"}, "created_at": {"$gte": started_at}
+        })
+        self.log_test("No placeholder tool for the failed page", placeholders == 0,
+                      f"{placeholders} placeholder tools written")
+
+        # The next sync resumes the partial job and fetches only the failed page
+        StandInHandler.hits.clear()
+        response = requests.post(f"{BASE_URL}/ai-tools/sync-aitools", timeout=30)
+        body = response.json() if response.status_code == 202 else {}
+        retried = self.wait_for_job(body.get("job_id")) if body else None
+        self.log_test("Resumed sync retries only the failed page",
+                      body.get("resumed") and retried is not None and retried.get("status") == "completed"
+                      and set(StandInHandler.hits) == {failing},
+                      f"resumed={body.get('resumed')}, status {retried and retried.get('status')}, "
+                      f"pages fetched {sorted(StandInHandler.hits)}")
+
+    def run(self, keep_data=False):
+        print("🚀 SYNC RACE & IDEMPOTENCY STRESS TEST")
+        print(f"🕒 Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"🌐 API: {BASE_URL}   🗄️  {MONGO_URL}/{DB_NAME}")
+        print("="*80)
+
+        server = self.start_stand_in()
+        self.db.ai_tools.delete_many({"source": "AITools.fyi", "name": {"$regex": "^Race "}})
+        try:
+            self.test_concurrent_syncs()
+            self.test_lease_released()
+            self.test_sequential_resync()
+            self.test_failed_page()
+        finally:
+            server.shutdown()
+            if not keep_data:
+                self.db.ai_tools.delete_many({"source": "AITools.fyi", "name": {"$regex": "^Race "}})
+
+        print("\n" + "="*80)
+        passed = sum(1 for r in self.results if r["success"])
+        print(f"📊 Results: {passed}/{len(self.results)} checks passed")
+        for result in self.results:
+            if not result["success"]:
+                print(f"  ❌ {result['test']}: {result['details']}")
+        return 0 if passed == len(self.results) else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent sync-aitools race test")
+    parser.add_argument("--concurrency", type=int, default=16, help="simultaneous sync requests")
+    parser.add_argument("--port", type=int, default=8765, help="port for the aitools.fyi stand-in")
+    parser.add_argument("--page-latency", type=float, default=0.2, help="seconds the stand-in waits per page")
+    parser.add_argument("--keep-data", action="store_true", help="leave the synced test tools in MongoDB")
+    args = parser.parse_args()
+
+    tester = SyncRaceTester(args.concurrency, args.port, args.page_latency)
+    return tester.run(keep_data=args.keep_data)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -257,6 +257,113 @@ class WorkflowBuilderTester:
                 
         except Exception as e:
             self.log_test("Helper Functions (Basic Template)", False, f"Exception: {str(e)}")
+        
+        # Test 8: Stock automations are served from the local template tier
+        print("\n--- Testing Template Tier ---")
+        try:
+            payload = {
+                "name": "Welcome Flow",
+                "provider": "openai",
+                "apiKey": "fake-api-key-for-testing",
+                "automationDescription": "When someone submits a contact form on my website, I want to send them a welcome email and add their information to my CRM system.",
+                "platform": "make"
+            }
+            
+            start = time.time()
+            response = requests.post(f"{BASE_URL}/workflow-builder/generate", json=payload, headers=HEADERS, timeout=30)
+            elapsed_ms = (time.time() - start) * 1000
+            
+            if response.status_code == 200:
+                data = response.json()
+                metadata = data.get('metadata', {})
+                if metadata.get('served_from') == 'template' and data.get('nodeCount', 0) >= 2:
+                    self.log_test("Template Tier", True, f"Served template {metadata.get('template', {}).get('id')} (score {metadata.get('template', {}).get('score')}) in {elapsed_ms:.0f} ms")
+                else:
+                    self.log_test("Template Tier", False, f"Not served from the template tier: {metadata}")
+            else:
+                self.log_test("Template Tier", False, f"HTTP {response.status_code}: {response.text}")
+            
+            # Opting out goes to the provider (which rejects the fake key)
+            payload["useTemplates"] = False
+            response = requests.post(f"{BASE_URL}/workflow-builder/generate", json=payload, headers=HEADERS, timeout=60)
+            served_from = response.json().get('metadata', {}).get('served_from') if response.status_code == 200 else None
+            self.log_test("Template Tier Opt-out", served_from != 'template', f"HTTP {response.status_code}, served_from={served_from}")
+
+            # Close wording is not enough: another service, or an excluded step, goes to the provider
+            for description in [
+                "Automatically post my blog content to LinkedIn when I publish a new article",
+                "Upload new videos to Vimeo and summarize them with Claude",
+                "Monitor my website and send alerts by email without Slack when it goes down"
+            ]:
+                payload = {**payload, "automationDescription": description, "useTemplates": True}
+                response = requests.post(f"{BASE_URL}/workflow-builder/generate", json=payload, headers=HEADERS, timeout=60)
+                served_from = response.json().get('metadata', {}).get('served_from') if response.status_code == 200 else None
+                self.log_test("Template Tier Mismatch", served_from != 'template', f"{description!r}: HTTP {response.status_code}, served_from={served_from}")
+
+        except Exception as e:
+            self.log_test("Template Tier", False, f"Exception: {str(e)}")
+        
+        # Test 9: One generation for both platforms, the second converted locally
+        print("\n--- Testing Multi-platform Generation ---")
+        try:
+            payload = {
+                "name": "Welcome Flow Both",
+                "provider": "openai",
+                "apiKey": "fake-api-key-for-testing",
+                "automationDescription": "When someone submits a contact form on my website, I want to send them a welcome email and add their information to my CRM system.",
+                "platforms": ["n8n", "make"]
+            }
+            
+            response = requests.post(f"{BASE_URL}/workflow-builder/generate", json=payload, headers=HEADERS, timeout=30)
+            
+            if response.status_code == 200:
+                data = response.json()
+                workflows = data.get('workflows', {})
+                make = workflows.get('make', {})
+                n8n = workflows.get('n8n', {})
+                if (data.get('metadata', {}).get('converted_from') == 'n8n'
+                        and make.get('nodeCount') == n8n.get('nodeCount')
+                        and make.get('workflow', {}).get('scenario', {}).get('flow')):
+                    self.log_test("Multi-platform Generation", True, f"Converted to Make.com in {data['metadata'].get('conversion_ms')} ms, {len(make.get('warnings', []))} warnings")
+                else:
+                    self.log_test("Multi-platform Generation", False, f"Unexpected response: {data.get('metadata')}")
+            else:
+                self.log_test("Multi-platform Generation", False, f"HTTP {response.status_code}: {response.text}")
+            
+            payload["platforms"] = ["n8n", "zapier"]
+            response = requests.post(f"{BASE_URL}/workflow-builder/generate", json=payload, headers=HEADERS, timeout=30)
+            self.log_test("Multi-platform Validation", response.status_code == 400, f"HTTP {response.status_code}")
+                
+        except Exception as e:
+            self.log_test("Multi-platform Generation", False, f"Exception: {str(e)}")
+        
+        # Test 10: Backup providers for hedged generation
+        print("\n--- Testing Hedged Generation ---")
+        try:
+            payload = {
+                "name": "Hedged Flow",
+                "provider": "openai",
+                "apiKey": "fake-api-key-for-testing",
+                "automationDescription": "Every morning, fetch the latest posts from our RSS feed and post a summary to Slack.",
+                "platform": "n8n",
+                "useTemplates": False,
+                "hedge": [{"provider": "mistral", "apiKey": "fake-api-key-for-testing"}]
+            }
+            
+            response = requests.post(f"{BASE_URL}/workflow-builder/generate", json=payload, headers=HEADERS, timeout=30)
+            self.log_test("Hedge Validation", response.status_code == 400, f"HTTP {response.status_code}")
+            
+            # With fake keys every provider fails; the primary's error is reported
+            payload["hedge"] = [{"provider": "claude", "apiKey": "fake-api-key-for-testing"}]
+            response = requests.post(f"{BASE_URL}/workflow-builder/generate", json=payload, headers=HEADERS, timeout=60)
+            self.log_test("Hedged Generation Failure", response.status_code == 500 and 'error' in response.json(), f"HTTP {response.status_code}")
+            
+            response = requests.get(f"{BASE_URL}/provider-latency", headers=HEADERS, timeout=30)
+            hedging = response.json().get('hedging', {}) if response.status_code == 200 else {}
+            self.log_test("Provider Latency Report", hedging.get('hedged', 0) >= 1, f"HTTP {response.status_code}, {hedging}")
+                
+        except Exception as e:
+            self.log_test("Hedged Generation", False, f"Exception: {str(e)}")
     
     def run_all_tests(self):
         """Run all workflow builder tests"""